@@ -526,6 +526,51 @@ REDIS_URL = env("REDIS_URL", default="redis://redis:6379")
 # ------------------------------------------------------------------------------
 TAGGIT_CASE_INSENSITIVE = True
 
+# Report Generation
+# ------------------------------------------------------------------------------
+# Upper bound (in bytes of uncompressed template content) for the per-process cache of
+# parsed DOCX/PPTX templates; set to ``0`` to parse the template file for every export
+REPORT_TEMPLATE_CACHE_MAX_BYTES = env.int("REPORT_TEMPLATE_CACHE_MAX_BYTES", default=256 * 1024 * 1024)
+# Maximum number of compiled rich text (finding, observation, etc.) templates kept in the
+# per-process cache; set to ``0`` to compile the rich text for every export
+REPORT_RICH_TEXT_CACHE_SIZE = env.int("REPORT_RICH_TEXT_CACHE_SIZE", default=4096)
+# Upper bound (in bytes) for the per-process cache of rich text converted to Word subdocuments,
+# including any images they embed; set to ``0`` to convert the rich text for every export
+REPORT_SUBDOC_CACHE_MAX_BYTES = env.int("REPORT_SUBDOC_CACHE_MAX_BYTES", default=64 * 1024 * 1024)
+# HTML backend used to convert rich text to DOCX/PPTX: ``lxml`` walks the parsed tree directly,
+# while ``bs4`` goes through BeautifulSoup; both produce the same documents
+REPORT_RICH_TEXT_PARSER = env("REPORT_RICH_TEXT_PARSER", default="lxml")
+# Number of worker processes used to render the formats of a "download all" report in parallel;
+# set to ``0`` or ``1`` to render them one after another in the requesting process
+REPORT_EXPORT_WORKERS = env.int("REPORT_EXPORT_WORKERS", default=4)
+# Add an ``X-Report-Timings`` header with the time spent in each stage of the export to
+# report downloads; the timings are always logged and stored with background jobs
+REPORT_TIMINGS_HEADER = env.bool("REPORT_TIMINGS_HEADER", default=False)
+
+# Activity Logs
+# ------------------------------------------------------------------------------
+# Seconds to collect changes to log entries before sending them to the browsers watching
+# the log in one batch; set to ``0`` to send the changes as soon as each transaction commits
+OPLOG_BROADCAST_WINDOW = env.float("OPLOG_BROADCAST_WINDOW", default=0.25)
+# Number of entries saved per query by the bulk ingestion API and CSV imports
+OPLOG_INGEST_CHUNK_SIZE = env.int("OPLOG_INGEST_CHUNK_SIZE", default=1000)
+
+# Domain and Server Management
+# ------------------------------------------------------------------------------
+# Nameservers queried by DNS record updates, as ``address`` or ``address:port`` (e.g., a
+# local stub resolver at ``127.0.0.1:5353``); queries are spread across all of them
+DNS_RESOLVERS = env.list("DNS_RESOLVERS", default=["8.8.8.8", "8.8.4.4", "1.1.1.1"])
+# Maximum number of DNS queries in flight at once for each nameserver
+DNS_RESOLVER_CONCURRENCY = env.int("DNS_RESOLVER_CONCURRENCY", default=20)
+# Seconds to wait for each answer before retrying the query with the next nameserver
+DNS_TIMEOUT = env.float("DNS_TIMEOUT", default=3.0)
+# Number of times a query that timed out or failed is retried
+DNS_RETRIES = env.int("DNS_RETRIES", default=2)
+# Number of servers port scanned at the same time, each by its own nmap process
+SERVER_SCAN_WORKERS = env.int("SERVER_SCAN_WORKERS", default=8)
+# Number of port scans kept for each server; older ones are deleted after each run
+SERVER_SCAN_HISTORY = env.int("SERVER_SCAN_HISTORY", default=30)
+
 
 def include_settings(py_glob):
     """
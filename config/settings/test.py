@@ -37,5 +37,16 @@ PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
+# REPORT GENERATION
+# ------------------------------------------------------------------------------
+# Export pool workers use their own database connections and can't see the data of
+# a test's transaction, so render every format in the test process
+REPORT_EXPORT_WORKERS = 0
+
+# ACTIVITY LOGS
+# ------------------------------------------------------------------------------
+# Timer threads use their own database connections, so broadcast changes on commit
+OPLOG_BROADCAST_WINDOW = 0
+
 # Your stuff...
 # ------------------------------------------------------------------------------
@@ -1,15 +1,18 @@
 # Standard Libraries
 import base64
+import copy
 import json
 import logging
 import os
 from datetime import date, datetime, timedelta
 from http import HTTPStatus
+from unittest import mock
 
 # Django Imports
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -35,6 +38,7 @@ from ghostwriter.factories import (
     FindingFactory,
     HistoryFactory,
     OplogEntryFactory,
+    OplogFactory,
     ProjectAssignmentFactory,
     ProjectContactFactory,
     ProjectFactory,
@@ -50,7 +54,9 @@ from ghostwriter.factories import (
     StaticServerFactory,
     UserFactory,
 )
+from ghostwriter.oplog.models import OplogEntry, OplogStats
 from ghostwriter.reporting.models import Evidence
+from ghostwriter.reporting.tasks import generate_report_job
 
 logging.disable(logging.CRITICAL)
 
@@ -554,6 +560,52 @@ class HasuraGenerateReportTests(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    def test_graphql_generate_report_async(self):
+        _, token = utils.generate_jwt(self.user)
+        data = {"input": {"id": self.report.pk, "async": True}}
+        response = self.client.post(
+            self.uri,
+            data=data,
+            content_type="application/json",
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}", "HTTP_AUTHORIZATION": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["reportData"])
+        self.assertEqual(response.json()["status"], "queued")
+        job_id = response.json()["jobId"]
+
+        status_uri = reverse("api:graphql_report_job_status")
+        data = {"input": {"id": job_id}}
+        response = self.client.post(
+            status_uri,
+            data=data,
+            content_type="application/json",
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}", "HTTP_AUTHORIZATION": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "queued")
+        self.assertIsNone(response.json()["reportData"])
+
+        generate_report_job(job_id)
+        response = self.client.post(
+            status_uri,
+            data=data,
+            content_type="application/json",
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}", "HTTP_AUTHORIZATION": f"Bearer {token}"},
+        )
+        self.assertEqual(response.json()["status"], "success")
+        report_data = json.loads(base64.b64decode(response.json()["reportData"]))
+        self.assertEqual(report_data["title"], self.report.title)
+
+        _, other_token = utils.generate_jwt(UserFactory(password=PASSWORD))
+        response = self.client.post(
+            status_uri,
+            data=data,
+            content_type="application/json",
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}", "HTTP_AUTHORIZATION": f"Bearer {other_token}"},
+        )
+        self.assertEqual(response.status_code, 401)
+
     def test_graphql_generate_report_with_invalid_report(self):
         _, token = utils.generate_jwt(self.user)
         data = {"input": {"id": 999}}
@@ -1586,6 +1638,178 @@ class GraphqlDomainUpdateEventTests(TestCase):
         self.assertFalse(self.domain.expired)
 
 
+class GraphqlOplogEntryPageTests(TestCase):
+    """Collection of tests for :view:`api:GraphqlOplogEntryPage`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(password=PASSWORD)
+        cls.mgr_user = UserFactory(password=PASSWORD, role="manager")
+        cls.uri = reverse("api:graphql_oplog_entry_page")
+        cls.log = OplogFactory()
+        cls.entries = OplogEntryFactory.create_batch(5, oplog_id=cls.log)
+        cls.entries[0].comments = "Kerberoasted the service accounts"
+        cls.entries[0].save()
+
+    def setUp(self):
+        self.client = Client()
+
+    def post(self, user, **data):
+        _, token = utils.generate_jwt(user)
+        return self.client.post(
+            self.uri,
+            content_type="application/json",
+            data={"input": data},
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}", "HTTP_AUTHORIZATION": f"Bearer {token}"},
+        )
+
+    def test_paging_through_entries(self):
+        seen = []
+        after = None
+        while True:
+            response = self.post(self.mgr_user, oplogId=self.log.id, after=after, limit=2)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            if not page:
+                break
+            seen.extend(entry["id"] for entry in page)
+            after = page[-1]["cursor"]
+        expected = sorted(self.entries, key=lambda entry: (entry.start_date, entry.id), reverse=True)
+        self.assertEqual(seen, [entry.id for entry in expected])
+
+    def test_filter(self):
+        response = self.post(self.mgr_user, oplogId=self.log.id, filter="kerberoast")
+        self.assertEqual([entry["id"] for entry in response.json()], [self.entries[0].id])
+
+    def test_structured_filters(self):
+        self.entries[1].tags.add("creds")
+        response = self.post(self.mgr_user, oplogId=self.log.id, filters={"tag": ["creds"], "operator": None})
+        self.assertEqual([entry["id"] for entry in response.json()], [self.entries[1].id])
+        response = self.post(self.mgr_user, oplogId=self.log.id, filters={"color": ["red"]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_input(self):
+        response = self.post(self.mgr_user, oplogId=self.log.id, after="not a cursor")
+        self.assertEqual(response.status_code, 400)
+        response = self.post(self.mgr_user, oplogId=self.log.id, limit=501)
+        self.assertEqual(response.status_code, 400)
+        response = self.post(self.mgr_user, oplogId=999999)
+        self.assertEqual(response.status_code, 401)
+
+    def test_requires_access_to_log(self):
+        response = self.post(self.user, oplogId=self.log.id)
+        self.assertEqual(response.status_code, 401)
+
+        ProjectAssignmentFactory(project=self.log.project, operator=self.user)
+        response = self.post(self.user, oplogId=self.log.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(self.entries))
+
+
+class GraphqlOplogEntryFacetsTests(TestCase):
+    """Collection of tests for :view:`api:GraphqlOplogEntryFacets`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(password=PASSWORD)
+        cls.mgr_user = UserFactory(password=PASSWORD, role="manager")
+        cls.uri = reverse("api:graphql_oplog_entry_facets")
+        cls.log = OplogFactory()
+        OplogEntryFactory.create_batch(2, oplog_id=cls.log, operator_name="alice", tool="Rubeus")
+        OplogEntryFactory(oplog_id=cls.log, operator_name="bob", tool="nmap")
+
+    def setUp(self):
+        self.client = Client()
+
+    def post(self, user, **data):
+        _, token = utils.generate_jwt(user)
+        return self.client.post(
+            self.uri,
+            content_type="application/json",
+            data={"input": data},
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}", "HTTP_AUTHORIZATION": f"Bearer {token}"},
+        )
+
+    def test_facets(self):
+        response = self.post(self.mgr_user, oplogId=self.log.id)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(data["operator"], [{"value": "alice", "count": 2}, {"value": "bob", "count": 1}])
+        self.assertEqual(data["tag"], [])
+
+        response = self.post(self.mgr_user, oplogId=self.log.id, filters={"tool": ["nmap"]}, limit=1)
+        self.assertEqual(response.json()["operator"], [{"value": "bob", "count": 1}])
+
+    def test_invalid_input(self):
+        response = self.post(self.mgr_user, oplogId=self.log.id, filters={"startDateAfter": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+        response = self.post(self.mgr_user, oplogId=self.log.id, limit=501)
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_access_to_log(self):
+        response = self.post(self.user, oplogId=self.log.id)
+        self.assertEqual(response.status_code, 401)
+
+
+class GraphqlOplogEntryBulkInsertTests(TestCase):
+    """Collection of tests for :view:`api:GraphqlOplogEntryBulkInsert`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(password=PASSWORD)
+        cls.mgr_user = UserFactory(password=PASSWORD, role="manager")
+        cls.uri = reverse("api:graphql_oplog_entry_bulk_insert")
+        cls.log = OplogFactory()
+
+    def setUp(self):
+        self.client = Client()
+
+    def post(self, user, **data):
+        _, token = utils.generate_jwt(user)
+        return self.client.post(
+            self.uri,
+            content_type="application/json",
+            data={"input": data},
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}", "HTTP_AUTHORIZATION": f"Bearer {token}"},
+        )
+
+    def test_inserting_entries(self):
+        response = self.post(
+            self.mgr_user,
+            oplogId=self.log.id,
+            entries=[{"entry_identifier": "1", "tool": "Rubeus.exe", "tags": ["kerberoast"]}],
+            ndjson='{"entry_identifier": "2"}\n{"entry_identifier": "1"}\n',
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["created"], 2)
+        self.assertEqual(data["existing"], 1)
+        self.assertEqual(data["entries"][2]["id"], data["entries"][0]["id"])
+        self.assertEqual(self.log.entries.count(), 2)
+
+    def test_invalid_input(self):
+        response = self.post(self.mgr_user, oplogId=self.log.id, entries=[])
+        self.assertEqual(response.status_code, 400)
+        response = self.post(self.mgr_user, oplogId=self.log.id, entries=[{"start_date": "soon"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Entry 0: start_date", response.json()["message"])
+        response = self.post(self.mgr_user, oplogId=self.log.id, ndjson="{")
+        self.assertEqual(response.status_code, 400)
+        response = self.post(self.mgr_user, oplogId=999999, entries=[{}])
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(self.log.entries.exists())
+
+    def test_requires_access_to_log(self):
+        response = self.post(self.user, oplogId=self.log.id, entries=[{}])
+        self.assertEqual(response.status_code, 401)
+
+        ProjectAssignmentFactory(project=self.log.project, operator=self.user)
+        response = self.post(self.user, oplogId=self.log.id, entries=[{}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.log.entries.count(), 1)
+
+
 class GraphqlOplogEntryEventTests(TestCase):
     """
     Collection of tests for :view:`api:GraphqlOplogEntryCreateEvent`,
@@ -1696,6 +1920,68 @@ class GraphqlOplogEntryEventTests(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    def test_graphql_oplogentry_events_skip_django_changes(self):
+        # Bulk ingestion and CSV imports write rows without session variables, and handle them themselves
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=OplogEntry, dispatch_uid="test_skip_django_changes")
+        try:
+            with mock.patch.object(OplogEntry, "save") as save:
+                for uri in (self.create_uri, self.update_uri):
+                    response = self.client.post(
+                        uri,
+                        content_type="application/json",
+                        data=self.sample_data,
+                        **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}"},
+                    )
+                    self.assertEqual(response.status_code, 200)
+        finally:
+            post_save.disconnect(sender=OplogEntry, dispatch_uid="test_skip_django_changes")
+        save.assert_not_called()
+        receiver.assert_not_called()
+
+    def test_graphql_oplogentry_events_update_stats(self):
+        stats = OplogStats.objects.get(oplog=self.oplog_entry.oplog_id)
+        self.assertEqual(stats.entry_count, 1)
+
+        # Entries created by Django were counted by the signals, so their events change nothing
+        self.client.post(
+            self.create_uri,
+            content_type="application/json",
+            data=self.sample_data,
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}"},
+        )
+        stats.refresh_from_db()
+        self.assertEqual(stats.entry_count, 1)
+
+        # Entries inserted through the GraphQL API are counted by their events
+        entry = OplogEntryFactory(oplog_id=self.oplog_entry.oplog_id, tool="Rubeus")
+        OplogStats.objects.filter(oplog=entry.oplog_id).update(entry_count=1, tools={})
+        data = copy.deepcopy(self.sample_data)
+        data["event"]["session_variables"] = {"x-hasura-role": "user"}
+        data["event"]["data"]["new"].update(id=entry.id, tool="Rubeus")
+        self.client.post(
+            self.create_uri,
+            content_type="application/json",
+            data=data,
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}"},
+        )
+        stats.refresh_from_db()
+        self.assertEqual(stats.entry_count, 2)
+        self.assertEqual(stats.tools, {"rubeus": 1})
+
+        data = copy.deepcopy(self.sample_delete_data)
+        data["event"]["session_variables"] = {"x-hasura-role": "user"}
+        data["event"]["data"]["old"].update(id=entry.id, tool="Rubeus", oplog_id_id=entry.oplog_id.id)
+        self.client.post(
+            self.delete_uri,
+            content_type="application/json",
+            data=data,
+            **{"HTTP_HASURA_ACTION_SECRET": f"{ACTION_SECRET}"},
+        )
+        stats.refresh_from_db()
+        self.assertEqual(stats.entry_count, 1)
+        self.assertEqual(stats.tools, {})
+
 
 class GraphqlReportFindingEventTests(TestCase):
     """
@@ -23,14 +23,18 @@ from ghostwriter.api.views import (
     GraphqlGenerateReport,
     GraphqlGetExtraFieldSpecAction,
     GraphqlLoginAction,
+    GraphqlOplogEntryBulkInsert,
     GraphqlOplogEntryCreateEvent,
     GraphqlOplogEntryDeleteEvent,
+    GraphqlOplogEntryFacets,
+    GraphqlOplogEntryPage,
     GraphqlOplogEntryUpdateEvent,
     GraphqlProjectContactUpdateEvent,
     GraphqlProjectObjectiveUpdateEvent,
     GraphqlProjectSubTaskUpdateEvent,
     GraphqlReportFindingChangeEvent,
     GraphqlReportFindingDeleteEvent,
+    GraphqlReportJobStatus,
     GraphqlServerCheckoutDelete,
     GraphqlTestView,
     GraphqlUploadReportTemplateView,
@@ -56,6 +60,14 @@ urlpatterns = [
         "getExtraFieldSpec", csrf_exempt(GraphqlGetExtraFieldSpecAction.as_view()), name="graphql_get_extra_field_spec"
     ),
     path("generateReport", csrf_exempt(GraphqlGenerateReport.as_view()), name="graphql_generate_report"),
+    path("reportJobStatus", csrf_exempt(GraphqlReportJobStatus.as_view()), name="graphql_report_job_status"),
+    path("oplogEntryPage", csrf_exempt(GraphqlOplogEntryPage.as_view()), name="graphql_oplog_entry_page"),
+    path("oplogEntryFacets", csrf_exempt(GraphqlOplogEntryFacets.as_view()), name="graphql_oplog_entry_facets"),
+    path(
+        "oplogEntryBulkInsert",
+        csrf_exempt(GraphqlOplogEntryBulkInsert.as_view()),
+        name="graphql_oplog_entry_bulk_insert",
+    ),
     path("checkoutDomain", csrf_exempt(GraphqlCheckoutDomain.as_view()), name="graphql_checkout_domain"),
     path("checkoutServer", csrf_exempt(GraphqlCheckoutServer.as_view()), name="graphql_checkout_server"),
     path("generateCodename", csrf_exempt(GraphqlGenerateCodenameAction.as_view()), name="graphql_generate_codename"),
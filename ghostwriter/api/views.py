@@ -4,12 +4,10 @@
 import json
 import logging
 import os
-from asgiref.sync import async_to_sync
 from base64 import b64encode
 from datetime import date, datetime
 from http import HTTPStatus
 from json import JSONDecodeError
-from socket import gaierror
 
 # Django Imports
 from django.conf import settings
@@ -27,7 +25,6 @@ from django.views.generic.edit import FormView
 from django.core.exceptions import ObjectDoesNotExist
 
 # 3rd Party Libraries
-from channels.layers import get_channel_layer
 from dateutil.parser import parse as parse_date
 from dateutil.parser._parser import ParserError
 import pytz
@@ -40,16 +37,21 @@ from ghostwriter.commandcenter.models import ExtraFieldModel, GeneralConfigurati
 from ghostwriter.modules import codenames
 from ghostwriter.modules.model_utils import set_finding_positions, to_dict
 from ghostwriter.modules.reportwriter.report.json import ExportReportJson
-from ghostwriter.oplog.models import OplogEntry
+from ghostwriter.oplog.broadcasts import broadcast_buffer
+from ghostwriter.oplog.filters import OplogFilterError, filter_entries, get_facets
+from ghostwriter.oplog.ingest import OplogIngestError, ingest_entries, parse_ndjson
+from ghostwriter.oplog.models import Oplog, OplogEntry, OplogStats
 from ghostwriter.reporting.models import (
     Evidence,
     Finding,
     Observation,
     Report,
     ReportFindingLink,
+    ReportGenerationJob,
     ReportObservationLink,
     ReportTemplate,
 )
+from ghostwriter.reporting.jobs import queue_report_job
 from ghostwriter.reporting.views2.report_finding_link import get_position
 from ghostwriter.rolodex.models import (
     Project,
@@ -333,6 +335,7 @@ class HasuraEventView(View):
     ]
     # Initialize default class attributes for event data
     data = None
+    event = None
     old_data = None
     new_data = None
 
@@ -362,6 +365,14 @@ class HasuraEventView(View):
             utils.generate_hasura_error_payload("Unauthorized access method", "Unauthorized"), status=403
         )
 
+    @property
+    def made_through_graphql(self) -> bool:
+        """
+        Whether the change was made through the GraphQL API. Changes made by Django have no session
+        variables, and have already fired the model signals.
+        """
+        return bool(self.event and self.event.get("session_variables"))
+
 
 ###########################
 # Hasura Action Endpoints #
@@ -551,7 +562,12 @@ class GraphqlGetExtraFieldSpecAction(JwtRequiredMixin, HasuraActionView):
 
 
 class GraphqlGenerateReport(JwtRequiredMixin, HasuraActionView):
-    """Endpoint for generating a JSON report with the ``generateReport`` action."""
+    """
+    Endpoint for generating a JSON report with the ``generateReport`` action.
+
+    If the optional ``async`` input is ``true``, the report is queued as a :model:`reporting.ReportGenerationJob`
+    and the response includes a ``jobId`` to poll with the ``reportJobStatus`` action instead of the report data.
+    """
 
     required_inputs = [
         "id",
@@ -565,20 +581,266 @@ class GraphqlGenerateReport(JwtRequiredMixin, HasuraActionView):
             return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
 
         if report.user_can_view(self.user_obj):
-            report_bytes = ExportReportJson(report).run().getvalue()
-            base64_bytes = b64encode(report_bytes)
-            base64_string = base64_bytes.decode("utf-8")
             data = {
-                "reportData": base64_string,
                 "docxUrl": reverse("reporting:generate_docx", args=[report_id]),
                 "xlsxUrl": reverse("reporting:generate_xlsx", args=[report_id]),
                 "pptxUrl": reverse("reporting:generate_pptx", args=[report_id]),
             }
+            if self.input.get("async", False):
+                job = queue_report_job(report, "json", self.user_obj)
+                data["reportData"] = None
+                data["jobId"] = job.id
+                data["status"] = job.status
+            else:
+                report_bytes = ExportReportJson(report).run().getvalue()
+                base64_bytes = b64encode(report_bytes)
+                data["reportData"] = base64_bytes.decode("utf-8")
+                data["jobId"] = None
+                data["status"] = "success"
             return JsonResponse(data, status=self.status)
 
         return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
 
 
+class GraphqlReportJobStatus(JwtRequiredMixin, HasuraActionView):
+    """
+    Endpoint for checking on a :model:`reporting.ReportGenerationJob` with the ``reportJobStatus`` action.
+
+    Once a JSON job succeeds, the response includes the base64-encoded report data. Other formats
+    include a URL to download the finished document.
+    """
+
+    required_inputs = [
+        "id",
+    ]
+
+    def post(self, request, *args, **kwargs):
+        job_id = self.input["id"]
+        try:
+            job = ReportGenerationJob.objects.select_related("report").get(id=job_id)
+        except ReportGenerationJob.DoesNotExist:
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        if not job.report.user_can_view(self.user_obj):
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        data = {
+            "jobId": job.id,
+            "reportId": job.report_id,
+            "format": job.output_format,
+            "status": job.status,
+            "stage": job.stage,
+            "error": job.error,
+            "reportData": None,
+            "downloadUrl": None,
+        }
+        if job.status == "success" and job.artifact:
+            data["downloadUrl"] = reverse("reporting:report_job_download", args=[job.id])
+            if job.output_format == "json":
+                with job.artifact.open("rb") as artifact:
+                    data["reportData"] = b64encode(artifact.read()).decode("utf-8")
+        return JsonResponse(data, status=self.status)
+
+
+# Names of the ``OplogEntryFilterInput`` fields in ``ghostwriter.oplog.filters.OplogEntryFilter``
+OPLOG_FILTER_INPUTS = {
+    "operator": "operator",
+    "tool": "tool",
+    "sourceIp": "source_ip",
+    "destIp": "dest_ip",
+    "tag": "tag",
+    "startDateAfter": "start_date_after",
+    "startDateBefore": "start_date_before",
+    "search": "search",
+}
+
+
+def filter_oplog_entries(oplog: Oplog, action_input: dict):
+    """
+    Get the entries of ``oplog`` matching the ``filter`` and ``filters`` inputs of an action. Raises
+    ``OplogFilterError`` if the filters are invalid.
+    """
+    filters = action_input.get("filters") or {}
+    if not isinstance(filters, dict):
+        raise OplogFilterError(["Filters must be an object"])
+    unknown = set(filters) - set(OPLOG_FILTER_INPUTS)
+    if unknown:
+        raise OplogFilterError([f"Unknown filter: {name}" for name in sorted(unknown)])
+    filters = {OPLOG_FILTER_INPUTS[name]: value for name, value in filters.items() if value is not None}
+    return filter_entries(OplogEntry.objects.filter(oplog_id=oplog), filters, action_input.get("filter"))
+
+
+class GraphqlOplogEntryPage(JwtRequiredMixin, HasuraActionView):
+    """
+    Endpoint for paging through the entries of an :model:`oplog.Oplog`, newest first, with the
+    ``oplogEntry_page`` action.
+
+    Each entry in the response carries a ``cursor``. Pass the last one as ``after`` to get the next page.
+
+    **Parameters**
+
+    ``oplogId``
+        The ID of the log
+    ``after``
+        Cursor of the entry to start after (optional)
+    ``limit``
+        Number of entries to return, up to 500 (optional, defaults to 100)
+    ``filter``
+        Words the entries must contain, as in the log's search box (optional)
+    ``filters``
+        Structured filters on the operator, tool, source and destination, tags, and start date (optional)
+    """
+
+    required_inputs = [
+        "oplogId",
+    ]
+    max_limit = 500
+
+    def post(self, request, *args, **kwargs):
+        try:
+            oplog = Oplog.objects.select_related("project").get(id=self.input["oplogId"])
+        except Oplog.DoesNotExist:
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        if not oplog.user_can_view(self.user_obj):
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        limit = self.input.get("limit") or 100
+        if not 0 < limit <= self.max_limit:
+            return JsonResponse(
+                utils.generate_hasura_error_payload(
+                    f"The limit must be between 1 and {self.max_limit}", "InvalidRequestBody"
+                ),
+                status=400,
+            )
+
+        try:
+            entries = filter_oplog_entries(oplog, self.input)
+        except OplogFilterError as exception:
+            return JsonResponse(
+                utils.generate_hasura_error_payload("; ".join(exception.errors), "InvalidRequestBody"), status=400
+            )
+
+        try:
+            # The entries' fields are fetched through the ``oplog_entry`` relationship, so only load the cursors
+            # (the model reads ``end_date`` when it's created)
+            entries = entries.only("id", "start_date", "end_date")
+            entries, _ = OplogEntry.get_page(entries, self.input.get("after"), limit)
+        except ValueError:
+            return JsonResponse(utils.generate_hasura_error_payload("Invalid cursor", "InvalidRequestBody"), status=400)
+
+        return JsonResponse(
+            [{"id": entry.id, "cursor": OplogEntry.make_cursor(entry)} for entry in entries],
+            safe=False,
+            status=self.status,
+        )
+
+
+class GraphqlOplogEntryFacets(JwtRequiredMixin, HasuraActionView):
+    """
+    Endpoint for counting the entries of an :model:`oplog.Oplog` per operator, tool, and tag with the
+    ``oplogEntry_facets`` action, to narrow the filters of ``oplogEntry_page``.
+
+    **Parameters**
+
+    ``oplogId``
+        The ID of the log
+    ``filter``
+        Words the entries must contain, as in the log's search box (optional)
+    ``filters``
+        Structured filters, as for ``oplogEntry_page`` (optional)
+    ``limit``
+        Number of values to return per facet, up to 500 (optional, defaults to 25)
+    """
+
+    required_inputs = [
+        "oplogId",
+    ]
+    max_limit = 500
+
+    def post(self, request, *args, **kwargs):
+        try:
+            oplog = Oplog.objects.select_related("project").get(id=self.input["oplogId"])
+        except Oplog.DoesNotExist:
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        if not oplog.user_can_view(self.user_obj):
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        limit = self.input.get("limit") or 25
+        if not 0 < limit <= self.max_limit:
+            return JsonResponse(
+                utils.generate_hasura_error_payload(
+                    f"The limit must be between 1 and {self.max_limit}", "InvalidRequestBody"
+                ),
+                status=400,
+            )
+
+        try:
+            entries = filter_oplog_entries(oplog, self.input)
+        except OplogFilterError as exception:
+            return JsonResponse(
+                utils.generate_hasura_error_payload("; ".join(exception.errors), "InvalidRequestBody"), status=400
+            )
+        return JsonResponse(get_facets(entries, limit), status=self.status)
+
+
+class GraphqlOplogEntryBulkInsert(JwtRequiredMixin, HasuraActionView):
+    """
+    Endpoint for logging many :model:`oplog.OplogEntry` entries at once with the ``oplogEntry_bulkInsert``
+    action, for C2 and tool integrations.
+
+    Entries with an ``entry_identifier`` already in the log are not created again, so a batch can be safely
+    retried. The response has the ID of the entry for each row, in order, and whether it was created.
+
+    **Parameters**
+
+    ``oplogId``
+        The ID of the log
+    ``entries``
+        List of entries, each an object with the entry's fields, ``tags``, and ``extra_fields`` (optional)
+    ``ndjson``
+        Entries as newline-delimited JSON, one object per line, instead of ``entries`` (optional)
+    """
+
+    required_inputs = [
+        "oplogId",
+    ]
+    allow_large_input = True
+    max_entries = 10000
+
+    def post(self, request, *args, **kwargs):
+        try:
+            oplog = Oplog.objects.select_related("project").get(id=self.input["oplogId"])
+        except Oplog.DoesNotExist:
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        if not OplogEntry.user_can_create(self.user_obj, oplog):
+            return JsonResponse(utils.generate_hasura_error_payload("Unauthorized access", "Unauthorized"), status=401)
+
+        try:
+            rows = self.input.get("entries") or []
+            if self.input.get("ndjson"):
+                rows = rows + parse_ndjson(self.input["ndjson"])
+            if not rows:
+                raise OplogIngestError(["No entries provided"])
+            if len(rows) > self.max_entries:
+                raise OplogIngestError([f"At most {self.max_entries} entries can be logged at once"])
+            results = ingest_entries(oplog, rows)
+        except OplogIngestError as exception:
+            return JsonResponse(
+                utils.generate_hasura_error_payload("; ".join(exception.errors[:20]), "InvalidRequestBody"),
+                status=400,
+            )
+
+        data = {
+            "created": sum(1 for result in results if result["created"]),
+            "existing": sum(1 for result in results if not result["created"]),
+            "entries": results,
+        }
+        return JsonResponse(data, status=self.status)
+
+
 class GraphqlDownloadEvidence(JwtRequiredMixin, HasuraActionView):
     """
     Return a download URL or base64-encoded evidence file for authenticated users with proper permissions.
@@ -1039,19 +1301,39 @@ class GraphqlDomainUpdateEvent(HasuraEventView):
 
 
 class GraphqlOplogEntryCreateEvent(HasuraEventView):
-    """Event webhook to fire :model:`oplog.OplogEntry` insert signals."""
+    """
+    Event webhook to fire :model:`oplog.OplogEntry` insert signals.
+
+    Rows written by Django, including bulk ingestion and CSV imports, were already handled there, so their
+    events are acknowledged without saving the entry again.
+    """
 
     def post(self, request, *args, **kwargs):
+        if not self.made_through_graphql:
+            return JsonResponse(self.data, status=self.status)
         instance = OplogEntry.objects.get(id=self.new_data["id"])
+        OplogStats.apply_changes(instance.oplog_id_id, added=[instance.get_stats_values()])
         instance.save()
         return JsonResponse(self.data, status=self.status)
 
 
 class GraphqlOplogEntryUpdateEvent(HasuraEventView):
-    """Event webhook to fire :model:`oplog.OplogEntry` update signals."""
+    """
+    Event webhook to fire :model:`oplog.OplogEntry` update signals.
+
+    As with inserts, events for rows written by Django are acknowledged without saving the entry again.
+    """
 
     def post(self, request, *args, **kwargs):
+        if not self.made_through_graphql:
+            return JsonResponse(self.data, status=self.status)
         instance = OplogEntry.objects.get(id=self.new_data["id"])
+        OplogStats.apply_update(
+            self.old_data["oplog_id_id"],
+            OplogStats.values_from_data(self.old_data),
+            self.new_data["oplog_id_id"],
+            OplogStats.values_from_data(self.new_data),
+        )
         instance.save()
         return JsonResponse(self.data, status=self.status)
 
@@ -1060,15 +1342,9 @@ class GraphqlOplogEntryDeleteEvent(HasuraEventView):
     """Event webhook to fire :model:`oplog.OplogEntry` delete signals."""
 
     def post(self, request, *args, **kwargs):
-        try:
-            channel_layer = get_channel_layer()
-            json_message = json.dumps({"action": "delete", "data": self.old_data["id"]})
-            async_to_sync(channel_layer.group_send)(
-                str(self.old_data["oplog_id_id"]), {"type": "send_oplog_entry", "text": json_message}
-            )
-        except gaierror:  # pragma: no cover
-            # WebSocket are unavailable (unit testing)
-            pass
+        if self.made_through_graphql:
+            OplogStats.apply_changes(self.old_data["oplog_id_id"], removed=[OplogStats.values_from_data(self.old_data)])
+        broadcast_buffer.delete(self.old_data["oplog_id_id"], self.old_data["id"])
         return JsonResponse(self.data, status=self.status)
 
 
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:28
+
+from django.db import migrations, models
+
+
+def convert_sleep_time(apps, schema_editor):
+    # The sleep time spaced requests out, so keep the same rate
+    VirusTotalConfiguration = apps.get_model("commandcenter", "VirusTotalConfiguration")
+    for config in VirusTotalConfiguration.objects.all():
+        config.requests_per_minute = max(1, 60 // config.sleep_time) if config.sleep_time > 0 else 0
+        config.save()
+
+
+def convert_requests_per_minute(apps, schema_editor):
+    VirusTotalConfiguration = apps.get_model("commandcenter", "VirusTotalConfiguration")
+    for config in VirusTotalConfiguration.objects.all():
+        config.sleep_time = -(-60 // config.requests_per_minute) if config.requests_per_minute > 0 else 0
+        config.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandcenter', '0044_bloodhoundconfiguration_bloodhound_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='virustotalconfiguration',
+            name='concurrent_requests',
+            field=models.IntegerField(default=4, help_text='Maximum number of requests sent to VirusTotal at the same time during domain health checks', verbose_name='Concurrent Requests'),
+        ),
+        migrations.AddField(
+            model_name='virustotalconfiguration',
+            name='requests_per_minute',
+            field=models.IntegerField(default=4, help_text='Requests per minute allowed by your API key – free API keys can only make 4 requests per minute (set to 0 to remove the limit)', verbose_name='Requests per Minute'),
+        ),
+        migrations.RunPython(convert_sleep_time, convert_requests_per_minute),
+        migrations.RemoveField(
+            model_name='virustotalconfiguration',
+            name='sleep_time',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandcenter', '0045_virustotal_request_rate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='virustotalconfiguration',
+            name='report_max_age',
+            field=models.IntegerField(default=24, help_text="Hours a domain's VirusTotal report is reused by health checks before it is fetched again (set to 0 to always fetch new reports)", verbose_name='Report Freshness Window'),
+        ),
+    ]
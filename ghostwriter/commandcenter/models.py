@@ -378,9 +378,22 @@ class CloudServicesConfiguration(SingletonModel):
 class VirusTotalConfiguration(SingletonModel):
     enable = models.BooleanField(default=False, help_text="Enable to allow domain health checks with VirusTotal")
     api_key = models.CharField(max_length=255, default="VirusTotal API Key")
-    sleep_time = models.IntegerField(
-        default=20,
-        help_text="Sleep time in seconds – free API keys can only make 4 requests per minute",
+    requests_per_minute = models.IntegerField(
+        "Requests per Minute",
+        default=4,
+        help_text="Requests per minute allowed by your API key – free API keys can only make 4 requests per minute "
+        "(set to 0 to remove the limit)",
+    )
+    concurrent_requests = models.IntegerField(
+        "Concurrent Requests",
+        default=4,
+        help_text="Maximum number of requests sent to VirusTotal at the same time during domain health checks",
+    )
+    report_max_age = models.IntegerField(
+        "Report Freshness Window",
+        default=24,
+        help_text="Hours a domain's VirusTotal report is reused by health checks before it is fetched again "
+        "(set to 0 to always fetch new reports)",
     )
 
     def __str__(self):
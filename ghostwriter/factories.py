@@ -804,6 +804,16 @@ class DomainNoteFactory(factory.django.DjangoModelFactory):
     operator = factory.SubFactory(UserFactory)
 
 
+class VirusTotalReportFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "shepherd.VirusTotalReport"
+
+    attributes = factory.LazyFunction(lambda: {"categories": {"Vendor": "business"}})
+    etag = Faker("md5")
+    fetched_at = factory.LazyFunction(timezone.now)
+    domain = factory.SubFactory(DomainFactory)
+
+
 class ServerNoteFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = "shepherd.ServerNote"
@@ -813,6 +823,14 @@ class ServerNoteFactory(factory.django.DjangoModelFactory):
     operator = factory.SubFactory(UserFactory)
 
 
+class ServerPortScanFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "shepherd.ServerPortScan"
+
+    open_ports = factory.LazyFunction(lambda: ["22/tcp", "443/tcp"])
+    server = factory.SubFactory(StaticServerFactory)
+
+
 class NamecheapConfigurationFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = "commandcenter.NamecheapConfiguration"
@@ -885,7 +903,9 @@ class VirusTotalConfigurationFactory(factory.django.DjangoModelFactory):
 
     enable = Faker("boolean")
     api_key = Faker("credit_card_number")
-    sleep_time = 20
+    requests_per_minute = 4
+    concurrent_requests = 4
+    report_max_age = 24
 
 
 class GeneralConfigurationFactory(factory.django.DjangoModelFactory):
@@ -9,6 +9,7 @@ import zoneinfo
 
 # Django Imports
 from django.conf import settings
+from django.db.models.functions import Lower
 from django.utils import dateformat
 
 # 3rd Party Libraries
@@ -70,6 +71,31 @@ def strip_html(value):
     return BeautifulSoup(value, "html.parser").text
 
 
+def get_oplog_tools(oplogs) -> list[str]:
+    """
+    Get the sorted, lowercase names of the tools logged in ``oplogs`` from their :model:`oplog.OplogStats`, without
+    loading any entries. Tools of logs without statistics are found with a ``DISTINCT`` query.
+    """
+    tools = set()
+    missing = []
+    for oplog in oplogs:
+        stats = getattr(oplog, "stats", None)
+        if stats:
+            tools.update(stats.tools)
+        else:
+            missing.append(oplog.id)
+    if missing:
+        tools.update(
+            OplogEntry.objects.filter(oplog_id__in=missing)
+            .exclude(tool__isnull=True)
+            .exclude(tool="")
+            .values_list(Lower("tool"), flat=True)
+            .order_by()
+            .distinct()
+        )
+    return sorted(tools)
+
+
 class CustomModelSerializer(serializers.ModelSerializer):
     """
     Modified version of ``ModelSerializer`` that adds an ``exclude`` argument for
@@ -773,7 +799,7 @@ class OplogEntrySerializer(TaggitSerializer, CustomModelSerializer):
 
     class Meta:
         model = OplogEntry
-        fields = "__all__"
+        exclude = ["search_vector"]
 
 
 class OplogSerializer(TaggitSerializer, CustomModelSerializer):
@@ -795,6 +821,11 @@ class FullProjectSerializer(serializers.Serializer):
     # IF YOU EDIT THIS CLASS:
     # Also edit `linting_utils.py` and the `generate_lint_data` method in `reportwriter/project/base.py`.
 
+    def __init__(self, *args, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in exclude or ():
+            self.fields.pop(field)
+
     project = ProjectSerializer(source="*")
     client = ClientSerializer()
     contacts = ProjectContactSerializer(source="projectcontact_set", many=True, exclude=["id", "project"])
@@ -819,12 +850,7 @@ class FullProjectSerializer(serializers.Serializer):
         return serializer.data
 
     def get_tools(self, obj):
-        tools = []
-        for oplog in obj.oplog_set.all():
-            for entry in oplog.entries.all():
-                if entry.tool and entry.tool.lower() not in tools:
-                    tools.append(entry.tool.lower())
-        return tools
+        return get_oplog_tools(obj.oplog_set.all())
 
     def get_recipient(self, obj):
         primary = None
@@ -942,12 +968,7 @@ class ReportDataSerializer(CustomModelSerializer):
         return BloodHoundConfiguration.get_solo().bloodhound_results
 
     def get_tools(self, obj):
-        tools = []
-        for oplog in obj.project.oplog_set.all():
-            for entry in oplog.entries.all():
-                if entry.tool and entry.tool.lower() not in tools:
-                    tools.append(entry.tool.lower())
-        return tools
+        return get_oplog_tools(obj.project.oplog_set.all())
 
     def get_recipient(self, obj):
         primary = None
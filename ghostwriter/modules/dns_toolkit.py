@@ -8,34 +8,94 @@ import logging
 from asyncio import Semaphore
 from typing import Union
 
+# Django Imports
+from django.conf import settings
+
 # 3rd Party Libraries
 from dns import asyncresolver
-from dns.resolver import NXDOMAIN, Answer, NoAnswer
+from dns.resolver import NXDOMAIN, YXDOMAIN, Answer, NoAnswer
 
 # Using __name__ resolves to ghostwriter.modules.dns_toolkit
 logger = logging.getLogger(__name__)
 
+# Keys of the ``dns`` dictionary stored for a :model:`shepherd.Domain`, in order
+DNS_FIELDS = ("ns", "a", "mx", "cname", "dmarc", "txt", "soa")
+
+
+def parse_nameserver(nameserver: str) -> tuple:
+    """
+    Split a nameserver written as ``address``, ``address:port``, or ``[IPv6 address]:port``
+    into its address and port.
+    """
+    if nameserver.startswith("["):
+        address, _, port = nameserver[1:].partition("]")
+        return address, int(port.lstrip(":") or 53)
+    if nameserver.count(":") == 1:
+        address, port = nameserver.split(":")
+        return address, int(port)
+    return nameserver, 53
+
+
+def normalize_records(records: dict) -> dict:
+    """
+    Format the records ``DNSCollector.run_async_dns`` collected for one domain as the
+    strings stored in the ``dns`` field of :model:`shepherd.Domain`.
+
+    The records of each type are sorted, so answers returned in a different order
+    compare equal.
+    """
+    normalized = {}
+    for field in DNS_FIELDS:
+        record = records[f"{field}_record"]
+        # Format any lists as strings for storage
+        if isinstance(record, list):
+            record = ", ".join(sorted(record))
+        normalized[field] = record.replace('"', "")
+    return normalized
+
 
 class DNSCollector:
     """
     Retrieve and parse DNS records asynchronously.
 
+    Queries take turns between the nameservers, with a limited number of queries in flight
+    for each one. A query that times out or fails is retried with the next nameserver.
+
     **Parameters**
 
+    ``nameservers``
+        Nameservers to query, as ``address`` or ``address:port`` (Defaults to ``settings.DNS_RESOLVERS``)
     ``concurrent_limit``
-        Set limit on number of concurrent DNS requests to avoid hitting system limits
+        Limit on the number of concurrent DNS requests sent to each nameserver
+        (Defaults to ``settings.DNS_RESOLVER_CONCURRENCY``)
+    ``timeout``
+        Seconds to wait for each answer (Defaults to ``settings.DNS_TIMEOUT``)
+    ``retries``
+        Number of times a failed query is retried (Defaults to ``settings.DNS_RETRIES``)
     """
 
-    # Configure the DNS resolver to be asynchronous and use specific nameservers
-    resolver = asyncresolver.Resolver()
-    resolver.lifetime = 1
-    resolver.nameservers = ["8.8.8.8", "8.8.4.4", "1.1.1.1"]
-
-    def __init__(self, concurrent_limit=50):
-        # Limit used for Semaphore to avoid hitting system limits on open requests
-        self.semaphore = Semaphore(value=concurrent_limit)
-
-    async def _query(self, domain: str, record_type: str) -> Union[Answer, NXDOMAIN, NoAnswer]:
+    # Answers that settle a query, so it isn't retried
+    final_errors = (NXDOMAIN, NoAnswer, YXDOMAIN)
+
+    def __init__(self, nameservers=None, concurrent_limit=None, timeout=None, retries=None):
+        self.concurrent_limit = concurrent_limit or settings.DNS_RESOLVER_CONCURRENCY
+        self.retries = settings.DNS_RETRIES if retries is None else retries
+        timeout = settings.DNS_TIMEOUT if timeout is None else timeout
+
+        # Configure an asynchronous resolver for each nameserver
+        self.resolvers = []
+        for nameserver in nameservers or settings.DNS_RESOLVERS:
+            address, port = parse_nameserver(nameserver)
+            resolver = asyncresolver.Resolver(configure=False)
+            resolver.nameservers = [address]
+            resolver.port = port
+            resolver.timeout = timeout
+            resolver.lifetime = timeout
+            self.resolvers.append(resolver)
+        self.semaphores = []
+        self.queries = 0
+
+    async def _query(self, domain: str, record_type: str) -> Union[Answer, Exception]:
         """
         Execute a DNS query for the target domain and record type.
 
@@ -46,14 +106,26 @@ class DNSCollector:
         ``record_type``
             DNS record type to collect
         """
-        try:
-            # Wait to acquire the semaphore to avoid too many concurrent DNS requests
-            await self.semaphore.acquire()
-            answer = await self.resolver.resolve(domain, record_type)
-        except Exception as e:
-            answer = e
-        # Release semaphore to allow next request
-        self.semaphore.release()
+        first = self.queries
+        self.queries += 1
+        answer = None
+        for attempt in range(self.retries + 1):
+            index = (first + attempt) % len(self.resolvers)
+            # Wait for the nameserver's semaphore to avoid too many concurrent DNS requests
+            async with self.semaphores[index]:
+                try:
+                    return await self.resolvers[index].resolve(domain, record_type)
+                except self.final_errors as e:
+                    return e
+                except Exception as e:
+                    logger.debug(
+                        "Query for %s records of %s failed with %s: %s",
+                        record_type,
+                        domain,
+                        self.resolvers[index].nameservers[0],
+                        e,
+                    )
+                    answer = e
         return answer
 
     async def _parse_answer(self, dns_record: Answer) -> list:
@@ -119,6 +191,8 @@ class DNSCollector:
         ``record_types``
             List of record types represented as strings (e.g., ["A", "TXT"])
         """
+        # Create the semaphores in the running event loop
+        self.semaphores = [Semaphore(value=self.concurrent_limit) for _ in self.resolvers]
         tasks = []
         # For each domain, create a task for each DNS record of interest
         for domain in domains:
@@ -139,10 +213,7 @@ class DNSCollector:
         ``record_types``
             List of record types represented as strings (e.g., ["A", "TXT"])
         """
-        # Setup an event loop
-        event_loop = asyncio.get_event_loop()
-        # Use an event loop (instead of ``asyncio.run()``) to easily get list of results
-        results = event_loop.run_until_complete(self._prepare_async_dns(domains=domains, record_types=record_types))
+        results = asyncio.run(self._prepare_async_dns(domains=domains, record_types=record_types))
         # Result is a list of dicts – seven for each domain name
         combined = {}
         # Combine all dicts with the same domain name
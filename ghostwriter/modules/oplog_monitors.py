@@ -11,7 +11,7 @@ from django.utils import dateformat
 
 # Ghostwriter Libraries
 from ghostwriter.modules.notifications_slack import SlackNotification
-from ghostwriter.oplog.models import Oplog, OplogEntry
+from ghostwriter.oplog.models import Oplog
 
 # Using __name__ resolves to ghostwriter.modules.cloud_monitors
 logger = logging.getLogger(__name__)
@@ -40,7 +40,7 @@ def review_active_logs(hours: int = 24) -> dict:
     # Check if yesterday was a weekend day (5 and 6 are Saturday and Sunday)
     if yesterday.weekday() < 5:
         slack = SlackNotification()
-        active_logs = Oplog.objects.select_related("project").filter(
+        active_logs = Oplog.objects.select_related("project", "stats").filter(
             Q(project__complete=False)
             & Q(project__end_date__gte=today)
             & Q(project__start_date__lte=today)
@@ -52,22 +52,19 @@ def review_active_logs(hours: int = 24) -> dict:
             inactive = False
             status = "passing"
             last_activity = None
-            latest_log_entry = None
 
-            # Try to get the latest log entry
-            try:
-                latest_log_entry = OplogEntry.objects.filter(oplog_id=log).latest("start_date")
-            except OplogEntry.DoesNotExist:
-                pass
+            # Get the start date of the latest log entry from the log's statistics
+            stats = getattr(log, "stats", None)
+            latest_start_date = stats.last_activity if stats else None
 
             # If there is log entry, check if it is older than the ``hours`` parameter
-            if latest_log_entry:
-                last_activity = latest_log_entry.start_date.replace(tzinfo=timezone.utc)
+            if latest_start_date:
+                last_activity = latest_start_date.replace(tzinfo=timezone.utc)
                 if last_activity < hours_ago:
                     inactive = True
 
             # If there are no logs or latest log is stale, handle notifications
-            if not latest_log_entry or inactive:
+            if not latest_start_date or inactive:
                 status = "inactive"
 
                 logger.warning(
@@ -93,8 +90,7 @@ def review_active_logs(hours: int = 24) -> dict:
                         logger.warning("Attempt to send a Slack notification returned an error: %s", err)
                         results["errors"].append(err)
             else:
-                if latest_log_entry:
-                    last_activity = dateformat.format(latest_log_entry.start_date, settings.DATE_FORMAT)
+                last_activity = dateformat.format(latest_start_date, settings.DATE_FORMAT)
 
             # Record results
             results["logs"].append(
@@ -4,6 +4,7 @@ reporting.
 """
 
 # Standard Libraries
+import functools
 import logging
 
 # 3rd Party Libraries
@@ -15,37 +16,15 @@ from ghostwriter.modules.reportwriter import jinja_funcs
 logger = logging.getLogger(__name__)
 
 
-def prepare_jinja2_env(debug=False):
-    """Prepare a Jinja2 environment with all custom filters."""
-    if debug:
-        undefined_vars = set()
-
-        class RecordUndefined(jinja2.DebugUndefined):
-            __slots__ = ()
-
-            def _record(self):
-                undefined_vars.add(self._undefined_name)
-
-            def _fail_with_undefined_error(self, *args, **kwargs):
-                self._record()
-                return super()._fail_with_undefined_error(*args, **kwargs)
-
-            def __str__(self) -> str:
-                self._record()
-                return super().__str__()
-
-            def __iter__(self):
-                self._record()
-                return super().__iter__()
-
-            def __bool__(self):
-                self._record()
-                return super().__bool__()
-
-        undefined = RecordUndefined
-    else:
-        undefined = jinja2.make_logging_undefined(logger=logger, base=jinja2.Undefined)
+@functools.lru_cache(maxsize=None)
+def shared_jinja2_env() -> jinja2.sandbox.SandboxedEnvironment:
+    """
+    Get the process-wide Jinja2 environment with all custom filters, for rendering exports.
 
+    The environment is shared between exports and threads, so it must not be modified after it's created. Use
+    ``overlay()`` to derive an environment with different options.
+    """
+    undefined = jinja2.make_logging_undefined(logger=logger, base=jinja2.Undefined)
     env = jinja2.sandbox.SandboxedEnvironment(undefined=undefined, extensions=["jinja2.ext.debug"], autoescape=True)
     env.filters["filter_severity"] = jinja_funcs.filter_severity
     env.filters["filter_type"] = jinja_funcs.filter_type
@@ -61,14 +40,55 @@ def prepare_jinja2_env(debug=False):
     env.filters["replace_blanks"] = jinja_funcs.replace_blanks
     env.filters["filter_bhe_findings_by_domain"] = jinja_funcs.filter_bhe_findings_by_domain
     env.filters["translate_domain_sid"] = jinja_funcs.translate_domain_sid
-
-    if debug:
-        return env, undefined_vars
     return env
 
+
+def prepare_jinja2_env(debug=False):
+    """
+    Prepare a Jinja2 environment with all custom filters.
+
+    Without ``debug``, this returns the shared environment from ``shared_jinja2_env``. With ``debug``, this returns
+    an overlay of the shared environment that records the names of undefined variables, along with the set they
+    are recorded in.
+    """
+    env = shared_jinja2_env()
+    if not debug:
+        return env
+
+    undefined_vars = set()
+
+    class RecordUndefined(jinja2.DebugUndefined):
+        __slots__ = ()
+
+        def _record(self):
+            undefined_vars.add(self._undefined_name)
+
+        def _fail_with_undefined_error(self, *args, **kwargs):
+            self._record()
+            return super()._fail_with_undefined_error(*args, **kwargs)
+
+        def __str__(self) -> str:
+            self._record()
+            return super().__str__()
+
+        def __iter__(self):
+            self._record()
+            return super().__iter__()
+
+        def __bool__(self):
+            self._record()
+            return super().__bool__()
+
+    # Overlays share the filters and caches of the shared environment, so this is cheap
+    return env.overlay(undefined=RecordUndefined), undefined_vars
+
+
 def report_generation_queryset():
     """
     Gets a queryset of Reports with `select_related` and `prefetch_related` options optimal for report generation.
+
+    The log entries aren't prefetched, as most templates don't use them; `ExportReportBase.serialize_report` loads
+    them when the export needs them.
     """
     from ghostwriter.reporting.models import Report # pylint: disable=import-outside-toplevel
     return Report.objects.all().prefetch_related(
@@ -78,6 +98,5 @@ def report_generation_queryset():
         "reportobservationlink_set",
         "evidence_set",
         "project__oplog_set",
-        "project__oplog_set__entries",
-        "project__oplog_set__entries__tags",
+        "project__oplog_set__stats",
     ).select_related()
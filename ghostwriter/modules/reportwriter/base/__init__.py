@@ -29,6 +29,11 @@ class ReportExportError(Exception):
         self.location = location
         self.code_context = code_context
 
+    def __reduce__(self):
+        # `__init__` doesn't pass its arguments to `Exception`, so pickle (used to return errors from the
+        # report export process pool) needs to be told how to rebuild the error
+        return (self.__class__, (self.display_text, self.location, self.code_context))
+
     def __str__(self) -> str:
         text = self.display_text
         ends_with_period = text.rstrip()[-1:] == "."
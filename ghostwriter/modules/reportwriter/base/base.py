@@ -1,7 +1,8 @@
 
 from datetime import datetime
 import io
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
+import logging
 import re
 from venv import logger
 
@@ -13,6 +14,9 @@ from ghostwriter.commandcenter.models import CompanyInformation, ExtraFieldSpec
 from ghostwriter.modules.reportwriter import prepare_jinja2_env
 from ghostwriter.modules.reportwriter.base import ReportExportTemplateError
 from ghostwriter.modules.reportwriter.base.html_rich_text import LazilyRenderedTemplate, rich_text_template
+from ghostwriter.modules.reportwriter.base.timings import ExportTimings
+
+timings_logger = logging.getLogger("ghostwriter.modules.reportwriter.timings")
 
 
 class ExportBase:
@@ -22,8 +26,13 @@ class ExportBase:
     # Fields
 
     * `input_object`: The object passed into `__init__`, unchanged
-    * `data`: The object passed into `__init__` ran through `serialize_object`, usually a dict, for passing into a Jinja env
+    * `data`: The object passed into `__init__` ran through `serialize_object`, usually a dict, for passing into a Jinja env.
+      Callers that have already serialized the object may pass the result in with the `data` keyword to skip serialization.
     * `jinja_env`: Jinja2 environment for templating
+    * `progress_callback`: Optional function called with the name of each stage (`serialize`, `rich_text`, `render`,
+      `save`) as the export reaches it
+    * `timings`: An `ExportTimings` recording the time spent in each stage, in spans within them (see `timing_span`),
+      and on each rich text field. Logged by `finish_timings` when the export is done.
     """
     input_object: Any
     data: Any
@@ -31,10 +40,14 @@ class ExportBase:
     jinja_undefined_variables: set[str] | None
     extra_fields_spec_cache: dict[str, Iterable[ExtraFieldSpec]]
     evidences_by_id: dict
+    progress_callback: Callable[[str], None] | None
+    timings: ExportTimings
 
-    def __init__(self, input_object: Any, *, is_raw=False, jinja_debug=False):
+    def __init__(self, input_object: Any, *, is_raw=False, jinja_debug=False, progress_callback=None, data=None):
         self.evidences_by_id = {}
         self.extra_fields_spec_cache = {}
+        self.progress_callback = progress_callback
+        self.timings = ExportTimings()
 
         if jinja_debug:
             self.jinja_env, self.jinja_undefined_variables = prepare_jinja2_env(debug=True)
@@ -44,9 +57,42 @@ class ExportBase:
         if is_raw:
             self.input_object = None
             self.data = input_object
+        elif data is not None:
+            self.input_object = input_object
+            self.data = data
         else:
             self.input_object = input_object
-            self.data = self.serialize_object(input_object)
+            self.report_progress("serialize")
+            with self.timing_span("serialize_object"):
+                self.data = self.serialize_object(input_object)
+
+    def report_progress(self, stage: str):
+        """
+        Notifies the `progress_callback`, if any, that the export has reached `stage`, and starts timing it.
+        """
+        self.timings.start_stage(stage)
+        if self.progress_callback is not None:
+            self.progress_callback(stage)
+
+    def timing_span(self, name: str, location: str | None = None):
+        """
+        Context manager timing a step of the export as the span `name`. Pass the `location` of a rich text field to
+        attribute the time to that field as well.
+        """
+        return self.timings.span(name, location)
+
+    def finish_timings(self):
+        """
+        Ends the timing of the export and logs the results. Called by the `run` method of the base exporters when
+        the document is complete.
+        """
+        self.timings.finish()
+        timings_logger.info(
+            "%s finished in %s",
+            type(self).__name__,
+            self.timings.summary(),
+            extra={"export_timings": self.timings.as_dict()},
+        )
 
     def serialize_object(self, object: Any) -> Any:
         """
@@ -22,6 +22,8 @@ from ghostwriter.modules.reportwriter.base.html_rich_text import (
     LazySubdocRender,
 )
 from ghostwriter.modules.reportwriter.richtext.docx import HtmlToDocxWithEvidence
+from ghostwriter.modules.reportwriter.subdoc_cache import subdoc_cache
+from ghostwriter.modules.reportwriter.template_cache import template_cache
 from ghostwriter.reporting.models import ReportTemplate
 
 logger = logging.getLogger(__name__)
@@ -90,7 +92,8 @@ class ExportDocxBase(ExportBase):
 
         # Create Word document writer using the specified template file
         try:
-            self.word_doc = DocxTemplate(report_template.document.path)
+            with self.timing_span("load_template"):
+                self.word_doc = template_cache.get_docx(report_template)
         except PackageNotFoundError as err:
             logger.exception("Failed to load the provided template document: %s", report_template.document.path)
             raise ReportExportTemplateError("Template document file could not be found - try re-uploading it") from err
@@ -100,24 +103,34 @@ class ExportDocxBase(ExportBase):
 
         self.global_report_config = ReportConfiguration.get_solo()
         self.company_config = CompanyInformation.get_solo()
+        self._subdoc_export_key = None
 
     def run(self) -> io.BytesIO:
         try:
-            self.create_styles()
-            self.replace_images()
-
-            rich_text_context = self.map_rich_texts()
-            docx_context = RichTextBase.deep_copy_process_html(
-                rich_text_context,
-                self.render_rich_text_docx,
-            )
-
-            ReportExportTemplateError.map_errors(
-                lambda: self.word_doc.render(docx_context, self.jinja_env, autoescape=True), "the DOCX template"
-            )
-            ReportExportTemplateError.map_errors(
-                lambda: self.render_properties(docx_context), "the DOCX properties"
-            )
+            with self.timing_span("create_styles"):
+                self.create_styles()
+            with self.timing_span("replace_images"):
+                self.replace_images()
+
+            self.report_progress("rich_text")
+            with self.timing_span("map_rich_texts"):
+                rich_text_context = self.map_rich_texts()
+            with self.timing_span("process_html"):
+                docx_context = RichTextBase.deep_copy_process_html(
+                    rich_text_context,
+                    self.render_rich_text_docx,
+                )
+
+            # Rich text is converted lazily while the template renders, so its spans are part of this one
+            self.report_progress("render")
+            with self.timing_span("render_template"):
+                ReportExportTemplateError.map_errors(
+                    lambda: self.word_doc.render(docx_context, self.jinja_env, autoescape=True), "the DOCX template"
+                )
+            with self.timing_span("render_properties"):
+                ReportExportTemplateError.map_errors(
+                    lambda: self.render_properties(docx_context), "the DOCX properties"
+                )
         except UnrecognizedImageError as err:
             raise ReportExportTemplateError(f"Could not load an image: {err}", "the DOCX template") from err
         except PackageNotFoundError as err:
@@ -130,12 +143,16 @@ class ExportDocxBase(ExportBase):
                 "An evidence file was missing – try uploading it again.", "the DOCX template"
             ) from err
 
+        self.report_progress("save")
         out = io.BytesIO()
-        self.word_doc.save(out)
+        with self.timing_span("save_document"):
+            self.word_doc.save(out)
 
         # Post-process to clean up separator footnotes (remove extra empty paragraphs)
-        out = self._cleanup_footnote_separators(out)
+        with self.timing_span("cleanup_footnote_separators"):
+            out = self._cleanup_footnote_separators(out)
 
+        self.finish_timings()
         return out
 
     def _cleanup_footnote_separators(self, docx_bytes: io.BytesIO) -> io.BytesIO:
@@ -287,21 +304,49 @@ class ExportDocxBase(ExportBase):
             return rich_text.obj
 
         def render():
+            location = getattr(rich_text, "location", None)
+            with self.timing_span("convert_rich_text", location):
+                return convert(location)
+
+        def convert(location):
+            html = ReportExportTemplateError.map_errors(lambda: str(rich_text.__html__()), location)
+
+            # Reuse the conversion from a previous export if nothing it depends on has changed
+            cache_key = None
+            if subdoc_cache.enabled and not self.linting:
+                cache_key = subdoc_cache.make_key(self.subdoc_export_key(), html, self.evidences_by_id)
+                cached = subdoc_cache.get(cache_key, self.word_doc)
+                if cached is not None:
+                    return cached
+                snapshot = subdoc_cache.snapshot(self.word_doc)
+
             doc = self.word_doc.new_subdoc()
             ReportExportTemplateError.map_errors(
                 lambda: HtmlToDocxWithEvidence.run(
-                    rich_text.__html__(),
+                    html,
                     doc=doc,
                     evidences=self.evidences_by_id,
                     report_template=self.report_template,
                     global_report_config=self.global_report_config,
                     images=self.image_replacements,
                 ),
-                getattr(rich_text, "location", None),
+                location,
             )
+            if cache_key is not None:
+                subdoc_cache.put(cache_key, self.word_doc, doc, snapshot)
             return doc
         return LazySubdocRender(render)
 
+    def subdoc_export_key(self) -> str:
+        """
+        Gets (and caches) the part of the subdocument cache key shared by every rich text in this export.
+        """
+        if self._subdoc_export_key is None:
+            self._subdoc_export_key = subdoc_cache.export_key(
+                self.report_template, self.global_report_config, self.image_replacements
+            )
+        return self._subdoc_export_key
+
     def replace_images(self):
         """
         Replaces images whose alt text contains an item from `self.image_replacements`.
@@ -400,6 +445,10 @@ class ExportDocxBase(ExportBase):
             for variable in undeclared_variables:
                 if variable not in lint_data:
                     warnings.append("Potential undefined variable: {!r}".format(variable))
+            if "logs" in undeclared_variables and not report_template.contains_log_data:
+                warnings.append(
+                    "Template uses `logs` but isn't flagged as containing activity log data, so `logs` will be empty"
+                )
 
             document_styles = exporter.word_doc.styles
             for style in EXPECTED_STYLES:
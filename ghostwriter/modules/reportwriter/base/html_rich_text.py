@@ -1,8 +1,13 @@
 
+import hashlib
 import re
+import threading
+from collections import OrderedDict
+from types import CodeType
 from typing import Any, Callable
 import bs4
 import jinja2
+from django.conf import settings
 from markupsafe import Markup
 from abc import ABC, abstractmethod
 
@@ -11,6 +16,86 @@ from ghostwriter.modules.reportwriter.base import ReportExportTemplateError
 
 _H = [f"h{n}" for n in range(1, 7)]
 
+
+class RichTextTemplateCache:
+    """
+    Process-wide LRU cache of compiled rich text templates.
+
+    Most rich text comes unchanged from the finding library, so the same text is converted and compiled over and
+    over across reports. The cache stores the compiled Python code, keyed by a hash of the source text and the
+    environment options that affect compilation, and binds it to whichever environment asks for it. Binding is
+    cheap, so environments with per-export state (like the linting environment's undefined variable recorder) can
+    share entries.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, CodeType] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> CodeType | None:
+        with self._lock:
+            code = self._entries.get(key)
+            if code is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return code
+
+    def put(self, key: tuple, code: CodeType):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = code
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drops every cached template and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+rich_text_cache = RichTextTemplateCache(settings.REPORT_RICH_TEXT_CACHE_SIZE)
+
+
+def _environment_key(env: jinja2.Environment) -> tuple:
+    """
+    Gets the options of `env` that change the code Jinja generates. Filters and tests are included because the
+    compiler checks that they exist.
+    """
+    return (
+        type(env),
+        env.autoescape if isinstance(env.autoescape, bool) else id(env.autoescape),
+        tuple(sorted(env.extensions)),
+        env.block_start_string,
+        env.block_end_string,
+        env.variable_start_string,
+        env.variable_end_string,
+        env.comment_start_string,
+        env.comment_end_string,
+        env.line_statement_prefix,
+        env.line_comment_prefix,
+        env.trim_blocks,
+        env.lstrip_blocks,
+        env.newline_sequence,
+        env.keep_trailing_newline,
+        env.optimized,
+        env.finalize is not None,
+        frozenset(env.filters),
+        frozenset(env.tests),
+    )
+
+
 def rich_text_template(
     env: jinja2.Environment,
     text: str,
@@ -18,7 +103,19 @@ def rich_text_template(
     """
     Converts rich text `text` to a Jinja template. This does some additional Ghostwriter-specific
     processing.
+
+    Compiled templates are cached in `rich_text_cache`.
     """
+    key = (_environment_key(env), hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest())
+    code = rich_text_cache.get(key)
+    if code is None:
+        code = _compile_rich_text(env, text)
+        rich_text_cache.put(key, code)
+    return env.template_class.from_code(env, code, env.make_globals(None), None)
+
+
+def _compile_rich_text(env: jinja2.Environment, text: str) -> CodeType:
+    """Converts rich text `text` to Jinja source and compiles it for `env`."""
     # Replace old `{{.item}}`` syntax with jinja templates or elements to replace
     def replace_old_tag(match: re.Match):
         contents = match.group(1).strip()
@@ -48,7 +145,7 @@ def rich_text_template(
 
     # Compile
     try:
-        return env.from_string(text)
+        return env.compile(text)
     except jinja2.TemplateSyntaxError as err:
         line = text.splitlines()[err.lineno - 1]
         raise ReportExportTemplateError(str(err), code_context=line) from err
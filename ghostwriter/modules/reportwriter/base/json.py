@@ -12,9 +12,12 @@ class ExportBaseJson(ExportBase):
     Runs `json.dump` over `self.data` and returns the result.
     """
     def run(self) -> io.BytesIO:
+        self.report_progress("save")
         s_out = io.TextIOWrapper(io.BytesIO(), "utf-8", write_through=True)
-        json.dump(self.data, s_out, indent=4, ensure_ascii=True)
-        s_out.flush()
+        with self.timing_span("save_document"):
+            json.dump(self.data, s_out, indent=4, ensure_ascii=True)
+            s_out.flush()
+        self.finish_timings()
         return s_out.detach()
 
     @classmethod
@@ -20,6 +20,7 @@ from ghostwriter.modules.reportwriter.base import ReportExportTemplateError
 from ghostwriter.modules.reportwriter.base.base import ExportBase
 from ghostwriter.modules.reportwriter.base.html_rich_text import LazilyRenderedTemplate
 from ghostwriter.modules.reportwriter.richtext.pptx import HtmlToPptxWithEvidence
+from ghostwriter.modules.reportwriter.template_cache import template_cache
 from ghostwriter.reporting.models import ReportTemplate
 
 logger = logging.getLogger(__name__)
@@ -60,7 +61,8 @@ class ExportBasePptx(ExportBase):
         self.report_template = report_template
 
         try:
-            self.ppt_presentation = Presentation(report_template.document.path)
+            with self.timing_span("load_template"):
+                self.ppt_presentation = template_cache.get_pptx(report_template)
         except PackageNotFoundError as err:
             raise ReportExportTemplateError("Template document file could not be found - try re-uploading it") from err
         except Exception:
@@ -77,15 +79,17 @@ class ExportBasePptx(ExportBase):
         Renders a `LazilyRenderedTemplate`, converting the HTML from the TinyMCE rich text editor and inserting it into the passed in shape and slide.
         Converts HTML from the TinyMCE rich text editor and inserts it into the passed in slide and shape
         """
-        ReportExportTemplateError.map_errors(
-            lambda: HtmlToPptxWithEvidence.run(
-                rich_text.render_html(),
-                slide=slide,
-                shape=shape,
-                evidences=self.evidences_by_id,
-            ),
-            getattr(rich_text, "location", None)
-        )
+        location = getattr(rich_text, "location", None)
+        with self.timing_span("convert_rich_text", location):
+            ReportExportTemplateError.map_errors(
+                lambda: HtmlToPptxWithEvidence.run(
+                    rich_text.render_html(),
+                    slide=slide,
+                    shape=shape,
+                    evidences=self.evidences_by_id,
+                ),
+                location,
+            )
 
     def process_footers(self):
         """
@@ -124,8 +128,11 @@ class ExportBasePptx(ExportBase):
                     date_placeholder.text = dateformat(date.today(), settings.DATE_FORMAT)
 
     def run(self):
+        self.report_progress("save")
         out = io.BytesIO()
-        self.ppt_presentation.save(out)
+        with self.timing_span("save_document"):
+            self.ppt_presentation.save(out)
+        self.finish_timings()
         return out
 
     @classmethod
@@ -0,0 +1,96 @@
+import time
+from contextlib import contextmanager
+
+
+class ExportTimings:
+    """
+    Records where an export spends its time.
+
+    Three things are tracked:
+
+    * `stages`: the coarse stages reported through `ExportBase.report_progress` (`serialize`, `rich_text`, `render`,
+      `save`), which follow each other and add up to the whole export
+    * `spans`: named, possibly nested, steps within the stages, such as the Jinja render or saving the document,
+      with their total time and how often they ran
+    * `rich_text`: the time spent templating and converting each rich text field, keyed by its location (e.g.
+      `finding SQL Injection`), to find the field that makes an export slow
+    """
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.spans: dict[str, list] = {}
+        self.rich_text: dict[str, float] = {}
+        self._stage = None
+        self._stage_start = None
+
+    def start_stage(self, stage: str):
+        """Ends the current stage, if any, and starts timing `stage`."""
+        now = time.perf_counter()
+        self._end_stage(now)
+        self._stage = stage
+        self._stage_start = now
+
+    def finish(self):
+        """Ends the current stage. Called when the export is done."""
+        self._end_stage(time.perf_counter())
+        self._stage = None
+
+    def _end_stage(self, now: float):
+        if self._stage is not None:
+            self.stages[self._stage] = self.stages.get(self._stage, 0.0) + now - self._stage_start
+
+    @contextmanager
+    def span(self, name: str, location: str | None = None):
+        """
+        Times the body of the `with` statement as the span `name`. If a rich text `location` is given, the time is
+        also added to that location's total.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.spans.setdefault(name, [0.0, 0])
+            entry[0] += elapsed
+            entry[1] += 1
+            if location is not None:
+                self.rich_text[location] = self.rich_text.get(location, 0.0) + elapsed
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def slowest_rich_text(self, limit=10) -> list[tuple[str, float]]:
+        """Gets the `limit` rich text locations that took the longest, slowest first."""
+        return sorted(self.rich_text.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def as_dict(self, limit=10) -> dict:
+        """Gets the timings as a JSON-serializable dict, for logs and job metadata. Times are in seconds."""
+        return {
+            "total": round(self.total, 6),
+            "stages": {stage: round(seconds, 6) for stage, seconds in self.stages.items()},
+            "spans": {name: {"seconds": round(seconds, 6), "count": count} for name, (seconds, count) in self.spans.items()},
+            "slowest_rich_text": [
+                {"location": location, "seconds": round(seconds, 6)}
+                for location, seconds in self.slowest_rich_text(limit)
+            ],
+        }
+
+    def header_value(self) -> str:
+        """
+        Formats the stages and spans for the `X-Report-Timings` response header, using the `Server-Timing` syntax
+        with durations in milliseconds. Rich text locations are left out, since they contain report content.
+        """
+        entries = [("total", self.total)]
+        entries += self.stages.items()
+        entries += ((name, seconds) for name, (seconds, _) in self.spans.items())
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in entries)
+
+    def summary(self, limit=3) -> str:
+        """Formats the timings as one line for log messages."""
+        stages = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in self.stages.items())
+        text = f"{self.total:.3f}s ({stages})"
+        slowest = self.slowest_rich_text(limit)
+        if slowest:
+            text += "; slowest rich text: " + ", ".join(f"{location} {seconds:.3f}s" for location, seconds in slowest)
+        return text
@@ -41,14 +41,19 @@ class ExportXlsxBase(ExportBase):
         Renders a `LazilyRenderedTemplate`, converting the HTML from the TinyMCE rich text editor to a plain text string
         for use in XLSX cells
         """
-        return ReportExportTemplateError.map_errors(
-            lambda: html_to_plain_text(
-                rich_text.render_html(),
-                self.evidences_by_id,
-            ),
-            getattr(rich_text, "location", None),
-        )
+        location = getattr(rich_text, "location", None)
+        with self.timing_span("convert_rich_text", location):
+            return ReportExportTemplateError.map_errors(
+                lambda: html_to_plain_text(
+                    rich_text.render_html(),
+                    self.evidences_by_id,
+                ),
+                location,
+            )
 
     def run(self) -> io.BytesIO:
-        self.workbook.close()
+        self.report_progress("save")
+        with self.timing_span("save_document"):
+            self.workbook.close()
+        self.finish_timings()
         return self.output
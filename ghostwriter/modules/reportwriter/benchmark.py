@@ -0,0 +1,267 @@
+"""
+Benchmark harness for the report exporters.
+
+Builds a synthetic engagement of a configurable size with the test data factories, then times each stage of every
+export format and records its peak memory use. The results are plain JSON, so a baseline saved from one commit can be
+compared against the results from another with `compare_results`.
+
+The factories need factory-boy, which is only installed with the development requirements, so they're imported when
+the engagement is built rather than with this module.
+"""
+
+# Standard Libraries
+import gc
+import platform
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+
+# Django Imports
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+# 3rd Party Libraries
+from PIL import Image
+
+# Ghostwriter Libraries
+from ghostwriter.commandcenter.models import ExtraFieldModel
+from ghostwriter.modules.reportwriter import report_generation_queryset
+from ghostwriter.modules.reportwriter.base.html_rich_text import rich_text_cache
+from ghostwriter.modules.reportwriter.report.docx import ExportReportDocx
+from ghostwriter.modules.reportwriter.report.json import ExportReportJson
+from ghostwriter.modules.reportwriter.report.pptx import ExportReportPptx
+from ghostwriter.modules.reportwriter.report.xlsx import ExportReportXlsx
+from ghostwriter.modules.reportwriter.subdoc_cache import subdoc_cache
+from ghostwriter.modules.reportwriter.template_cache import template_cache
+from ghostwriter.reporting.models import Evidence
+
+# Bump when the layout of the results changes, so stale baselines aren't compared
+RESULTS_VERSION = 1
+
+EXPORTERS = {
+    "docx": ExportReportDocx,
+    "pptx": ExportReportPptx,
+    "xlsx": ExportReportXlsx,
+    "json": ExportReportJson,
+}
+
+# Engagement sizes for the `--preset` option of the `benchmark_reports` command
+PRESETS = {
+    "small": {"findings": 5, "evidence": 1, "observations": 2, "oplog_entries": 50, "extra_fields": 1, "code_lines": 20},
+    "medium": {
+        "findings": 30,
+        "evidence": 2,
+        "observations": 10,
+        "oplog_entries": 1000,
+        "extra_fields": 3,
+        "code_lines": 100,
+    },
+    "large": {
+        "findings": 100,
+        "evidence": 3,
+        "observations": 30,
+        "oplog_entries": 10000,
+        "extra_fields": 5,
+        "code_lines": 400,
+    },
+}
+
+
+def create_benchmark_report(
+    findings=10, evidence=1, observations=5, oplog_entries=100, extra_fields=2, code_lines=50, image_size=(1024, 768)
+):
+    """
+    Creates a :model:`reporting.Report` for benchmarking and returns it.
+
+    **Parameters**
+
+    ``findings``
+        Number of findings in the report
+    ``evidence``
+        Number of evidence images attached to, and referenced by, each finding
+    ``observations``
+        Number of observations in the report
+    ``oplog_entries``
+        Number of entries in the project's activity log
+    ``extra_fields``
+        Number of rich text extra fields defined for, and filled in on, each finding
+    ``code_lines``
+        Number of lines in the code block of each finding's replication steps
+    ``image_size``
+        Width and height of the evidence images, in pixels
+    """
+    # pylint: disable=import-outside-toplevel
+    from ghostwriter.factories import (
+        EvidenceOnFindingFactory,
+        ExtraFieldSpecFactory,
+        GenerateMockProject,
+        OplogEntryFactory,
+        OplogFactory,
+        ReportObservationLinkFactory,
+    )
+
+    _, project, report = GenerateMockProject(num_of_findings=findings)
+
+    extra_field_model, _ = ExtraFieldModel.objects.get_or_create(
+        model_internal_name="reporting.Finding", defaults={"model_display_name": "Findings"}
+    )
+    specs = [
+        ExtraFieldSpecFactory(target_model=extra_field_model, internal_name=f"benchmark_field_{i}", type="rich_text")
+        for i in range(extra_fields)
+    ]
+
+    image = BytesIO()
+    Image.effect_noise(image_size, 64).convert("RGB").save(image, "PNG")
+    code_block = "\n".join(f"$ ./tool --target 10.0.0.{i % 255} --verbose &gt; out_{i}.log" for i in range(code_lines))
+
+    for finding in report.reportfindinglink_set.all():
+        references = []
+        for _ in range(evidence):
+            evidence_obj = EvidenceOnFindingFactory(
+                finding=finding, document=SimpleUploadedFile("evidence.png", image.getvalue())
+            )
+            references.append(f"<p>{{{{.{evidence_obj.friendly_name}}}}}</p>")
+        finding.description += "".join(references)
+        finding.replication_steps += f"<pre><code>{code_block}</code></pre>"
+        finding.extra_fields = {spec.internal_name: finding.description for spec in specs}
+        finding.save()
+
+    ReportObservationLinkFactory.create_batch(observations, report=report)
+
+    oplog = OplogFactory(project=project)
+    OplogEntryFactory.create_batch(oplog_entries, oplog_id=oplog)
+
+    return report
+
+
+def clear_export_caches():
+    """Empties the per-process caches of templates and converted rich text, so the next export starts cold."""
+    template_cache.clear()
+    rich_text_cache.clear()
+    subdoc_cache.clear()
+
+
+def time_export(report, output_format: str, cold=True) -> dict:
+    """
+    Exports `report` once in `output_format`, returning the time spent in each stage, the total time, and the size
+    of the document. Unless `cold` is false, the export caches are cleared first.
+    """
+    if cold:
+        clear_export_caches()
+    exporter_cls = EXPORTERS[output_format]
+    kwargs = {}
+    if output_format == "docx":
+        kwargs["report_template"] = report.docx_template
+    elif output_format == "pptx":
+        kwargs["report_template"] = report.pptx_template
+
+    marks = []
+
+    def progress_callback(stage):
+        marks.append((stage, time.perf_counter()))
+
+    start = time.perf_counter()
+    exporter = exporter_cls(report, progress_callback=progress_callback, **kwargs)
+    document = exporter.run()
+    end = time.perf_counter()
+
+    stages = {}
+    for (stage, stage_start), (_, stage_end) in zip(marks, marks[1:] + [(None, end)]):
+        stages[stage] = stages.get(stage, 0.0) + stage_end - stage_start
+    return {"stages": stages, "total": end - start, "size": len(document.getvalue())}
+
+
+def measure_peak_memory(report, output_format: str, cold=True) -> int:
+    """Exports `report` once in `output_format` with `tracemalloc` running, returning the peak memory in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        time_export(report, output_format, cold=cold)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_report(report, formats=tuple(EXPORTERS), iterations=3, measure_memory=True, cold=True) -> dict:
+    """
+    Benchmarks exporting `report` in each of `formats`, returning a JSON-serializable dict of the results.
+
+    Each format is exported `iterations` times after one warm-up run, and the median time of each stage is reported.
+    Peak memory is measured in a separate run, since tracing allocations slows the export down considerably. With
+    `cold`, every run starts with empty export caches, as the first export of a report does; otherwise the runs
+    measure repeated exports of an unchanged report.
+    """
+    results = {}
+    for output_format in formats:
+        # Fetch the report the way the views do, so query counts match real exports
+        report = report_generation_queryset().get(pk=report.pk)
+        time_export(report, output_format, cold=cold)
+        runs = [time_export(report, output_format, cold=cold) for _ in range(iterations)]
+        stages = {stage: statistics.median(run["stages"].get(stage, 0.0) for run in runs) for stage in runs[0]["stages"]}
+        results[output_format] = {
+            "stages": stages,
+            "total": statistics.median(run["total"] for run in runs),
+            "size": runs[-1]["size"],
+            "peak_memory": measure_peak_memory(report, output_format, cold=cold) if measure_memory else None,
+        }
+    return results
+
+
+def run_benchmark(iterations=3, formats=tuple(EXPORTERS), measure_memory=True, cold=True, **sizes) -> dict:
+    """
+    Creates a report with `create_benchmark_report(**sizes)` and benchmarks it, returning the results along with the
+    parameters and environment they came from.
+    """
+    report = create_benchmark_report(**sizes)
+    try:
+        results = benchmark_report(
+            report, formats=formats, iterations=iterations, measure_memory=measure_memory, cold=cold
+        )
+    finally:
+        delete_benchmark_files(report)
+    return {
+        "version": RESULTS_VERSION,
+        "parameters": {"iterations": iterations, "cold": cold, **sizes},
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "results": results,
+    }
+
+
+def delete_benchmark_files(report):
+    """
+    Deletes the evidence and template files uploaded by `create_benchmark_report`. Rolling back the transaction
+    the report was created in doesn't remove them.
+    """
+    for evidence in Evidence.objects.filter(finding__report=report):
+        evidence.document.delete(save=False)
+    for template in (report.docx_template, report.pptx_template):
+        template.document.delete(save=False)
+
+
+def compare_results(baseline: dict, current: dict, threshold=0.1) -> list[str]:
+    """
+    Compares two sets of results from `run_benchmark`, returning a description of each timing or peak memory figure
+    in `current` that is more than `threshold` (a fraction) worse than in `baseline`.
+    """
+    if baseline.get("version") != current.get("version"):
+        raise ValueError("The baseline was recorded by a different version of the benchmark")
+
+    regressions = []
+
+    def check(label, old, new, unit):
+        if not old or new is None or new <= old * (1 + threshold):
+            return
+        regressions.append(f"{label}: {old:.3f}{unit} -> {new:.3f}{unit} (+{(new / old - 1) * 100:.0f}%)")
+
+    for output_format, result in current["results"].items():
+        old = baseline["results"].get(output_format)
+        if old is None:
+            continue
+        for stage, seconds in result["stages"].items():
+            check(f"{output_format} {stage}", old["stages"].get(stage), seconds, "s")
+        check(f"{output_format} total", old["total"], result["total"], "s")
+        if old.get("peak_memory") and result.get("peak_memory"):
+            check(
+                f"{output_format} peak memory", old["peak_memory"] / 2**20, result["peak_memory"] / 2**20, "MiB"
+            )
+    return regressions
@@ -1,5 +1,6 @@
 from collections import ChainMap
 import copy
+from django.db.models import prefetch_related_objects
 
 from ghostwriter.commandcenter.models import ExtraFieldSpec
 from ghostwriter.modules.custom_serializers import FullProjectSerializer
@@ -19,9 +20,22 @@ class ExportProjectBase(ExportBase):
 
     Provides a `serialize_object` implementation for serializing the `Project` database object,
     and helper functions for creating Jinja contexts.
+
+    Without `include_logs`, `logs` is an empty list and the log entries are never loaded.
     """
+    include_logs: bool
+
+    def __init__(self, *args, include_logs=True, **kwargs):
+        self.include_logs = include_logs
+        super().__init__(*args, **kwargs)
 
     def serialize_object(self, object):
+        prefetch_related_objects([object], "oplog_set__stats")
+        if not self.include_logs:
+            data = FullProjectSerializer(object, exclude=["logs"]).data
+            data["logs"] = []
+            return data
+        prefetch_related_objects([object], "oplog_set__entries__tags")
         return FullProjectSerializer(object).data
 
     def map_rich_texts(self):
@@ -190,7 +190,9 @@ class ProjectSlidesMixin:
 
 class ExportProjectPptx(ExportBasePptx, ExportProjectBase, ProjectSlidesMixin):
     def run(self) -> io.BytesIO:
+        self.report_progress("rich_text")
         base_context = self.map_rich_texts()
+        self.report_progress("render")
         self.create_project_slides(base_context)
         self.process_footers()
         return super().run()
@@ -1,6 +1,7 @@
 from collections import ChainMap
 import copy
 import html
+from django.db.models import prefetch_related_objects
 from markupsafe import Markup
 from docxtpl import RichText as DocxRichText
 
@@ -25,19 +26,39 @@ class ExportReportBase(ExportBase):
     and helper functions for creating Jinja contexts.
     """
     include_bloodhound: bool
+    include_logs: bool
 
-    def __init__(self, *args, include_bloodhound=True, **kwargs):
+    def __init__(self, *args, include_bloodhound=True, include_logs=True, **kwargs):
         self.include_bloodhound = include_bloodhound
+        self.include_logs = include_logs
         super().__init__(*args, **kwargs)
 
     def serialize_object(self, report):
+        return self.serialize_report(report, self.include_bloodhound, self.include_logs)
+
+    @staticmethod
+    def serialize_report(report, include_bloodhound=True, include_logs=True) -> dict:
+        """
+        Serializes a `Report` for the report exporters. The result can be shared between several exporters with
+        the `data` keyword, so a report exported in multiple formats only hits the database once.
+
+        Without `include_logs`, `logs` is an empty list and the log entries are never loaded, which matters for
+        projects with hundreds of thousands of entries.
+        """
         excludes = ["id"]
-        if not self.include_bloodhound:
+        if not include_bloodhound:
             excludes.append("bloodhound")
-        return ReportDataSerializer(
+        if include_logs:
+            prefetch_related_objects([report], "project__oplog_set__entries__tags")
+        else:
+            excludes.append("logs")
+        data = ReportDataSerializer(
             report,
             exclude=excludes,
         ).data
+        if not include_logs:
+            data["logs"] = []
+        return data
 
     def severity_rich_text(self, text: str, severity_color: str) -> str | DocxRichText:
         """
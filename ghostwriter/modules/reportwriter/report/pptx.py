@@ -15,7 +15,9 @@ class ExportReportPptx(ExportBasePptx, ExportReportBase, ProjectSlidesMixin):
     def run(self) -> io.BytesIO:
         """Generate a complete PowerPoint slide deck for the current report."""
 
+        self.report_progress("rich_text")
         base_context = self.map_rich_texts()
+        self.report_progress("render")
 
         # Loop through the findings to create slides
         findings_stats = {}
@@ -14,7 +14,9 @@ logger = logging.getLogger(__name__)
 
 class ExportReportXlsx(ExportXlsxBase, ExportReportBase):
     def run(self) -> io.BytesIO:
+        self.report_progress("rich_text")
         context = self.map_rich_texts()
+        self.report_progress("render")
 
         # Create an in-memory Excel workbook with a named worksheet
         xlsx_doc = self.workbook
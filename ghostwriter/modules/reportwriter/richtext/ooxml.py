@@ -3,8 +3,12 @@ import logging
 import re
 import typing
 
+# Django Imports
+from django.conf import settings
+
 # 3rd Party Libraries
 import bs4
+from lxml import etree
 
 logger = logging.getLogger(__name__)
 
@@ -96,28 +100,43 @@ class BaseHtmlToOOXML:
 
     text_tracking: TextTracking
 
+    # Maps tag names to their `tag_*` methods; built for each subclass when it's defined
+    tag_handlers: dict[str, typing.Callable]
+
     def __init__(self):
         self.text_tracking = TextTracking()
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.tag_handlers = cls._build_tag_handlers()
+
     @classmethod
-    def run(cls, text: str, *args, **kwargs):
+    def _build_tag_handlers(cls):
+        return {name[len("tag_") :]: getattr(cls, name) for name in dir(cls) if name.startswith("tag_")}
+
+    @classmethod
+    def run(cls, text: str, *args, parser: str | None = None, **kwargs):
         """
         Parses the `text` as HTML and runs the class over the tree.
         Extra parameters are passed to the class's `__init__`.
+
+        The `parser` selects the HTML backend, either `"lxml"` or `"bs4"` (BeautifulSoup). Both produce the same
+        output; it defaults to the `REPORT_RICH_TEXT_PARSER` setting.
         """
-        soup = bs4.BeautifulSoup(text, "lxml")
-        tag = soup.find("body")
+        body = parse_html_body(text, parser or settings.REPORT_RICH_TEXT_PARSER)
         instance = cls(*args, **kwargs)
-        if tag is not None:
-            instance.process_children(tag.children)
+        if body is not None:
+            instance.process_children(body.children)
         return instance
 
     def process(self, el, **kwargs):
-        if el.name:
-            if hasattr(self, "tag_" + el.name):
-                getattr(self, "tag_" + el.name)(el, **kwargs)
+        name = el.name
+        if name:
+            handler = self.tag_handlers.get(name)
+            if handler is not None:
+                handler(self, el, **kwargs)
             else:
-                logger.warning("Unimplemented tag: %s, skipping", el.name)
+                logger.warning("Unimplemented tag: %s, skipping", name)
         else:
             self.text(el, **kwargs)
 
@@ -302,6 +321,111 @@ class BaseHtmlToOOXML:
         raise NotImplementedError()
 
 
+BaseHtmlToOOXML.tag_handlers = BaseHtmlToOOXML._build_tag_handlers()
+
+
+class LxmlText(str):
+    """
+    A text node of an `LxmlElement`, matching BeautifulSoup's `NavigableString` as far as the converters use it.
+    """
+
+    __slots__ = ()
+
+    name = None
+
+    @property
+    def text(self):
+        return str(self)
+
+
+class LxmlElement:
+    """
+    Wraps an `lxml` element with the subset of BeautifulSoup's `Tag` interface used by the converters, so the same
+    `tag_*` methods can walk either tree.
+
+    Like BeautifulSoup, `attrs["class"]` is a list of class names, `children` includes text nodes, and comments are
+    treated as text.
+    """
+
+    __slots__ = ("element", "name", "attrs")
+
+    def __init__(self, element):
+        self.element = element
+        self.name = element.tag
+        attrs = dict(element.attrib)
+        if "class" in attrs:
+            attrs["class"] = attrs["class"].split()
+        self.attrs = attrs
+
+    @property
+    def children(self):
+        element = self.element
+        if element.text:
+            yield LxmlText(element.text)
+        for child in element:
+            if isinstance(child.tag, str):
+                yield LxmlElement(child)
+            elif child.text:
+                # Comments and processing instructions
+                yield LxmlText(child.text)
+            if child.tail:
+                yield LxmlText(child.tail)
+
+    def __iter__(self):
+        return self.children
+
+    @property
+    def contents(self):
+        return list(self.children)
+
+    def get_text(self):
+        return "".join(self.element.itertext())
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    def find(self, name=None, class_=None):
+        """Returns the first descendant with the tag `name` and/or the class `class_`, or `None`."""
+        for descendant in self.element.iterdescendants():
+            if not isinstance(descendant.tag, str):
+                continue
+            if name is not None and descendant.tag != name:
+                continue
+            if class_ is not None and class_ not in descendant.get("class", "").split():
+                continue
+            return LxmlElement(descendant)
+        return None
+
+    def __str__(self):
+        return etree.tostring(self.element, encoding="unicode", method="html", with_tail=False)
+
+
+def parse_html_body(text: str, parser: str = "lxml"):
+    """
+    Parses `text` as an HTML document and returns its `body` element, or `None` if it has no content.
+
+    With the `"lxml"` parser, the element is an `LxmlElement`; with `"bs4"`, it's a BeautifulSoup `Tag`. Both come
+    from libxml2's HTML parser, so the trees are the same.
+    """
+    if parser == "bs4":
+        return bs4.BeautifulSoup(text, "lxml").find("body")
+    if parser != "lxml":
+        raise ValueError(f"Unknown rich text parser: {parser}")
+
+    if text and text[0] == "\N{BYTE ORDER MARK}":
+        text = text[1:]
+    try:
+        root = etree.fromstring(text, etree.HTMLParser())
+    except ValueError:
+        # Unicode strings with an encoding declaration; let libxml2 decode the bytes instead, as BeautifulSoup does
+        root = etree.fromstring(text.encode("utf8"), etree.HTMLParser(encoding="utf8"))
+    if root is None:
+        return None
+    body = root.find("body")
+    return LxmlElement(body) if body is not None else None
+
+
 def strip_text_whitespace(text: str):
     """
     Consolidates adjacent whitespace into one space, similar to how browsers display it
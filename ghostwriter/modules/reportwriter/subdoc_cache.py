@@ -0,0 +1,263 @@
+"""
+Process-wide cache of rich text converted to Word subdocuments.
+
+Converting a finding's HTML to OOXML is one of the more expensive steps of a DOCX export, and a draft report is often
+downloaded many times while only one of its findings changes. The cache stores the converted OOXML fragment together
+with what it needs from the main document (images, hyperlinks, and list numbering) and splices it back into later
+exports of the same content.
+"""
+
+# Standard Libraries
+import copy
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# Django Imports
+from django.conf import settings
+
+# 3rd Party Libraries
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import nsmap, qn
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+_evidence_re = re.compile(r'data-gw-evidence="(\d+)"')
+_r_namespace = "{" + nsmap["r"] + "}"
+
+
+class CachedSubdoc:
+    """
+    Stands in for a docxtpl `Subdoc` when a cached fragment is spliced into a document; renders as the body XML.
+    """
+
+    def __init__(self, xml: str):
+        self.xml = xml
+
+    def __str__(self):
+        return self.xml
+
+    def __html__(self):
+        return self.xml
+
+
+class _Fragment:
+    """
+    A converted subdocument body, along with the relationships and list numbering it refers to in the main document.
+    """
+
+    def __init__(self, body, relationships: dict, numberings: dict, size: int):
+        # Pristine `w:body` element holding the converted content; never modified after creation
+        self.body = body
+        # rId -> ("external", reltype, target) or ("image", blob)
+        self.relationships = relationships
+        # numId -> `w:abstractNum` element created for that numbering
+        self.numberings = numberings
+        self.size = size
+
+
+class SubdocCache:
+    """
+    LRU cache of converted rich text fragments, bounded by their estimated memory use.
+
+    Keys are built by `make_key` from the HTML itself and everything else the conversion reads: the template file,
+    the global report configuration, image replacements, and the evidence files the HTML refers to. Editing any of
+    those produces a new key, so entries never need to be invalidated explicitly.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, _Fragment] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def export_key(report_template, global_report_config, image_replacements: dict) -> str:
+        """
+        Hashes the parts of an export that affect every conversion. Exporters compute this once and pass it to
+        `make_key`.
+        """
+        digest = hashlib.sha256()
+        document_path = report_template.document.path
+        digest.update(
+            repr(
+                (
+                    report_template.pk,
+                    report_template.document.name,
+                    report_template.upload_date,
+                    _file_signature(document_path),
+                    report_template.p_style,
+                    report_template.evidence_image_width,
+                    [(field.attname, getattr(global_report_config, field.attname)) for field in global_report_config._meta.concrete_fields],
+                    sorted((name, path, _file_signature(path)) for name, path in image_replacements.items()),
+                )
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(export_key: str, html: str, evidences_by_id: dict) -> bytes:
+        """Builds the cache key for converting `html` in an export identified by `export_key`."""
+        digest = hashlib.sha256(export_key.encode())
+        digest.update(html.encode("utf-8", "surrogatepass"))
+        for evidence_id in sorted(set(_evidence_re.findall(html))):
+            evidence = evidences_by_id.get(int(evidence_id))
+            digest.update(json.dumps(evidence, sort_keys=True, default=str).encode())
+            if evidence is not None:
+                digest.update(repr(_file_signature(os.path.join(settings.MEDIA_ROOT, evidence["path"]))).encode())
+        return digest.digest()
+
+    def get(self, key: bytes, word_doc) -> CachedSubdoc | None:
+        """
+        Splices a cached fragment into `word_doc` (a `DocxTemplate`), adding the images, hyperlinks, and numbering
+        it needs, and returns it. Returns `None` on a miss.
+        """
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        body = copy.deepcopy(fragment.body)
+        main_part = word_doc.docx.part
+
+        rid_map = {}
+        for old_rid, relationship in fragment.relationships.items():
+            if relationship[0] == "external":
+                rid_map[old_rid] = main_part.relate_to(relationship[2], relationship[1], is_external=True)
+            else:
+                rid_map[old_rid], _ = main_part.get_or_add_image(io.BytesIO(relationship[1]))
+        if rid_map:
+            for element in body.iter():
+                for name, value in element.attrib.items():
+                    if name.startswith(_r_namespace) and value in rid_map:
+                        element.set(name, rid_map[value])
+
+        if fragment.numberings:
+            numbering = main_part.numbering_part.numbering_definitions._numbering  # pylint: disable=protected-access
+            num_map = {}
+            for old_num_id, abstract_numbering in fragment.numberings.items():
+                abstract_id = 1 + max(
+                    (int(id) for id in numbering.xpath("w:abstractNum/@w:abstractNumId")),
+                    default=-1,
+                )
+                abstract_numbering = copy.deepcopy(abstract_numbering)
+                abstract_numbering.set(qn("w:abstractNumId"), str(abstract_id))
+                numbering.insert(0, abstract_numbering)
+                num_map[old_num_id] = str(numbering.add_num(abstract_id).numId)
+            for num_id in body.iter(qn("w:numId")):
+                if num_id.get(qn("w:val")) in num_map:
+                    num_id.set(qn("w:val"), num_map[num_id.get(qn("w:val"))])
+
+        return CachedSubdoc(_body_xml(body))
+
+    def snapshot(self, word_doc) -> set:
+        """
+        Records the list numberings in `word_doc` before a conversion, so `put` can tell which ones the
+        conversion created.
+        """
+        try:
+            numbering = word_doc.docx.part.numbering_part.numbering_definitions._numbering  # pylint: disable=protected-access
+        except NotImplementedError:
+            return set()
+        return set(numbering.xpath("w:num/@w:numId"))
+
+    def put(self, key: bytes, word_doc, subdoc, snapshot: set):
+        """
+        Stores a freshly converted `subdoc` for `key`, if it can be spliced into other documents. Conversions that
+        created footnotes or other relationships the cache doesn't know how to recreate aren't stored.
+        """
+        # Copying the whole body keeps the namespace declarations on it, like docxtpl's serialization does
+        body = copy.deepcopy(subdoc.subdocx.element.body)
+        for sect_pr in body.findall(qn("w:sectPr")):
+            body.remove(sect_pr)
+
+        if next(body.iter(qn("w:footnoteReference")), None) is not None:
+            return
+
+        main_part = word_doc.docx.part
+        size = len(etree.tostring(body))
+        relationships = {}
+        for element in body.iter():
+            for name, rid in element.attrib.items():
+                if not name.startswith(_r_namespace) or rid in relationships:
+                    continue
+                rel = main_part.rels.get(rid)
+                if rel is None:
+                    return
+                if rel.is_external:
+                    relationships[rid] = ("external", rel.reltype, rel.target_ref)
+                elif rel.reltype == RT.IMAGE:
+                    relationships[rid] = ("image", rel.target_part.blob)
+                    size += len(rel.target_part.blob)
+                else:
+                    return
+
+        numberings = {}
+        num_ids = {num_id.get(qn("w:val")) for num_id in body.iter(qn("w:numId"))} - snapshot
+        if num_ids:
+            numbering = main_part.numbering_part.numbering_definitions._numbering  # pylint: disable=protected-access
+            for num_id in num_ids:
+                abstract_ids = numbering.xpath(f'w:num[@w:numId="{num_id}"]/w:abstractNumId/@w:val')
+                if not abstract_ids:
+                    return
+                abstract_numbering = numbering.xpath(f'w:abstractNum[@w:abstractNumId="{abstract_ids[0]}"]')
+                if not abstract_numbering:
+                    return
+                numberings[num_id] = copy.deepcopy(abstract_numbering[0])
+
+        self._store(key, _Fragment(body, relationships, numberings, size))
+
+    def _store(self, key: bytes, fragment: _Fragment):
+        if fragment.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.size
+            self._entries[key] = fragment
+            self.current_bytes += fragment.size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.size
+
+    def clear(self):
+        """Drops every cached fragment and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _file_signature(path: str) -> tuple | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _body_xml(body) -> str:
+    """Serializes the children of a `w:body` element the same way docxtpl serializes a `Subdoc`."""
+    return re.sub(r"</?w:body[^>]*>", "", etree.tostring(body, encoding="unicode", pretty_print=False))
+
+
+subdoc_cache = SubdocCache(settings.REPORT_SUBDOC_CACHE_MAX_BYTES)
@@ -0,0 +1,154 @@
+"""
+Process-wide cache of parsed DOCX and PPTX report templates.
+
+Loading a template means unzipping the package and parsing every XML part, which is expensive for large corporate
+templates. The cache keeps a pristine parsed copy of each template in memory and hands out deep copies, so every
+export still gets its own document to mutate.
+"""
+
+# Standard Libraries
+import copy
+import logging
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+
+# Django Imports
+from django.conf import settings
+
+# 3rd Party Libraries
+from docxtpl import DocxTemplate
+from pptx import Presentation
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateCache:
+    """
+    LRU cache of parsed template packages, bounded by the estimated memory use of the cached entries.
+
+    Entries are keyed by the :model:`reporting.ReportTemplate` ID, the kind of package, and a fingerprint of the file
+    (name, upload date, size, and modification time), so a replaced file is never served from a stale entry even if
+    the invalidation signal was missed.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, report_template) -> tuple:
+        stat = os.stat(report_template.document.path)
+        return (
+            report_template.document.name,
+            report_template.upload_date,
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+
+    def _get(self, kind: str, report_template, loader):
+        """
+        Returns a private copy of the parsed package, loading it with `loader` on a miss.
+
+        Returns `None` if the cache is disabled or the file can't be read, leaving the caller to load (and report
+        errors for) the file the usual way.
+        """
+        if self.max_bytes <= 0:
+            return None
+
+        try:
+            fingerprint = self._fingerprint(report_template)
+        except (OSError, ValueError):
+            return None
+
+        key = (kind, report_template.pk)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                pristine = entry[1]
+            else:
+                pristine = None
+                self.misses += 1
+
+        if pristine is None:
+            try:
+                pristine = loader(report_template.document.path)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.warning("Could not parse template file for caching: %s", report_template.document.path)
+                return None
+            self._store(key, fingerprint, pristine, _estimate_size(report_template.document.path))
+
+        # Deep copying the object graph is considerably cheaper than unzipping and parsing the package again;
+        # binary parts (images, fonts) are immutable bytes and are shared between copies
+        return copy.deepcopy(pristine)
+
+    def _store(self, key: tuple, fingerprint: tuple, pristine, size: int):
+        if size > self.max_bytes:
+            logger.info("Template %s is too large to cache (%d bytes)", key, size)
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+            self._entries[key] = (fingerprint, pristine, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def get_docx(self, report_template) -> DocxTemplate:
+        """
+        Returns a `DocxTemplate` for the template file. On a cache hit or miss, the document is already loaded;
+        otherwise `DocxTemplate` loads it when first used.
+        """
+        word_doc = DocxTemplate(report_template.document.path)
+        word_doc.docx = self._get("docx", report_template, _load_docx)
+        return word_doc
+
+    def get_pptx(self, report_template):
+        """Returns a `Presentation` for the template file."""
+        presentation = self._get("pptx", report_template, Presentation)
+        if presentation is None:
+            presentation = Presentation(report_template.document.path)
+        return presentation
+
+    def invalidate(self, template_id: int):
+        """Drops all cached packages for the :model:`reporting.ReportTemplate` with the given ID."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == template_id]:
+                self.current_bytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        """Drops every cached package and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+def _load_docx(path: str):
+    word_doc = DocxTemplate(path)
+    word_doc.init_docx()
+    return word_doc.docx
+
+
+def _estimate_size(path: str) -> int:
+    """
+    Estimates the memory used by a parsed package from the uncompressed size of its members. Parsed XML is
+    larger than its text, but the ratio is similar between templates, which is all the LRU bound needs.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return sum(info.file_size for info in archive.infolist())
+    except (OSError, zipfile.BadZipFile):
+        return os.path.getsize(path)
+
+
+template_cache = TemplateCache(settings.REPORT_TEMPLATE_CACHE_MAX_BYTES)
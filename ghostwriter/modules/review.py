@@ -9,14 +9,19 @@ properly categorized, has not been flagged in VirusTotal, or tagged with a bad c
 # Standard Libraries
 import logging
 import sys
+import threading
 import traceback
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from time import monotonic, sleep
 
 # 3rd Party Libraries
 import requests
+from requests.adapters import HTTPAdapter
 
 # Ghostwriter Libraries
 from ghostwriter.commandcenter.models import VirusTotalConfiguration
+from ghostwriter.shepherd.models import VirusTotalReport
 
 # Disable requests warnings for things like disabling certificate checking
 requests.packages.urllib3.disable_warnings()
@@ -25,22 +30,68 @@ requests.packages.urllib3.disable_warnings()
 logger = logging.getLogger(__name__)
 
 
+class TokenBucket:
+    """
+    Thread-safe token bucket that lets callers through at ``rate`` requests per minute.
+
+    The bucket holds up to ``capacity`` tokens, so that many requests can go out at once after an idle
+    period. The default of one token spaces every request out evenly, which keeps even a short burst
+    within per-minute quotas. A ``rate`` of 0 disables the limit.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, blocking until one is available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / 60)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * 60 / self.rate
+            sleep(wait)
+
+
 class DomainReview:
     """
     Pull a list of domain names and check their web reputation.
 
+    Reports are requested from VirusTotal concurrently, limited to the rate and number of concurrent
+    requests in :model:`commandcenter.VirusTotalConfiguration`. Reports are stored as
+    :model:`shepherd.VirusTotalReport` and reused until they are older than the configured
+    freshness window.
+
     **Parameters**
 
     ``domain_queryset``
         Queryset for :model:`shepherd:Domain`
-    ``sleep_time_override``
-        Number of seconds to sleep between VirusTotal API requests
+    ``requests_per_minute_override``
+        Number of VirusTotal API requests allowed per minute, with 0 removing the limit
         (overrides global configuration)
+    ``use_cache``
+        Reuse reports fetched within the freshness window (Default: True)
     """
 
     # API endpoints
     VIRUSTOTAL_BASE_API_URL = "https://www.virustotal.com/api/v3"
 
+    # Attempts made for each request when VirusTotal reports the quota is exceeded (HTTP 429)
+    max_attempts = 4
+
+    # Seconds to wait before the first retry when VirusTotal doesn't send a ``Retry-After`` header,
+    # doubled for every following retry
+    retry_backoff = 15
+
     # Categories we don't want to see
     # These are lowercase to avoid inconsistencies with how each service might return the categories
     blocklist = [
@@ -66,10 +117,7 @@ class DomainReview:
         "web ads/analytics",
     ]
 
-    # Variables for web browsing
-    session = requests.Session()
-
-    def __init__(self, domain_queryset, sleep_time_override=None):
+    def __init__(self, domain_queryset, requests_per_minute_override=None, use_cache=True):
         # Get API configuration
         self.virustotal_config = VirusTotalConfiguration.get_solo()
         if self.virustotal_config.enable is False:
@@ -78,15 +126,21 @@ class DomainReview:
 
         self.domain_queryset = domain_queryset
 
-        # Override globally configured sleep time
-        if len(domain_queryset) == 1:
-            self.sleep_time = 0
-        elif sleep_time_override:
-            self.sleep_time = sleep_time_override
+        # Override globally configured request rate
+        if requests_per_minute_override is not None:
+            requests_per_minute = requests_per_minute_override
         else:
-            self.sleep_time = self.virustotal_config.sleep_time
+            requests_per_minute = self.virustotal_config.requests_per_minute
+        self.rate_limiter = TokenBucket(requests_per_minute)
+        self.max_workers = max(1, self.virustotal_config.concurrent_requests)
+        self.report_max_age = timedelta(hours=self.virustotal_config.report_max_age)
+        self.use_cache = use_cache and self.virustotal_config.report_max_age > 0
 
-    def get_domain_report(self, domain, ignore_case=False, subdomains=False):
+        # Variables for web browsing, with a connection for each worker
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=self.max_workers))
+
+    def get_domain_report(self, domain, ignore_case=False, subdomains=False, etag=None):
         """
         Look-up the provided domain name with VirusTotal's Domains API endpoint.
 
@@ -105,6 +159,9 @@ class DomainReview:
             Do not convert domain name to lowercase (Default: False)
         ``subdomains``
             Return a list of subdomains (Default: False)
+        ``etag``
+            ETag of a stored report, so VirusTotal can answer that the report hasn't changed
+            with a ``not_modified`` result (Default: None)
         """
         # The VT API is case-sensitive, so domains should always be lowercase
         if not ignore_case:
@@ -122,10 +179,25 @@ class DomainReview:
                 headers = {
                     "x-apikey": self.virustotal_config.api_key,
                 }
-                req = self.session.get(url, headers=headers)
-                if req.ok:
+                if etag:
+                    headers["If-None-Match"] = etag
+                for attempt in range(self.max_attempts):
+                    self.rate_limiter.acquire()
+                    req = self.session.get(url, headers=headers)
+                    if req.status_code != 429 or attempt == self.max_attempts - 1:
+                        break
+                    wait = self.get_retry_delay(req, attempt)
+                    logger.warning("VirusTotal quota exceeded while looking up %s, so retrying in %s seconds", domain, wait)
+                    sleep(wait)
+                if req.status_code == 304:
+                    results["result"] = "not_modified"
+                elif req.ok:
                     vt_data = req.json()
                     results["data"] = vt_data["data"]["attributes"]
+                    results["etag"] = req.headers.get("ETag", "")
+                elif req.status_code == 429:
+                    results["result"] = "error"
+                    results["error"] = "VirusTotal quota for the API key in settings was exceeded"
                 else:
                     results["result"] = "error"
                     results["error"] = "VirusTotal rejected the API key in settings"
@@ -140,132 +212,224 @@ class DomainReview:
 
         return results
 
+    def get_retry_delay(self, response, attempt):
+        """
+        Return the seconds to wait before retrying a request VirusTotal rejected with HTTP 429, honoring
+        its ``Retry-After`` header.
+        """
+        try:
+            return max(0, int(response.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            return self.retry_backoff * 2**attempt
+
     def check_domain_status(self):
         """
         Check the status of each domain name in the provided :model:`shepherd.Domain`
         queryset. Mark the domain as burned if a vendor has flagged it for malware or
         phishing or assigned it an undesirable category.
+
+        The reports of all domains are fetched before any result is returned, so the caller
+        can apply them together.
         """
-        lab_results = {}
+        domains = []
         for domain in self.domain_queryset:
-            burned = False
             # Ignore any expired domains because we don't control them anymore
-            if domain.is_expired() is False:
-                domain_categories = {}
-                malicious_scans = []
-                bad_categories = []
-                burned_explanations = []
-                lab_results[domain.id] = {}
-                warnings = []
-                lab_results[domain.id]["domain"] = domain.name
-                lab_results[domain.id]["domain_qs"] = domain
-                lab_results[domain.id]["warnings"] = {}
-                logger.info("Starting domain category update for %s", domain.name)
-
-                # Sort the domain information from queryset
-                domain_name = domain.name
-                health = domain.health_status
-
-                # For notifications, track date of the last health check-up
-                if domain.last_health_check:
-                    logger.info(
-                        "Domain has a prior health check-up date: %s",
-                        domain.last_health_check,
-                    )
-                    last_health_check = domain.last_health_check
-                # If the date is empty (no past checks), limit notifications with the purchase date
-                else:
-                    last_health_check = domain.creation
-                    logger.info("No prior health check so set date to %s", last_health_check)
-                logger.info("Domain is currently considered to be %s", health)
-
-                # Check domain name with VT's Domain Report
-                vt_results = self.get_domain_report(domain_name)
-                if vt_results["result"] == "success":
-                    logger.info("Received results for %s from VirusTotal", domain_name)
-
-                    domain_categories = {}
-                    lab_results[domain.id]["vt_results"] = vt_results["data"]
-
-                    # Check if the domain is tagged as DGA
-                    if "tags" in vt_results["data"]:
-                        if "dga" in vt_results["data"]["tags"]:
-                            burned = True
-                            burned_explanations.append(
-                                "Domain is tagged with `DGA` for domain generation algorithm, and likely flagged for malware."
-                            )
-
-                    # Check if VT returned the ``categories`` key with a list
-                    if "categories" in vt_results["data"]:
-                        # Store the categories and check each one against the blocklist
-                        domain_categories = vt_results["data"]["categories"]
-                        for source, category in domain_categories.items():
-                            if category.lower() in self.blocklist:
-                                bad_categories.append(category)
-                                logger.warning(
-                                    "%s has assigned %s an undesirable category: %s",
-                                    source,
-                                    domain_name,
-                                    category,
-                                )
-                                burned = True
-                                burned_explanations.append(
-                                    f"{source} has assigned the domain an undesirable category: {category}."
-                                )
-
-                    # Check for any detections
-                    if "last_analysis_stats" in vt_results["data"]:
-                        analysis_stats = vt_results["data"]["last_analysis_stats"]
-                        if analysis_stats["malicious"] > 0:
-                            for scanner, result in vt_results["data"]["last_analysis_results"].items():
-                                if result["result"] == "malicious":
-                                    malicious_scans.append(scanner)
-                            burned = True
-                            burned_explanations.append(
-                                "{} VirusTotal scanner(s) ({}) flagged the domain as malicious.".format(
-                                    analysis_stats["malicious"],
-                                    ", ".join(malicious_scans),
-                                )
-                            )
-                            logger.warning(
-                                "%s VirusTotal scanners flagged the %s as malicious",
-                                analysis_stats["malicious"],
-                                domain_name,
-                            )
-
-                    # Check the VT community voting
-                    if "total_votes" in vt_results["data"]:
-                        votes = vt_results["data"]["total_votes"]
-                        if votes["malicious"] > 0:
-                            burned = True
-                            burned_explanations.append(
-                                "There are {} VirusTotal community votes flagging the the domain as malicious.".format(
-                                    votes["malicious"]
-                                )
-                            )
-                            logger.warning(
-                                "There are %s VirusTotal community votes flagging the the domain as malicious.",
-                                votes["malicious"],
-                            )
-
-                else:
-                    lab_results[domain.id]["vt_results"] = "none"
-                    logger.warning("Did not receive results for %s from VirusTotal.", domain_name)
-
-                # Assemble the dictionary to return for this domain
-                lab_results[domain.id]["burned"] = burned
-                lab_results[domain.id]["categories"] = domain_categories
-                lab_results[domain.id]["scanners"] = malicious_scans
-                lab_results[domain.id]["warnings"]["messages"] = warnings
-                lab_results[domain.id]["warnings"]["total"] = len(warnings)
-                if burned:
-                    lab_results[domain.id]["burned_explanation"] = burned_explanations
-
-                # Sleep for a while for VirusTotal's API
-                sleep(self.sleep_time)
-            else:
+            if domain.is_expired():
                 logger.warning(
                     "Domain %s is expired, so skipped it",
                     domain.name,
                 )
+                continue
+            domains.append(domain)
+
+        lab_results = {}
+        if not domains:
+            return lab_results
+
+        stored_reports = {report.domain_id: report for report in VirusTotalReport.objects.filter(domain__in=domains)}
+        stale = [
+            domain
+            for domain in domains
+            if not (
+                self.use_cache
+                and domain.id in stored_reports
+                and stored_reports[domain.id].is_fresh(self.report_max_age)
+            )
+        ]
+        logger.info(
+            "Requesting VirusTotal reports for %s domains and reusing %s fresh reports",
+            len(stale),
+            len(domains) - len(stale),
+        )
+
+        # Only the requests run in the worker threads
+        fetched = {}
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stale))) as executor:
+                reports = executor.map(self.fetch_report, stale, [stored_reports.get(domain.id) for domain in stale])
+                fetched = {domain.id: vt_results for domain, vt_results in zip(stale, reports)}
+        self.store_reports([domain for domain in stale if fetched[domain.id]["result"] == "success"], fetched)
+
+        for domain in domains:
+            if domain.id in fetched:
+                vt_results = fetched[domain.id]
+            else:
+                logger.info("Reusing the VirusTotal report fetched for %s", domain.name)
+                vt_results = {"result": "success", "data": stored_reports[domain.id].attributes}
+            lab_results[domain.id] = self.review_domain(domain, vt_results)
+        return lab_results
+
+    def fetch_report(self, domain, stored_report=None):
+        """
+        Fetch the VirusTotal report of an individual :model:`shepherd.Domain`, reusing the
+        attributes of ``stored_report`` if VirusTotal answers that they haven't changed.
+        """
+        vt_results = self.get_domain_report(domain.name, etag=stored_report.etag if stored_report else None)
+        if vt_results["result"] == "not_modified":
+            logger.info("VirusTotal report for %s hasn't changed", domain.name)
+            vt_results = {"result": "success", "data": stored_report.attributes, "etag": stored_report.etag}
+        return vt_results
+
+    def store_reports(self, domains, fetched):
+        """
+        Store the fetched reports of ``domains`` as :model:`shepherd.VirusTotalReport`,
+        replacing any older reports with one query.
+        """
+        fetched_at = datetime.now(timezone.utc)
+        reports = []
+        for domain in domains:
+            data = fetched[domain.id]["data"]
+            last_analysis_date = None
+            if data.get("last_analysis_date"):
+                last_analysis_date = datetime.fromtimestamp(data["last_analysis_date"], timezone.utc)
+            reports.append(
+                VirusTotalReport(
+                    domain=domain,
+                    attributes=data,
+                    etag=fetched[domain.id].get("etag", ""),
+                    last_analysis_date=last_analysis_date,
+                    fetched_at=fetched_at,
+                )
+            )
+        VirusTotalReport.objects.bulk_create(
+            reports,
+            update_conflicts=True,
+            unique_fields=["domain"],
+            update_fields=["attributes", "etag", "last_analysis_date", "fetched_at"],
+        )
+
+    def review_domain(self, domain, vt_results):
+        """
+        Check the VirusTotal report of an individual :model:`shepherd.Domain` and return
+        the domain's results.
+
+        **Parameters**
+
+        ``domain``
+            Instance of :model:`shepherd.Domain`
+        ``vt_results``
+            Results of ``get_domain_report`` for the domain
+        """
+        burned = False
+        domain_categories = {}
+        malicious_scans = []
+        bad_categories = []
+        burned_explanations = []
+        warnings = []
+        lab_results = {"domain": domain.name, "domain_qs": domain, "warnings": {}}
+        logger.info("Starting domain category update for %s", domain.name)
+
+        # Sort the domain information from queryset
+        domain_name = domain.name
+
+        # For notifications, track date of the last health check-up
+        if domain.last_health_check:
+            logger.info(
+                "Domain has a prior health check-up date: %s",
+                domain.last_health_check,
+            )
+        # If the date is empty (no past checks), limit notifications with the purchase date
+        else:
+            logger.info("No prior health check so set date to %s", domain.creation)
+
+        # Check domain name with VT's Domain Report
+        if vt_results["result"] == "success":
+            logger.info("Received results for %s from VirusTotal", domain_name)
+
+            domain_categories = {}
+            lab_results["vt_results"] = vt_results["data"]
+
+            # Check if the domain is tagged as DGA
+            if "tags" in vt_results["data"]:
+                if "dga" in vt_results["data"]["tags"]:
+                    burned = True
+                    burned_explanations.append(
+                        "Domain is tagged with `DGA` for domain generation algorithm, and likely flagged for malware."
+                    )
+
+            # Check if VT returned the ``categories`` key with a list
+            if "categories" in vt_results["data"]:
+                # Store the categories and check each one against the blocklist
+                domain_categories = vt_results["data"]["categories"]
+                for source, category in domain_categories.items():
+                    if category.lower() in self.blocklist:
+                        bad_categories.append(category)
+                        logger.warning(
+                            "%s has assigned %s an undesirable category: %s",
+                            source,
+                            domain_name,
+                            category,
+                        )
+                        burned = True
+                        burned_explanations.append(
+                            f"{source} has assigned the domain an undesirable category: {category}."
+                        )
+
+            # Check for any detections
+            if "last_analysis_stats" in vt_results["data"]:
+                analysis_stats = vt_results["data"]["last_analysis_stats"]
+                if analysis_stats["malicious"] > 0:
+                    for scanner, result in vt_results["data"]["last_analysis_results"].items():
+                        if result["result"] == "malicious":
+                            malicious_scans.append(scanner)
+                    burned = True
+                    burned_explanations.append(
+                        "{} VirusTotal scanner(s) ({}) flagged the domain as malicious.".format(
+                            analysis_stats["malicious"],
+                            ", ".join(malicious_scans),
+                        )
+                    )
+                    logger.warning(
+                        "%s VirusTotal scanners flagged the %s as malicious",
+                        analysis_stats["malicious"],
+                        domain_name,
+                    )
+
+            # Check the VT community voting
+            if "total_votes" in vt_results["data"]:
+                votes = vt_results["data"]["total_votes"]
+                if votes["malicious"] > 0:
+                    burned = True
+                    burned_explanations.append(
+                        "There are {} VirusTotal community votes flagging the the domain as malicious.".format(
+                            votes["malicious"]
+                        )
+                    )
+                    logger.warning(
+                        "There are %s VirusTotal community votes flagging the the domain as malicious.",
+                        votes["malicious"],
+                    )
+
+        else:
+            lab_results["vt_results"] = "none"
+            logger.warning("Did not receive results for %s from VirusTotal.", domain_name)
+
+        # Assemble the dictionary to return for this domain
+        lab_results["burned"] = burned
+        lab_results["categories"] = domain_categories
+        lab_results["scanners"] = malicious_scans
+        lab_results["warnings"]["messages"] = warnings
+        lab_results["warnings"]["total"] = len(warnings)
+        if burned:
+            lab_results["burned_explanation"] = burned_explanations
         return lab_results
@@ -0,0 +1,131 @@
+"""This contains Zip and gzip writers for streaming archives in HTTP responses."""
+
+# Standard Libraries
+import os
+import zipfile
+import zlib
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator
+
+# 3rd Party Libraries
+from asgiref.sync import sync_to_async
+
+# Size of the chunks read from files and emitted to the response
+CHUNK_SIZE = 64 * 1024
+
+
+class _StreamBuffer:
+    """
+    Write-only file object that collects the bytes written by ``zipfile.ZipFile`` until they are drained.
+
+    It can report its position but not seek, so ``ZipFile`` writes entry sizes in data descriptors after each
+    entry instead of going back to patch the local headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_chunks(source) -> Iterator[bytes]:
+    """Yield the content of an entry source (bytes, a file path, or a binary file object) in chunks."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), CHUNK_SIZE):
+            yield view[start : start + CHUNK_SIZE]
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as source_file:
+            yield from _iter_chunks(source_file)
+    else:
+        while chunk := source.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def iterate_async(chunks: Iterable) -> AsyncIterator:
+    """
+    Wrap a synchronous iterable so each item is produced on demand in the request's sync thread.
+
+    Under ASGI, Django 4.2's ``StreamingHttpResponse`` consumes a synchronous iterator with
+    ``sync_to_async(list)``, holding the whole body in memory before the first byte goes out. Passing the
+    response this async iterator instead sends every chunk as soon as it's ready. The sync code runs
+    thread-sensitively, so it shares the view's database connection.
+    """
+    iterator = iter(chunks)
+    done = object()
+    get_next = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await get_next(iterator, done)) is not done:
+            yield chunk
+    finally:
+        # Release generators (and their open files or cursors) when the client disconnects early
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+def stream_zip(entries: Iterable[tuple[str, bytes | str | os.PathLike | BinaryIO]]) -> Iterator[bytes]:
+    """
+    Build a Zip file from ``entries`` and yield it in pieces, for use as the content of a
+    ``StreamingHttpResponse``.
+
+    Each entry is a tuple of the name inside the archive and its content, which may be ``bytes``, the
+    path to a file on disk, or a binary file object. Entries are only consumed as the response is sent,
+    so ``entries`` can be a generator that produces documents on demand, and files are read in chunks,
+    keeping memory use flat regardless of the size of the archive.
+    """
+    buffer = _StreamBuffer()
+    zf = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED)
+    for arcname, source in entries:
+        # Sizes aren't known in advance, so always allow for entries over 2 GiB
+        with zf.open(arcname, mode="w", force_zip64=True) as dest:
+            for chunk in _iter_chunks(source):
+                dest.write(chunk)
+                if data := buffer.drain():
+                    yield data
+        if data := buffer.drain():
+            yield data
+    zf.close()
+    yield buffer.drain()
+
+
+def stream_gzip(chunks: Iterable[bytes | str]) -> Iterator[bytes]:
+    """
+    Compress ``chunks`` into a gzip file and yield it in pieces, for use as the content of a
+    ``StreamingHttpResponse``. Text chunks are encoded as UTF-8.
+    """
+    # A ``wbits`` of 31 writes the gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def zip_directory(path: str, prefix: str = "evidence/") -> Iterator[tuple[str, str]]:
+    """
+    Walk the target directory and yield ``stream_zip`` entries for every file in it, named
+    relative to ``path`` and placed under ``prefix``.
+    """
+    abs_src = os.path.abspath(path)
+    for root, _, files in os.walk(path):
+        for file in files:
+            absname = os.path.abspath(os.path.join(root, file))
+            arcname = absname[len(abs_src) + 1 :]
+            yield prefix + arcname, absname
@@ -8,7 +8,7 @@ from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
 # Ghostwriter Libraries
-from ghostwriter.oplog.models import Oplog, OplogEntry
+from ghostwriter.oplog.models import Oplog, OplogEntry, OplogImportJob, OplogStats
 from ghostwriter.oplog.resources import OplogEntryResource
 
 
@@ -42,3 +42,16 @@ class OplogEntryAdmin(ImportExportModelAdmin):
 @admin.register(Oplog)
 class OplogAdmin(ImportExportModelAdmin):
     resource_class = OplogResource
+
+
+@admin.register(OplogImportJob)
+class OplogImportJobAdmin(admin.ModelAdmin):
+    list_display = ("oplog", "status", "processed", "total", "requested_by", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "finished_at")
+
+
+@admin.register(OplogStats)
+class OplogStatsAdmin(admin.ModelAdmin):
+    list_display = ("oplog", "entry_count", "last_activity", "updated_at")
+    readonly_fields = ("entry_count", "last_activity", "operators", "tools", "hourly_activity", "updated_at")
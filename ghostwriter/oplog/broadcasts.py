@@ -0,0 +1,135 @@
+"""
+Coalesced WebSocket broadcasts of activity log changes.
+
+Saving an entry and changing its tags fire separate signals, so sending the entry on each one would send a new tagged
+entry two or three times, and integrations logging thousands of entries a minute would flood the channel layer and
+the browsers watching the log. Instead, the signals record the IDs of changed entries once their transaction commits,
+and each log's group receives a single ``batch`` message per broadcast window with the latest state of those entries.
+"""
+
+# Standard Libraries
+import json
+import logging
+import threading
+from socket import gaierror
+
+# Django Imports
+from django.conf import settings
+from django.db import connection, transaction
+
+# 3rd Party Libraries
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+# Ghostwriter Libraries
+from ghostwriter.modules.custom_serializers import OplogEntrySerializer
+from ghostwriter.oplog.models import OplogEntry
+
+# Using __name__ resolves to ghostwriter.oplog.broadcasts
+logger = logging.getLogger(__name__)
+
+
+def send_to_log(oplog_id: int, message: dict):
+    """Send ``message`` to the browsers watching an :model:`oplog.Oplog`."""
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            str(oplog_id), {"type": "send_oplog_entry", "text": json.dumps(message)}
+        )
+    except gaierror:  # pragma: no cover
+        # WebSocket are unavailable (unit testing)
+        pass
+
+
+def send_refresh(oplog_id: int):
+    """Tell the browsers watching an :model:`oplog.Oplog` to fetch its entries again, after a bulk change."""
+    send_to_log(oplog_id, {"action": "refresh"})
+
+
+class _PendingChanges:
+    """Entry IDs of one log that changed since the last broadcast; dicts keep the order of the changes."""
+
+    def __init__(self):
+        self.upserts: dict[int, None] = {}
+        self.deletes: dict[int, None] = {}
+
+
+class OplogBroadcastBuffer:
+    """
+    Collects changes to :model:`oplog.OplogEntry` and broadcasts them to each log's WebSocket group in batches.
+
+    A change is only queued once the transaction that made it commits, so rolled back changes are never sent. The
+    first change queued after a broadcast starts a timer for ``window`` seconds, and every change committed before
+    it fires goes out in the same message. With a ``window`` of ``0``, each change is sent as soon as it's committed.
+
+    Entries are serialized when the batch is sent, so an entry saved several times in a window is sent once, in its
+    latest state, and an entry created and deleted in the same window is only sent as a deletion.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._pending: dict[int, _PendingChanges] = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def upsert(self, oplog_id: int, entry_id: int):
+        """Queues a created or updated entry, once the current transaction commits."""
+        self.upsert_many(oplog_id, [entry_id])
+
+    def upsert_many(self, oplog_id: int, entry_ids: list[int]):
+        """Queues created or updated entries of one log, once the current transaction commits."""
+        transaction.on_commit(lambda: self._queue(oplog_id, upserts=entry_ids))
+
+    def delete(self, oplog_id: int, entry_id: int):
+        """Queues a deleted entry, once the current transaction commits."""
+        transaction.on_commit(lambda: self._queue(oplog_id, deletes=[entry_id]))
+
+    def _queue(self, oplog_id: int, upserts=(), deletes=()):
+        timer = None
+        with self._lock:
+            changes = self._pending.setdefault(oplog_id, _PendingChanges())
+            changes.upserts.update(dict.fromkeys(upserts))
+            for entry_id in deletes:
+                changes.upserts.pop(entry_id, None)
+                changes.deletes[entry_id] = None
+            if self.window > 0 and self._timer is None:
+                timer = self._timer = threading.Timer(self.window, self._flush_from_timer)
+                timer.daemon = True
+
+        if self.window <= 0:
+            self.flush()
+        elif timer is not None:
+            timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception:  # pragma: no cover
+            logger.exception("Failed to broadcast activity log changes")
+        finally:
+            # The timer runs in its own thread, which has its own database connection
+            connection.close()
+
+    def flush(self):
+        """Sends every queued change now, one message per log."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._timer = None
+
+        for oplog_id, changes in pending.items():
+            entries = OplogEntry.objects.filter(id__in=changes.upserts).prefetch_related("tags")
+            entries = {entry.id: entry for entry in entries}
+            upserts = [entries[entry_id] for entry_id in changes.upserts if entry_id in entries]
+            # Entries that are gone by now were deleted in a way that skipped the signals (e.g., through GraphQL)
+            deletes = list(changes.deletes) + [entry_id for entry_id in changes.upserts if entry_id not in entries]
+            send_to_log(
+                oplog_id,
+                {
+                    "action": "batch",
+                    "upsert": OplogEntrySerializer(upserts, many=True).data,
+                    "delete": deletes,
+                },
+            )
+
+
+broadcast_buffer = OplogBroadcastBuffer(settings.OPLOG_BROADCAST_WINDOW)
@@ -5,24 +5,19 @@ import json
 import logging
 from copy import deepcopy
 from datetime import datetime
-from functools import reduce
 
 # Django Imports
-from django.db.models import TextField, Func, Subquery, OuterRef, Value, F
-from django.db.models.functions import Cast, Left
-from django.db.models.expressions import CombinedExpression
 from django.utils.timezone import make_aware
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank, SearchVectorField
 
 # 3rd Party Libraries
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from rest_framework.utils.serializer_helpers import ReturnList
-from taggit.models import TaggedItem
 
 # Ghostwriter Libraries
 from ghostwriter.commandcenter.models import ExtraFieldSpec
 from ghostwriter.modules.custom_serializers import OplogEntrySerializer
+from ghostwriter.oplog.filters import OplogFilterError, filter_entries, get_facets
 from ghostwriter.oplog.models import Oplog, OplogEntry
 from ghostwriter.users.models import User
 
@@ -30,19 +25,6 @@ from ghostwriter.users.models import User
 logger = logging.getLogger(__name__)
 
 
-class TsVectorConcat(Func):
-    """
-    Raw concat operator.
-
-    Unlike Django's built in Concat function, this does not convert each argument to text first, so
-    it can be used with tsvectors.
-    """
-
-    template = "(%(expressions)s)"
-    arg_joiner = " || "
-    output_field = SearchVectorField()
-
-
 @database_sync_to_async
 def create_oplog_entry(oplog_id, user):
     """Attempt to create a new log entry for the given log ID."""
@@ -109,100 +91,70 @@ def copy_oplog_entry(entry_id, user):
 class OplogEntryConsumer(AsyncWebsocketConsumer):
     """This consumer handles WebSocket connections for :model:`oplog.OplogEntry`."""
 
-    @database_sync_to_async
-    def get_log_entries(self, oplog_id: int, offset: int, user: User, filter: str | None = None) -> ReturnList:
+    @staticmethod
+    def get_viewable_entries(oplog_id: int, user: User):
+        """Get the entries of the log, or ``None`` if the log doesn't exist or the user can't view it."""
         try:
             oplog = Oplog.objects.get(pk=oplog_id)
         except Oplog.DoesNotExist:
             logger.warning("Failed to get log entries for log ID %s because that log ID does not exist.", oplog_id)
-            return OplogEntrySerializer([], many=True).data
+            return None
 
         if not oplog.project.user_can_view(user):
-            return OplogEntrySerializer([], many=True).data
-
-        entries = OplogEntry.objects.filter(oplog_id=oplog_id)
-        if filter:
-            # Build search vectors.
-            # english_vector_args should contain fields containing mostly English text, and will be stemmed.
-            # simple_vector_args should contain fields that won't be stemmed.
-
-            # Built-in fields
-            english_vector_args = [
-                "description",
-                "output",
-                "comments",
-            ]
-
-            simple_vector_args = english_vector_args + [
-                "entry_identifier",
-                "source_ip",
-                "dest_ip",
-                "tool",
-                "user_context",
-                "command",
-                "operator_name",
-                "start_date",
-                "end_date",
-            ]
-
-            # Subquery to fetch tags
-            simple_vector_args.append(
-                Subquery(
-                    TaggedItem.objects.filter(
-                        content_type__app_label=OplogEntry._meta.app_label,
-                        content_type__model=OplogEntry._meta.model_name,
-                        object_id=OuterRef("pk"),
-                    )
-                    .annotate(all_tags=Func(F("tag__name"), Value(" "), function="STRING_AGG"))
-                    .values("all_tags")
-                )
-            )
+            return None
+        return OplogEntry.objects.filter(oplog_id=oplog_id)
 
-            # JSON operations to fetch extra fields
-            for spec in ExtraFieldSpec.objects.filter(target_model=OplogEntry._meta.label):
-                if spec.type == "json":
-                    continue
-
-                field = CombinedExpression(
-                    F("extra_fields"),
-                    "->>",
-                    Value(spec.internal_name),
-                )
-                simple_vector_args.append(field)
-                if spec.type == "rich_text":
-                    english_vector_args.append(field)
-
-            # Create and combine search vectors.
-            # Limit inputs since PostgreSQL will abort the query if attempting to make a tsvector out of a huge string
-            vectors = [SearchVector(Left(Cast(va, TextField()), 100000), config="english") for va in english_vector_args] + \
-                [SearchVector(Left(Cast(va, TextField()), 100000), config="simple") for va in simple_vector_args]
-            vector = TsVectorConcat(*vectors)
-
-            # Build filter.
-            # Search using both english and simple configs, to help match both types of vectors. Also use prefix
-            # terms to help search partial matches.
-
-            def q_term(term):
-                term = "'" + term.replace("'", "''").replace("\\", "\\\\") + "':*"
-                return SearchQuery(term, config="english", search_type="raw") | SearchQuery(
-                    term, config="simple", search_type="raw"
-                )
-
-            query = reduce(lambda a, b: a & b, (q_term(term) for term in filter.split()))
-
-            # Run query
-            entries = (
-                entries.annotate(
-                    search=vector,
-                    rank=SearchRank(vector, query),
-                )
-                .filter(search=query)
-                .order_by("-start_date")
-            )
-        else:
-            entries = entries.order_by("-start_date")
-        entries = entries[offset : offset + 100]
-        return OplogEntrySerializer(entries, many=True).data
+    @database_sync_to_async
+    def get_log_entries(
+        self,
+        oplog_id: int,
+        offset: int,
+        user: User,
+        filter: str | None = None,
+        cursor: str | None = None,
+        filters: dict | None = None,
+    ) -> tuple[ReturnList, str | None]:
+        """
+        Get a page of entries for the log, newest first, and the cursor for the next page.
+
+        Entries are narrowed by the free-text ``filter`` and the structured ``filters`` (see
+        ``ghostwriter.oplog.filters.OplogEntryFilter``). Pages start after ``cursor`` (see ``OplogEntry.get_page``).
+        Clients that still page by ``offset`` send no cursor; pages after the first are then fetched by offset and
+        come without a next cursor.
+        """
+        entries = self.get_viewable_entries(oplog_id, user)
+        if entries is None:
+            return OplogEntrySerializer([], many=True).data, None
+
+        try:
+            entries = filter_entries(entries, filters, filter)
+        except OplogFilterError as exception:
+            logger.warning("Received invalid filters for log ID %s: %s", oplog_id, exception)
+            return OplogEntrySerializer([], many=True).data, None
+
+        if cursor is None and offset:
+            entries = entries.order_by("-start_date", "-id")[offset : offset + 100]
+            return OplogEntrySerializer(entries, many=True).data, None
+
+        try:
+            entries, next_cursor = OplogEntry.get_page(entries, cursor)
+        except ValueError:
+            logger.warning("Received an invalid cursor for log ID %s: %s", oplog_id, cursor)
+            return OplogEntrySerializer([], many=True).data, None
+        return OplogEntrySerializer(entries, many=True).data, next_cursor
+
+    @database_sync_to_async
+    def get_log_facets(
+        self, oplog_id: int, user: User, filter: str | None = None, filters: dict | None = None
+    ) -> dict | None:
+        """Count the log's entries matching the filters per operator, tool, and tag (see ``get_facets``)."""
+        entries = self.get_viewable_entries(oplog_id, user)
+        if entries is None:
+            return None
+        try:
+            return get_facets(filter_entries(entries, filters, filter))
+        except OplogFilterError:
+            return None
 
     async def send_oplog_entry(self, event):
         await self.send(text_data=event["text"])
@@ -233,15 +185,25 @@ class OplogEntryConsumer(AsyncWebsocketConsumer):
 
         if json_data["action"] == "sync":
             oplog_id = json_data["oplog_id"]
-            offset = json_data["offset"]
+            offset = json_data.get("offset", 0)
             filter = json_data.get("filter", "")
-            entries = await self.get_log_entries(oplog_id, offset, user, filter)
+            cursor = json_data.get("cursor")
+            filters = json_data.get("filters") or {}
+            entries, next_cursor = await self.get_log_entries(oplog_id, offset, user, filter, cursor, filters)
+            # Facets only change with the filters, so they're counted with the first page
+            facets = None
+            if cursor is None and not offset:
+                facets = await self.get_log_facets(oplog_id, user, filter, filters)
             message = json.dumps(
                 {
                     "action": "sync",
                     "filter": filter,
+                    "filters": filters,
                     "offset": offset,
+                    "cursor": cursor,
+                    "next_cursor": next_cursor,
                     "data": entries,
+                    "facets": facets,
                 }
             )
 
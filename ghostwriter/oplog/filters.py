@@ -0,0 +1,166 @@
+"""This contains the structured filters and facet counts of the entries in an activity log."""
+
+# Standard Libraries
+from functools import reduce
+
+# Django Imports
+from django import forms
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+
+# 3rd Party Libraries
+import django_filters
+from taggit.models import Tag, TaggedItem
+
+# Ghostwriter Libraries
+from ghostwriter.oplog.models import FilterKey, OplogEntry
+
+# Facets counted by ``get_facets``
+FACETS = ("operator", "tool", "tag")
+
+# Values returned per facet by default, most common first
+FACET_LIMIT = 25
+
+
+class OplogFilterError(Exception):
+    """Raised when structured filters are invalid. ``errors`` holds one message per problem."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+class ValueListField(forms.Field):
+    """Form field accepting a string or a list of strings, cleaned into a list of non-blank strings."""
+
+    widget = forms.SelectMultiple
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return []
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) for item in value):
+            raise ValidationError("Enter a list of values.", code="invalid_list")
+        return [item.strip() for item in value if item.strip()]
+
+
+class ValueListFilter(django_filters.Filter):
+    field_class = ValueListField
+
+
+class OplogEntryFilter(django_filters.FilterSet):
+    """
+    Filter :model:`oplog.OplogEntry` with typed predicates, for the log's WebSocket and GraphQL API.
+
+    Values of the same field are alternatives, and different fields must all match.
+
+    **Fields**
+
+    ``operator``, ``tool``, ``source_ip``, ``dest_ip``
+        Case insensitive match of any of the values
+    ``tag``
+        Entries with any of the tags
+    ``start_date_after``, ``start_date_before``
+        ISO 8601 bounds of the ``start_date``, inclusive
+    ``search``
+        Words the entries must contain, as in the log's search box
+    """
+
+    operator = ValueListFilter(field_name="operator_name", method="filter_values")
+    tool = ValueListFilter(method="filter_values")
+    source_ip = ValueListFilter(method="filter_values")
+    dest_ip = ValueListFilter(method="filter_values")
+    tag = ValueListFilter(method="filter_tags")
+    start_date = django_filters.IsoDateTimeFromToRangeFilter()
+    search = django_filters.CharFilter(method="search_text")
+
+    class Meta:
+        model = OplogEntry
+        fields = []
+
+    def filter_values(self, queryset, name, value):
+        # The key finds the candidates through the index, and the full values are then compared
+        keys = {item.lower()[: FilterKey.length] for item in value}
+        return queryset.alias(**{f"{name}_key": FilterKey(name)}).filter(
+            reduce(lambda a, b: a | b, (Q(**{f"{name}__iexact": item}) for item in value)),
+            **{f"{name}_key__in": keys},
+        )
+
+    def filter_tags(self, queryset, name, value):
+        tagged = TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(OplogEntry), tag__name__in=value
+        ).values("object_id")
+        return queryset.filter(id__in=tagged)
+
+    def search_text(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        # Entries without a search vector are indexed by the signals, bulk imports, and the
+        # ``backfill_oplog_search`` command, never here, so searching doesn't write to the log
+        return queryset.filter(search_vector=OplogEntry.search_query(value))
+
+
+def filter_entries(queryset, filters: dict | None = None, search: str | None = None):
+    """
+    Filter ``queryset`` with the structured ``filters`` (see ``OplogEntryFilter``) and the free-text ``search``.
+    Raises ``OplogFilterError`` if the filters are invalid.
+    """
+    if not isinstance(filters or {}, dict):
+        raise OplogFilterError(["Filters must be an object"])
+    data = dict(filters or {})
+    unknown = set(data) - set(OplogEntryFilter.base_filters) - {"start_date_after", "start_date_before"}
+    if unknown:
+        raise OplogFilterError([f"Unknown filter: {name}" for name in sorted(unknown)])
+    if search:
+        data["search"] = " ".join(filter(None, [data.get("search"), search]))
+
+    filterset = OplogEntryFilter(data, queryset=queryset)
+    if not filterset.is_valid():
+        raise OplogFilterError(
+            [f"{name}: {' '.join(messages)}" for name, messages in sorted(filterset.errors.items())]
+        )
+    return filterset.qs
+
+
+def get_facets(queryset, limit: int = FACET_LIMIT) -> dict:
+    """
+    Count the entries in ``queryset`` per operator, tool, and tag, returning the ``total`` and, for each facet of
+    ``FACETS``, up to ``limit`` values with their counts, most common first. Tools are counted in lowercase, as in
+    :model:`oplog.OplogStats`.
+
+    Every count comes from one grouped query over the entries and their tags.
+    """
+    entries_sql, params = queryset.order_by().values("id").query.sql_with_params()
+    content_type = ContentType.objects.get_for_model(OplogEntry)
+    # GROUPING() sets a bit for each column a row isn't grouped by: 0b011 for operators, 0b101 for tools,
+    # 0b110 for tags, and 0b111 for the total
+    sql = f"""
+        SELECT GROUPING(e.operator_name, lower(e.tool), t.name), e.operator_name, lower(e.tool), t.name,
+            count(DISTINCT e.id)
+        FROM {OplogEntry._meta.db_table} e
+        LEFT JOIN {TaggedItem._meta.db_table} ti ON ti.object_id = e.id AND ti.content_type_id = %s
+        LEFT JOIN {Tag._meta.db_table} t ON t.id = ti.tag_id
+        WHERE e.id IN ({entries_sql})
+        GROUP BY GROUPING SETS ((e.operator_name), (lower(e.tool)), (t.name), ())
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [content_type.id, *params])
+        rows = cursor.fetchall()
+
+    columns = {0b011: ("operator", 1), 0b101: ("tool", 2), 0b110: ("tag", 3)}
+    facets = {name: [] for name in FACETS}
+    total = 0
+    for row in rows:
+        if row[0] == 0b111:
+            total = row[4]
+            continue
+        name, index = columns[row[0]]
+        if row[index]:
+            facets[name].append({"value": row[index], "count": row[4]})
+    for name, values in facets.items():
+        values.sort(key=lambda value: (-value["count"], value["value"]))
+        facets[name] = values[:limit]
+    return {"total": total, **facets}
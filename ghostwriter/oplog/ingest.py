@@ -0,0 +1,396 @@
+"""
+Bulk ingestion of activity log entries for integrations and CSV imports.
+
+C2 and tool integrations log thousands of entries, and creating them one at a time runs the model signals, a search
+vector update, a WebSocket broadcast, and a Hasura event for each one. ``ingest_entries`` validates a whole batch
+first, then creates the entries, their tags, and their search vectors with a few queries per chunk, and broadcasts
+them to the log once. ``import_csv`` does the same for CSV files, reading them a chunk at a time.
+"""
+
+# Standard Libraries
+import ast
+import csv
+import json
+import logging
+from datetime import datetime
+
+# Django Imports
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+# 3rd Party Libraries
+from taggit.models import Tag, TaggedItem
+from taggit.utils import parse_tags
+
+# Ghostwriter Libraries
+from ghostwriter.oplog.broadcasts import broadcast_buffer
+from ghostwriter.oplog.models import Oplog, OplogEntry, OplogStats
+
+# Using __name__ resolves to ghostwriter.oplog.ingest
+logger = logging.getLogger(__name__)
+
+# Entry fields an integration may set, besides ``tags`` and ``extra_fields``
+INGEST_FIELDS = (
+    "entry_identifier",
+    "start_date",
+    "end_date",
+    "source_ip",
+    "dest_ip",
+    "tool",
+    "user_context",
+    "command",
+    "description",
+    "output",
+    "comments",
+    "operator_name",
+)
+
+
+class OplogIngestError(Exception):
+    """Raised when a batch of entries fails validation. ``errors`` holds one message per problem."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def parse_ndjson(text: str) -> list:
+    """Parses newline-delimited JSON into a list of values, skipping blank lines."""
+    rows = []
+    errors = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as exception:
+            errors.append(f"Line {number}: invalid JSON ({exception.msg})")
+    if errors:
+        raise OplogIngestError(errors)
+    return rows
+
+
+def _parse_date(value):
+    if value is None or value == "":
+        return now()
+    if isinstance(value, str):
+        value = parse_datetime(value.strip())
+    if not isinstance(value, datetime):
+        raise ValueError("expected a date and time, such as 2024-01-31 13:45:00 or an ISO 8601 timestamp")
+    if is_naive(value):
+        value = make_aware(value)
+    return value
+
+
+def _build_entry(oplog: Oplog, row) -> tuple[OplogEntry, list[str]]:
+    """Builds an unsaved entry and its tag names from one row, raising ``ValueError`` if the row is invalid."""
+    if not isinstance(row, dict):
+        raise ValueError("expected an object")
+    unknown = set(row) - set(INGEST_FIELDS) - {"tags", "extra_fields"}
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+
+    # A null value means the field wasn't set, so non-nullable fields get their defaults
+    values = {
+        field: row[field]
+        for field in INGEST_FIELDS
+        if field in row and (row[field] is not None or OplogEntry._meta.get_field(field).null)
+    }
+    for field in ("start_date", "end_date"):
+        try:
+            values[field] = _parse_date(values.get(field))
+        except ValueError as exception:
+            raise ValueError(f"{field}: {exception}") from exception
+
+    extra_fields = row.get("extra_fields")
+    if extra_fields is None:
+        extra_fields = {}
+    if not isinstance(extra_fields, dict):
+        raise ValueError("extra_fields: expected an object")
+
+    tags = row.get("tags") or []
+    if isinstance(tags, str):
+        tags = parse_tags(tags)
+    elif not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError("tags: expected a list of strings or a comma-separated string")
+
+    entry = OplogEntry(oplog_id=oplog, extra_fields=extra_fields, **values)
+    try:
+        entry.clean_fields(exclude=["oplog_id", "extra_fields", "search_vector"])
+    except ValidationError as exception:
+        raise ValueError(
+            "; ".join(f"{field}: {' '.join(messages)}" for field, messages in exception.message_dict.items())
+        ) from exception
+    return entry, [tag.strip() for tag in tags if tag.strip()]
+
+
+def validate_entries(oplog: Oplog, rows: list) -> list[tuple[OplogEntry, list[str]]]:
+    """
+    Validates every row before anything is saved, returning an unsaved :model:`oplog.OplogEntry` and the tag names
+    for each one. Raises ``OplogIngestError`` with the problems of all invalid rows.
+    """
+    entries = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            entries.append(_build_entry(oplog, row))
+        except ValueError as exception:
+            errors.append(f"Entry {index}: {exception}")
+    if errors:
+        raise OplogIngestError(errors)
+    return entries
+
+
+def _get_tags(names) -> dict[str, Tag]:
+    """Gets or creates the named tags, keyed by lowercase name to match ``TAGGIT_CASE_INSENSITIVE``."""
+    lowered = {name.lower(): name for name in names}
+    tags = {
+        tag.lowered_name: tag
+        for tag in Tag.objects.annotate(lowered_name=Lower("name")).filter(lowered_name__in=lowered)
+    }
+    for key, name in lowered.items():
+        if key not in tags:
+            # New tags are rare, and saving them one at a time lets taggit pick unique slugs
+            tags[key] = Tag.objects.create(name=name)
+    return tags
+
+
+def _tag_entries(entries: list[tuple[OplogEntry, list[str]]], batch_size: int):
+    names = {name for _, entry_tags in entries for name in entry_tags}
+    if not names:
+        return
+    tags = _get_tags(names)
+    content_type = ContentType.objects.get_for_model(OplogEntry)
+    items = []
+    for entry, entry_tags in entries:
+        for tag_id in {tags[name.lower()].id for name in entry_tags}:
+            items.append(TaggedItem(tag_id=tag_id, content_type=content_type, object_id=entry.id))
+    TaggedItem.objects.bulk_create(items, batch_size=batch_size)
+
+
+def _get_known_identifiers(oplog: Oplog, entries: list[tuple[OplogEntry, list[str]]]) -> dict[str, int]:
+    """Get the IDs of the entries already in ``oplog`` with the identifiers of ``entries``, keyed by identifier."""
+    identifiers = {entry.entry_identifier for entry, _ in entries if entry.entry_identifier}
+    # Ordered newest first, so the oldest entry wins if an identifier was logged more than once
+    return dict(
+        OplogEntry.objects.filter(oplog_id=oplog, entry_identifier__in=identifiers)
+        .order_by("-id")
+        .values_list("entry_identifier", "id")
+    )
+
+
+def ingest_entries(oplog: Oplog, rows: list, chunk_size: int | None = None) -> list[dict]:
+    """
+    Creates :model:`oplog.OplogEntry` entries in ``oplog`` from a list of dicts, as sent by an integration, and
+    returns ``{"id": ..., "created": ...}`` for each row, in order.
+
+    Rows may set the fields in ``INGEST_FIELDS``, ``tags`` (a list or comma-separated string), and ``extra_fields``.
+    Nothing is saved if any row is invalid; ``OplogIngestError`` is raised with the problems instead.
+
+    Ingestion is idempotent for rows with an ``entry_identifier``: a row whose identifier is already in the log, or
+    appeared earlier in the batch, isn't created again and gets the ID of the existing entry. Concurrent ingests
+    into the same log wait for each other, so they can't both create the same identifier.
+
+    Entries are created ``chunk_size`` rows at a time (``OPLOG_INGEST_CHUNK_SIZE`` by default) without running the
+    model signals; their search vectors, statistics, and WebSocket broadcast are handled here for the whole batch
+    instead.
+    """
+    chunk_size = chunk_size or settings.OPLOG_INGEST_CHUNK_SIZE
+    entries = validate_entries(oplog, rows)
+
+    with transaction.atomic():
+        # Lock the log so concurrent ingests don't race on the identifiers
+        Oplog.objects.select_for_update().get(id=oplog.id)
+
+        known = _get_known_identifiers(oplog, entries)
+
+        new_entries = []
+        # For each row, the ID of the existing entry it matches, or the index of its entry in ``new_entries``
+        results = []
+        pending = {}
+        for entry, tags in entries:
+            identifier = entry.entry_identifier
+            if identifier and identifier in known:
+                results.append(("existing", known[identifier]))
+            elif identifier and identifier in pending:
+                results.append(("duplicate", pending[identifier]))
+            else:
+                if identifier:
+                    pending[identifier] = len(new_entries)
+                results.append(("new", len(new_entries)))
+                new_entries.append((entry, tags))
+
+        created_ids = []
+        for start in range(0, len(new_entries), chunk_size):
+            chunk = new_entries[start : start + chunk_size]
+            OplogEntry.objects.bulk_create([entry for entry, _ in chunk])
+            _tag_entries(chunk, chunk_size)
+            chunk_ids = [entry.id for entry, _ in chunk]
+            OplogEntry.update_search_vectors(OplogEntry.objects.filter(id__in=chunk_ids))
+            created_ids.extend(chunk_ids)
+
+        if created_ids:
+            OplogStats.apply_changes(oplog.id, added=[entry.get_stats_values() for entry, _ in new_entries])
+            broadcast_buffer.upsert_many(oplog.id, created_ids)
+
+    logger.info(
+        "Ingested %s entries into activity log %s (%s already logged)",
+        len(created_ids),
+        oplog.id,
+        len(rows) - len(created_ids),
+    )
+
+    output = []
+    for kind, value in results:
+        if kind == "existing":
+            output.append({"id": value, "created": False})
+        else:
+            output.append({"id": created_ids[value], "created": kind == "new"})
+    return output
+
+
+# Columns of a CSV import, besides an optional ``extra_fields`` column
+CSV_HEADERS = INGEST_FIELDS + ("tags",)
+
+# Columns of exported logs that are ignored when importing them
+IGNORED_CSV_HEADERS = ("oplog_id",)
+
+# Encoding of uploaded CSV files
+CSV_ENCODING = "iso-8859-1"
+
+
+def validate_csv_headers(headers: list[str]) -> bool:
+    """Check the header row of a CSV import has every expected column once, and nothing else."""
+    headers = [header for header in headers if header not in IGNORED_CSV_HEADERS]
+    return len(headers) == len(set(headers)) and set(headers) - {"extra_fields"} == set(CSV_HEADERS)
+
+
+def _parse_csv_extra_fields(value: str):
+    if not value:
+        return {}
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        pass
+    # Older exports wrote the extra fields as Python dicts
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError) as exception:
+        raise ValueError("extra_fields: expected a JSON object") from exception
+
+
+def _read_csv_rows(path: str):
+    """Yield the number of the last line of each row of a CSV file and the row as a dict."""
+    with open(path, newline="", encoding=CSV_ENCODING) as csv_file:
+        reader = csv.DictReader(csv_file)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _build_csv_entry(oplog: Oplog, row: dict) -> tuple[OplogEntry, list[str]]:
+    for header in IGNORED_CSV_HEADERS:
+        row.pop(header, None)
+    row["extra_fields"] = _parse_csv_extra_fields(row.get("extra_fields"))
+    return _build_entry(oplog, row)
+
+
+def validate_csv(oplog: Oplog, path: str, max_errors: int = 20) -> int:
+    """
+    Validate every row of a CSV import without saving anything, and return the number of entries in it. Raises
+    ``OplogIngestError`` with the problems found, stopping after ``max_errors`` of them.
+    """
+    count = 0
+    identifiers = set()
+    errors = []
+    for line, row in _read_csv_rows(path):
+        count += 1
+        try:
+            entry, _ = _build_csv_entry(oplog, row)
+        except ValueError as exception:
+            errors.append(f"Line {line}: {exception}")
+        else:
+            # Rows are imported in chunks, so a second row for an identifier couldn't be matched to the first
+            if entry.entry_identifier in identifiers:
+                errors.append(f"Line {line}: the identifier {entry.entry_identifier} is used by an earlier row")
+            elif entry.entry_identifier:
+                identifiers.add(entry.entry_identifier)
+        if len(errors) >= max_errors:
+            break
+    if errors:
+        raise OplogIngestError(errors)
+    return count
+
+
+def _import_chunk(oplog: Oplog, chunk: list[tuple[OplogEntry, list[str]]], chunk_size: int) -> tuple[int, int]:
+    """Save a chunk of imported entries, updating the entries whose identifiers are already in the log."""
+    with transaction.atomic():
+        known = _get_known_identifiers(oplog, chunk)
+        new_entries = []
+        existing_entries = []
+        for entry, tags in chunk:
+            if entry.entry_identifier in known:
+                entry.id = known[entry.entry_identifier]
+                existing_entries.append((entry, tags))
+            else:
+                new_entries.append((entry, tags))
+
+        OplogEntry.objects.bulk_create([entry for entry, _ in new_entries])
+        if existing_entries:
+            OplogEntry.objects.bulk_update(
+                [entry for entry, _ in existing_entries], INGEST_FIELDS + ("extra_fields",), batch_size=chunk_size
+            )
+            # Imported tags replace the existing ones
+            TaggedItem.objects.filter(
+                content_type=ContentType.objects.get_for_model(OplogEntry),
+                object_id__in=[entry.id for entry, _ in existing_entries],
+            ).delete()
+        _tag_entries(chunk, chunk_size)
+        OplogEntry.update_search_vectors(OplogEntry.objects.filter(id__in=[entry.id for entry, _ in chunk]))
+    return len(new_entries), len(existing_entries)
+
+
+def import_csv(oplog: Oplog, path: str, chunk_size: int | None = None, progress_callback=None) -> tuple[int, int]:
+    """
+    Import the entries in the CSV file at ``path`` into ``oplog``, and return the number of entries created and
+    updated. Run ``validate_csv`` on the file first.
+
+    The file is read and saved ``chunk_size`` rows at a time (``OPLOG_INGEST_CHUNK_SIZE`` by default), in one
+    transaction per chunk, without running the model signals. Rows with an ``entry_identifier`` already in the log
+    update that entry instead of creating a new one. After each chunk, ``progress_callback`` is called with the
+    number of rows processed, entries created, and entries updated so far.
+
+    Nothing is broadcast to the browsers watching the log; send them a refresh once the import is done.
+    """
+    chunk_size = chunk_size or settings.OPLOG_INGEST_CHUNK_SIZE
+    processed = created = updated = 0
+    chunk = []
+
+    def save_chunk():
+        nonlocal processed, created, updated
+        chunk_created, chunk_updated = _import_chunk(oplog, chunk, chunk_size)
+        processed += len(chunk)
+        created += chunk_created
+        updated += chunk_updated
+        chunk.clear()
+        if progress_callback is not None:
+            progress_callback(processed, created, updated)
+
+    try:
+        for _, row in _read_csv_rows(path):
+            chunk.append(_build_csv_entry(oplog, row))
+            if len(chunk) >= chunk_size:
+                save_chunk()
+        if chunk:
+            save_chunk()
+    finally:
+        # Updated rows replace entries whose old values weren't loaded, so count the log again once
+        if processed:
+            OplogStats.rebuild(oplog.id)
+
+    logger.info("Imported %s new and %s updated entries into activity log %s", created, updated, oplog.id)
+    return created, updated
@@ -0,0 +1,56 @@
+"""This contains the helpers for queuing activity log imports as background jobs."""
+
+# Standard Libraries
+import os
+
+# Django Imports
+from django.db import transaction
+from django.urls import reverse
+
+# 3rd Party Libraries
+from django_q.tasks import async_task
+
+# Ghostwriter Libraries
+from ghostwriter.oplog.broadcasts import send_to_log
+from ghostwriter.oplog.models import Oplog, OplogImportJob
+
+
+def send_import_update(job: OplogImportJob):
+    """Send the import job's current state to the log's WebSocket group."""
+    send_to_log(
+        job.oplog_id,
+        {
+            "action": "import",
+            "job": job.id,
+            "status": job.status,
+            "total": job.total,
+            "processed": job.processed,
+            "created": job.created,
+            "updated": job.updated,
+            "error": job.error,
+            "status_url": reverse("oplog:oplog_import_status", args=[job.id]),
+        },
+    )
+
+
+def queue_import_job(oplog: Oplog, csv_file, user) -> OplogImportJob:
+    """
+    Store an uploaded CSV file with a new :model:`oplog.OplogImportJob` and queue it for the Django Q
+    cluster with :task:`oplog.tasks.import_oplog_entries_job`.
+    """
+    job = OplogImportJob(oplog=oplog, requested_by=user)
+    job.csv_file.save(os.path.basename(csv_file.name), csv_file, save=False)
+    job.save()
+
+    def enqueue():
+        task_id = async_task(
+            "ghostwriter.oplog.tasks.import_oplog_entries_job",
+            job.id,
+            group="Activity Log Import",
+        )
+        OplogImportJob.objects.filter(id=job.id).update(task_id=task_id)
+
+    # Wait for the job row to be committed so the worker can always find it
+    transaction.on_commit(enqueue)
+    send_import_update(job)
+    return job
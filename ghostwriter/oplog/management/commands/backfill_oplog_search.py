@@ -0,0 +1,49 @@
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+
+# Ghostwriter Libraries
+from ghostwriter.oplog.models import OplogEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills in the full-text search vectors of activity log entries that don't have one yet, such as entries "
+        "created before the search index existed. Entries are updated in batches, each in its own transaction, "
+        "so the command can be interrupted and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log",
+            type=int,
+            action="append",
+            dest="logs",
+            help="ID of a log to backfill; may be repeated (default: every log)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="rebuild",
+            help="Recompute every vector, not only missing ones (e.g., after changing the log entries' extra fields)",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000, help="Entries updated per query")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be at least 1")
+
+        entries = OplogEntry.objects.all()
+        if options["logs"]:
+            entries = entries.filter(oplog_id__in=options["logs"])
+        if not options["rebuild"]:
+            entries = entries.filter(search_vector__isnull=True)
+
+        ids = list(entries.order_by("pk").values_list("pk", flat=True))
+        self.stdout.write(f"Updating the search vectors of {len(ids)} log entries...")
+        updated = 0
+        for start in range(0, len(ids), options["batch_size"]):
+            batch = ids[start : start + options["batch_size"]]
+            updated += OplogEntry.update_search_vectors(OplogEntry.objects.filter(pk__in=batch))
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Updated {updated} of {len(ids)} log entries")
+        self.stdout.write(self.style.SUCCESS(f"Updated the search vectors of {updated} log entries"))
@@ -0,0 +1,121 @@
+# Standard Libraries
+from datetime import datetime
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+
+# Ghostwriter Libraries
+from ghostwriter.oplog import partitions
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError as error:
+        raise CommandError(f"{value} isn't a month formatted as YYYY-MM") from error
+
+
+class Command(BaseCommand):
+    help = (
+        "Manages the PostgreSQL partitions of the activity log entries table. Partitioning is opt-in: `enable` "
+        "converts the table into one partitioned by log or by month, copying every entry while holding an exclusive "
+        "lock, so run it during a maintenance window. The primary key then includes the partition key, so GraphQL "
+        "`oplogEntry_by_pk` queries and mutations need the entry's `oplogId` or `startDate` too. Detached and archived "
+        "partitions keep their entries out of the logs until they're attached again."
+    )
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="action", required=True)
+        subparsers.add_parser("status", help="Show the partitioning strategy and the partitions")
+
+        enable = subparsers.add_parser("enable", help="Partition the entries table")
+        enable.add_argument("--by", choices=sorted(partitions.STRATEGIES), required=True, help="Partition key")
+        enable.add_argument(
+            "--months-ahead", type=int, default=3, help="Future months to create partitions for (default: 3)"
+        )
+
+        create = subparsers.add_parser("create", help="Create the partitions new entries will need")
+        create.add_argument(
+            "--months-ahead", type=int, default=3, help="Future months to create partitions for (default: 3)"
+        )
+
+        detach = subparsers.add_parser("detach", help="Detach partitions, hiding their entries")
+        detach.add_argument("names", nargs="+", help="Names of the partitions")
+
+        attach = subparsers.add_parser("attach", help="Attach detached or archived partitions again")
+        attach.add_argument("names", nargs="+", help="Names of the partitions")
+
+        archive = subparsers.add_parser(
+            "archive", help=f"Detach partitions and move them to the {partitions.ARCHIVE_SCHEMA} schema"
+        )
+        archive.add_argument("names", nargs="*", help="Names of the partitions")
+        archive.add_argument(
+            "--before", type=parse_month, help="Archive the partitions of months before this one (YYYY-MM)"
+        )
+        archive.add_argument(
+            "--completed",
+            action="store_true",
+            help="Archive the partitions of deleted logs and of logs whose projects are complete",
+        )
+        archive.add_argument("--dry-run", action="store_true", help="List the partitions without archiving them")
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, f"handle_{options['action']}")(options)
+        except partitions.OplogPartitionError as error:
+            raise CommandError(str(error)) from error
+
+    def handle_status(self, options):
+        strategy = partitions.get_strategy()
+        if strategy is None:
+            self.stdout.write("The activity log entries table isn't partitioned")
+            return
+        self.stdout.write(f"The activity log entries table is partitioned by {strategy}")
+        for partition in partitions.list_partitions():
+            self.stdout.write(f"  {partition['name']}: {partition['bounds']} (~{partition['rows']} entries)")
+        archived = partitions.list_partitions(partitions.ARCHIVE_SCHEMA)
+        if archived:
+            self.stdout.write(f"Archived in the {partitions.ARCHIVE_SCHEMA} schema:")
+            for partition in archived:
+                self.stdout.write(f"  {partition['name']} (~{partition['rows']} entries)")
+
+    def handle_enable(self, options):
+        self.stdout.write(f"Partitioning the activity log entries table by {options['by']}...")
+        created = partitions.enable_partitioning(options["by"], months_ahead=options["months_ahead"])
+        self.stdout.write(self.style.SUCCESS(f"Partitioned the activity log entries into {len(created)} partitions"))
+
+    def handle_create(self, options):
+        if partitions.get_strategy() is None:
+            raise CommandError("The activity log entries table isn't partitioned")
+        created = partitions.create_upcoming_partitions(options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions"))
+
+    def handle_detach(self, options):
+        for name in options["names"]:
+            partitions.detach_partition(name)
+            self.stdout.write(self.style.SUCCESS(f"Detached {name}"))
+
+    def handle_attach(self, options):
+        for name in options["names"]:
+            partitions.attach_partition(name)
+            self.stdout.write(self.style.SUCCESS(f"Attached {name}"))
+
+    def handle_archive(self, options):
+        names = list(options["names"])
+        strategy = partitions.get_strategy()
+        if options["before"] and strategy != "month":
+            raise CommandError("--before only applies to entries partitioned by month")
+        if options["completed"] and strategy != "log":
+            raise CommandError("--completed only applies to entries partitioned by log")
+        if options["before"] or options["completed"]:
+            names += partitions.get_archivable_partitions(options["before"])
+        if not names:
+            raise CommandError("Name the partitions to archive, or use --before or --completed")
+        for name in dict.fromkeys(names):
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive {name}")
+                continue
+            partitions.detach_partition(name, archive=True)
+            self.stdout.write(self.style.SUCCESS(f"Archived {name}"))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oplog', '0019_set_text_defaults'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oplogentry',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search vector of the entry, its tags, and its extra fields', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='oplogentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='oplog_entry_search'),
+        ),
+        migrations.AddIndex(
+            model_name='oplogentry',
+            index=models.Index(condition=models.Q(('search_vector__isnull', True)), fields=['oplog_id'], name='oplog_entry_unsearchable'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oplog', '0020_oplogentry_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='oplogentry',
+            index=models.Index(fields=['oplog_id', 'start_date', 'id'], name='oplog_entry_position'),
+        ),
+    ]
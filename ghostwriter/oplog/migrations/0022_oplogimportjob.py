@@ -0,0 +1,39 @@
+# Generated by Django 4.2.16 on 2026-10-18 05:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('oplog', '0021_oplogentry_position_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OplogImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed')], default='queued', help_text='Current state of the import job', max_length=8, verbose_name='Status')),
+                ('task_id', models.CharField(blank=True, default='', help_text='ID of the Django Q task running this job', max_length=255, verbose_name='Task ID')),
+                ('csv_file', models.FileField(blank=True, help_text='The uploaded CSV file, deleted once the import finishes', upload_to='oplog_imports')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Number of entries in the CSV file, counted once the file is validated', verbose_name='Total Rows')),
+                ('processed', models.PositiveIntegerField(default=0, help_text='Number of entries imported so far', verbose_name='Processed Rows')),
+                ('created', models.PositiveIntegerField(default=0, help_text='Number of new entries added to the log', verbose_name='Created Entries')),
+                ('updated', models.PositiveIntegerField(default=0, help_text='Number of existing entries updated because their identifiers matched', verbose_name='Updated Entries')),
+                ('error', models.TextField(blank=True, default='', help_text='Error message for a failed job', verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time the job was queued', verbose_name='Created')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Date and time the job succeeded or failed', null=True, verbose_name='Finished')),
+                ('oplog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='oplog.oplog')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Activity log import job',
+                'verbose_name_plural': 'Activity log import jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.16 on 2026-10-18 05:48
+
+from datetime import timezone
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Lower, TruncHour
+import django.db.models.deletion
+
+
+def count_existing_logs(apps, schema_editor):
+    # Count the entries of every existing log, as ``OplogStats.rebuild()`` does
+    Oplog = apps.get_model("oplog", "Oplog")
+    OplogEntry = apps.get_model("oplog", "OplogEntry")
+    OplogStats = apps.get_model("oplog", "OplogStats")
+
+    for oplog_id in Oplog.objects.values_list("id", flat=True):
+        entries = OplogEntry.objects.filter(oplog_id=oplog_id).order_by()
+
+        def counter(expression, exclude):
+            return dict(
+                entries.exclude(exclude)
+                .annotate(key=expression)
+                .values("key")
+                .annotate(total=Count("id"))
+                .values_list("key", "total")
+            )
+
+        hours = counter(TruncHour("start_date", tzinfo=timezone.utc), Q(start_date__isnull=True))
+        OplogStats.objects.create(
+            oplog_id=oplog_id,
+            operators=counter(models.F("operator_name"), Q(operator_name__isnull=True) | Q(operator_name="")),
+            tools=counter(Lower("tool"), Q(tool__isnull=True) | Q(tool="")),
+            hourly_activity={hour.strftime("%Y-%m-%dT%H:00Z"): total for hour, total in hours.items()},
+            **entries.aggregate(entry_count=Count("id"), last_activity=Max("start_date")),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oplog', '0022_oplogimportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OplogStats',
+            fields=[
+                ('oplog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='oplog.oplog')),
+                ('entry_count', models.PositiveIntegerField(default=0, help_text='Number of entries in the log', verbose_name='Entries')),
+                ('last_activity', models.DateTimeField(blank=True, help_text="Latest start date of the log's entries", null=True, verbose_name='Last Activity')),
+                ('operators', models.JSONField(default=dict, help_text='Number of entries logged by each operator')),
+                ('tools', models.JSONField(default=dict, help_text='Number of entries logged for each tool, by lowercase name')),
+                ('hourly_activity', models.JSONField(default=dict, help_text='Number of entries started in each hour, keyed by the hour in UTC')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time the statistics last changed', verbose_name='Updated')),
+            ],
+            options={
+                'verbose_name': 'Activity log statistics',
+                'verbose_name_plural': 'Activity log statistics',
+            },
+        ),
+        migrations.RunPython(count_existing_logs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:11
+
+from django.db import migrations, models
+import ghostwriter.oplog.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oplog', '0023_oplogstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='oplogentry',
+            index=models.Index(models.F('oplog_id'), ghostwriter.oplog.models.FilterKey('operator_name'), name='oplog_entry_operator'),
+        ),
+        migrations.AddIndex(
+            model_name='oplogentry',
+            index=models.Index(models.F('oplog_id'), ghostwriter.oplog.models.FilterKey('tool'), name='oplog_entry_tool'),
+        ),
+        migrations.AddIndex(
+            model_name='oplogentry',
+            index=models.Index(models.F('oplog_id'), ghostwriter.oplog.models.FilterKey('source_ip'), name='oplog_entry_source_ip'),
+        ),
+        migrations.AddIndex(
+            model_name='oplogentry',
+            index=models.Index(models.F('oplog_id'), ghostwriter.oplog.models.FilterKey('dest_ip'), name='oplog_entry_dest_ip'),
+        ),
+    ]
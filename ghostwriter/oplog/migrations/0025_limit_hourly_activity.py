@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oplog', '0024_oplogentry_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='oplogstats',
+            name='hourly_activity',
+            field=models.JSONField(default=dict, help_text='Number of entries started in each of the latest hours with activity, keyed by the hour in UTC'),
+        ),
+    ]
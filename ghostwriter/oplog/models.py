@@ -2,16 +2,25 @@
 
 # Standard Libraries
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import reduce
 
 # Django Imports
 from django import forms
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Func, Max, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.expressions import CombinedExpression
+from django.db.models.functions import Cast, Left, Lower, TruncHour
 from django.urls import reverse
+from django.utils.dateparse import parse_datetime
 
 # 3rd Party Libraries
 from taggit.managers import TaggableManager
+from taggit.models import TaggedItem
 
 from ghostwriter.rolodex.models import Project
 
@@ -25,6 +34,45 @@ class NoLengthLimitCharField(models.TextField):
         return super().formfield(**kwargs)
 
 
+class TsVectorConcat(Func):
+    """
+    Raw concat operator.
+
+    Unlike Django's built in Concat function, this does not convert each argument to text first, so
+    it can be used with tsvectors.
+    """
+
+    template = "(%(expressions)s)"
+    arg_joiner = " || "
+    output_field = SearchVectorField()
+
+
+class RowValue(Func):
+    """
+    Row constructor, for comparing several columns at once (e.g., ``ROW(start_date, id) < ROW(%s, %s)``).
+
+    PostgreSQL can evaluate a row comparison with a multicolumn index, unlike the equivalent combination of
+    ``OR`` and ``AND`` conditions.
+    """
+
+    function = "ROW"
+    output_field = models.Field()
+
+
+class FilterKey(Left):
+    """
+    Lowercase prefix of a text column, for the indexes behind the structured log filters.
+
+    B-tree indexes reject values over about 2,700 bytes and these columns have no length limit, so only a prefix
+    is indexed. Filters compare the key to find candidates through the index, then check the full value.
+    """
+
+    length = 255
+
+    def __init__(self, expression, **extra):
+        super().__init__(Lower(expression), self.length, **extra)
+
+
 class Oplog(models.Model):
     """Stores an individual operation log."""
 
@@ -154,6 +202,11 @@ class OplogEntry(models.Model):
     )
     tags = TaggableManager(blank=True)
     extra_fields = models.JSONField(default=dict)
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text search vector of the entry, its tags, and its extra fields",
+    )
 
     # Foreign Keys
     oplog_id = models.ForeignKey(
@@ -166,9 +219,13 @@ class OplogEntry(models.Model):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Stash the initial date values for future operations
-        self.initial_start_date = self.start_date
-        self.initial_end_date = self.end_date
+        # Stash the initial date values for future operations; fields that weren't loaded are read from
+        # ``__dict__``, as loading them here would create another instance and recurse
+        self.initial_start_date = self.__dict__.get("start_date")
+        self.initial_end_date = self.__dict__.get("end_date")
+        # Stash the values counted by the log's statistics, to adjust them when the entry changes
+        self.initial_oplog_id = self.__dict__.get("oplog_id_id")
+        self.initial_stats_values = self.get_stats_values()
 
     class Meta:
         ordering = ["-start_date", "-end_date", "oplog_id"]
@@ -176,8 +233,149 @@ class OplogEntry(models.Model):
         verbose_name_plural = "Activity log entries"
         indexes = [
             models.Index(fields=["oplog_id", "entry_identifier"]),
+            GinIndex(fields=["search_vector"], name="oplog_entry_search"),
+            # Finds the entries of a log that still need a search vector without scanning the whole log
+            models.Index(
+                fields=["oplog_id"], condition=Q(search_vector__isnull=True), name="oplog_entry_unsearchable"
+            ),
+            # Serves each page of ``get_page`` with a single index range scan
+            models.Index(fields=["oplog_id", "start_date", "id"], name="oplog_entry_position"),
+            # Serve the structured filters of ``ghostwriter.oplog.filters``
+            models.Index(F("oplog_id"), FilterKey("operator_name"), name="oplog_entry_operator"),
+            models.Index(F("oplog_id"), FilterKey("tool"), name="oplog_entry_tool"),
+            models.Index(F("oplog_id"), FilterKey("source_ip"), name="oplog_entry_source_ip"),
+            models.Index(F("oplog_id"), FilterKey("dest_ip"), name="oplog_entry_dest_ip"),
         ]
 
+    @classmethod
+    def build_search_vector(cls):
+        """
+        Build the expression computing ``search_vector`` for an entry from its fields, tags, and extra fields.
+
+        Fields containing mostly English text are stemmed. Every field is also added without stemming, so
+        identifiers, hostnames, and partial words still match.
+        """
+        # Avoid a circular import, as the extra field specs import the report writer
+        from ghostwriter.commandcenter.models import ExtraFieldSpec
+
+        english_vector_args = [
+            "description",
+            "output",
+            "comments",
+        ]
+
+        simple_vector_args = english_vector_args + [
+            "entry_identifier",
+            "source_ip",
+            "dest_ip",
+            "tool",
+            "user_context",
+            "command",
+            "operator_name",
+            "start_date",
+            "end_date",
+        ]
+
+        # Subquery to fetch tags
+        simple_vector_args.append(
+            Subquery(
+                TaggedItem.objects.filter(
+                    content_type__app_label=cls._meta.app_label,
+                    content_type__model=cls._meta.model_name,
+                    object_id=OuterRef("pk"),
+                )
+                .annotate(all_tags=Func(F("tag__name"), Value(" "), function="STRING_AGG"))
+                .values("all_tags")
+            )
+        )
+
+        # JSON operations to fetch extra fields
+        for spec in ExtraFieldSpec.objects.filter(target_model=cls._meta.label):
+            if spec.type == "json":
+                continue
+
+            field = CombinedExpression(
+                F("extra_fields"),
+                "->>",
+                Value(spec.internal_name),
+            )
+            simple_vector_args.append(field)
+            if spec.type == "rich_text":
+                english_vector_args.append(field)
+
+        # Limit inputs since PostgreSQL will abort the query if attempting to make a tsvector out of a huge string
+        vectors = [
+            SearchVector(Left(Cast(arg, TextField()), 100000), config="english") for arg in english_vector_args
+        ] + [SearchVector(Left(Cast(arg, TextField()), 100000), config="simple") for arg in simple_vector_args]
+        return TsVectorConcat(*vectors)
+
+    @classmethod
+    def update_search_vectors(cls, queryset) -> int:
+        """
+        Recompute ``search_vector`` for the entries in ``queryset`` in the database and return the number
+        of entries updated.
+        """
+        return queryset.update(search_vector=cls.build_search_vector())
+
+    @classmethod
+    def search_query(cls, text: str) -> SearchQuery:
+        """
+        Build the query matching ``search_vector`` against every word in ``text``.
+
+        Words are searched using both English and simple configs, to help match both types of vectors, and as
+        prefixes, to help match partial words.
+        """
+
+        def q_term(term):
+            term = "'" + term.replace("'", "''").replace("\\", "\\\\") + "':*"
+            return SearchQuery(term, config="english", search_type="raw") | SearchQuery(
+                term, config="simple", search_type="raw"
+            )
+
+        return reduce(lambda a, b: a & b, (q_term(term) for term in text.split()))
+
+    @staticmethod
+    def make_cursor(entry) -> str:
+        """Build the cursor pointing after ``entry`` for ``get_page``."""
+        start_date = entry.start_date.isoformat() if entry.start_date else ""
+        return f"{start_date}|{entry.id}"
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> tuple[datetime | None, int]:
+        """
+        Get the ``start_date`` and ``id`` from a cursor built by ``make_cursor``. Raises ``ValueError`` if the
+        cursor is malformed.
+        """
+        start_date, entry_id = cursor.rsplit("|", 1)
+        return (datetime.fromisoformat(start_date) if start_date else None), int(entry_id)
+
+    @classmethod
+    def get_page(cls, queryset, cursor: str | None = None, limit: int = 100) -> tuple[list, str | None]:
+        """
+        Get up to ``limit`` entries of ``queryset``, newest first, starting after ``cursor``. Returns the entries
+        and the cursor for the next page, which is ``None`` after the last page.
+
+        Pages are selected by their position in the (``start_date``, ``id``) order rather than an offset, so
+        fetching a page costs the same at any depth and entries created while scrolling don't shift the pages
+        that follow. Raises ``ValueError`` if the cursor is malformed.
+        """
+        # PostgreSQL sorts null dates first in descending order, matching a backwards scan of the index
+        queryset = queryset.order_by("-start_date", "-id")
+        if cursor:
+            start_date, entry_id = cls.parse_cursor(cursor)
+            if start_date is None:
+                queryset = queryset.filter(Q(start_date__isnull=True, id__lt=entry_id) | Q(start_date__isnull=False))
+            else:
+                queryset = queryset.alias(position=RowValue("start_date", "id")).filter(
+                    position__lt=RowValue(Value(start_date), Value(entry_id))
+                )
+
+        # Fetch one extra entry to find out if there's another page
+        entries = list(queryset[: limit + 1])
+        if len(entries) > limit:
+            return entries[:limit], cls.make_cursor(entries[limit - 1])
+        return entries, None
+
     @classmethod
     def user_can_create(cls, user, log: Oplog) -> bool:
         return log.user_can_edit(user)
@@ -197,6 +395,15 @@ class OplogEntry(models.Model):
     def user_can_delete(self, user) -> bool:
         return self.oplog_id.user_can_edit(user)
 
+    def get_stats_values(self) -> tuple | None:
+        """
+        Get the values of the entry counted by :model:`oplog.OplogStats`, or ``None`` if some of them weren't
+        loaded from the database.
+        """
+        if {"oplog_id_id", "operator_name", "tool", "start_date"} & self.get_deferred_fields():
+            return None
+        return OplogStats.normalize_values(self.operator_name, self.tool, self.start_date)
+
     def clean(self, *args, **kwargs):
         if isinstance(self.start_date, str):
             try:
@@ -218,3 +425,277 @@ class OplogEntry(models.Model):
                 logger.exception("Received an incomplete time value: %s", self.end_date)
                 self.end_date = self.initial_end_date
         super().clean(*args, **kwargs)
+
+
+class OplogStats(models.Model):
+    """
+    Stores running totals of the entries of an individual :model:`oplog.Oplog`.
+
+    The totals are adjusted as entries are created, changed, and deleted, so reading them costs the same for
+    any size of log. Operators, tools, and hourly buckets are stored with the number of entries counted in each,
+    so a value disappears once its last entry is gone. Only the latest ``HOURLY_ACTIVITY_LIMIT`` hourly buckets
+    are kept, so the row stays small however long an engagement runs.
+    """
+
+    # Number of hours with activity kept in ``hourly_activity`` (about a month of around-the-clock work)
+    HOURLY_ACTIVITY_LIMIT = 24 * 30
+
+    oplog = models.OneToOneField("Oplog", on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    entry_count = models.PositiveIntegerField(
+        "Entries",
+        default=0,
+        help_text="Number of entries in the log",
+    )
+    last_activity = models.DateTimeField(
+        "Last Activity",
+        null=True,
+        blank=True,
+        help_text="Latest start date of the log's entries",
+    )
+    operators = models.JSONField(
+        default=dict,
+        help_text="Number of entries logged by each operator",
+    )
+    tools = models.JSONField(
+        default=dict,
+        help_text="Number of entries logged for each tool, by lowercase name",
+    )
+    hourly_activity = models.JSONField(
+        default=dict,
+        help_text="Number of entries started in each of the latest hours with activity, keyed by the hour in UTC",
+    )
+    updated_at = models.DateTimeField(
+        "Updated",
+        auto_now=True,
+        help_text="Date and time the statistics last changed",
+    )
+
+    class Meta:
+        verbose_name = "Activity log statistics"
+        verbose_name_plural = "Activity log statistics"
+
+    def __str__(self):
+        return f"Statistics for {self.oplog}"
+
+    @property
+    def operator_names(self) -> list[str]:
+        return sorted(self.operators)
+
+    @property
+    def tool_names(self) -> list[str]:
+        return sorted(self.tools)
+
+    @staticmethod
+    def hour_key(value: datetime) -> str:
+        """Get the key of the ``hourly_activity`` bucket holding ``value``."""
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:00Z")
+
+    @staticmethod
+    def normalize_values(operator_name, tool, start_date) -> tuple:
+        """Get the values counted for an entry, with blank names left out and tools in lowercase."""
+        operator_name = operator_name or None
+        tool = tool.lower() if tool else None
+        if isinstance(start_date, str):
+            start_date = parse_datetime(start_date)
+        return operator_name, tool, start_date
+
+    @classmethod
+    def values_from_data(cls, data: dict) -> tuple:
+        """Get the values counted for an entry from a row of a Hasura event payload."""
+        return cls.normalize_values(data.get("operator_name"), data.get("tool"), data.get("start_date"))
+
+    @classmethod
+    def trim_hourly_activity(cls, hourly_activity: dict) -> dict:
+        """Keep the latest ``HOURLY_ACTIVITY_LIMIT`` buckets of ``hourly_activity``."""
+        if len(hourly_activity) <= cls.HOURLY_ACTIVITY_LIMIT:
+            return hourly_activity
+        # The keys are ISO 8601 timestamps, so they sort by time
+        latest = sorted(hourly_activity, reverse=True)[: cls.HOURLY_ACTIVITY_LIMIT]
+        return {key: hourly_activity[key] for key in sorted(latest)}
+
+    @staticmethod
+    def _count(counter: dict, key, delta: int):
+        if key is None:
+            return
+        total = counter.get(key, 0) + delta
+        if total > 0:
+            counter[key] = total
+        else:
+            counter.pop(key, None)
+
+    @classmethod
+    def apply_changes(cls, oplog_id: int | None, added=(), removed=()):
+        """
+        Adjust the statistics of a log for entries ``added`` to it and ``removed`` from it, where each item is the
+        result of an entry's ``get_stats_values``. An update is the entry's old values removed and its new values
+        added. Call this after saving the changes, in the same transaction.
+
+        The log's row is locked until the transaction ends, so concurrent changes are applied one after the other.
+        Nothing happens to a log without statistics when entries are removed, as the log itself may be being
+        deleted.
+        """
+        if oplog_id is None or not (added or removed):
+            return
+        with transaction.atomic():
+            stats = cls.objects.select_for_update().filter(oplog_id=oplog_id).first()
+            if stats is None or None in added or None in removed:
+                # Logs created through the GraphQL API have no statistics until their first entry, and values that
+                # weren't loaded can't be counted, so count the log from scratch instead
+                if stats is not None or added:
+                    cls.rebuild(oplog_id)
+                return
+
+            stats.entry_count = max(stats.entry_count + len(added) - len(removed), 0)
+            recount_last_activity = False
+            for operator_name, tool, start_date in removed:
+                cls._count(stats.operators, operator_name, -1)
+                cls._count(stats.tools, tool, -1)
+                if start_date is not None:
+                    cls._count(stats.hourly_activity, cls.hour_key(start_date), -1)
+                    if stats.last_activity is not None and start_date >= stats.last_activity:
+                        recount_last_activity = True
+            for operator_name, tool, start_date in added:
+                cls._count(stats.operators, operator_name, 1)
+                cls._count(stats.tools, tool, 1)
+                if start_date is not None:
+                    cls._count(stats.hourly_activity, cls.hour_key(start_date), 1)
+                    if stats.last_activity is None or start_date > stats.last_activity:
+                        stats.last_activity = start_date
+
+            if recount_last_activity:
+                # The latest entry changed or is gone; the next one is found with the entry position index
+                stats.last_activity = OplogEntry.objects.filter(oplog_id=oplog_id).aggregate(
+                    latest=Max("start_date")
+                )["latest"]
+            stats.hourly_activity = cls.trim_hourly_activity(stats.hourly_activity)
+            stats.save()
+
+    @classmethod
+    def apply_update(cls, old_oplog_id: int | None, old_values: tuple | None, oplog_id: int | None, values):
+        """Adjust the statistics for a changed entry, which may have moved from the log ``old_oplog_id``."""
+        if old_oplog_id is not None and old_oplog_id != oplog_id:
+            cls.apply_changes(old_oplog_id, removed=[old_values])
+            cls.apply_changes(oplog_id, added=[values])
+        elif old_values != values or old_values is None:
+            cls.apply_changes(oplog_id, added=[values], removed=[old_values])
+
+    @classmethod
+    def rebuild(cls, oplog_id: int) -> "OplogStats":
+        """Count the statistics of a log from all of its entries, replacing the stored ones."""
+        entries = OplogEntry.objects.filter(oplog_id=oplog_id).order_by()
+        totals = entries.aggregate(entry_count=Count("id"), last_activity=Max("start_date"))
+
+        def counter(expression, exclude, limit=None):
+            rows = (
+                entries.exclude(exclude)
+                .annotate(key=expression)
+                .values("key")
+                .annotate(total=Count("id"))
+                .values_list("key", "total")
+            )
+            if limit is not None:
+                rows = rows.order_by("-key")[:limit]
+            return dict(rows)
+
+        operators = counter(F("operator_name"), Q(operator_name__isnull=True) | Q(operator_name=""))
+        tools = counter(Lower("tool"), Q(tool__isnull=True) | Q(tool=""))
+        hours = counter(
+            TruncHour("start_date", tzinfo=timezone.utc), Q(start_date__isnull=True), limit=cls.HOURLY_ACTIVITY_LIMIT
+        )
+        hourly_activity = {cls.hour_key(hour): total for hour, total in sorted(hours.items())}
+        stats, _ = cls.objects.update_or_create(
+            oplog_id=oplog_id,
+            defaults={
+                "operators": operators,
+                "tools": tools,
+                "hourly_activity": hourly_activity,
+                **totals,
+            },
+        )
+        return stats
+
+
+class OplogImportJob(models.Model):
+    """
+    Stores an individual CSV import of entries queued for the Django Q cluster, related to
+    :model:`oplog.Oplog` and :model:`users.User`.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("success", "Success"),
+        ("failed", "Failed"),
+    ]
+
+    status = models.CharField(
+        "Status",
+        max_length=8,
+        choices=STATUS_CHOICES,
+        default="queued",
+        help_text="Current state of the import job",
+    )
+    task_id = models.CharField(
+        "Task ID",
+        max_length=255,
+        default="",
+        blank=True,
+        help_text="ID of the Django Q task running this job",
+    )
+    csv_file = models.FileField(
+        upload_to="oplog_imports",
+        blank=True,
+        help_text="The uploaded CSV file, deleted once the import finishes",
+    )
+    total = models.PositiveIntegerField(
+        "Total Rows",
+        default=0,
+        help_text="Number of entries in the CSV file, counted once the file is validated",
+    )
+    processed = models.PositiveIntegerField(
+        "Processed Rows",
+        default=0,
+        help_text="Number of entries imported so far",
+    )
+    created = models.PositiveIntegerField(
+        "Created Entries",
+        default=0,
+        help_text="Number of new entries added to the log",
+    )
+    updated = models.PositiveIntegerField(
+        "Updated Entries",
+        default=0,
+        help_text="Number of existing entries updated because their identifiers matched",
+    )
+    error = models.TextField(
+        "Error",
+        default="",
+        blank=True,
+        help_text="Error message for a failed job",
+    )
+    created_at = models.DateTimeField(
+        "Created",
+        auto_now_add=True,
+        help_text="Date and time the job was queued",
+    )
+    finished_at = models.DateTimeField(
+        "Finished",
+        null=True,
+        blank=True,
+        help_text="Date and time the job succeeded or failed",
+    )
+    # Foreign Keys
+    oplog = models.ForeignKey("Oplog", on_delete=models.CASCADE, related_name="import_jobs")
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Activity log import job"
+        verbose_name_plural = "Activity log import jobs"
+
+    def __str__(self):
+        return f"Import into {self.oplog} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ("success", "failed")
@@ -0,0 +1,383 @@
+"""
+Opt-in PostgreSQL partitioning of the activity log entries table.
+
+``OplogEntry`` is the largest table in most installations, and nearly every query filters it by log and orders it by
+``start_date``. Partitioning the table by log (one partition per :model:`oplog.Oplog`) or by month (of ``start_date``)
+keeps each partition and its indexes small, lets PostgreSQL skip partitions that can't match a query, and lets old
+engagements be detached and archived without a long ``DELETE`` or ``VACUUM``.
+
+The table keeps its name and columns, so the ORM and Hasura keep working, but PostgreSQL requires the partition key
+in the primary key. Once partitioned, the primary key is ``(id, oplog_id_id)`` or ``(id, start_date)``, so GraphQL
+``oplogEntry_by_pk`` queries and mutations also need the entry's log or start date, and that column can't be null.
+
+Rows that don't match any partition go to a default partition, so inserts never fail; creating a partition later
+moves its rows out of the default partition.
+"""
+
+# Standard Libraries
+import logging
+import re
+from datetime import date
+
+# Django Imports
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Ghostwriter Libraries
+from ghostwriter.oplog.models import Oplog, OplogEntry, OplogStats
+
+# Using __name__ resolves to ghostwriter.oplog.partitions
+logger = logging.getLogger(__name__)
+
+TABLE = OplogEntry._meta.db_table
+
+# Partition key column for each strategy
+STRATEGIES = {
+    "log": "oplog_id_id",
+    "month": "start_date",
+}
+
+# Catches the rows that don't belong to any other partition
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+# Schema holding archived partitions, which are detached from the table
+ARCHIVE_SCHEMA = "oplog_archive"
+
+LOG_PARTITION_PATTERN = re.compile(rf"^{TABLE}_log_(\d+)$")
+MONTH_PARTITION_PATTERN = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+class OplogPartitionError(Exception):
+    """Raised when the entries table can't be partitioned or a partition can't be changed."""
+
+
+def _quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _fetch(sql: str, params=None) -> list[tuple]:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _execute(*statements: str):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def get_strategy() -> str | None:
+    """Get how the entries table is partitioned (a key of ``STRATEGIES``), or ``None`` if it isn't."""
+    rows = _fetch(
+        """
+        SELECT a.attname FROM pg_partitioned_table pt
+        JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+        WHERE pt.partrelid = to_regclass(%s)
+        """,
+        [TABLE],
+    )
+    if not rows:
+        return None
+    return {column: strategy for strategy, column in STRATEGIES.items()}[rows[0][0]]
+
+
+def partition_name(strategy: str, value) -> str:
+    """Get the name of the partition holding the entries of a log ID or a month (``date``)."""
+    if strategy == "log":
+        return f"{TABLE}_log_{value}"
+    return f"{TABLE}_p{value:%Y_%m}"
+
+
+def partition_bounds(name: str) -> tuple[str, str]:
+    """
+    Get the strategy and the ``FOR VALUES`` clause of a partition from its name. Raises ``OplogPartitionError``
+    for names this module doesn't create.
+    """
+    match = LOG_PARTITION_PATTERN.match(name)
+    if match:
+        return "log", f"IN ({int(match.group(1))})"
+    match = MONTH_PARTITION_PATTERN.match(name)
+    if match:
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        return "month", f"FROM ('{month} 00:00:00+00') TO ('{_next_month(month)} 00:00:00+00')"
+    raise OplogPartitionError(f"{name} isn't the name of an activity log entry partition")
+
+
+def _partition_filter(strategy: str, name: str) -> str:
+    """Get the ``WHERE`` condition matching the rows that belong in a partition."""
+    _, bounds = partition_bounds(name)
+    column = _quote(STRATEGIES[strategy])
+    if strategy == "log":
+        return f"{column} {bounds}"
+    lower, upper = re.findall(r"\('([^']+)'\)", bounds)
+    return f"{column} >= '{lower}' AND {column} < '{upper}'"
+
+
+def list_partitions(schema: str = "public") -> list[dict]:
+    """
+    List the partitions attached to the entries table, or the tables in ``schema`` named like partitions (e.g.,
+    archived ones), with their estimated number of rows.
+    """
+    if schema == "public":
+        rows = _fetch(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+            """,
+            [TABLE],
+        )
+    else:
+        rows = _fetch(
+            """
+            SELECT c.relname, NULL, c.reltuples FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind = 'r' AND c.relname LIKE %s
+            ORDER BY c.relname
+            """,
+            [schema, f"{TABLE}\\_%"],
+        )
+    return [{"name": name, "bounds": bounds, "rows": max(int(rows), 0)} for name, bounds, rows in rows]
+
+
+def create_partition(name: str) -> bool:
+    """
+    Create the partition ``name`` if it doesn't exist, moving its rows out of the default partition, and return
+    whether it was created.
+    """
+    strategy, bounds = partition_bounds(name)
+    if strategy != get_strategy():
+        raise OplogPartitionError(f"The entries table isn't partitioned by {strategy}")
+    if _fetch("SELECT to_regclass(%s)", [name])[0][0] is not None:
+        return False
+
+    # PostgreSQL refuses to create a partition for rows already in the default partition, so the partition is
+    # filled first and then attached
+    with transaction.atomic():
+        _execute(
+            f"CREATE TABLE {_quote(name)} (LIKE {_quote(TABLE)} INCLUDING DEFAULTS INCLUDING STORAGE)",
+            f"INSERT INTO {_quote(name)} SELECT * FROM {_quote(DEFAULT_PARTITION)} "
+            f"WHERE {_partition_filter(strategy, name)}",
+            f"DELETE FROM {_quote(DEFAULT_PARTITION)} WHERE {_partition_filter(strategy, name)}",
+            f"ALTER TABLE {_quote(TABLE)} ATTACH PARTITION {_quote(name)} FOR VALUES {bounds}",
+        )
+    logger.info("Created activity log entry partition %s", name)
+    return True
+
+
+def create_month_partitions(first: date, last: date) -> list[str]:
+    """Create the missing monthly partitions from the month of ``first`` to the month of ``last``."""
+    created = []
+    month = first.replace(day=1)
+    while month <= last:
+        name = partition_name("month", month)
+        if create_partition(name):
+            created.append(name)
+        month = _next_month(month)
+    return created
+
+
+def create_upcoming_partitions(months_ahead: int = 3) -> list[str]:
+    """
+    Create the partitions new entries will need: the partitions of the current and next ``months_ahead`` months when
+    partitioning by month, or the partitions of logs without one when partitioning by log.
+    """
+    strategy = get_strategy()
+    if strategy == "month":
+        today = timezone.now().date()
+        last = today
+        for _ in range(months_ahead):
+            last = _next_month(last.replace(day=1))
+        return create_month_partitions(today, last)
+    if strategy == "log":
+        created = []
+        for oplog_id in Oplog.objects.order_by("id").values_list("id", flat=True):
+            name = partition_name("log", oplog_id)
+            if create_partition(name):
+                created.append(name)
+        return created
+    return []
+
+
+def _capture_definitions() -> dict:
+    """Get the SQL recreating the table's indexes, foreign keys, and triggers, and how its IDs are generated."""
+    return {
+        "indexes": [
+            row[0]
+            for row in _fetch(
+                """
+                SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i
+                WHERE i.indrelid = to_regclass(%s) AND NOT i.indisprimary
+                """,
+                [TABLE],
+            )
+        ],
+        "foreign_keys": _fetch(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(%s) "
+            "AND contype = 'f'",
+            [TABLE],
+        ),
+        # Hasura's event triggers
+        "triggers": [
+            row[0]
+            for row in _fetch(
+                "SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = to_regclass(%s) AND NOT tgisinternal",
+                [TABLE],
+            )
+        ],
+        "identity": _fetch(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'id'", [TABLE]
+        )[0][0]
+        != "",
+    }
+
+
+def enable_partitioning(strategy: str, months_ahead: int = 3) -> list[str]:
+    """
+    Convert the entries table into a table partitioned by ``strategy``, copying every entry, and return the names of
+    the partitions created.
+
+    The conversion runs in one transaction holding an exclusive lock on the table, so the logs are unavailable while
+    the entries are copied; run it during a maintenance window.
+    """
+    if strategy not in STRATEGIES:
+        raise OplogPartitionError(f"Unknown partitioning strategy: {strategy}")
+    if get_strategy() is not None:
+        raise OplogPartitionError("The entries table is already partitioned")
+    column = STRATEGIES[strategy]
+    old_table = f"{TABLE}_unpartitioned"
+
+    with transaction.atomic():
+        # Deferred foreign key checks pending on the old table would keep it from being dropped
+        _execute("SET CONSTRAINTS ALL IMMEDIATE", f"LOCK TABLE {_quote(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        if _fetch("SELECT 1 FROM pg_constraint WHERE confrelid = to_regclass(%s)", [TABLE]):
+            raise OplogPartitionError("Other tables have foreign keys to the entries table")
+        nulls = _fetch(f"SELECT count(*) FROM {_quote(TABLE)} WHERE {_quote(column)} IS NULL")[0][0]
+        if nulls:
+            raise OplogPartitionError(
+                f"{nulls} entries have no {column}, which is required to partition by {strategy}"
+            )
+        definitions = _capture_definitions()
+
+        _execute(
+            f"ALTER TABLE {_quote(TABLE)} RENAME TO {_quote(old_table)}",
+            f"CREATE TABLE {_quote(TABLE)} (LIKE {_quote(old_table)} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING STORAGE) PARTITION BY {'LIST' if strategy == 'log' else 'RANGE'} ({_quote(column)})",
+            f"ALTER TABLE {_quote(TABLE)} ALTER COLUMN {_quote(column)} SET NOT NULL",
+            f"CREATE TABLE {_quote(DEFAULT_PARTITION)} PARTITION OF {_quote(TABLE)} DEFAULT",
+        )
+        created = [DEFAULT_PARTITION]
+        if strategy == "month":
+            first = _fetch(f"SELECT min({_quote(column)}) FROM {_quote(old_table)}")[0][0]
+            created += create_month_partitions((first or timezone.now()).date(), timezone.now().date())
+        created += create_upcoming_partitions(months_ahead)
+
+        _execute(f"INSERT INTO {_quote(TABLE)} SELECT * FROM {_quote(old_table)}")
+        if definitions["identity"]:
+            # The new identity column has its own sequence, which must continue after the copied IDs
+            _execute(
+                f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+                f"coalesce((SELECT max(id) FROM {_quote(TABLE)}), 1), "
+                f"(SELECT max(id) FROM {_quote(TABLE)}) IS NOT NULL)"
+            )
+        else:
+            # Keep the serial sequence from being dropped with the old table
+            sequence = _fetch("SELECT pg_get_serial_sequence(%s, 'id')", [old_table])[0][0]
+            _execute(f"ALTER SEQUENCE {sequence} OWNED BY {_quote(TABLE)}.id")
+        _execute(f"DROP TABLE {_quote(old_table)}")
+
+        # Indexes and constraints are recreated once the old table, which owned their names, is gone
+        _execute(f"ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(TABLE + '_pkey')} PRIMARY KEY (id, {column})")
+        _execute(*definitions["indexes"])
+        _execute(
+            *(
+                f"ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(name)} {definition}"
+                for name, definition in definitions["foreign_keys"]
+            )
+        )
+        _execute(*definitions["triggers"])
+
+    logger.info("Partitioned the activity log entries table by %s into %s partitions", strategy, len(created))
+    return created
+
+
+def _find_schema(name: str) -> str | None:
+    rows = _fetch(
+        "SELECT n.nspname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = %s AND c.relkind = 'r' AND n.nspname IN ('public', %s)",
+        [name, ARCHIVE_SCHEMA],
+    )
+    return rows[0][0] if rows else None
+
+
+def _partition_log_ids(qualified_name: str) -> list[int]:
+    return [row[0] for row in _fetch(f"SELECT DISTINCT oplog_id_id FROM {qualified_name}")]
+
+
+def _recount_logs(oplog_ids: list[int]):
+    # Detached and attached entries skip the model signals, so count their logs again
+    existing = set(Oplog.objects.filter(id__in=oplog_ids).values_list("id", flat=True))
+    for oplog_id in sorted(existing):
+        OplogStats.rebuild(oplog_id)
+
+
+def detach_partition(name: str, archive: bool = False):
+    """
+    Detach the partition ``name`` from the entries table, removing its entries from their logs without deleting
+    them. If ``archive`` is set, the partition is also moved to the ``ARCHIVE_SCHEMA`` schema.
+    """
+    partition_bounds(name)
+    if name not in {partition["name"] for partition in list_partitions()}:
+        raise OplogPartitionError(f"{name} isn't attached to the entries table")
+    with transaction.atomic():
+        oplog_ids = _partition_log_ids(_quote(name))
+        _execute(f"ALTER TABLE {_quote(TABLE)} DETACH PARTITION {_quote(name)}")
+        if archive:
+            _execute(
+                f"CREATE SCHEMA IF NOT EXISTS {_quote(ARCHIVE_SCHEMA)}",
+                f"ALTER TABLE {_quote(name)} SET SCHEMA {_quote(ARCHIVE_SCHEMA)}",
+            )
+        _recount_logs(oplog_ids)
+    logger.info("Detached activity log entry partition %s%s", name, " into the archive" if archive else "")
+
+
+def attach_partition(name: str):
+    """Attach a detached or archived partition ``name`` to the entries table again, restoring its entries."""
+    strategy, bounds = partition_bounds(name)
+    if strategy != get_strategy():
+        raise OplogPartitionError(f"The entries table isn't partitioned by {strategy}")
+    schema = _find_schema(name)
+    if schema is None:
+        raise OplogPartitionError(f"There's no table named {name}")
+    if name in {partition["name"] for partition in list_partitions()}:
+        raise OplogPartitionError(f"{name} is already attached to the entries table")
+    with transaction.atomic():
+        if schema != "public":
+            _execute(f"ALTER TABLE {_quote(schema)}.{_quote(name)} SET SCHEMA public")
+        _execute(f"ALTER TABLE {_quote(TABLE)} ATTACH PARTITION {_quote(name)} FOR VALUES {bounds}")
+        _recount_logs(_partition_log_ids(_quote(name)))
+    logger.info("Attached activity log entry partition %s", name)
+
+
+def get_archivable_partitions(before: date | None = None) -> list[str]:
+    """
+    Get the partitions that can be archived: when partitioning by month, those of months before ``before``, and when
+    partitioning by log, those of logs that are gone or whose projects are complete.
+    """
+    strategy = get_strategy()
+    names = [partition["name"] for partition in list_partitions() if partition["name"] != DEFAULT_PARTITION]
+    if strategy == "month":
+        if before is None:
+            raise OplogPartitionError("Choose the month before which partitions are archived")
+        return [name for name in names if name < partition_name("month", before.replace(day=1))]
+    if strategy == "log":
+        active = Oplog.objects.filter(project__complete=False).values_list("id", flat=True)
+        active_names = {partition_name("log", oplog_id) for oplog_id in active}
+        return [name for name in names if name not in active_names]
+    return []
@@ -74,6 +74,7 @@ class OplogEntryResource(resources.ModelResource):
     class Meta:
         model = OplogEntry
         skip_unchanged = False
+        exclude = ("search_vector",)
         export_order = (
             "entry_identifier",
             "start_date",
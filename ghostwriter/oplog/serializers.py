@@ -16,4 +16,4 @@ class OplogSerializer(serializers.ModelSerializer):
 class OplogEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = OplogEntry
-        fields = "__all__"
+        exclude = ["search_vector"]
@@ -1,23 +1,19 @@
 """This contains all of the model Signals used by the oplog application."""
 
 # Standard Libraries
-import json
 import logging
-from asgiref.sync import async_to_sync
 from datetime import datetime
-from socket import gaierror
 
 # Django Imports
+from django.db.models import QuerySet
 from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils.timezone import make_aware
 
-# 3rd Party Libraries
-from channels.layers import get_channel_layer
-
 # Ghostwriter Libraries
-from ghostwriter.modules.custom_serializers import OplogEntrySerializer
-from ghostwriter.oplog.models import Oplog, OplogEntry
+from ghostwriter.oplog.broadcasts import broadcast_buffer
+from ghostwriter.oplog.models import Oplog, OplogEntry, OplogImportJob, OplogStats
+from ghostwriter.oplog.partitions import create_partition, get_strategy, partition_name
 
 # Using __name__ resolves to ghostwriter.rolodex.signals
 logger = logging.getLogger(__name__)
@@ -37,58 +33,97 @@ def oplog_pre_save(sender, instance, **kwargs):
     instance.clean()
 
 
+@receiver(post_save, sender=OplogEntry)
+def update_oplog_entry_search_vector(sender, instance, **kwargs):
+    """Update the ``search_vector`` of a new or updated instance of :model:`oplog.OplogEntry`."""
+    OplogEntry.update_search_vectors(OplogEntry.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=OplogEntry.tags.through)
+def update_oplog_entry_tags_search_vector(sender, instance, action, **kwargs):
+    """Update the ``search_vector`` of an instance of :model:`oplog.OplogEntry` after its tags change."""
+    if isinstance(instance, OplogEntry) and action in ("post_add", "post_remove", "post_clear"):
+        OplogEntry.update_search_vectors(OplogEntry.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Oplog)
+def create_oplog_stats(sender, instance, created, **kwargs):
+    """Create the empty :model:`oplog.OplogStats` of a new :model:`oplog.Oplog`."""
+    if created:
+        OplogStats.objects.get_or_create(oplog=instance)
+
+
+@receiver(post_save, sender=Oplog)
+def create_oplog_partition(sender, instance, created, **kwargs):
+    """Create the entries partition of a new :model:`oplog.Oplog` when the entries are partitioned by log."""
+    if created and get_strategy() == "log":
+        create_partition(partition_name("log", instance.id))
+
+
+@receiver(post_save, sender=OplogEntry)
+def update_oplog_stats(sender, instance, created, **kwargs):
+    """Count a new or changed instance of :model:`oplog.OplogEntry` in its log's :model:`oplog.OplogStats`."""
+    values = instance.get_stats_values()
+    if created:
+        OplogStats.apply_changes(instance.oplog_id_id, added=[values])
+    else:
+        OplogStats.apply_update(instance.initial_oplog_id, instance.initial_stats_values, instance.oplog_id_id, values)
+    instance.initial_oplog_id = instance.oplog_id_id
+    instance.initial_stats_values = values
+
+
+@receiver(post_delete, sender=OplogEntry)
+def remove_oplog_entry_stats(sender, instance, origin=None, **kwargs):
+    """
+    Remove a deleted instance of :model:`oplog.OplogEntry` from its log's :model:`oplog.OplogStats`.
+
+    Entries are only deleted along with something else when their log is deleted (the log is their only foreign
+    key), and then the statistics go with it, so they're left alone instead of being locked and adjusted per entry.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is not None and origin_model is not OplogEntry:
+        return
+    OplogStats.apply_changes(instance.initial_oplog_id, removed=[instance.initial_stats_values])
+
+
 @receiver(post_save, sender=OplogEntry)
 def signal_oplog_entry(sender, instance, **kwargs):
     """
-    Send a WebSockets message to update a user's log entry list with the
+    Queue a WebSockets message to update a user's log entry list with the
     new or updated instance of :model:`oplog.OplogEntry`.
     """
-    try:
-        channel_layer = get_channel_layer()
-        oplog_id = instance.oplog_id.id
-        serialized_entry = OplogEntrySerializer(instance).data
-        json_message = json.dumps({"action": "create", "data": serialized_entry})
-
-        async_to_sync(channel_layer.group_send)(str(oplog_id), {"type": "send_oplog_entry", "text": json_message})
-    except gaierror:  # pragma: no cover
-        # WebSocket are unavailable (unit testing)
-        pass
+    broadcast_buffer.upsert(instance.oplog_id_id, instance.id)
 
 
 @receiver(m2m_changed, sender=OplogEntry.tags.through)
-def signal_oplog_entry_tags(sender, instance, **kwargs):
+def signal_oplog_entry_tags(sender, instance, action, **kwargs):
     """
-    Send a WebSockets message to update a user's log entry list with the
+    Queue a WebSockets message to update a user's log entry list with the
     new or updated tags applied to an instance of :model:`oplog.OplogEntry`.
     """
-    if isinstance(instance, OplogEntry):
-        try:
-            channel_layer = get_channel_layer()
-            oplog_id = instance.oplog_id.id
-            serialized_entry = OplogEntrySerializer(instance).data
-            json_message = json.dumps({"action": "create", "data": serialized_entry})
-
-            async_to_sync(channel_layer.group_send)(str(oplog_id), {"type": "send_oplog_entry", "text": json_message})
-        except gaierror:  # pragma: no cover
-            # WebSocket are unavailable (unit testing)
-            pass
+    if isinstance(instance, OplogEntry) and action in ("post_add", "post_remove", "post_clear"):
+        broadcast_buffer.upsert(instance.oplog_id_id, instance.id)
 
 
 @receiver(post_delete, sender=OplogEntry)
 def delete_oplog_entry(sender, instance, **kwargs):
     """
-    Send a WebSockets message to update a user's log entry list and remove
+    Queue a WebSockets message to update a user's log entry list and remove
     the deleted instance of :model:`oplog.OplogEntry`.
     """
-    channel_layer = get_channel_layer()
-    try:
-        oplog_id = instance.oplog_id.id
-        entry_id = instance.id
-        json_message = json.dumps({"action": "delete", "data": entry_id})
-        async_to_sync(channel_layer.group_send)(str(oplog_id), {"type": "send_oplog_entry", "text": json_message})
-    except Oplog.DoesNotExist:  # pragma: no cover
-        # Oplog has been deleted and this is a cascading delete
-        pass
-    except gaierror:  # pragma: no cover
-        # WebSocket are unavailable (unit testing)
-        pass
+    broadcast_buffer.delete(instance.oplog_id_id, instance.id)
+
+
+@receiver(post_delete, sender=OplogImportJob)
+def remove_import_job_file_on_delete(sender, instance, **kwargs):
+    """Deletes the uploaded CSV file when related :model:`oplog.OplogImportJob` entry is deleted."""
+    if instance.csv_file:
+        try:
+            instance.csv_file.delete(save=False)
+        except Exception:  # pragma: no cover
+            logger.warning(
+                "Failed to delete file associated with %s %s: %s",
+                instance.__class__.__name__,
+                instance.id,
+                instance.csv_file.name,
+            )
@@ -0,0 +1,75 @@
+"""This contains tasks to be run using Django Q and Redis."""
+
+# Standard Libraries
+import csv
+import logging
+
+# Django Imports
+from django.utils import timezone
+
+# Ghostwriter Libraries
+from ghostwriter.oplog.broadcasts import send_refresh
+from ghostwriter.oplog.ingest import OplogIngestError, import_csv, validate_csv
+from ghostwriter.oplog.jobs import send_import_update
+from ghostwriter.oplog.models import OplogImportJob
+from ghostwriter.oplog.partitions import create_upcoming_partitions
+
+# Using __name__ resolves to ghostwriter.oplog.tasks
+logger = logging.getLogger(__name__)
+
+
+def import_oplog_entries_job(job_id):
+    """
+    Run a queued :model:`oplog.OplogImportJob`, validating the whole CSV file before importing it in
+    chunks and sending progress updates to the log's WebSocket group.
+    """
+    job = OplogImportJob.objects.select_related("oplog").get(id=job_id)
+    job.status = "running"
+    job.save(update_fields=["status"])
+    send_import_update(job)
+
+    def progress(processed, created, updated):
+        job.processed = processed
+        job.created = created
+        job.updated = updated
+        job.save(update_fields=["processed", "created", "updated"])
+        send_import_update(job)
+
+    try:
+        job.total = validate_csv(job.oplog, job.csv_file.path)
+        job.save(update_fields=["total"])
+        import_csv(job.oplog, job.csv_file.path, progress_callback=progress)
+        job.status = "success"
+    except OplogIngestError as error:
+        job.status = "failed"
+        job.error = "\n".join(error.errors)
+    except csv.Error as error:
+        logger.exception("Could not read the CSV file for activity log import job %s", job_id)
+        job.status = "failed"
+        job.error = (
+            f"Your log file could not be loaded ({error}). There may be cells that exceed the 128KB text size limit "
+            "for CSVs."
+        )
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logger.exception("Activity log import job %s failed unexpectedly", job_id)
+        job.status = "failed"
+        job.error = f"Encountered an error importing the log: {error}"
+
+    # The file is only needed for the import
+    job.csv_file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save()
+    send_import_update(job)
+    if job.processed:
+        send_refresh(job.oplog_id)
+    return job.status
+
+
+def create_oplog_partitions(months_ahead=3):
+    """
+    Create the activity log entry partitions needed for the next ``months_ahead`` months, when the entries are
+    partitioned by month. Schedule this task monthly so new entries never land in the default partition.
+    """
+    created = create_upcoming_partitions(months_ahead)
+    logger.info("Created %s activity log entry partitions", len(created))
+    return created
@@ -1,12 +1,26 @@
 # Standard Libraries
+import io
+import json
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
 # Django Imports
+from django.contrib.postgres.search import SearchQuery
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 # Ghostwriter Libraries
-from ghostwriter.factories import OplogEntryFactory, OplogFactory
+from ghostwriter.commandcenter.models import ExtraFieldModel
+from ghostwriter.factories import ExtraFieldSpecFactory, OplogEntryFactory, OplogFactory, UserFactory
+from ghostwriter.oplog import partitions
+from ghostwriter.oplog.broadcasts import OplogBroadcastBuffer
+from ghostwriter.oplog.consumers import OplogEntryConsumer
+from ghostwriter.oplog.filters import OplogFilterError, filter_entries, get_facets
+from ghostwriter.oplog.ingest import OplogIngestError, ingest_entries, parse_ndjson
+from ghostwriter.oplog.models import Oplog, OplogEntry, OplogStats
 
 logging.disable(logging.CRITICAL)
 
@@ -99,3 +113,600 @@ class OplogEntryModelTests(TestCase):
         entry.refresh_from_db()
 
         self.assertEqual(list(entry.tags.names()), tags)
+
+
+class OplogEntrySearchTests(TestCase):
+    """Collection of tests for the full-text search vector of :model:`oplog.OplogEntry`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.OplogEntry = OplogEntryFactory._meta.model
+        cls.log = OplogFactory()
+        cls.user = UserFactory(password="SuperNaturalReporting!", role="manager")
+        extra_field_model, _ = ExtraFieldModel.objects.get_or_create(
+            model_internal_name="oplog.OplogEntry", defaults={"model_display_name": "Log Entries"}
+        )
+        ExtraFieldSpecFactory(target_model=extra_field_model, internal_name="implant", type="single_line_text")
+
+    def search(self, text):
+        return self.OplogEntry.objects.filter(search_vector=SearchQuery(text, config="simple"))
+
+    def test_vector_follows_fields_tags_and_extra_fields(self):
+        entry = OplogEntryFactory(oplog_id=self.log, tool="Rubeus.exe", extra_fields={"implant": "beacon42"})
+        self.assertQuerysetEqual(self.search("beacon42"), [entry])
+
+        entry.tags.add("kerberoast")
+        self.assertQuerysetEqual(self.search("kerberoast"), [entry])
+        entry.tags.clear()
+        self.assertFalse(self.search("kerberoast").exists())
+
+        entry.tool = "Seatbelt.exe"
+        entry.save()
+        self.assertQuerysetEqual(self.search("seatbelt.exe"), [entry])
+        self.assertFalse(self.search("rubeus.exe").exists())
+
+    def test_consumer_search_does_not_write(self):
+        entry = OplogEntryFactory(oplog_id=self.log, comments="Dumped the SAM hive")
+        OplogEntryFactory(oplog_id=self.log, comments="Listed the domain admins")
+
+        # The consumer method is wrapped for async use; call the synchronous function directly
+        get_log_entries = OplogEntryConsumer.__dict__["get_log_entries"].func
+        with CaptureQueriesContext(connection) as queries:
+            results, _ = get_log_entries(OplogEntryConsumer(), self.log.id, 0, self.user, "dump sam")
+        self.assertEqual([result["id"] for result in results], [entry.id])
+        self.assertNotIn("search_vector", results[0])
+        self.assertFalse([query for query in queries if query["sql"].startswith("UPDATE")])
+
+        # Entries without a search vector are left for the backfill command
+        self.OplogEntry.objects.update(search_vector=None)
+        results, _ = get_log_entries(OplogEntryConsumer(), self.log.id, 0, self.user, "dump sam")
+        self.assertEqual(results, [])
+        self.assertEqual(self.OplogEntry.objects.filter(search_vector__isnull=True).count(), 2)
+
+    def test_backfill_command(self):
+        entries = OplogEntryFactory.create_batch(5, oplog_id=self.log)
+        other = OplogEntryFactory()
+        self.OplogEntry.objects.update(search_vector=None)
+
+        call_command("backfill_oplog_search", log=[self.log.id], batch_size=2, stdout=io.StringIO())
+        self.assertEqual(self.OplogEntry.objects.filter(search_vector__isnull=False).count(), len(entries))
+        other.refresh_from_db()
+        self.assertIsNone(other.search_vector)
+
+        call_command("backfill_oplog_search", stdout=io.StringIO())
+        self.assertFalse(self.OplogEntry.objects.filter(search_vector__isnull=True).exists())
+
+
+class OplogEntryPaginationTests(TestCase):
+    """Collection of tests for the cursor pagination of :model:`oplog.OplogEntry`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.OplogEntry = OplogEntryFactory._meta.model
+        cls.log = OplogFactory()
+        cls.user = UserFactory(password="SuperNaturalReporting!", role="manager")
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        # Pairs of entries share a start date, so pages must break ties by ID
+        cls.entries = [
+            OplogEntryFactory(oplog_id=cls.log, start_date=start + timedelta(minutes=i // 2)) for i in range(7)
+        ]
+        OplogEntryFactory()
+
+    def walk(self, limit):
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = self.OplogEntry.get_page(self.OplogEntry.objects.filter(oplog_id=self.log), cursor, limit)
+            seen.extend(page)
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_every_entry_once(self):
+        expected = sorted(self.entries, key=lambda entry: (entry.start_date, entry.id), reverse=True)
+        for limit in (1, 2, 3, 7, 100):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.walk(limit), expected)
+
+    def test_new_entries_do_not_shift_pages(self):
+        entries = self.OplogEntry.objects.filter(oplog_id=self.log)
+        first, cursor = self.OplogEntry.get_page(entries, None, 3)
+        OplogEntryFactory(oplog_id=self.log, start_date=datetime(2025, 1, 1, tzinfo=timezone.utc))
+        second, _ = self.OplogEntry.get_page(entries, cursor, 3)
+        self.assertEqual(second[0], self.walk(100)[4])
+        self.assertNotIn(second[0], first)
+
+    def test_entries_without_start_date(self):
+        self.OplogEntry.objects.filter(pk__in=[self.entries[0].pk, self.entries[1].pk]).update(start_date=None)
+        seen = self.walk(1)
+        self.assertEqual(len(seen), len(self.entries))
+        # PostgreSQL sorts null dates first in descending order
+        self.assertEqual(seen[:2], [self.entries[1], self.entries[0]])
+
+    def test_cursor_round_trip(self):
+        entry = self.entries[3]
+        self.assertEqual(
+            self.OplogEntry.parse_cursor(self.OplogEntry.make_cursor(entry)), (entry.start_date, entry.id)
+        )
+        for cursor in ("", "garbage", "2024-01-01|abc", "yesterday|1"):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                self.OplogEntry.parse_cursor(cursor)
+
+    def test_consumer_returns_next_cursor(self):
+        get_log_entries = OplogEntryConsumer.__dict__["get_log_entries"].func
+        consumer = OplogEntryConsumer()
+        results, cursor = get_log_entries(consumer, self.log.id, 0, self.user, "", None)
+        self.assertEqual(len(results), len(self.entries))
+        self.assertIsNone(cursor)
+
+        results, cursor = get_log_entries(consumer, self.log.id, 0, self.user, "", "not a cursor")
+        self.assertEqual(len(results), 0)
+
+        # Clients paging by offset still work
+        results, cursor = get_log_entries(consumer, self.log.id, 5, self.user, "", None)
+        self.assertEqual(len(results), 2)
+
+
+class OplogEntryFilterTests(TestCase):
+    """Collection of tests for the structured filters and facet counts of :model:`oplog.OplogEntry`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.log = OplogFactory()
+        cls.user = UserFactory(password="SuperNaturalReporting!", role="manager")
+        cls.start = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc)
+        cls.roast = OplogEntryFactory(
+            oplog_id=cls.log,
+            operator_name="alice",
+            tool="Rubeus",
+            dest_ip="10.0.0.5",
+            start_date=cls.start,
+            comments="Kerberoasted the service accounts",
+            tags=["kerberoast", "creds"],
+        )
+        cls.dump = OplogEntryFactory(
+            oplog_id=cls.log,
+            operator_name="bob",
+            tool="rubeus",
+            dest_ip="10.0.0.6",
+            start_date=cls.start + timedelta(days=1),
+            tags=["creds"],
+        )
+        cls.recon = OplogEntryFactory(
+            oplog_id=cls.log,
+            operator_name="alice",
+            tool="nmap",
+            dest_ip="10.0.0.7",
+            start_date=cls.start + timedelta(days=2),
+        )
+        # Entries of other logs are never counted
+        OplogEntryFactory(operator_name="alice", tool="Rubeus", tags=["creds"])
+
+    def filter(self, filters=None, search=None):
+        return sorted(
+            entry.id
+            for entry in filter_entries(OplogEntry.objects.filter(oplog_id=self.log), filters, search)
+        )
+
+    def test_filters(self):
+        self.assertEqual(self.filter({"operator": ["ALICE"]}), sorted([self.roast.id, self.recon.id]))
+        self.assertEqual(self.filter({"tool": ["rubeus"]}), sorted([self.roast.id, self.dump.id]))
+        self.assertEqual(self.filter({"tool": "rubeus", "operator": ["bob"]}), [self.dump.id])
+        self.assertEqual(self.filter({"dest_ip": ["10.0.0.5", "10.0.0.7"]}), sorted([self.roast.id, self.recon.id]))
+        self.assertEqual(self.filter({"tag": ["creds"]}), sorted([self.roast.id, self.dump.id]))
+        self.assertEqual(
+            self.filter({"start_date_after": (self.start + timedelta(hours=12)).isoformat()}),
+            sorted([self.dump.id, self.recon.id]),
+        )
+        self.assertEqual(
+            self.filter({"start_date_before": (self.start + timedelta(days=1)).isoformat(), "tag": ["creds"]}),
+            sorted([self.roast.id, self.dump.id]),
+        )
+        self.assertEqual(self.filter({"tool": ["rubeus"]}, search="kerberoasted"), [self.roast.id])
+        self.assertEqual(self.filter({"operator": []}), sorted([self.roast.id, self.dump.id, self.recon.id]))
+
+    def test_invalid_filters(self):
+        for filters in ({"operator": 5}, {"start_date_after": "yesterday"}, {"color": ["red"]}, ["alice"]):
+            with self.assertRaises(OplogFilterError):
+                self.filter(filters)
+
+    def test_facets(self):
+        facets = get_facets(OplogEntry.objects.filter(oplog_id=self.log))
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(facets["operator"], [{"value": "alice", "count": 2}, {"value": "bob", "count": 1}])
+        self.assertEqual(facets["tool"], [{"value": "rubeus", "count": 2}, {"value": "nmap", "count": 1}])
+        self.assertEqual(facets["tag"], [{"value": "creds", "count": 2}, {"value": "kerberoast", "count": 1}])
+
+        # Counts follow the filters, and each facet is limited to its most common values
+        facets = get_facets(filter_entries(OplogEntry.objects.filter(oplog_id=self.log), {"tag": ["creds"]}), 1)
+        self.assertEqual(facets["total"], 2)
+        self.assertEqual(facets["operator"], [{"value": "alice", "count": 1}])
+        self.assertEqual(facets["tool"], [{"value": "rubeus", "count": 2}])
+
+    def test_consumer_filters(self):
+        consumer = OplogEntryConsumer()
+        get_log_entries = OplogEntryConsumer.__dict__["get_log_entries"].func
+        get_log_facets = OplogEntryConsumer.__dict__["get_log_facets"].func
+
+        results, _ = get_log_entries(consumer, self.log.id, 0, self.user, "", None, {"operator": ["alice"]})
+        self.assertEqual([result["id"] for result in results], [self.recon.id, self.roast.id])
+        facets = get_log_facets(consumer, self.log.id, self.user, "", {"operator": ["alice"]})
+        self.assertEqual(facets["total"], 2)
+
+        results, _ = get_log_entries(consumer, self.log.id, 0, self.user, "", None, {"operator": 5})
+        self.assertEqual(results, [])
+        self.assertIsNone(get_log_facets(consumer, self.log.id, UserFactory(), "", {}))
+
+
+class OplogBroadcastTests(TestCase):
+    """Collection of tests for the batched WebSocket broadcasts of :model:`oplog.OplogEntry` changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.log = OplogFactory()
+        cls.other_log = OplogFactory()
+
+    def setUp(self):
+        self.channel_layer = mock.Mock(group_send=mock.AsyncMock())
+        patcher = mock.patch("ghostwriter.oplog.broadcasts.get_channel_layer", return_value=self.channel_layer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def messages(self):
+        return [
+            (call.args[0], json.loads(call.args[1]["text"])) for call in self.channel_layer.group_send.call_args_list
+        ]
+
+    def test_changes_are_batched_per_window(self):
+        buffer = OplogBroadcastBuffer(window=60)
+        with mock.patch("ghostwriter.oplog.signals.broadcast_buffer", buffer), mock.patch("threading.Timer") as timer:
+            with self.captureOnCommitCallbacks(execute=True):
+                entry = OplogEntryFactory(oplog_id=self.log, tool="Rubeus.exe")
+                entry.tags.add("kerberoast")
+            with self.captureOnCommitCallbacks(execute=True):
+                entry.tool = "Seatbelt.exe"
+                entry.save()
+                deleted = OplogEntryFactory(oplog_id=self.log)
+                deleted_id = deleted.id
+                deleted.delete()
+                other = OplogEntryFactory(oplog_id=self.other_log)
+        # One timer per window, however many transactions commit changes
+        timer.assert_called_once()
+        timer.return_value.start.assert_called_once()
+        self.assertFalse(self.channel_layer.group_send.called)
+
+        buffer.flush()
+        messages = dict(self.messages())
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[str(self.log.id)]["action"], "batch")
+        # The entry is sent once, in its final state
+        self.assertEqual(len(messages[str(self.log.id)]["upsert"]), 1)
+        self.assertEqual(messages[str(self.log.id)]["upsert"][0]["tool"], "Seatbelt.exe")
+        self.assertEqual(messages[str(self.log.id)]["upsert"][0]["tags"], ["kerberoast"])
+        self.assertEqual(messages[str(self.log.id)]["delete"], [deleted_id])
+        self.assertEqual([e["id"] for e in messages[str(self.other_log.id)]["upsert"]], [other.id])
+
+    def test_nothing_is_sent_before_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            OplogEntryFactory(oplog_id=self.log)
+        self.assertFalse(self.channel_layer.group_send.called)
+        for callback in callbacks:
+            callback()
+        # Without a window, each change is sent as soon as it's committed
+        self.assertTrue(self.messages())
+        self.assertEqual({group for group, _ in self.messages()}, {str(self.log.id)})
+
+    def test_missing_entries_are_sent_as_deletions(self):
+        buffer = OplogBroadcastBuffer(window=60)
+        with mock.patch("threading.Timer"), self.captureOnCommitCallbacks(execute=True):
+            buffer.upsert(self.log.id, 999999)
+        buffer.flush()
+        (group, message), = self.messages()
+        self.assertEqual(group, str(self.log.id))
+        self.assertEqual(message["upsert"], [])
+        self.assertEqual(message["delete"], [999999])
+
+
+class OplogIngestTests(TestCase):
+    """Collection of tests for the bulk ingestion of :model:`oplog.OplogEntry` entries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.log = OplogFactory()
+        cls.other_log = OplogFactory()
+
+    def test_entries_are_created_with_tags_and_search_vectors(self):
+        rows = [
+            {
+                "entry_identifier": "beacon-1",
+                "start_date": "2024-01-31 13:45:00",
+                "end_date": "2024-01-31T13:46:00Z",
+                "tool": "Rubeus.exe",
+                "command": "kerberoast /nowrap",
+                "tags": ["Kerberoast", "att&ck:T1558"],
+                "extra_fields": {"ticket": "krbtgt"},
+            },
+            {"tool": "Seatbelt.exe", "tags": "kerberoast, recon"},
+        ]
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            results = ingest_entries(self.log, rows, chunk_size=1)
+
+        self.assertEqual([result["created"] for result in results], [True, True])
+        first, second = (OplogEntry.objects.get(id=result["id"]) for result in results)
+        self.assertEqual(first.oplog_id, self.log)
+        self.assertEqual(first.start_date, datetime(2024, 1, 31, 13, 45, tzinfo=timezone.utc))
+        self.assertEqual(first.extra_fields, {"ticket": "krbtgt"})
+        self.assertEqual(sorted(first.tags.names()), ["Kerberoast", "att&ck:T1558"])
+        # Tags match existing ones regardless of case
+        self.assertEqual(sorted(second.tags.names()), ["Kerberoast", "recon"])
+        self.assertIsNotNone(second.start_date)
+        self.assertEqual(
+            list(OplogEntry.objects.filter(search_vector=OplogEntry.search_query("kerberoast")).order_by("id")),
+            [first, second],
+        )
+        # One broadcast for the whole batch
+        self.assertEqual(len(callbacks), 1)
+
+    def test_entry_identifiers_are_idempotent(self):
+        existing = OplogEntryFactory(oplog_id=self.log, entry_identifier="beacon-1")
+        OplogEntryFactory(oplog_id=self.other_log, entry_identifier="beacon-2")
+        rows = [
+            {"entry_identifier": "beacon-1"},
+            {"entry_identifier": "beacon-2"},
+            {"entry_identifier": "beacon-2"},
+            {},
+            {"entry_identifier": None},
+        ]
+        results = ingest_entries(self.log, rows)
+
+        self.assertEqual(results[0], {"id": existing.id, "created": False})
+        self.assertTrue(results[1]["created"])
+        # Identifiers are per log, and repeats within the batch map to the first entry
+        self.assertEqual(results[2], {"id": results[1]["id"], "created": False})
+        self.assertTrue(results[3]["created"] and results[4]["created"])
+        self.assertEqual(OplogEntry.objects.filter(oplog_id=self.log).count(), 4)
+
+        # Retrying the batch creates nothing new, except for entries without identifiers
+        retry = ingest_entries(self.log, rows[:3])
+        self.assertEqual(retry, [{"id": result["id"], "created": False} for result in results[:3]])
+
+    def test_invalid_batches_are_rejected(self):
+        rows = [
+            {"tool": "Rubeus.exe"},
+            {"start_date": "yesterday"},
+            {"end_date": 1706708700},
+            {"oplog_id": self.other_log.id},
+            {"tags": [1, 2]},
+            {"extra_fields": []},
+            "not an object",
+        ]
+        with self.assertRaises(OplogIngestError) as context:
+            ingest_entries(self.log, rows)
+        self.assertEqual(
+            [error.split(":")[0] for error in context.exception.errors],
+            [f"Entry {index}" for index in range(1, 7)],
+        )
+        self.assertFalse(OplogEntry.objects.filter(oplog_id=self.log).exists())
+
+    def test_parse_ndjson(self):
+        self.assertEqual(parse_ndjson('{"tool": "a"}\n\n{"tool": "b"}\n'), [{"tool": "a"}, {"tool": "b"}])
+        with self.assertRaises(OplogIngestError) as context:
+            parse_ndjson('{"tool": "a"}\n{"tool":')
+        self.assertEqual(len(context.exception.errors), 1)
+        self.assertTrue(context.exception.errors[0].startswith("Line 2:"))
+
+
+class OplogStatsTests(TestCase):
+    """Collection of tests for :model:`oplog.OplogStats`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.log = OplogFactory()
+        cls.other_log = OplogFactory()
+        cls.start = datetime(2024, 1, 31, 13, 45, tzinfo=timezone.utc)
+
+    def assertStatsMatchEntries(self, log):
+        """Check the incrementally updated statistics of ``log`` match a count from scratch."""
+        stats = OplogStats.objects.get(oplog=log)
+        rebuilt = OplogStats.rebuild(log.id)
+        for field in ("entry_count", "last_activity", "operators", "tools", "hourly_activity"):
+            self.assertEqual(getattr(stats, field), getattr(rebuilt, field), field)
+        return rebuilt
+
+    def test_new_log_has_empty_stats(self):
+        stats = OplogStats.objects.get(oplog=self.log)
+        self.assertEqual(stats.entry_count, 0)
+        self.assertIsNone(stats.last_activity)
+        self.assertEqual(stats.tools, {})
+
+    def test_stats_follow_entry_changes(self):
+        first = OplogEntryFactory(oplog_id=self.log, start_date=self.start, tool="Rubeus", operator_name="alice")
+        second = OplogEntryFactory(
+            oplog_id=self.log, start_date=self.start + timedelta(hours=2), tool="rubeus", operator_name="bob"
+        )
+        OplogEntryFactory(oplog_id=self.log, start_date=self.start + timedelta(minutes=5), tool="", operator_name="")
+
+        stats = self.assertStatsMatchEntries(self.log)
+        self.assertEqual(stats.entry_count, 3)
+        self.assertEqual(stats.last_activity, self.start + timedelta(hours=2))
+        self.assertEqual(stats.operator_names, ["alice", "bob"])
+        self.assertEqual(stats.tools, {"rubeus": 2})
+        self.assertEqual(stats.hourly_activity, {"2024-01-31T13:00Z": 2, "2024-01-31T15:00Z": 1})
+
+        # Changing the latest entry's date moves it to another hour and finds the new latest entry
+        second.start_date = self.start - timedelta(days=1)
+        second.tool = "Seatbelt"
+        second.save()
+        stats = self.assertStatsMatchEntries(self.log)
+        self.assertEqual(stats.last_activity, self.start + timedelta(minutes=5))
+        self.assertEqual(stats.tool_names, ["rubeus", "seatbelt"])
+
+        # Moving an entry to another log counts it there instead
+        first.oplog_id = self.other_log
+        first.save()
+        self.assertStatsMatchEntries(self.other_log)
+        stats = self.assertStatsMatchEntries(self.log)
+        self.assertEqual(stats.entry_count, 2)
+        self.assertEqual(stats.operator_names, ["bob"])
+
+        second.delete()
+        stats = self.assertStatsMatchEntries(self.log)
+        self.assertEqual(stats.entry_count, 1)
+        self.assertEqual(stats.tools, {})
+
+    def test_entries_with_deferred_fields_count_the_log_again(self):
+        entry = OplogEntryFactory(oplog_id=self.log, start_date=self.start)
+        entry = OplogEntry.objects.only("id", "start_date", "end_date").get(id=entry.id)
+        self.assertIsNone(entry.initial_stats_values)
+        entry.start_date = self.start + timedelta(days=1)
+        entry.save()
+        stats = self.assertStatsMatchEntries(self.log)
+        self.assertEqual(stats.last_activity, self.start + timedelta(days=1))
+
+    def test_reads_do_not_scan_entries(self):
+        OplogEntryFactory.create_batch(3, oplog_id=self.log)
+        log = type(self.log).objects.select_related("stats").get(id=self.log.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(log.stats.entry_count, 3)
+
+    def test_bulk_ingestion_is_counted(self):
+        OplogEntryFactory(oplog_id=self.log, entry_identifier="beacon-1", tool="Rubeus")
+        ingest_entries(
+            self.log,
+            [
+                {"entry_identifier": "beacon-1", "tool": "Rubeus"},
+                {"entry_identifier": "beacon-2", "tool": "Seatbelt", "start_date": "2024-01-31T13:45:00Z"},
+            ],
+        )
+        stats = self.assertStatsMatchEntries(self.log)
+        self.assertEqual(stats.entry_count, 2)
+        self.assertEqual(stats.tools, {"rubeus": 1, "seatbelt": 1})
+
+    def test_missing_stats_are_rebuilt(self):
+        OplogEntryFactory(oplog_id=self.log, tool="Rubeus")
+        OplogStats.objects.filter(oplog=self.log).delete()
+        OplogEntryFactory(oplog_id=self.log, tool="Seatbelt")
+        stats = OplogStats.objects.get(oplog=self.log)
+        self.assertEqual(stats.entry_count, 2)
+
+    def test_hourly_activity_keeps_latest_hours(self):
+        with mock.patch.object(OplogStats, "HOURLY_ACTIVITY_LIMIT", 2):
+            for hours in (0, 2, 1, 3):
+                OplogEntryFactory(oplog_id=self.log, start_date=self.start + timedelta(hours=hours))
+            stats = self.assertStatsMatchEntries(self.log)
+        self.assertEqual(stats.hourly_activity, {"2024-01-31T15:00Z": 1, "2024-01-31T16:00Z": 1})
+        self.assertEqual(stats.entry_count, 4)
+
+    def test_deleting_log_skips_entry_adjustments(self):
+        OplogEntryFactory.create_batch(3, oplog_id=self.log)
+        with CaptureQueriesContext(connection) as queries:
+            self.log.delete()
+        self.assertFalse([query for query in queries if "FOR UPDATE" in query["sql"]])
+        self.assertFalse(OplogStats.objects.filter(oplog_id=self.log.id).exists())
+
+        # Entries deleted on their own are still counted
+        entry = OplogEntryFactory(oplog_id=self.other_log)
+        OplogEntryFactory(oplog_id=self.other_log)
+        entry.delete()
+        self.assertEqual(self.assertStatsMatchEntries(self.other_log).entry_count, 1)
+        OplogEntry.objects.filter(oplog_id=self.other_log).delete()
+        self.assertEqual(self.assertStatsMatchEntries(self.other_log).entry_count, 0)
+
+
+class OplogPartitionTests(TestCase):
+    """Collection of tests for the partitioning of :model:`oplog.OplogEntry`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.log = OplogFactory()
+        cls.other_log = OplogFactory()
+        cls.january = datetime(2024, 1, 15, 12, 0, tzinfo=timezone.utc)
+        cls.march = datetime(2024, 3, 2, 8, 30, tzinfo=timezone.utc)
+        cls.entries = [
+            OplogEntryFactory(oplog_id=cls.log, start_date=cls.january, end_date=cls.january),
+            OplogEntryFactory(oplog_id=cls.log, start_date=cls.march, end_date=cls.march),
+            OplogEntryFactory(oplog_id=cls.other_log, start_date=cls.march, end_date=cls.march),
+        ]
+
+    def partition_names(self, schema="public"):
+        return [partition["name"] for partition in partitions.list_partitions(schema)]
+
+    def test_unpartitioned_by_default(self):
+        self.assertIsNone(partitions.get_strategy())
+        output = io.StringIO()
+        call_command("oplog_partitions", "status", stdout=output)
+        self.assertIn("isn't partitioned", output.getvalue())
+
+    def test_partition_by_log(self):
+        partitions.enable_partitioning("log")
+
+        self.assertEqual(partitions.get_strategy(), "log")
+        self.assertEqual(
+            self.partition_names(),
+            sorted(
+                [
+                    partitions.DEFAULT_PARTITION,
+                    partitions.partition_name("log", self.log.id),
+                    partitions.partition_name("log", self.other_log.id),
+                ]
+            ),
+        )
+        self.assertEqual(OplogEntry.objects.filter(oplog_id=self.log).count(), 2)
+
+        # New entries continue the IDs, and new logs get their own partition
+        new_log = OplogFactory()
+        entry = OplogEntryFactory(oplog_id=new_log)
+        self.assertGreater(entry.id, max(existing.id for existing in self.entries))
+        self.assertIn(partitions.partition_name("log", new_log.id), self.partition_names())
+
+        # Detaching a partition hides its entries until it's attached again
+        name = partitions.partition_name("log", self.log.id)
+        partitions.detach_partition(name)
+        self.assertFalse(OplogEntry.objects.filter(oplog_id=self.log).exists())
+        self.assertEqual(OplogStats.objects.get(oplog=self.log).entry_count, 0)
+        self.assertEqual(OplogEntry.objects.filter(oplog_id=self.other_log).count(), 1)
+
+        partitions.attach_partition(name)
+        self.assertEqual(OplogEntry.objects.filter(oplog_id=self.log).count(), 2)
+        self.assertEqual(OplogStats.objects.get(oplog=self.log).entry_count, 2)
+
+    def test_partition_by_month(self):
+        call_command("oplog_partitions", "enable", "--by", "month", "--months-ahead", "1", stdout=io.StringIO())
+
+        self.assertEqual(partitions.get_strategy(), "month")
+        names = self.partition_names()
+        for month in ("2024_01", "2024_02", "2024_03"):
+            self.assertIn(f"{partitions.TABLE}_p{month}", names)
+        self.assertEqual(OplogEntry.objects.count(), 3)
+
+        call_command("oplog_partitions", "archive", "--before", "2024-02", stdout=io.StringIO())
+        self.assertEqual(self.partition_names(partitions.ARCHIVE_SCHEMA), [f"{partitions.TABLE}_p2024_01"])
+        self.assertFalse(OplogEntry.objects.filter(start_date=self.january).exists())
+        self.assertEqual(OplogStats.objects.get(oplog=self.log).entry_count, 1)
+
+        call_command("oplog_partitions", "attach", f"{partitions.TABLE}_p2024_01", stdout=io.StringIO())
+        self.assertEqual(OplogEntry.objects.count(), 3)
+        self.assertEqual(self.partition_names(partitions.ARCHIVE_SCHEMA), [])
+
+    def test_creating_partition_moves_rows_out_of_default(self):
+        partitions.enable_partitioning("log")
+        # Bulk creating skips the signal creating the log's partition, so its entries go to the default partition
+        new_log = Oplog.objects.bulk_create([Oplog(name="Bulk", project=self.log.project)])[0]
+        OplogEntryFactory(oplog_id=new_log)
+        name = partitions.partition_name("log", new_log.id)
+        self.assertNotIn(name, self.partition_names())
+
+        self.assertTrue(partitions.create_partition(name))
+        self.assertFalse(partitions.create_partition(name))
+        self.assertEqual(OplogEntry.objects.filter(oplog_id=new_log).count(), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {partitions.DEFAULT_PARTITION}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+        with self.assertRaises(partitions.OplogPartitionError):
+            partitions.create_partition(partitions.partition_name("month", self.march.date()))
+
+    def test_refuses_entries_without_partition_key(self):
+        OplogEntry.objects.filter(id=self.entries[0].id).update(oplog_id=None)
+        with self.assertRaises(partitions.OplogPartitionError):
+            partitions.enable_partitioning("log")
+        self.assertIsNone(partitions.get_strategy())
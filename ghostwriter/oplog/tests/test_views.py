@@ -1,15 +1,27 @@
 # Standard Libraries
 import csv
+import gzip
+import io
+import json
 import logging
 import os
+import warnings
 from datetime import datetime
+from unittest import mock
 
 # Django Imports
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.messages import get_messages
 from django.urls import reverse
 from django.utils.encoding import force_str
 
+# 3rd Party Libraries
+from asgiref.sync import async_to_sync
+
 # Ghostwriter Libraries
 from ghostwriter.factories import (
     AdminFactory,
@@ -22,11 +34,19 @@ from ghostwriter.factories import (
     ProjectFactory,
     UserFactory,
 )
+from ghostwriter.oplog import exports
+from ghostwriter.oplog.models import OplogImportJob
+from ghostwriter.oplog.tasks import import_oplog_entries_job
 
 logging.disable(logging.CRITICAL)
 
 PASSWORD = "SuperNaturalReporting!"
 
+
+async def _read_streaming_content(response):
+    return b"".join([part async for part in response.streaming_content])
+
+
 def messages_in_response(response):
     messages = get_messages(response.wsgi_request)
     return ", ".join(str(msg) for msg in messages)
@@ -204,6 +224,14 @@ class OplogEntriesImportTests(TestCase):
         if os.path.exists(self.update_filename):
             os.remove(self.update_filename)
 
+    def post_import(self, client, csvfile, oplog_id):
+        """Post a CSV file for import, running the queued import job as soon as the request commits."""
+        with mock.patch(
+            "ghostwriter.oplog.jobs.async_task", side_effect=lambda task, job_id, **kwargs: import_oplog_entries_job(job_id)
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                return client.post(self.uri, {"csv_file": csvfile, "oplog_id": oplog_id})
+
     def test_view_uri_exists_at_desired_location(self):
         response = self.client_auth.get(self.uri)
         self.assertEqual(response.status_code, 200)
@@ -241,20 +269,20 @@ class OplogEntriesImportTests(TestCase):
                 writer.writerow(row)
 
         with open(self.filename, "r") as csvfile:
-            response = self.client_mgr.post(self.uri, {"csv_file": csvfile, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, csvfile, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.redirect_uri)
             self.assertEqual(self.OplogEntry.objects.count(), self.num_of_entries)
 
         with open(self.filename, "r") as csvfile:
-            response = self.client_auth.post(self.uri, {"csv_file": csvfile, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_auth, csvfile, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.failure_redirect_uri)
             self.assertEqual(self.OplogEntry.objects.count(), self.num_of_entries)
 
         ProjectAssignmentFactory(operator=self.user, project=self.oplog.project)
         with open(self.filename, "r") as csvfile:
-            response = self.client_auth.post(self.uri, {"csv_file": csvfile, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_auth, csvfile, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.redirect_uri)
             self.assertEqual(self.OplogEntry.objects.count(), self.num_of_entries)
@@ -275,7 +303,7 @@ class OplogEntriesImportTests(TestCase):
             new_entry.delete()
 
         with open(self.update_filename, "r") as updatecsv:
-            response = self.client_mgr.post(self.uri, {"csv_file": updatecsv, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, updatecsv, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.redirect_uri)
             self.assertEqual(self.OplogEntry.objects.count(), self.num_of_entries + 1)
@@ -292,18 +320,21 @@ class OplogEntriesImportTests(TestCase):
                 writer.writerow(row)
 
         with open(self.filename, "r") as csvfile:
-            response = self.client_mgr.post(self.uri, {"csv_file": csvfile, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, csvfile, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.redirect_uri)
             self.assertEqual(self.OplogEntry.objects.filter(oplog_id=self.oplog).count(), self.num_of_entries)
             self.assertEqual(self.OplogEntry.objects.filter(oplog_id=9000).count(), 0)
             messages = list(get_messages(response.wsgi_request))
-            self.assertEqual(str(messages[0]), "Successfully imported log data.")
+            self.assertEqual(
+                str(messages[0]),
+                "Your log file is being imported. The entries will appear in the log when the import finishes.",
+            )
 
     def test_empty_csv_and_file_with_invalid_dimensions(self):
         """Test an invalid csv file is handled gracefully."""
         with open(self.update_filename, "w+") as updatecsv:
-            response = self.client_mgr.post(self.uri, {"csv_file": updatecsv, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, updatecsv, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.failure_redirect_uri)
             messages = list(get_messages(response.wsgi_request))
@@ -321,7 +352,7 @@ class OplogEntriesImportTests(TestCase):
                 writer.writerow(row)
 
         with open(self.filename, "r") as csvfile:
-            response = self.client_mgr.post(self.uri, {"csv_file": csvfile, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, csvfile, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.failure_redirect_uri)
             messages = list(get_messages(response.wsgi_request))
@@ -341,7 +372,7 @@ class OplogEntriesImportTests(TestCase):
             update_writer.writerow(self.build_row(entry, entry_identifier=another_entry.entry_identifier))
 
         with open(self.update_filename, "r") as updatecsv:
-            response = self.client_mgr.post(self.uri, {"csv_file": updatecsv, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, updatecsv, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.redirect_uri)
             self.assertEqual(self.OplogEntry.objects.filter(oplog_id=self.oplog).count(), starting_entries)
@@ -357,9 +388,14 @@ class OplogEntriesImportTests(TestCase):
             update_writer.writerow(self.build_row(another_entry))
 
         with open(self.update_filename, "r") as updatecsv:
-            response = self.client_mgr.post(self.uri, {"csv_file": updatecsv, "oplog_id": entry.oplog_id})
+            response = self.post_import(self.client_mgr, updatecsv, entry.oplog_id.id)
             self.assertEqual(response.status_code, 302)
-            self.assertRedirects(response, self.failure_redirect_uri)
+            self.assertRedirects(response, self.redirect_uri)
+            # Rows are validated by the job, which rejects the whole file
+            job = OplogImportJob.objects.latest("created_at")
+            self.assertEqual(job.status, "failed")
+            self.assertIn("is used by an earlier row", job.error)
+            self.assertEqual(self.OplogEntry.objects.filter(oplog_id=self.oplog).count(), starting_entries)
 
         with open(self.filename, "w") as csvfile:
             writer = csv.DictWriter(
@@ -369,7 +405,7 @@ class OplogEntriesImportTests(TestCase):
             writer.writerow(self.build_row(entry, use_entry_identifier=False))
 
         with open(self.filename, "r") as csvfile:
-            response = self.client_mgr.post(self.uri, {"csv_file": csvfile, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, csvfile, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.redirect_uri, msg_prefix=messages_in_response(response))
             self.assertEqual(self.OplogEntry.objects.filter(oplog_id=self.oplog).count(), starting_entries + 1)
@@ -388,11 +424,65 @@ class OplogEntriesImportTests(TestCase):
             writer.writerow(self.build_row(entry))
 
         with open(self.filename, "r") as csvfile:
-            response = self.client_mgr.post(self.uri, {"csv_file": csvfile, "oplog_id": self.oplog.id})
+            response = self.post_import(self.client_mgr, csvfile, self.oplog.id)
             self.assertEqual(response.status_code, 302)
             self.assertRedirects(response, self.redirect_uri)
             self.assertEqual(self.OplogEntry.objects.filter(oplog_id=self.oplog).count(), self.num_of_entries)
 
+    def test_import_job_reports_progress(self):
+        with open(self.filename, "w") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames, quoting=csv.QUOTE_MINIMAL, escapechar="\\")
+            writer.writeheader()
+            for entry in self.OplogEntry.objects.all():
+                writer.writerow(self.build_row(entry))
+            for x in range(3):
+                writer.writerow(self.build_row(entry, entry_identifier=f"new-entry-{x}"))
+
+        with self.settings(OPLOG_INGEST_CHUNK_SIZE=2), mock.patch("ghostwriter.oplog.tasks.send_refresh") as send_refresh:
+            with mock.patch("ghostwriter.oplog.tasks.send_import_update") as send_import_update:
+                with open(self.filename, "r") as csvfile:
+                    self.post_import(self.client_mgr, csvfile, self.oplog.id)
+
+        job = OplogImportJob.objects.get(oplog=self.oplog)
+        self.assertEqual(job.status, "success")
+        self.assertEqual((job.total, job.processed, job.created, job.updated), (8, 8, 3, 5))
+        self.assertEqual(job.requested_by, self.mgr_user)
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(job.csv_file)
+        self.assertEqual(self.OplogEntry.objects.filter(oplog_id=self.oplog).count(), self.num_of_entries + 3)
+        # Running, then once per chunk of two rows, then finished
+        self.assertEqual(send_import_update.call_count, 6)
+        send_refresh.assert_called_once_with(self.oplog.id)
+
+        response = self.client_mgr.get(reverse("oplog:oplog_import_status", kwargs={"pk": job.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "success")
+        self.assertEqual(response.json()["created"], 3)
+
+        response = self.client_auth.get(reverse("oplog:oplog_import_status", kwargs={"pk": job.pk}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_import_job_rejects_invalid_rows(self):
+        entry = self.OplogEntry.objects.all().first()
+        with open(self.filename, "w") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames, quoting=csv.QUOTE_MINIMAL, escapechar="\\")
+            writer.writeheader()
+            writer.writerow(self.build_row(entry, entry_identifier="valid-entry"))
+            row = self.build_row(entry, entry_identifier="invalid-entry")
+            row["start_date"] = "not a date"
+            writer.writerow(row)
+
+        with mock.patch("ghostwriter.oplog.tasks.send_refresh") as send_refresh:
+            with open(self.filename, "r") as csvfile:
+                self.post_import(self.client_mgr, csvfile, self.oplog.id)
+
+        job = OplogImportJob.objects.get(oplog=self.oplog)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Line 3", job.error)
+        self.assertEqual(job.processed, 0)
+        self.assertFalse(self.OplogEntry.objects.filter(entry_identifier="valid-entry").exists())
+        send_refresh.assert_not_called()
+
 
 class OplogCreateViewTests(TestCase):
     """Collection of tests for :view:`oplog.OplogCreate`."""
@@ -626,6 +716,107 @@ class OplogExportViewTests(TestCase):
         response = self.client_auth.get(self.uri)
         self.assertEqual(response.status_code, 200)
 
+    def test_csv_export(self):
+        entry = self.oplog.entries.first()
+        entry.tags.add("kerberoast", "att&ck")
+        entry.extra_fields = {"ticket": "krbtgt"}
+        entry.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client_mgr.get(self.uri)
+            content = async_to_sync(_read_streaming_content)(response).decode("utf-8")
+        # Tags are aggregated in the query for the entries instead of fetched per entry
+        self.assertEqual(len([query for query in queries if "taggit" in query["sql"]]), 1)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn(f'filename="{self.oplog.name}.csv"', response["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 5)
+        self.assertNotIn("search_vector", rows[0])
+        self.assertNotIn("id", rows[0])
+        row = next(row for row in rows if row["tags"])
+        self.assertEqual(row["tags"], "att&ck, kerberoast")
+        self.assertEqual(json.loads(row["extra_fields"]), {"ticket": "krbtgt"})
+        self.assertEqual(row["oplog_id"], str(self.oplog.id))
+
+    def test_jsonl_export(self):
+        response = self.client_mgr.get(self.uri, {"format": "jsonl"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = async_to_sync(_read_streaming_content)(response)
+        rows = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["tags"], [])
+        self.assertEqual(rows[0]["oplog_id"], self.oplog.id)
+
+    def test_gzip_export(self):
+        response = self.client_mgr.get(self.uri, {"format": "jsonl", "compress": "gzip"})
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn(f'filename="{self.oplog.name}.jsonl.gz"', response["Content-Disposition"])
+        content = gzip.decompress(async_to_sync(_read_streaming_content)(response)).decode("utf-8")
+        self.assertEqual(len(content.splitlines()), 5)
+
+    def test_invalid_format(self):
+        response = self.client_mgr.get(self.uri, {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_streams_under_asgi(self):
+        produced = []
+        export_rows = exports.export_rows
+
+        def counted_rows(oplog):
+            for row in export_rows(oplog):
+                produced.append(row)
+                yield row
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": self.uri,
+            "query_string": b"format=jsonl",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", f"sessionid={self.client_mgr.cookies['sessionid'].value}".encode()),
+            ],
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        messages = []
+        produced_at_first_chunk = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and not produced_at_first_chunk:
+                produced_at_first_chunk.append(len(produced))
+            messages.append(message)
+
+        # Keep the handler from closing the test's connection, as the test client does
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with (
+                mock.patch.object(exports, "export_rows", counted_rows),
+                mock.patch.object(exports, "EXPORT_BUFFER_SIZE", 1),
+                warnings.catch_warnings(record=True) as caught,
+            ):
+                warnings.simplefilter("always")
+                async_to_sync(ASGIHandler())(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        self.assertEqual(messages[0]["type"], "http.response.start")
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertFalse([warning for warning in caught if "StreamingHttpResponse" in str(warning.message)])
+        # The first line goes out before the rest of the log has been read
+        self.assertLess(produced_at_first_chunk[0], 5)
+        content = b"".join(message.get("body", b"") for message in messages[1:])
+        self.assertEqual(len(content.decode("utf-8").splitlines()), 5)
+
 
 class OplogSanitizeViewTests(TestCase):
     """Collection of tests for :view:`oplog.OplogSanitize`."""
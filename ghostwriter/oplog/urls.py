@@ -30,6 +30,7 @@ urlpatterns = [
     ),
     path("<int:pk>/entries", views.OplogListEntries.as_view(), name="oplog_entries"),
     path("import", views.oplog_entries_import, name="oplog_import"),
+    path("import/status/<int:pk>", views.OplogImportJobStatus.as_view(), name="oplog_import_status"),
     path("export/<int:pk>", views.OplogExport.as_view(), name="oplog_export"),
 ]
 
@@ -1,7 +1,6 @@
 """This contains all the views used by the Oplog application."""
 
 # Standard Libraries
-import collections
 import csv
 import json
 import logging
@@ -9,53 +8,33 @@ import logging
 # Django Imports
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.http import HttpResponseBadRequest, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.generic import ListView
 from django.views.generic.detail import DetailView, SingleObjectMixin
 from django.views.generic.edit import CreateView, DeleteView, UpdateView, View
 
-# 3rd Party Libraries
-from tablib import Dataset
-
 # Ghostwriter Libraries
 from ghostwriter.api.utils import (
+    ForbiddenJsonResponse,
     RoleBasedAccessControlMixin,
     verify_user_is_privileged,
 )
 from ghostwriter.commandcenter.models import ExtraFieldSpec
 from ghostwriter.modules.custom_serializers import ExtraFieldsSpecSerializer
 from ghostwriter.modules.shared import add_content_disposition_header
-from ghostwriter.oplog.admin import OplogEntryResource
+from ghostwriter.modules.zip_stream import iterate_async
+from ghostwriter.oplog.exports import EXPORT_FORMATS, stream_export
 from ghostwriter.oplog.forms import OplogEntryForm, OplogForm
-from ghostwriter.oplog.models import Oplog, OplogEntry
+from ghostwriter.oplog.ingest import CSV_ENCODING, validate_csv_headers
+from ghostwriter.oplog.jobs import queue_import_job
+from ghostwriter.oplog.models import Oplog, OplogEntry, OplogImportJob, OplogStats
 from ghostwriter.rolodex.models import Project
 
 # Using __name__ resolves to ghostwriter.oplog.views
 logger = logging.getLogger(__name__)
 
-def escape_message(message):
-    """
-    Escape single quotes, double quotes, newlines and other characters
-    that may break JavaScript.
-    """
-    # Replace single quotes
-    message = message.replace("'", "")
-    # Replace double quotes
-    message = message.replace('"', "")
-    # Replace newlines
-    message = message.replace("\n", "\\n")
-    # Replace carriage return
-    message = message.replace("\r", "\\r")
-    # Replace horizontal tab
-    message = message.replace("\t", "\\t")
-    # Replace backspace
-    message = message.replace("\b", "\\b")
-    # Replace form feed
-    message = message.replace("\f", "\\f")
-    return message
-
 
 ##################
 #   AJAX Views   #
@@ -191,6 +170,7 @@ class OplogSanitize(RoleBasedAccessControlMixin, SingleObjectMixin, View):
                             extra_fields_data[field] = entry_field_specs[field].empty_value()
                     entry.extra_fields = extra_fields_data
                 OplogEntry.objects.bulk_update(entries, bulk_update_fields, batch_size=100)
+                OplogStats.rebuild(obj.id)
             except Exception as exception:  # pragma: no cover
                 template = "An exception of type {0} occurred. Arguments:\n{1!r}"
                 log_message = template.format(type(exception).__name__, exception.args)
@@ -207,33 +187,37 @@ class OplogSanitize(RoleBasedAccessControlMixin, SingleObjectMixin, View):
         return JsonResponse(data)
 
 
+class OplogImportJobStatus(RoleBasedAccessControlMixin, SingleObjectMixin, View):
+    """Return the status of an individual :model:`oplog.OplogImportJob` as JSON."""
+
+    model = OplogImportJob
+
+    def test_func(self):
+        return self.get_object().oplog.user_can_view(self.request.user)
+
+    def handle_no_permission(self):
+        return ForbiddenJsonResponse()
+
+    def get(self, *args, **kwargs):
+        job = self.get_object()
+        data = {
+            "job": job.id,
+            "oplog": job.oplog_id,
+            "status": job.status,
+            "total": job.total,
+            "processed": job.processed,
+            "created": job.created,
+            "updated": job.updated,
+            "error": job.error,
+        }
+        return JsonResponse(data)
+
+
 ##################
 # View Functions #
 ##################
 
 
-def validate_headers(imported_data):
-    """Validate the headers of the CSV file for an activity log import."""
-    expected_header_count = collections.Counter([
-        "entry_identifier",
-        "start_date",
-        "end_date",
-        "source_ip",
-        "dest_ip",
-        "tool",
-        "user_context",
-        "command",
-        "description",
-        "output",
-        "comments",
-        "operator_name",
-        "tags",
-    ])
-    actual_header_count = collections.Counter(imported_data.headers)
-    num_extra_fields = actual_header_count.pop("extra_fields", 0)
-    return expected_header_count == actual_header_count and num_extra_fields in (0,1)
-
-
 def validate_log_selection(user, oplog_id):
     """Validate the log selection for an activity log import."""
     bad_selection = False
@@ -252,61 +236,18 @@ def validate_log_selection(user, oplog_id):
     return not bad_selection
 
 
-def import_data(request, oplog_id, new_entries, dry_run=False):
-    """Import the data into a dataset for validation and import."""
-    logger.info("Importing log data for log ID %s", oplog_id)
-    dataset = Dataset()
-    oplog_entry_resource = OplogEntryResource()
-    try:
-        imported_data = dataset.load(new_entries, format="csv")
-    except csv.Error:  # pragma: no cover
-        logger.exception("An error occurred while loading the CSV file for log import")
-        messages.error(
-            request,
-            "Your log file could not be loaded. There may be cells that exceed the 128KB text size limit for CSVs.",
-            extra_tags="alert-error",
-        )
+def read_csv_headers(csv_file):
+    """
+    Read the header row of an uploaded CSV file for an activity log import. Returns ``None`` if the
+    file doesn't have a header row followed by at least one entry.
+    """
+    csv_file.seek(0)
+    header_line = csv_file.readline().decode(CSV_ENCODING)
+    first_entry = csv_file.readline().decode(CSV_ENCODING)
+    csv_file.seek(0)
+    if not header_line.strip() or not first_entry.strip():
         return None
-
-    if "oplog_id" in imported_data.headers:
-        del imported_data["oplog_id"]
-
-    if validate_headers(imported_data):
-        imported_data.append_col([oplog_id] * len(imported_data), header="oplog_id")
-        result = oplog_entry_resource.import_data(imported_data, dry_run=dry_run)
-        return result
-
-    messages.error(
-        request,
-        "Your log file needs the required header row and at least one entry.",
-        extra_tags="alert-error",
-    )
-    return None
-
-
-def handle_errors(request, result):
-    """Handle errors from a dry run of an activity log import."""
-    row_errors = result.row_errors()
-    for (row, errors) in row_errors:
-        error_message = escape_message(f"There was an error in row {row}: {errors[0].error}")
-        for err in errors:
-            logger.error("Could not import row %d", row, exc_info=err.error)
-        messages.error(
-            request,
-            error_message,
-            extra_tags="alert-danger",
-        )
-    for invalid_row in result.invalid_rows:
-        error = str(invalid_row.error).replace("'", "")
-        error_message = escape_message(
-            f"There was a validation error in row {invalid_row.number} with these errors: {error}"
-        )
-        logger.error(error_message)
-        messages.error(
-            request,
-            error_message,
-            extra_tags="alert-danger",
-        )
+    return next(csv.reader([header_line]), [])
 
 
 @login_required
@@ -323,25 +264,28 @@ def oplog_entries_import(request):
     logs = Oplog.for_user(request.user)
     if request.method == "POST":
         oplog_id = request.POST.get("oplog_id")
-        new_entries = request.FILES["csv_file"].read().decode("iso-8859-1")
-
-        if not new_entries or not validate_log_selection(request.user, oplog_id):
+        csv_file = request.FILES["csv_file"]
+
+        # Only the header row is checked here; the rows are validated by the background job
+        headers = read_csv_headers(csv_file)
+        if (
+            headers is None
+            or not validate_csv_headers(headers)
+            or not validate_log_selection(request.user, oplog_id)
+        ):
             messages.error(
                 request, "Your log file needs the required header row and at least one entry.", extra_tags="alert-error"
             )
             return HttpResponseRedirect(reverse("oplog:oplog_import"))
 
-        imported_data = import_data(request, oplog_id, new_entries, dry_run=True)
-
-        if imported_data is None:
-            return HttpResponseRedirect(reverse("oplog:oplog_import"))
-
-        if imported_data.has_errors() or imported_data.has_validation_errors():
-            handle_errors(request, imported_data)
-            return HttpResponseRedirect(reverse("oplog:oplog_import"))
-
-        import_data(request, oplog_id, new_entries)
-        messages.success(request, "Successfully imported log data.", extra_tags="alert-success")
+        # The rows are validated and imported by the Django Q cluster, which reports its progress on the log's page
+        logger.info("Queuing an import of log data for log ID %s", oplog_id)
+        queue_import_job(Oplog.objects.get(id=oplog_id), csv_file, request.user)
+        messages.success(
+            request,
+            "Your log file is being imported. The entries will appear in the log when the import finishes.",
+            extra_tags="alert-success",
+        )
         return HttpResponseRedirect(reverse("oplog:oplog_entries", kwargs={"pk": oplog_id}))
 
     log_id = request.GET.get("log", None)
@@ -374,7 +318,7 @@ class OplogListView(RoleBasedAccessControlMixin, ListView):
     def get_queryset(self):
         queryset = (
             Oplog.for_user(self.request.user)
-            .select_related("project", "project__client", "project__project_type")
+            .select_related("project", "project__client", "project__project_type", "stats")
         )
         return queryset
 
@@ -611,7 +555,12 @@ class OplogEntryDelete(RoleBasedAccessControlMixin, DeleteView):
 
 
 class OplogExport(RoleBasedAccessControlMixin, SingleObjectMixin, View):
-    """Export the :oplog:`oplog.Entries` for an individual :model:`oplog.Oplog` in a csv format."""
+    """
+    Export the :oplog:`oplog.Entries` for an individual :model:`oplog.Oplog`.
+
+    The file is streamed as the entries are read from the database. Use the ``format`` query parameter to pick
+    ``csv`` (the default) or ``jsonl`` (JSON Lines), and ``compress=gzip`` to compress it.
+    """
 
     model = Oplog
 
@@ -625,33 +574,19 @@ class OplogExport(RoleBasedAccessControlMixin, SingleObjectMixin, View):
     def get(self, *args, **kwargs):
         obj = self.get_object()
 
-        queryset = obj.entries.all()
-        opts = queryset.model._meta
-
-        response = HttpResponse(content_type="text/csv")
-        add_content_disposition_header(response, f"{obj.name}.csv")
-
-        writer = csv.writer(response)
-        field_names = [field.name for field in opts.fields]
-        field_names.remove("id")
+        export_format = self.request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Unsupported export format")
+        compress = self.request.GET.get("compress") == "gzip"
 
-        # Add the tags field to the list of fields
-        field_names.append("tags")
-
-        # Write the headers to the csv file
-        writer.writerow(field_names)
-
-        for obj in queryset:
-            values = []
-            for field in field_names:
-                # Special case for oplog_id to write the ID of the oplog instead of the object
-                if field == "oplog_id":
-                    values.append(getattr(obj, field).id)
-                # Special case for tags to write a comma-separated list of tag names
-                elif field == "tags":
-                    values.append(", ".join([tag.name for tag in obj.tags.all()]))
-                else:
-                    values.append(getattr(obj, field))
-            writer.writerow(values)
+        content_type, extension = EXPORT_FORMATS[export_format]
+        filename = f"{obj.name}.{extension}"
+        if compress:
+            content_type = "application/gzip"
+            filename += ".gz"
 
+        response = StreamingHttpResponse(
+            iterate_async(stream_export(obj, export_format, compress)), content_type=content_type
+        )
+        add_content_disposition_header(response, filename)
         return response
@@ -20,6 +20,7 @@ from ghostwriter.reporting.models import (
     Observation,
     Report,
     ReportFindingLink,
+    ReportGenerationJob,
     ReportObservationLink,
     ReportTemplate,
     Severity,
@@ -214,6 +215,13 @@ class ReportFindingLinkAdmin(CollabAdminBase):
         return ", ".join(o.name for o in obj.tags.all())
 
 
+@admin.register(ReportGenerationJob)
+class ReportGenerationJobAdmin(admin.ModelAdmin):
+    list_display = ("report", "output_format", "status", "stage", "requested_by", "created_at", "finished_at")
+    list_filter = ("status", "output_format")
+    readonly_fields = ("created_at", "finished_at", "timings")
+
+
 @admin.register(Severity)
 class SeverityAdmin(admin.ModelAdmin):
     list_display = ("severity", "color", "weight")
@@ -248,6 +256,7 @@ class ReportTemplateAdmin(admin.ModelAdmin):
                     "p_style",
                     "evidence_image_width",
                     "contains_bloodhound_data",
+                    "contains_log_data",
                     "tags",
                 )
             },
@@ -30,7 +30,7 @@ def archive_report(report: Report):
     with tempfile.TemporaryFile("w+b") as arcfile:
         with zipfile.ZipFile(arcfile, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
             zf.writestr("report.json", ExportReportJson(report).run().getvalue())
-            zf.writestr("report.xlsx", ExportReportXlsx(report).run().getvalue())
+            zf.writestr("report.xlsx", ExportReportXlsx(report, include_logs=False).run().getvalue())
             zf.writestr("report.docx", docx_template.exporter(report).run().getvalue())
             zf.writestr("report.pptx", pptx_template.exporter(report).run().getvalue())
 
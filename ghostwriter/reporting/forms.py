@@ -480,6 +480,15 @@ class ReportTemplateForm(forms.ModelForm):
                 ),
                 css_class="form-row pb-2",
             ),
+            Row(
+                Column(
+                    SwitchToggle(
+                        "contains_log_data",
+                    ),
+                    css_class="form-group col-md-4 mb-0",
+                ),
+                css_class="form-row pb-2",
+            ),
             "description",
             HTML(
                 """
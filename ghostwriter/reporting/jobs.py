@@ -0,0 +1,304 @@
+"""This contains the helpers for queuing report generation as background jobs."""
+
+# Standard Libraries
+import copy
+import logging
+import multiprocessing
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from socket import gaierror
+from typing import BinaryIO, Iterator
+
+# Django Imports
+import django
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+# 3rd Party Libraries
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django_q.tasks import async_task
+
+# Ghostwriter Libraries
+from ghostwriter.commandcenter.models import ReportConfiguration
+from ghostwriter.modules.exceptions import MissingTemplate
+from ghostwriter.modules.reportwriter import report_generation_queryset
+from ghostwriter.modules.reportwriter.base import ReportExportTemplateError
+from ghostwriter.modules.reportwriter.report.base import ExportReportBase
+from ghostwriter.modules.reportwriter.report.docx import ExportReportDocx
+from ghostwriter.modules.reportwriter.report.json import ExportReportJson
+from ghostwriter.modules.reportwriter.report.pptx import ExportReportPptx
+from ghostwriter.modules.reportwriter.report.xlsx import ExportReportXlsx
+from ghostwriter.reporting.models import Report, ReportGenerationJob
+
+# Using __name__ resolves to ghostwriter.reporting.jobs
+logger = logging.getLogger(__name__)
+
+# Formats bundled into the Zip file for the ``all`` format
+ZIP_FORMATS = ("docx", "pptx", "xlsx", "json")
+
+_export_pool = None
+_export_pool_lock = threading.Lock()
+
+
+def get_report_template(report: Report, doc_type: str):
+    """
+    Get the Word or PowerPoint template for a :model:`reporting.Report`, falling back to the
+    default template in :model:`commandcenter.ReportConfiguration`.
+
+    Raises ``MissingTemplate`` if there is no template, or ``ReportExportTemplateError`` if
+    the template failed linting.
+    """
+    report_config = ReportConfiguration.get_solo()
+    if doc_type == "docx":
+        report_template = report.docx_template or report_config.default_docx_template
+        label = "DOCX"
+    else:
+        report_template = report.pptx_template or report_config.default_pptx_template
+        label = "PPTX"
+    if not report_template:
+        raise MissingTemplate()
+    if report_template.get_status() in ("error", "failed"):
+        raise ReportExportTemplateError(
+            f"The selected report template has linting errors and cannot be used to render a {label} document"
+        )
+    return report_template
+
+
+def build_report_exporter(report: Report, output_format: str, progress_callback=None, data=None):
+    """
+    Create the exporter for one document format of a :model:`reporting.Report` and return it with
+    the Jinja template for its filename.
+
+    Pass the result of ``ExportReportBase.serialize_report`` as ``data`` to skip serializing the report again.
+    """
+    report_config = ReportConfiguration.get_solo()
+    kwargs = {
+        "include_bloodhound": report.include_bloodhound_data,
+        "progress_callback": progress_callback,
+        "data": data,
+    }
+
+    if output_format in ("docx", "pptx"):
+        report_template = get_report_template(report, output_format)
+        exporter_cls = ExportReportDocx if output_format == "docx" else ExportReportPptx
+        exporter = exporter_cls(
+            report, report_template=report_template, include_logs=report_template.contains_log_data, **kwargs
+        )
+        return exporter, report_template.filename_override or report_config.report_filename
+    if output_format == "xlsx":
+        return ExportReportXlsx(report, include_logs=False, **kwargs), report_config.report_filename
+    if output_format == "json":
+        return ExportReportJson(report, **kwargs), report_config.report_filename
+    raise ValueError(f"Unknown report format: {output_format}")
+
+
+def export_report(
+    report: Report, output_format: str, progress_callback=None, timings: dict | None = None
+) -> tuple[str, BinaryIO]:
+    """
+    Generate a document for a :model:`reporting.Report` and return its filename and contents.
+
+    The ``output_format`` is one of the keys of ``ReportGenerationJob.FORMAT_CHOICES``. The ``all``
+    format produces a Zip file containing every other format, written to a temporary file.
+
+    If a ``timings`` dict is passed, the ``ExportTimings.as_dict`` results of each rendered format are
+    added to it, keyed by format.
+    """
+    if output_format == "all":
+        output = tempfile.TemporaryFile()
+        try:
+            filename = write_report_zip(report, output, progress_callback, timings)
+        except BaseException:
+            output.close()
+            raise
+        output.seek(0)
+        return filename, output
+
+    exporter, filename_template = build_report_exporter(report, output_format, progress_callback)
+    filename = exporter.render_filename(filename_template)
+    document = exporter.run()
+    if timings is not None:
+        timings[output_format] = exporter.timings.as_dict()
+    return filename, document
+
+
+def write_report_zip(report: Report, output: BinaryIO, progress_callback=None, timings: dict | None = None) -> str:
+    """
+    Generate every report format and write them into a Zip file in ``output``, returning the
+    filename for the Zip file.
+    """
+    zip_filename, documents = prepare_report_documents(report, progress_callback, timings)
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        for filename, content in documents:
+            zf.writestr(filename, content)
+    return zip_filename
+
+
+def prepare_report_documents(
+    report: Report, progress_callback=None, timings: dict | None = None
+) -> tuple[str, Iterator[tuple[str, bytes]]]:
+    """
+    Prepare every report format of a :model:`reporting.Report` for a Zip file. Returns the filename
+    for the Zip file and an iterator of ``(filename, document)`` tuples.
+
+    Templates are checked and the report is serialized before returning, so those errors are raised
+    immediately. The serialized data is shared by all exporters, and the documents are only rendered as
+    the iterator is consumed. When ``REPORT_EXPORT_WORKERS`` allows it, the formats are rendered in
+    parallel in the export process pool and each document is yielded as soon as it's finished.
+
+    The JSON document always has the logs, like the standalone JSON export, while the other formats get
+    a copy of the data without them unless their template uses them.
+
+    If a ``timings`` dict is passed, each format's timings are added to it as its document is yielded.
+    """
+    if timings is None:
+        timings = {}
+    # Check for missing or broken templates before doing any work
+    templates = [get_report_template(report, doc_type) for doc_type in ("docx", "pptx")]
+
+    if progress_callback is not None:
+        progress_callback("serialize")
+    data = ExportReportBase.serialize_report(report, report.include_bloodhound_data, include_logs=True)
+    data_without_logs = {**data, "logs": []}
+    log_formats = {"json"}
+    log_formats.update(
+        doc_type for doc_type, template in zip(("docx", "pptx"), templates) if template.contains_log_data
+    )
+    format_data = {
+        output_format: data if output_format in log_formats else data_without_logs for output_format in ZIP_FORMATS
+    }
+
+    report_config = ReportConfiguration.get_solo()
+    zip_filename = ExportReportJson(report, data=data).render_filename(report_config.report_filename, ext="zip")
+
+    if _can_use_export_pool():
+        if progress_callback is not None:
+            progress_callback("render")
+        return zip_filename, _render_in_pool(report, format_data, timings)
+    return zip_filename, _render_in_process(report, format_data, timings, progress_callback)
+
+
+def render_report_format(report_id: int, output_format: str, data: dict) -> tuple[str, bytes, dict]:
+    """
+    Render one format of a :model:`reporting.Report` from already serialized data and return the
+    filename, document, and export timings. This is the entry point for the export process pool.
+    """
+    report = report_generation_queryset().get(id=report_id)
+    exporter, filename_template = build_report_exporter(report, output_format, data=data)
+    filename = exporter.render_filename(filename_template)
+    return filename, exporter.run().getvalue(), exporter.timings.as_dict()
+
+
+def _render_in_pool(report: Report, format_data: dict, timings: dict):
+    """Render every format in the export process pool, yielding each document as it finishes."""
+    pool = _get_export_pool()
+    futures = {
+        pool.submit(render_report_format, report.id, output_format, format_data[output_format]): output_format
+        for output_format in ZIP_FORMATS
+    }
+    try:
+        for future in as_completed(futures):
+            filename, document, format_timings = future.result()
+            timings[futures[future]] = format_timings
+            yield filename, document
+    except BrokenProcessPool:
+        # A worker died (usually killed for running out of memory); start a fresh pool next time
+        _shutdown_export_pool()
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _render_in_process(report: Report, format_data: dict, timings: dict, progress_callback=None):
+    """Render every format one after another in this process, with the serialized data for each in ``format_data``."""
+    for output_format in ZIP_FORMATS:
+        # Exporters may modify their data while rendering, so each one gets its own copy
+        exporter, filename_template = build_report_exporter(
+            report, output_format, progress_callback, data=copy.deepcopy(format_data[output_format])
+        )
+        filename = exporter.render_filename(filename_template)
+        document = exporter.run().getvalue()
+        timings[output_format] = exporter.timings.as_dict()
+        yield filename, document
+
+
+def _can_use_export_pool() -> bool:
+    # Django Q runs tasks in daemonic processes, which aren't allowed to start children
+    return settings.REPORT_EXPORT_WORKERS > 1 and not multiprocessing.current_process().daemon
+
+
+def _init_export_worker():
+    django.setup()
+
+
+def _get_export_pool() -> ProcessPoolExecutor:
+    global _export_pool  # pylint: disable=global-statement
+    with _export_pool_lock:
+        if _export_pool is None:
+            # Spawn rather than fork, so workers don't inherit the server's threads or database connections
+            _export_pool = ProcessPoolExecutor(
+                max_workers=settings.REPORT_EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_export_worker,
+            )
+        return _export_pool
+
+
+def _shutdown_export_pool():
+    global _export_pool  # pylint: disable=global-statement
+    with _export_pool_lock:
+        if _export_pool is not None:
+            _export_pool.shutdown(wait=False, cancel_futures=True)
+            _export_pool = None
+
+
+def send_job_update(job: ReportGenerationJob):
+    """Send the job's current state to the report's WebSocket group."""
+    message = {
+        "job": job.id,
+        "format": job.output_format,
+        "status": job.status,
+        "stage": job.stage,
+    }
+    if job.status == "success":
+        message["download_url"] = reverse("reporting:report_job_download", args=[job.id])
+    elif job.status == "failed":
+        message["error"] = job.error
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            f"report_{job.report_id}",
+            {
+                "type": "status_update",
+                "message": message,
+            },
+        )
+    except gaierror:
+        # WebSocket are unavailable (unit testing)
+        pass
+
+
+def queue_report_job(report: Report, output_format: str, user) -> ReportGenerationJob:
+    """
+    Create a :model:`reporting.ReportGenerationJob` and queue it for the Django Q cluster
+    with :task:`reporting.tasks.generate_report_job`.
+    """
+    job = ReportGenerationJob.objects.create(report=report, output_format=output_format, requested_by=user)
+
+    def enqueue():
+        task_id = async_task(
+            "ghostwriter.reporting.tasks.generate_report_job",
+            job.id,
+            group="Report Generation",
+        )
+        ReportGenerationJob.objects.filter(id=job.id).update(task_id=task_id)
+
+    # Wait for the job row to be committed so the worker can always find it
+    transaction.on_commit(enqueue)
+    send_job_update(job)
+    return job
@@ -0,0 +1,104 @@
+# Standard Libraries
+import importlib.util
+import json
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+# Ghostwriter Libraries
+from ghostwriter.modules.reportwriter.benchmark import EXPORTERS, PRESETS, compare_results, run_benchmark
+
+SIZE_OPTIONS = ("findings", "evidence", "observations", "oplog_entries", "extra_fields", "code_lines")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks report generation against a synthetic engagement, timing each stage of every export format and "
+        "recording peak memory. The engagement is created in a temporary test database, like the one used by the "
+        "test suite, which is destroyed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--preset",
+            choices=PRESETS.keys(),
+            default="small",
+            help="Size of the synthetic engagement; the options below override individual values",
+        )
+        for option in SIZE_OPTIONS:
+            parser.add_argument(f"--{option.replace('_', '-')}", type=int, dest=option)
+        parser.add_argument(
+            "--formats",
+            nargs="+",
+            choices=EXPORTERS.keys(),
+            default=list(EXPORTERS),
+            help="Export formats to benchmark",
+        )
+        parser.add_argument("--iterations", type=int, default=3, help="Timed exports of each format")
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help="Keep the template and rich text caches between exports instead of starting each one cold",
+        )
+        parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory measurements")
+        parser.add_argument("--output", help="Write the results as JSON to this file instead of standard output")
+        parser.add_argument("--baseline", help="Compare the results against a JSON file written by an earlier run")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.1,
+            help="Fraction by which a figure may exceed the baseline before it counts as a regression",
+        )
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec("factory") is None:
+            raise CommandError(
+                "The benchmark builds its engagement with factory-boy, which is a development dependency; "
+                "install `requirements/local.txt` to run it"
+            )
+
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], "r") as baseline_file:
+                baseline = json.load(baseline_file)
+
+        sizes = PRESETS[options["preset"]].copy()
+        for option in SIZE_OPTIONS:
+            if options[option] is not None:
+                sizes[option] = options[option]
+
+        self.stderr.write(f"Benchmarking {', '.join(options['formats'])} with {sizes}...")
+        # The factories assume an empty database, so don't touch the real one
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = run_benchmark(
+                iterations=options["iterations"],
+                formats=options["formats"],
+                measure_memory=not options["no_memory"],
+                cold=not options["warm"],
+                **sizes,
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        for output_format, result in results["results"].items():
+            stages = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in result["stages"].items())
+            memory = f", peak {result['peak_memory'] / 2**20:.1f} MiB" if result["peak_memory"] is not None else ""
+            self.stderr.write(f"{output_format}: {result['total']:.3f}s ({stages}){memory}")
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                output_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            try:
+                regressions = compare_results(baseline, results, options["threshold"])
+            except ValueError as e:
+                raise CommandError(str(e)) from e
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+            self.stderr.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,144 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reporting", "0062_reporttemplate_contains_bloodhound_data"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportGenerationJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "output_format",
+                    models.CharField(
+                        choices=[
+                            ("docx", "Word"),
+                            ("pptx", "PowerPoint"),
+                            ("xlsx", "Excel"),
+                            ("json", "JSON"),
+                            ("all", "All Formats (Zip)"),
+                        ],
+                        help_text="The type of document to generate",
+                        max_length=8,
+                        verbose_name="Output Format",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("success", "Success"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        help_text="Current state of the generation job",
+                        max_length=8,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Most recent report writer stage reached by a running job",
+                        max_length=32,
+                        verbose_name="Stage",
+                    ),
+                ),
+                (
+                    "task_id",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="ID of the Django Q task running this job",
+                        max_length=255,
+                        verbose_name="Task ID",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(
+                        blank=True,
+                        default="",
+                        help_text="Error message for a failed job",
+                        verbose_name="Error",
+                    ),
+                ),
+                (
+                    "artifact",
+                    models.FileField(
+                        blank=True,
+                        help_text="The generated document",
+                        upload_to="report_jobs",
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Filename to use when downloading the generated document",
+                        max_length=255,
+                        verbose_name="Filename",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Date and time the job was queued",
+                        verbose_name="Created",
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Date and time the job succeeded or failed",
+                        null=True,
+                        verbose_name="Finished",
+                    ),
+                ),
+                (
+                    "report",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="reporting.report",
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Report generation job",
+                "verbose_name_plural": "Report generation jobs",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reporting", "0063_reportgenerationjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportgenerationjob",
+            name="timings",
+            field=models.JSONField(
+                blank=True,
+                help_text="Time spent in each stage of the export, and on the slowest rich text fields, for each format",
+                null=True,
+                verbose_name="Timings",
+            ),
+        ),
+    ]
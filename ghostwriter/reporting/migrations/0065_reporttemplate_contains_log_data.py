@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:20
+
+from django.db import migrations, models
+
+
+def flag_existing_templates(apps, schema_editor):
+    # Existing templates, or the rich text they render, may use the logs, so they keep loading them until an
+    # admin clears the flag; only new templates start without the logs
+    ReportTemplate = apps.get_model("reporting", "ReportTemplate")
+    ReportTemplate.objects.update(contains_log_data=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0064_reportgenerationjob_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporttemplate',
+            name='contains_log_data',
+            field=models.BooleanField(default=False, help_text="Set to true if this template, or the rich text it renders, uses the entries of the project's activity logs (the `logs` variable). Other templates get an empty `logs` list, so generating their reports doesn't load every log entry", verbose_name='Contains Activity Log Data'),
+        ),
+        migrations.RunPython(flag_existing_templates, migrations.RunPython.noop),
+    ]
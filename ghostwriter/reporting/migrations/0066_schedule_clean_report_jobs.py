@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:40
+
+from django.db import migrations
+
+TASK = "ghostwriter.reporting.tasks.clean_report_jobs"
+
+
+def schedule_cleanup(apps, schema_editor):
+    # Finished jobs keep their documents in storage until this task deletes them
+    Schedule = apps.get_model("django_q", "Schedule")
+    if not Schedule.objects.filter(func=TASK).exists():
+        Schedule.objects.create(
+            name="Clean Report Generation Jobs",
+            func=TASK,
+            schedule_type="D",
+            repeats=-1,
+        )
+
+
+def unschedule_cleanup(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(func=TASK).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_q", "0018_task_success_index"),
+        ("reporting", "0065_reporttemplate_contains_log_data"),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_cleanup, unschedule_cleanup),
+    ]
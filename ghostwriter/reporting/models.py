@@ -357,6 +357,13 @@ class ReportTemplate(models.Model):
         default=False,
         help_text="Set to true if this template is designed to include data from BloodHound",
     )
+    contains_log_data = models.BooleanField(
+        "Contains Activity Log Data",
+        default=False,
+        help_text="Set to true if this template, or the rich text it renders, uses the entries of the project's "
+        "activity logs (the `logs` variable). Other templates get an empty `logs` list, so generating their "
+        "reports doesn't load every log entry",
+    )
     tags = TaggableManager(blank=True)
     # Foreign Keys
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
@@ -427,6 +434,7 @@ class ReportTemplate(models.Model):
         # Ghostwriter Libraries
         from ghostwriter.rolodex.models import Project
 
+        kwargs.setdefault("include_logs", self.contains_log_data)
         if self.doc_type.doc_type == "docx":
             assert isinstance(object, Report)
             # Ghostwriter Libraries
@@ -932,6 +940,108 @@ class Archive(models.Model):
         return f"{self.report_archive.name}"
 
 
+class ReportGenerationJob(models.Model):
+    """
+    Stores an individual report export queued for the Django Q cluster and its finished file,
+    related to :model:`reporting.Report` and :model:`users.User`.
+    """
+
+    FORMAT_CHOICES = [
+        ("docx", "Word"),
+        ("pptx", "PowerPoint"),
+        ("xlsx", "Excel"),
+        ("json", "JSON"),
+        ("all", "All Formats (Zip)"),
+    ]
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("success", "Success"),
+        ("failed", "Failed"),
+    ]
+
+    output_format = models.CharField(
+        "Output Format",
+        max_length=8,
+        choices=FORMAT_CHOICES,
+        help_text="The type of document to generate",
+    )
+    status = models.CharField(
+        "Status",
+        max_length=8,
+        choices=STATUS_CHOICES,
+        default="queued",
+        help_text="Current state of the generation job",
+    )
+    stage = models.CharField(
+        "Stage",
+        max_length=32,
+        default="",
+        blank=True,
+        help_text="Most recent report writer stage reached by a running job",
+    )
+    task_id = models.CharField(
+        "Task ID",
+        max_length=255,
+        default="",
+        blank=True,
+        help_text="ID of the Django Q task running this job",
+    )
+    error = models.TextField(
+        "Error",
+        default="",
+        blank=True,
+        help_text="Error message for a failed job",
+    )
+    artifact = models.FileField(
+        upload_to="report_jobs",
+        blank=True,
+        help_text="The generated document",
+    )
+    filename = models.CharField(
+        "Filename",
+        max_length=255,
+        default="",
+        blank=True,
+        help_text="Filename to use when downloading the generated document",
+    )
+    created_at = models.DateTimeField(
+        "Created",
+        auto_now_add=True,
+        help_text="Date and time the job was queued",
+    )
+    finished_at = models.DateTimeField(
+        "Finished",
+        null=True,
+        blank=True,
+        help_text="Date and time the job succeeded or failed",
+    )
+    timings = models.JSONField(
+        "Timings",
+        null=True,
+        blank=True,
+        help_text="Time spent in each stage of the export, and on the slowest rich text fields, for each format",
+    )
+    # Foreign Keys
+    report = models.ForeignKey("Report", on_delete=models.CASCADE)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Report generation job"
+        verbose_name_plural = "Report generation jobs"
+
+    def __str__(self):
+        return f"{self.get_output_format_display()} export of {self.report} ({self.status})"
+
+    def get_absolute_url(self):
+        return reverse("reporting:report_job_status", args=[str(self.id)])
+
+    @property
+    def is_finished(self):
+        return self.status in ("success", "failed")
+
+
 class FindingNote(models.Model):
     """Stores an individual finding note, related to :model:`reporting.Finding`."""
 
@@ -10,7 +10,9 @@ from django.dispatch import receiver
 from django.utils import timezone
 
 # Ghostwriter Libraries
+from ghostwriter.modules.reportwriter.template_cache import template_cache
 from ghostwriter.reporting.models import (
+    ReportGenerationJob,
     ReportTemplate,
     Severity,
 )
@@ -51,6 +53,9 @@ def clean_template(sender, instance, created, **kwargs):
     Delete the old template file and lint the replacement file for an instance of
     :model:`reporting.ReportTemplate`.
     """
+    # Drop any parsed copy of the template so the next export (and the linter) reads the new file
+    template_cache.invalidate(instance.pk)
+
     should_lint_template = False
     if hasattr(instance, "_current_template"):
         if instance._current_template:
@@ -107,6 +112,7 @@ def clean_template(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=ReportTemplate)
 def remove_template_on_delete(sender, instance, **kwargs):
     """Deletes file from filesystem when related :model:`reporting.ReportTemplate` entry is deleted."""
+    template_cache.invalidate(instance.pk)
     if instance.document:
         if os.path.isfile(instance.document.path):
             try:
@@ -121,6 +127,21 @@ def remove_template_on_delete(sender, instance, **kwargs):
                 )
 
 
+@receiver(post_delete, sender=ReportGenerationJob)
+def remove_report_job_artifact_on_delete(sender, instance, **kwargs):
+    """Deletes the generated document when related :model:`reporting.ReportGenerationJob` entry is deleted."""
+    if instance.artifact:
+        try:
+            instance.artifact.delete(save=False)
+        except Exception:  # pragma: no cover
+            logger.warning(
+                "Failed to delete file associated with %s %s: %s",
+                instance.__class__.__name__,
+                instance.id,
+                instance.artifact.name,
+            )
+
+
 @receiver(pre_save, sender=Severity)
 def adjust_severity_weight_with_changes(sender, instance, **kwargs):
     """
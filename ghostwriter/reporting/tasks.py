@@ -5,10 +5,17 @@ import datetime
 import logging
 from datetime import date
 
+# Django Imports
+from django.core.files import File
+from django.utils import timezone
 
 # Ghostwriter Libraries
+from ghostwriter.modules.exceptions import MissingTemplate
 from ghostwriter.modules.reportwriter import report_generation_queryset
+from ghostwriter.modules.reportwriter.base import ReportExportTemplateError
 from ghostwriter.reporting.archive import archive_report
+from ghostwriter.reporting.jobs import export_report, send_job_update
+from ghostwriter.reporting.models import ReportGenerationJob
 
 # Using __name__ resolves to ghostwriter.reporting.tasks
 logger = logging.getLogger(__name__)
@@ -27,3 +34,61 @@ def archive_projects():
             archive_report(report)
         except Exception: # pylint: disable=broad-exception-caught
             logger.exception("Error while archiving report %s", report.pk)
+
+
+def generate_report_job(job_id):
+    """
+    Run a queued :model:`reporting.ReportGenerationJob`, storing the finished document with the
+    job and sending progress updates to the report's WebSocket group.
+    """
+    job = ReportGenerationJob.objects.get(id=job_id)
+    job.status = "running"
+    job.save(update_fields=["status"])
+
+    def progress(stage):
+        job.stage = stage
+        job.save(update_fields=["stage"])
+        send_job_update(job)
+
+    timings = {}
+    # Anything that goes wrong once the job is running marks it as failed, so clients polling it don't wait forever
+    try:
+        send_job_update(job)
+        report = report_generation_queryset().get(id=job.report_id)
+        filename, output = export_report(report, job.output_format, progress_callback=progress, timings=timings)
+        job.filename = filename
+        with output:
+            job.artifact.save(filename, File(output), save=False)
+        job.status = "success"
+    except MissingTemplate:
+        job.status = "failed"
+        job.error = "You do not have a template selected and have not configured a default template."
+    except ReportExportTemplateError as error:
+        logger.error("Report generation job %s failed: %s", job_id, error)
+        job.status = "failed"
+        job.error = f"Error: {error}"
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logger.exception("Report generation job %s failed unexpectedly", job_id)
+        job.status = "failed"
+        job.error = f"Encountered an error generating the document: {error}"
+    job.finished_at = timezone.now()
+    job.timings = timings or None
+    job.save()
+    send_job_update(job)
+    return job.status
+
+
+def clean_report_jobs(days=1):
+    """
+    Delete finished :model:`reporting.ReportGenerationJob` entries (and their stored documents)
+    older than ``days`` days.
+    """
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    jobs = ReportGenerationJob.objects.filter(status__in=["success", "failed"], created_at__lt=cutoff)
+    count = 0
+    # Delete one at a time so the ``post_delete`` signal removes each document from storage
+    for job in jobs:
+        job.delete()
+        count += 1
+    logger.info("Deleted %s old report generation jobs", count)
+    return count
@@ -0,0 +1,133 @@
+# Standard Libraries
+import copy
+from unittest import mock
+
+# Django Imports
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+# 3rd Party Libraries
+import pytest
+
+# Ghostwriter Libraries
+from ghostwriter.modules.reportwriter.benchmark import (
+    EXPORTERS,
+    PRESETS,
+    RESULTS_VERSION,
+    benchmark_report,
+    compare_results,
+    create_benchmark_report,
+    delete_benchmark_files,
+    time_export,
+)
+
+try:
+    import pytest_benchmark  # noqa: F401 pylint: disable=unused-import
+except ImportError:
+    pytest_benchmark = None
+
+
+class BenchmarkReportTests(TestCase):
+    """Collection of tests for the report generation benchmark harness."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.report = create_benchmark_report(
+            findings=2, evidence=1, observations=1, oplog_entries=5, extra_fields=1, code_lines=5, image_size=(16, 16)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        delete_benchmark_files(cls.report)
+        super().tearDownClass()
+
+    def test_synthetic_report_has_requested_size(self):
+        self.assertEqual(self.report.reportfindinglink_set.count(), 2)
+        self.assertEqual(self.report.reportobservationlink_set.count(), 1)
+        self.assertEqual(self.report.project.oplog_set.get().entries.count(), 5)
+        for finding in self.report.reportfindinglink_set.all():
+            self.assertEqual(finding.evidence_set.count(), 1)
+            self.assertIn("{{.", finding.description)
+            self.assertIn("<pre><code>", finding.replication_steps)
+            self.assertEqual(list(finding.extra_fields), ["benchmark_field_0"])
+
+    def test_stages_are_timed(self):
+        result = time_export(self.report, "docx")
+        self.assertEqual(list(result["stages"]), ["serialize", "rich_text", "render", "save"])
+        self.assertAlmostEqual(sum(result["stages"].values()), result["total"], places=2)
+        self.assertGreater(result["size"], 0)
+
+    def test_benchmark_results(self):
+        results = benchmark_report(self.report, formats=["json", "xlsx"], iterations=1)
+        self.assertEqual(list(results), ["json", "xlsx"])
+        for result in results.values():
+            self.assertGreater(result["total"], 0)
+            self.assertGreater(result["peak_memory"], 0)
+
+
+class CompareResultsTests(TestCase):
+    """Collection of tests for comparing benchmark results against a baseline."""
+
+    baseline = {
+        "version": RESULTS_VERSION,
+        "results": {
+            "docx": {
+                "stages": {"serialize": 1.0, "render": 2.0},
+                "total": 3.0,
+                "size": 100,
+                "peak_memory": 100 * 2**20,
+            },
+        },
+    }
+
+    def test_no_regressions(self):
+        current = copy.deepcopy(self.baseline)
+        current["results"]["docx"]["stages"]["render"] = 2.1
+        self.assertEqual(compare_results(self.baseline, current, threshold=0.1), [])
+
+    def test_regressions(self):
+        current = copy.deepcopy(self.baseline)
+        current["results"]["docx"]["stages"]["render"] = 3.0
+        current["results"]["docx"]["peak_memory"] = 200 * 2**20
+        self.assertEqual(
+            compare_results(self.baseline, current, threshold=0.1),
+            [
+                "docx render: 2.000s -> 3.000s (+50%)",
+                "docx peak memory: 100.000MiB -> 200.000MiB (+100%)",
+            ],
+        )
+
+    def test_version_mismatch(self):
+        current = copy.deepcopy(self.baseline)
+        current["version"] = RESULTS_VERSION + 1
+        with self.assertRaises(ValueError):
+            compare_results(self.baseline, current)
+
+
+class BenchmarkReportsCommandTests(TestCase):
+    """Collection of tests for the ``benchmark_reports`` management command."""
+
+    def test_requires_factory_boy(self):
+        with mock.patch("importlib.util.find_spec", return_value=None):
+            with self.assertRaisesMessage(CommandError, "factory-boy"):
+                call_command("benchmark_reports")
+
+
+@pytest.fixture
+def benchmark_engagement(request, db):  # pylint: disable=unused-argument
+    # Exporting a full engagement is slow, so only do it when benchmarks are requested
+    if not request.config.getoption("benchmark_only"):
+        pytest.skip("Benchmarks only run with `pytest --benchmark-only`")
+    report = create_benchmark_report(**PRESETS["small"])
+    yield report
+    delete_benchmark_files(report)
+
+
+@pytest.mark.skipif(pytest_benchmark is None, reason="pytest-benchmark is not installed")
+@pytest.mark.parametrize("output_format", EXPORTERS)
+def test_export_benchmark(benchmark, benchmark_engagement, output_format):
+    """Runs each exporter under pytest-benchmark, e.g. with ``pytest --benchmark-only --benchmark-autosave``."""
+    result = benchmark.pedantic(time_export, args=(benchmark_engagement, output_format), rounds=3, warmup_rounds=1)
+    benchmark.extra_info.update(result["stages"])
+    assert result["size"] > 0
@@ -38,6 +38,7 @@ from ghostwriter.factories import (
     ObservationFactory
 )
 from ghostwriter.modules.reportwriter.report.json import ExportReportJson
+from ghostwriter.modules.reportwriter.template_cache import TemplateCache, template_cache
 from ghostwriter.reporting.models import Report
 from ghostwriter.rolodex.models import Project
 
@@ -349,6 +350,70 @@ class ReportTemplateModelTests(TestCase):
         self.assertFalse(os.path.exists(template.document.path))
 
 
+class ReportTemplateCacheTests(TestCase):
+    """Collection of tests for the parsed report template cache."""
+
+    def setUp(self):
+        self.cache = TemplateCache(64 * 1024 * 1024)
+
+    def test_docx_copies_are_independent(self):
+        template = ReportDocxTemplateFactory()
+        first = self.cache.get_docx(template)
+        first.docx.add_paragraph("Only in the first copy")
+        second = self.cache.get_docx(template)
+
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertNotEqual(len(first.docx.paragraphs), len(second.docx.paragraphs))
+
+    def test_pptx_copies_are_independent(self):
+        template = ReportPptxTemplateFactory()
+        first = self.cache.get_pptx(template)
+        first.slides.add_slide(first.slide_layouts[0])
+        second = self.cache.get_pptx(template)
+
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(len(second.slides), len(first.slides) - 1)
+
+    def test_invalidate(self):
+        template = ReportDocxTemplateFactory()
+        self.cache.get_docx(template)
+        self.assertGreater(self.cache.current_bytes, 0)
+
+        self.cache.invalidate(template.pk)
+        self.assertEqual(self.cache.current_bytes, 0)
+        self.cache.get_docx(template)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_save_signal_invalidates_shared_cache(self):
+        template = ReportDocxTemplateFactory()
+        template_cache.get_docx(template)
+        self.assertIn(("docx", template.pk), template_cache._entries)
+
+        template.name = "Renamed Template"
+        template.save()
+        self.assertNotIn(("docx", template.pk), template_cache._entries)
+
+    def test_lru_eviction(self):
+        first = ReportDocxTemplateFactory()
+        second = ReportDocxTemplateFactory()
+        self.cache.get_docx(first)
+        self.cache.max_bytes = self.cache.current_bytes
+        self.cache.get_docx(second)
+
+        self.assertEqual(list(self.cache._entries), [("docx", second.pk)])
+        self.assertLessEqual(self.cache.current_bytes, self.cache.max_bytes)
+
+    def test_disabled_cache(self):
+        self.cache.max_bytes = 0
+        template = ReportDocxTemplateFactory()
+        self.cache.get_docx(template)
+        self.cache.get_docx(template)
+
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.current_bytes, 0)
+
+
 class ReportModelTests(TestCase):
     """Collection of tests for :model:`reporting.Report`."""
 
@@ -1,16 +1,26 @@
 # Standard Libraries
 from io import BytesIO
+from unittest import mock
 from zipfile import ZipFile
 
 # Django Imports
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
 # 3rd Party Libraries
 import docx
 from lxml import etree
+from PIL import Image
 
 # Ghostwriter Libraries
+from ghostwriter.factories import EvidenceOnFindingFactory, GenerateMockProject
+from ghostwriter.modules.reportwriter import report_generation_queryset
+from ghostwriter.modules.reportwriter.report.docx import ExportReportDocx
 from ghostwriter.modules.reportwriter.richtext.docx import HtmlToDocx
+from ghostwriter.modules.reportwriter.subdoc_cache import subdoc_cache
+
+# Both HTML backends are checked against the same expected output
+RICH_TEXT_PARSERS = ("lxml", "bs4")
 
 WORD_PREFIX = """<?xml version='1.0' encoding='UTF-8' standalone='yes'?>
 <w:document xmlns:wpc="http://schemas.microsoft.com/office/word/2010/wordprocessingCanvas" xmlns:mo="http://schemas.microsoft.com/office/mac/office/2008/main" xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" xmlns:mv="urn:schemas-microsoft-com:mac:vml" xmlns:o="urn:schemas-microsoft-com:office:office" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:wp14="http://schemas.microsoft.com/office/word/2010/wordprocessingDrawing" xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" xmlns:w10="urn:schemas-microsoft-com:office:word" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml" xmlns:wpg="http://schemas.microsoft.com/office/word/2010/wordprocessingGroup" xmlns:wpi="http://schemas.microsoft.com/office/word/2010/wordprocessingInk" xmlns:wne="http://schemas.microsoft.com/office/word/2006/wordml" xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" mc:Ignorable="w14 wp14"><w:body>"""  # noqa: E501
@@ -40,7 +50,7 @@ def clean_xml(xml):
 def mk_test_docx(name, input, expected_output, p_style=None):
     """
     Creates a test function, that compares the output of running the `HtmlToDocx` converter
-    over `input` to the `expected_output`.
+    over `input` to the `expected_output`, with each HTML backend.
 
     The converted result XML and expected output XML are both cleaned before comparison, so differences in
     whitespace will not affect comparison.
@@ -48,20 +58,22 @@ def mk_test_docx(name, input, expected_output, p_style=None):
     expected_output = clean_xml(WORD_PREFIX + expected_output + WORD_SUFFIX)
 
     def test_func(self):
-        doc = docx.Document()
-        HtmlToDocx.run(input, doc, p_style)
-        out = BytesIO()
-        doc.part.save(out)
-
-        # Uncomment to write generates docx files for manual inspection
-        # with open(name + ".docx", "wb") as f:
-        #     f.write(out.getvalue())
-
-        with ZipFile(out) as zip:
-            with zip.open("word/document.xml") as file:
-                contents = file.read()
-        contents = clean_xml(contents)
-        self.assertEqual(contents, expected_output)
+        for parser in RICH_TEXT_PARSERS:
+            with self.subTest(parser=parser):
+                doc = docx.Document()
+                HtmlToDocx.run(input, doc, p_style, parser=parser)
+                out = BytesIO()
+                doc.part.save(out)
+
+                # Uncomment to write generates docx files for manual inspection
+                # with open(name + ".docx", "wb") as f:
+                #     f.write(out.getvalue())
+
+                with ZipFile(out) as zip:
+                    with zip.open("word/document.xml") as file:
+                        contents = file.read()
+                contents = clean_xml(contents)
+                self.assertEqual(contents, expected_output)
 
     test_func.__name__ = name
     return test_func
@@ -805,3 +817,169 @@ class FootnoteToDocxTests(TestCase):
                 footnote_ids = [fid for fid in footnote_ids if int(fid) > 0]
                 self.assertEqual(sorted(footnote_ids), ["1", "2", "3"])
 
+
+class SubdocCacheTests(TestCase):
+    """Collection of tests for the cache of converted DOCX subdocuments."""
+
+    maxDiff = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org, cls.project, cls.report = GenerateMockProject(num_of_findings=2)
+        image = BytesIO()
+        Image.new("RGB", (4, 4), "red").save(image, "PNG")
+        cls.finding = cls.report.reportfindinglink_set.first()
+        cls.evidence = EvidenceOnFindingFactory(
+            finding=cls.finding,
+            document=SimpleUploadedFile("evidence.png", image.getvalue()),
+        )
+        cls.finding.description = (
+            '<p>See <a href="https://example.com/advisory">the advisory</a>.</p>'
+            "<ol><li>First</li><li>Second<ul><li>Nested</li></ul></li></ol>"
+            "<p>{{.%s}}</p>" % cls.evidence.friendly_name
+        )
+        cls.finding.impact = "<ul><li>Impact</li></ul>"
+        cls.finding.save()
+
+    def setUp(self):
+        subdoc_cache.clear()
+
+    def export(self):
+        report = report_generation_queryset().get(pk=self.report.pk)
+        out = ExportReportDocx(report, report_template=report.docx_template).run()
+        with ZipFile(out) as zip:
+            return {
+                name: zip.read(name)
+                for name in ("word/document.xml", "word/numbering.xml", "word/_rels/document.xml.rels")
+            }
+
+    def test_cached_export_matches_uncached_export(self):
+        first = self.export()
+        self.assertEqual(subdoc_cache.hits, 0)
+        self.assertGreater(len(subdoc_cache), 0)
+        self.assertIn(b"https://example.com/advisory", first["word/_rels/document.xml.rels"])
+        self.assertIn(b"media/image", first["word/_rels/document.xml.rels"])
+
+        # Every conversion in the second export, including the evidence image, hyperlink, and lists, is a hit
+        misses = subdoc_cache.misses
+        second = self.export()
+        self.assertEqual(subdoc_cache.misses, misses)
+        self.assertGreater(subdoc_cache.hits, 0)
+        for name, contents in first.items():
+            self.assertEqual(clean_xml(second[name]), clean_xml(contents), name)
+
+    def test_changed_evidence_is_converted_again(self):
+        self.export()
+        misses = subdoc_cache.misses
+        self.evidence.caption = "A new caption"
+        self.evidence.save()
+        self.export()
+        self.assertGreater(subdoc_cache.misses, misses)
+
+
+class ExportTimingsTests(TestCase):
+    """Collection of tests for the timings recorded by the report exporters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org, cls.project, cls.report = GenerateMockProject(num_of_findings=2)
+
+    def setUp(self):
+        subdoc_cache.clear()
+
+    def test_docx_export_records_timings(self):
+        report = report_generation_queryset().get(pk=self.report.pk)
+        exporter = ExportReportDocx(report, report_template=report.docx_template)
+        # Other test modules disable logging globally, so check the call itself
+        with mock.patch("ghostwriter.modules.reportwriter.base.base.timings_logger") as timings_logger:
+            exporter.run()
+        timings_logger.info.assert_called_once()
+        self.assertIn("export_timings", timings_logger.info.call_args.kwargs["extra"])
+
+        timings = exporter.timings
+        self.assertEqual(list(timings.stages), ["serialize", "rich_text", "render", "save"])
+        self.assertAlmostEqual(timings.total, sum(timings.stages.values()))
+        for span in ("serialize_object", "load_template", "render_template", "convert_rich_text", "save_document"):
+            self.assertIn(span, timings.spans)
+        self.assertEqual(timings.spans["save_document"][1], 1)
+
+        # Every converted field is attributed to its location, e.g. "the description of finding <title>"
+        finding = report.reportfindinglink_set.first()
+        self.assertIn(f"the description of finding {finding.title}", timings.rich_text)
+        slowest = timings.slowest_rich_text(3)
+        self.assertEqual(len(slowest), 3)
+        self.assertEqual(slowest, sorted(slowest, key=lambda item: item[1], reverse=True))
+
+        data = timings.as_dict(limit=2)
+        self.assertEqual(len(data["slowest_rich_text"]), 2)
+        self.assertEqual(data["spans"]["save_document"]["count"], 1)
+
+        # Locations carry report content, so they stay out of the response header
+        header = timings.header_value()
+        self.assertTrue(header.startswith("total;dur="))
+        self.assertIn("render_template;dur=", header)
+        self.assertNotIn(finding.title, header)
+
+
+# Rich text exercising the converters' handling of the parsed HTML tree, for checking that both backends agree
+PARSER_PARITY_CORPUS = (
+    "",
+    "   \n  ",
+    "<!-- only a comment -->",
+    "<p>Plain <b>bold</b>, <i>italic</i>, <u>underline</u>, <del>struck</del>, H<sub>2</sub>O and x<sup>2</sup></p>",
+    "<p>Nested <strong><em>strong <u>and</u> emphasized</em></strong> text &amp; entities &lt;&gt; &nbsp;&copy;</p>",
+    "<p>Comment <!-- hidden --> inside a paragraph</p>",
+    "<p>\n   Lots     of\n\n whitespace\t here   </p>\n\n<p> and <b> around </b> inline </p>",
+    '<p class="center">Centered</p><p class="right justify">Aligned</p><p class="">Empty class</p>',
+    '<p><span class="bold italic underline highlight">classes</span> <span style="color: #ff0000; '
+    "background-color: #00ff00; font-size: 14pt; font-family: 'Courier New', monospace\">styles</span>"
+    '<span style="color: nonsense; font-size: big">bad styles</span></p>',
+    '<p><a href="https://example.com/?a=1&amp;b=2">A link</a> and <a>no href</a></p>',
+    "<p>Inline <code>code</code> and <mark>marked</mark> text</p>",
+    "<pre><code>def main():\n    if x &lt; 1:\n        return  'a'\n\n\treturn \"b\"\n</code></pre>",
+    "<pre>Not   code\n  <b>bold</b> inside pre</pre>",
+    "<pre><code>first</code><code>second</code></pre>",
+    "<h1>Heading</h1><h2>With <i>markup</i></h2><h6>Smallest</h6>",
+    "<ul><li>One</li><li>Two<ul><li>Nested <b>bold</b></li><li><p>Paragraph in list</p></li></ul></li>"
+    "<li>Three</li></ul><ol><li>First</li><li>Second<ol><li>Sub</li></ol></li></ol>",
+    "<ul>\n  <li>Whitespace between</li>\n  <!-- comment in list -->\n  <li>items</li>\n</ul>",
+    "<blockquote><p>Quoted</p><p>Two paragraphs</p></blockquote><blockquote>Bare quote</blockquote>",
+    "<p>Line<br>break<br />twice</p><br data-gw-pagebreak=\"\"><div class=\"page-break\"></div><p>After</p>",
+    "<table><thead><tr><th>Head 1</th><th>Head 2</th></tr></thead><tbody><tr><td>A</td><td><b>B</b></td>"
+    "</tr><tr><td colspan=\"2\">Merged across</td></tr><tr><td rowspan=\"2\">Down</td><td>C</td></tr>"
+    "<tr><td>D</td></tr></tbody></table>",
+    "<table><tr><td style=\"background-color: #ff00ff\">Styled cell</td><td><p>Para</p><p>Two</p></td></tr>"
+    "<tr><td><ul><li>List in cell</li></ul></td></tr></table>",
+    '<div class="collab-table-wrapper"><span class="collab-table-caption" data-bookmark="tbl">'
+    '<span class="collab-table-caption-content">Table caption</span></span><table><tr><td>Cell</td></tr>'
+    "</table></div>",
+    "<table><caption>Caption element</caption><tr><td>1</td><td>2</td></tr></table>",
+    "<div>Unknown div</div><p>Unknown <blink>tag</blink> and <span>plain span</span></p>",
+    "<p>Unclosed <b>bold <i>italic</p><p>next",
+    "<p>Invalid \x01 control &#20; chars and emoji \U0001f600</p>",
+    "﻿<p>Byte order mark</p>",
+    "Text outside of a paragraph",
+)
+
+
+class RichTextParserParityTests(TestCase):
+    """Checks that the lxml and BeautifulSoup backends produce identical documents."""
+
+    maxDiff = None
+
+    @staticmethod
+    def convert(html, parser):
+        doc = docx.Document()
+        try:
+            HtmlToDocx.run(html, doc, None, parser=parser)
+        except ValueError as e:
+            return repr(e)
+        out = BytesIO()
+        doc.save(out)
+        with ZipFile(out) as zip:
+            return {name: zip.read(name) for name in zip.namelist() if name.startswith("word/")}
+
+    def test_backends_match(self):
+        for html in PARSER_PARITY_CORPUS:
+            with self.subTest(html=html):
+                self.assertEqual(self.convert(html, "lxml"), self.convert(html, "bs4"))
@@ -3,7 +3,7 @@ from io import BytesIO
 from zipfile import ZipFile
 
 from django.test import TestCase
-from .test_rich_text_docx import clean_xml
+from .test_rich_text_docx import PARSER_PARITY_CORPUS, RICH_TEXT_PARSERS, clean_xml
 
 from ghostwriter.modules.reportwriter.richtext.pptx import HtmlToPptx
 
@@ -68,25 +68,27 @@ def mk_test_pptx(name, input, expected_output, add_suffix=True):
     expected_output = clean_xml(PPTX_PREFIX + expected_output + (PPTX_SUFFIX if add_suffix else ""))
 
     def test_func(self):
-        ppt = pptx.Presentation()
-        slide = ppt.slides.add_slide(ppt.slide_layouts[SLD_LAYOUT_TITLE_AND_CONTENT])
-        shape = slide.shapes.placeholders[1]
-        shape.text_frame.clear()
-        HtmlToPptx.run(input, slide, shape)
-        HtmlToPptx.delete_extra_paragraph(shape)
+        for parser in RICH_TEXT_PARSERS:
+            with self.subTest(parser=parser):
+                ppt = pptx.Presentation()
+                slide = ppt.slides.add_slide(ppt.slide_layouts[SLD_LAYOUT_TITLE_AND_CONTENT])
+                shape = slide.shapes.placeholders[1]
+                shape.text_frame.clear()
+                HtmlToPptx.run(input, slide, shape, parser=parser)
+                HtmlToPptx.delete_extra_paragraph(shape)
 
-        out = BytesIO()
-        ppt.part.save(out)
+                out = BytesIO()
+                ppt.part.save(out)
 
-        # Uncomment to write generates pptx files for manual inspection
-        # with open(name + ".pptx", "wb") as f:
-        #     f.write(out.getvalue())
+                # Uncomment to write generates pptx files for manual inspection
+                # with open(name + ".pptx", "wb") as f:
+                #     f.write(out.getvalue())
 
-        with ZipFile(out) as zip:
-            with zip.open("ppt/slides/slide1.xml") as file:
-                contents = file.read()
-        contents = clean_xml(contents)
-        self.assertEqual(contents, expected_output)
+                with ZipFile(out) as zip:
+                    with zip.open("ppt/slides/slide1.xml") as file:
+                        contents = file.read()
+                contents = clean_xml(contents)
+                self.assertEqual(contents, expected_output)
 
     test_func.__name__ = name
     return test_func
@@ -581,3 +583,29 @@ class RichTextToPptxTests(TestCase):
             </a:p>
         """,
     )
+
+
+class RichTextParserParityTests(TestCase):
+    """Checks that the lxml and BeautifulSoup backends produce identical slides."""
+
+    maxDiff = None
+
+    @staticmethod
+    def convert(html, parser):
+        ppt = pptx.Presentation()
+        slide = ppt.slides.add_slide(ppt.slide_layouts[SLD_LAYOUT_TITLE_AND_CONTENT])
+        shape = slide.shapes.placeholders[1]
+        shape.text_frame.clear()
+        try:
+            HtmlToPptx.run(html, slide, shape, parser=parser)
+        except ValueError as e:
+            return repr(e)
+        out = BytesIO()
+        ppt.save(out)
+        with ZipFile(out) as zip:
+            return {name: zip.read(name) for name in zip.namelist() if name.startswith("ppt/slides/")}
+
+    def test_backends_match(self):
+        for html in PARSER_PARITY_CORPUS:
+            with self.subTest(html=html):
+                self.assertEqual(self.convert(html, "lxml"), self.convert(html, "bs4"))
@@ -1,9 +1,11 @@
+import pickle
+
 
 from django.test import TestCase
 
-from ghostwriter.modules.reportwriter import prepare_jinja2_env
+from ghostwriter.modules.reportwriter import prepare_jinja2_env, shared_jinja2_env
 from ghostwriter.modules.reportwriter.base import ReportExportTemplateError
-from ghostwriter.modules.reportwriter.base.html_rich_text import rich_text_template
+from ghostwriter.modules.reportwriter.base.html_rich_text import rich_text_cache, rich_text_template
 
 
 class RichTextTemplatingTests(TestCase):
@@ -29,3 +31,53 @@ class RichTextTemplatingTests(TestCase):
         env, _ = prepare_jinja2_env(debug=True)
         with self.assertRaisesMessage(ReportExportTemplateError, "Jinja tag prefixed with 'li' was not a descendant of a li tag"):
             rich_text_template(env, "<ol>{%li for i in thelist %}<li>{{i}}</li><li>{%li endfor %}</li></ol>")
+
+    def test_error_can_be_pickled(self):
+        error = ReportExportTemplateError("Bad template", "the DOCX template", "{{ foo }")
+        self.assertEqual(str(pickle.loads(pickle.dumps(error))), str(error))
+
+    def test_compiled_templates_are_cached(self):
+        rich_text_cache.clear()
+        text = "<p>{{ title }} {{.caption Example}}</p>"
+        first = rich_text_template(prepare_jinja2_env(debug=False), text)
+        self.assertEqual((rich_text_cache.hits, rich_text_cache.misses), (0, 1))
+
+        # A different environment with the same options reuses the compiled template
+        env, undefined_vars = prepare_jinja2_env(debug=True)
+        second = rich_text_template(env, text)
+        self.assertEqual((rich_text_cache.hits, rich_text_cache.misses), (1, 1))
+        self.assertIs(second.environment, env)
+        self.assertEqual(first.render({"title": "Foo"}), second.render({"title": "Foo"}))
+
+        # The cached template still reports undefined variables to its own environment
+        second.render({})
+        self.assertEqual(undefined_vars, {"title"})
+
+        rich_text_template(env, "<p>{{ title }}</p>")
+        self.assertEqual((rich_text_cache.hits, rich_text_cache.misses), (1, 2))
+
+    def test_syntax_errors_are_not_cached(self):
+        rich_text_cache.clear()
+        env, _ = prepare_jinja2_env(debug=True)
+        for _ in range(2):
+            with self.assertRaises(ReportExportTemplateError):
+                rich_text_template(env, "<p>{{ title </p>")
+        self.assertEqual(len(rich_text_cache), 0)
+
+    def test_environment_is_shared(self):
+        self.assertIs(prepare_jinja2_env(debug=False), shared_jinja2_env())
+        self.assertIs(prepare_jinja2_env(debug=False), prepare_jinja2_env(debug=False))
+
+    def test_debug_environments_record_undefined_separately(self):
+        first_env, first_vars = prepare_jinja2_env(debug=True)
+        second_env, second_vars = prepare_jinja2_env(debug=True)
+        self.assertIsNot(first_env, shared_jinja2_env())
+        self.assertIs(first_env.filters, shared_jinja2_env().filters)
+
+        first_env.from_string("{{ foo }}").render()
+        second_env.from_string("{{ bar }}{{ '<b>baz</b>'|strip_html }}").render()
+        self.assertEqual(first_vars, {"foo"})
+        self.assertEqual(second_vars, {"bar"})
+
+        # The shared environment is unchanged
+        self.assertEqual(shared_jinja2_env().from_string("{{ foo }}").render(), "")
@@ -5,7 +5,9 @@ from datetime import date
 
 # Django Imports
 from django.conf import settings
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import dateformat
 
 # 3rd Party Libraries
@@ -14,6 +16,9 @@ from rest_framework.renderers import JSONRenderer
 # Ghostwriter Libraries
 from ghostwriter.factories import GenerateMockProject, OplogEntryFactory, OplogFactory
 from ghostwriter.modules.custom_serializers import ReportDataSerializer
+from ghostwriter.modules.reportwriter import report_generation_queryset
+from ghostwriter.modules.reportwriter.report.base import ExportReportBase
+from ghostwriter.oplog.models import OplogStats
 
 logging.disable(logging.CRITICAL)
 
@@ -130,3 +135,28 @@ class ReportDataSerializerTests(TestCase):
             for entry in log["entries"]:
                 print(entry["tool"])
                 self.assertTrue(entry["tool"] is not None)
+
+    def test_tools_of_logs_without_stats(self):
+        oplog = OplogFactory.create(project=self.project)
+        OplogEntryFactory.create(tool="Rubeus", oplog_id=oplog)
+        OplogEntryFactory.create(tool="rubeus", oplog_id=oplog)
+        OplogEntryFactory.create(tool="", oplog_id=oplog)
+        with_stats = ReportDataSerializer(self.report, exclude=["id"]).data["tools"]
+
+        OplogStats.objects.filter(oplog__project=self.project).delete()
+        self.report.project.refresh_from_db()
+        self.assertEqual(ReportDataSerializer(self.report, exclude=["id"]).data["tools"], with_stats)
+        self.assertIn("rubeus", with_stats)
+
+    def test_logs_are_optional(self):
+        OplogEntryFactory.create(tool="Rubeus", oplog_id=OplogFactory.create(project=self.project))
+        report = report_generation_queryset().get(pk=self.report.pk)
+        with CaptureQueriesContext(connection) as queries:
+            data = ExportReportBase.serialize_report(report, include_logs=False)
+        self.assertEqual(data["logs"], [])
+        self.assertIn("rubeus", data["tools"])
+        self.assertFalse(any("oplog_oplogentry" in query["sql"] for query in queries.captured_queries))
+
+        report = report_generation_queryset().get(pk=self.report.pk)
+        data = ExportReportBase.serialize_report(report)
+        self.assertEqual(sum(len(log["entries"]) for log in data["logs"]), 2)
@@ -0,0 +1,53 @@
+# Standard Libraries
+import logging
+import os
+from datetime import timedelta
+
+# Django Imports
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.utils import timezone
+
+# 3rd Party Libraries
+from django_q.models import Schedule
+
+# Ghostwriter Libraries
+from ghostwriter.factories import GenerateMockProject
+from ghostwriter.reporting.models import ReportGenerationJob
+from ghostwriter.reporting.tasks import clean_report_jobs
+
+logging.disable(logging.CRITICAL)
+
+
+class CleanReportJobsTests(TestCase):
+    """Collection of tests for :task:`reporting.tasks.clean_report_jobs`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org, cls.project, cls.report = GenerateMockProject()
+
+    def create_job(self, status, age):
+        job = ReportGenerationJob.objects.create(report=self.report, output_format="json", status=status)
+        job.artifact.save("report.json", ContentFile(b"{}"))
+        ReportGenerationJob.objects.filter(id=job.id).update(created_at=timezone.now() - age)
+        return job
+
+    def test_deletes_old_finished_jobs(self):
+        old_success = self.create_job("success", timedelta(days=2))
+        old_failed = self.create_job("failed", timedelta(days=2))
+        old_running = self.create_job("running", timedelta(days=2))
+        recent = self.create_job("success", timedelta(hours=1))
+
+        self.assertEqual(clean_report_jobs(), 2)
+        self.assertEqual(set(ReportGenerationJob.objects.values_list("id", flat=True)), {old_running.id, recent.id})
+        self.assertFalse(os.path.exists(old_success.artifact.path))
+        self.assertFalse(os.path.exists(old_failed.artifact.path))
+        self.assertTrue(os.path.exists(recent.artifact.path))
+
+        old_running.delete()
+        recent.delete()
+
+    def test_task_is_scheduled_daily(self):
+        schedule = Schedule.objects.get(func="ghostwriter.reporting.tasks.clean_report_jobs")
+        self.assertEqual(schedule.schedule_type, Schedule.DAILY)
+        self.assertEqual(schedule.repeats, -1)
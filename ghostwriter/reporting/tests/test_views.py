@@ -1,22 +1,30 @@
 # Standard Libraries
+import io
 import json
 import logging
 import os
+import tempfile
+import zipfile
 from datetime import datetime, timedelta
+from unittest import mock
 
 # Django Imports
 from django.contrib.messages import get_messages
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.dateformat import format as dateformat
 from django.utils.encoding import force_str
 
 # 3rd Party Libraries
+from asgiref.sync import async_to_sync
 from rest_framework.renderers import JSONRenderer
 
 # Ghostwriter Libraries
 from ghostwriter.commandcenter.models import ExtraFieldSpec
 from ghostwriter.factories import (
+    ArchiveFactory,
     ClientFactory,
     DocTypeFactory,
     EvidenceOnFindingFactory,
@@ -29,6 +37,8 @@ from ghostwriter.factories import (
     GenerateMockProject,
     LocalFindingNoteFactory,
     ObservationFactory,
+    OplogEntryFactory,
+    OplogFactory,
     ProjectAssignmentFactory,
     ProjectFactory,
     ProjectTargetFactory,
@@ -43,6 +53,9 @@ from ghostwriter.factories import (
 )
 from ghostwriter.modules.custom_serializers import ReportDataSerializer
 from ghostwriter.modules.exceptions import InvalidFilterValue
+from ghostwriter.modules.reportwriter import report_generation_queryset
+from ghostwriter.modules.reportwriter.report.base import ExportReportBase
+from ghostwriter.modules.zip_stream import iterate_async, stream_zip, zip_directory
 from ghostwriter.modules.reportwriter.jinja_funcs import (
     add_days,
     compromised,
@@ -59,6 +72,9 @@ from ghostwriter.modules.reportwriter.jinja_funcs import (
     strip_html,
     translate_domain_sid,
 )
+from ghostwriter.reporting.jobs import build_report_exporter
+from ghostwriter.reporting.models import ReportGenerationJob
+from ghostwriter.reporting.tasks import generate_report_job
 from ghostwriter.reporting.templatetags import report_tags
 
 logging.disable(logging.CRITICAL)
@@ -66,6 +82,10 @@ logging.disable(logging.CRITICAL)
 PASSWORD = "SuperNaturalReporting!"
 
 
+async def _read_streaming_content(response):
+    return b"".join([part async for part in response.streaming_content])
+
+
 class IndexViewTests(TestCase):
     """Collection of tests for :view:`reporting.index`."""
 
@@ -2305,6 +2325,15 @@ class GenerateReportTests(TestCase):
             "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         )
 
+    def test_view_docx_skips_log_entries_unless_template_uses_them(self):
+        log = OplogFactory(project=self.report.project)
+        OplogEntryFactory(oplog_id=log)
+        self.assertFalse(self.report.docx_template.contains_log_data)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client_mgr.get(self.docx_uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if "oplog_oplogentry" in query["sql"]])
+
     def test_view_xlsx_uri_exists_at_desired_location(self):
         response = self.client_mgr.get(self.xlsx_uri)
         self.assertEqual(
@@ -2325,6 +2354,35 @@ class GenerateReportTests(TestCase):
         self.assertEqual(response.status_code, 200, str(response))
         self.assertEqual(response.get("Content-Type"), "application/x-zip-compressed", str(response))
 
+    def test_view_all_contains_every_format(self):
+        with mock.patch.object(
+            ExportReportBase, "serialize_report", side_effect=ExportReportBase.serialize_report
+        ) as serialize_report:
+            response = self.client_mgr.get(self.all_uri)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            content = async_to_sync(_read_streaming_content)(response)
+        serialize_report.assert_called_once()
+
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            extensions = sorted(os.path.splitext(name)[1] for name in zf.namelist())
+        self.assertEqual(extensions, [".docx", ".json", ".pptx", ".xlsx"])
+
+    def test_view_all_json_keeps_logs_without_log_templates(self):
+        log = OplogFactory(project=self.report.project)
+        entry = OplogEntryFactory(oplog_id=log)
+        self.assertFalse(self.report.docx_template.contains_log_data)
+        self.assertFalse(self.report.pptx_template.contains_log_data)
+
+        response = self.client_mgr.get(self.all_uri)
+        self.assertEqual(response.status_code, 200)
+        content = async_to_sync(_read_streaming_content)(response)
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            json_name = next(name for name in zf.namelist() if name.endswith(".json"))
+            data = json.loads(zf.read(json_name))
+        self.assertEqual([log_data["name"] for log_data in data["logs"]], [log.name])
+        self.assertEqual([entry_data["command"] for entry_data in data["logs"][0]["entries"]], [entry.command])
+
     def test_view_json_requires_login_and_permissions(self):
         response = self.client.get(self.json_uri)
         self.assertEqual(response.status_code, 302)
@@ -2402,6 +2460,200 @@ class GenerateReportTests(TestCase):
         self.report.docx_template = good_template
         self.report.save()
 
+    def test_view_timings_header(self):
+        response = self.client_mgr.get(self.docx_uri)
+        self.assertNotIn("X-Report-Timings", response)
+
+        with override_settings(REPORT_TIMINGS_HEADER=True):
+            for uri in (self.docx_uri, self.json_uri):
+                response = self.client_mgr.get(uri)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response["X-Report-Timings"].startswith("total;dur="))
+                self.assertIn("save_document;dur=", response["X-Report-Timings"])
+
+
+class ZipStreamTests(TestCase):
+    """Collection of tests for the ``stream_zip`` helper used for report bundles."""
+
+    def test_stream_zip_entries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "sub"))
+            with open(os.path.join(directory, "sub", "image.png"), "wb") as image:
+                image.write(os.urandom(200 * 1024))
+            with open(os.path.join(directory, "notes.txt"), "wb") as notes:
+                notes.write(b"notes")
+
+            entries = [("report.json", b'{"title": "Report"}')]
+            entries.extend(zip_directory(directory))
+            chunks = list(stream_zip(entries))
+
+            # The archive is emitted in pieces rather than one buffer
+            self.assertGreater(len(chunks), 2)
+            with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+                self.assertIsNone(zf.testzip())
+                self.assertEqual(
+                    sorted(zf.namelist()), ["evidence/notes.txt", "evidence/sub/image.png", "report.json"]
+                )
+                self.assertEqual(zf.read("report.json"), b'{"title": "Report"}')
+                with open(os.path.join(directory, "sub", "image.png"), "rb") as image:
+                    self.assertEqual(zf.read("evidence/sub/image.png"), image.read())
+
+    def test_stream_zip_consumes_entries_lazily(self):
+        consumed = []
+
+        def entries():
+            for name in ("first.txt", "second.txt"):
+                consumed.append(name)
+                yield name, name.encode()
+
+        stream = stream_zip(entries())
+        next(stream)
+        self.assertEqual(consumed, ["first.txt"])
+        list(stream)
+        self.assertEqual(consumed, ["first.txt", "second.txt"])
+
+    def test_iterate_async_yields_chunks_on_demand(self):
+        produced = []
+
+        def chunks():
+            for chunk in (b"first", b"second", b"third"):
+                produced.append(chunk)
+                yield chunk
+
+        async def read_two():
+            stream = iterate_async(chunks())
+            received = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return received
+
+        self.assertEqual(async_to_sync(read_two)(), [b"first", b"second"])
+        self.assertEqual(produced, [b"first", b"second"])
+
+
+class ReportGenerationJobTests(TestCase):
+    """Collection of tests for :view:`reporting.GenerateReportJob` and the related job views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org, cls.project, cls.report = GenerateMockProject()
+        cls.user = UserFactory(password=PASSWORD)
+        cls.mgr_user = UserFactory(password=PASSWORD, role="manager")
+        cls.docx_uri = reverse("reporting:generate_job", kwargs={"pk": cls.report.pk, "output_format": "docx"})
+
+    def setUp(self):
+        self.client = Client()
+        self.client_auth = Client()
+        self.client_mgr = Client()
+        self.assertTrue(self.client_auth.login(username=self.user.username, password=PASSWORD))
+        self.assertTrue(self.client_mgr.login(username=self.mgr_user.username, password=PASSWORD))
+
+    def test_view_queues_job(self):
+        response = self.client_mgr.post(self.docx_uri)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["result"], "success")
+
+        job = ReportGenerationJob.objects.get(id=data["job"])
+        self.assertEqual(job.report, self.report)
+        self.assertEqual(job.output_format, "docx")
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.requested_by, self.mgr_user)
+
+    def test_view_reports_queueing_failure(self):
+        with mock.patch("ghostwriter.reporting.views2.report.queue_report_job", side_effect=ConnectionError):
+            response = self.client_mgr.post(self.docx_uri)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["result"], "error")
+
+    def test_view_rejects_unknown_format(self):
+        uri = reverse("reporting:generate_job", kwargs={"pk": self.report.pk, "output_format": "pdf"})
+        response = self.client_mgr.post(uri)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ReportGenerationJob.objects.exists())
+
+    def test_view_requires_login_and_permissions(self):
+        response = self.client.post(self.docx_uri)
+        self.assertEqual(response.status_code, 302)
+
+        response = self.client_auth.post(self.docx_uri)
+        self.assertEqual(response.status_code, 403)
+
+    def test_job_generates_documents(self):
+        for output_format in ("docx", "pptx", "xlsx", "json", "all"):
+            job = ReportGenerationJob.objects.create(report=self.report, output_format=output_format)
+            self.assertEqual(generate_report_job(job.id), "success")
+
+            job.refresh_from_db()
+            self.assertEqual(job.stage, "save")
+            self.assertIsNotNone(job.finished_at)
+            self.assertTrue(job.filename.endswith("zip" if output_format == "all" else output_format))
+            expected_formats = {"docx", "pptx", "xlsx", "json"} if output_format == "all" else {output_format}
+            self.assertEqual(set(job.timings), expected_formats)
+            for format_timings in job.timings.values():
+                self.assertIn("save", format_timings["stages"])
+
+            status_uri = reverse("reporting:report_job_status", kwargs={"pk": job.pk})
+            response = self.client_mgr.get(status_uri)
+            self.assertEqual(response.json()["status"], "success")
+
+            response = self.client_mgr.get(response.json()["download_url"])
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(job.filename, response.get("Content-Disposition"))
+
+            artifact_path = job.artifact.path
+            job.delete()
+            self.assertFalse(os.path.exists(artifact_path))
+
+    def test_exporters_only_load_logs_for_templates_using_them(self):
+        report = report_generation_queryset().get(pk=self.report.pk)
+        exporter, _ = build_report_exporter(report, "docx")
+        self.assertFalse(exporter.include_logs)
+        self.assertEqual(exporter.data["logs"], [])
+        exporter, _ = build_report_exporter(report, "json")
+        self.assertTrue(exporter.include_logs)
+
+        report.docx_template.contains_log_data = True
+        report.docx_template.save()
+        exporter, _ = build_report_exporter(report, "docx")
+        self.assertTrue(exporter.include_logs)
+        exporter, _ = build_report_exporter(report, "xlsx")
+        self.assertFalse(exporter.include_logs)
+
+    def test_job_records_failure(self):
+        good_template = self.report.docx_template
+        bad_template = ReportDocxTemplateFactory()
+        os.remove(bad_template.document.path)
+        self.report.docx_template = bad_template
+        self.report.save()
+
+        job = ReportGenerationJob.objects.create(report=self.report, output_format="docx")
+        self.assertEqual(generate_report_job(job.id), "failed")
+        job.refresh_from_db()
+        self.assertIn("could not be found", job.error)
+        self.assertFalse(job.artifact)
+
+        response = self.client_mgr.get(reverse("reporting:report_job_download", kwargs={"pk": job.pk}))
+        self.assertEqual(response.status_code, 404)
+
+        self.report.docx_template = good_template
+        self.report.save()
+
+    def test_job_records_failure_loading_report(self):
+        job = ReportGenerationJob.objects.create(report=self.report, output_format="docx")
+        with mock.patch("ghostwriter.reporting.tasks.report_generation_queryset", side_effect=RuntimeError("db gone")):
+            self.assertEqual(generate_report_job(job.id), "failed")
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertIn("db gone", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_job_views_require_permissions(self):
+        job = ReportGenerationJob.objects.create(report=self.report, output_format="json")
+        response = self.client_auth.get(reverse("reporting:report_job_status", kwargs={"pk": job.pk}))
+        self.assertEqual(response.status_code, 403)
+        response = self.client_auth.get(reverse("reporting:report_job_download", kwargs={"pk": job.pk}))
+        self.assertEqual(response.status_code, 302)
+
 
 class ReportTemplateFilterTests(TestCase):
     """Collection of tests for custom Jinja2 filters for report templates."""
@@ -2764,6 +3016,39 @@ class FindingNoteDeleteTests(TestCase):
         self.assertEqual(response.status_code, 302)
 
 
+class ArchiveDownloadViewTests(TestCase):
+    """Collection of tests for :view:`reporting.ArchiveDownloadView`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(password=PASSWORD)
+        cls.mgr_user = UserFactory(password=PASSWORD, role="manager")
+        cls.archive = ArchiveFactory()
+        cls.uri = reverse("reporting:download_archive", kwargs={"pk": cls.archive.pk})
+
+    def setUp(self):
+        self.client = Client()
+        self.client_auth = Client()
+        self.assertTrue(self.client_auth.login(username=self.user.username, password=PASSWORD))
+        self.client_mgr = Client()
+        self.assertTrue(self.client_mgr.login(username=self.mgr_user.username, password=PASSWORD))
+
+    def test_view_uri_exists_at_desired_location(self):
+        response = self.client_mgr.get(self.uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response.get("Content-Type"), "application/x-zip-compressed")
+        with open(self.archive.report_archive.path, "rb") as archive_file:
+            self.assertEqual(b"".join(response.streaming_content), archive_file.read())
+
+    def test_view_requires_login_and_permissions(self):
+        response = self.client.get(self.uri)
+        self.assertEqual(response.status_code, 302)
+
+        response = self.client_auth.get(self.uri)
+        self.assertEqual(response.status_code, 302)
+
+
 class EvidenceDownloadTests(TestCase):
     """Collection of tests for :view:`reporting.EvidenceDownload`."""
 
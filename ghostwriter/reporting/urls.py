@@ -290,6 +290,21 @@ urlpatterns += [
         name="generate_json",
     ),
     path("reports/<int:pk>/all/", ghostwriter.reporting.views2.report.GenerateReportAll.as_view(), name="generate_all"),
+    path(
+        "reports/<int:pk>/jobs/<str:output_format>/",
+        ghostwriter.reporting.views2.report.GenerateReportJob.as_view(),
+        name="generate_job",
+    ),
+    path(
+        "reports/jobs/<int:pk>/",
+        ghostwriter.reporting.views2.report.ReportJobStatus.as_view(),
+        name="report_job_status",
+    ),
+    path(
+        "reports/jobs/<int:pk>/download/",
+        ghostwriter.reporting.views2.report.ReportJobDownload.as_view(),
+        name="report_job_download",
+    ),
 ]
 
 # URLs for management functions
@@ -1,9 +1,8 @@
 
 from datetime import datetime
-import io
 import os
 import logging
-import zipfile
+from itertools import chain
 from socket import gaierror
 from asgiref.sync import async_to_sync
 
@@ -13,6 +12,8 @@ from django.http import (
     Http404,
     HttpResponse,
     HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
 )
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
@@ -25,7 +26,7 @@ from django.contrib import messages
 from channels.layers import get_channel_layer
 from taggit.models import Tag
 
-from ghostwriter.api.utils import RoleBasedAccessControlMixin, get_reports_list, get_templates_list, verify_user_is_privileged
+from ghostwriter.api.utils import ForbiddenJsonResponse, RoleBasedAccessControlMixin, get_reports_list, get_templates_list, verify_user_is_privileged
 from ghostwriter.commandcenter.models import BloodHoundConfiguration, ExtraFieldSpec, ReportConfiguration
 from ghostwriter.commandcenter.views import CollabModelUpdate
 from ghostwriter.modules.exceptions import MissingTemplate
@@ -36,10 +37,12 @@ from ghostwriter.modules.reportwriter.report.json import ExportReportJson
 from ghostwriter.modules.reportwriter.report.pptx import ExportReportPptx
 from ghostwriter.modules.reportwriter.report.xlsx import ExportReportXlsx
 from ghostwriter.modules.shared import add_content_disposition_header
+from ghostwriter.modules.zip_stream import iterate_async, stream_zip
 from ghostwriter.reporting.archive import archive_report
 from ghostwriter.reporting.filters import ReportFilter, ReportTemplateFilter
 from ghostwriter.reporting.forms import ReportForm, ReportTemplateForm, SelectReportTemplateForm
-from ghostwriter.reporting.models import Archive, Finding, Observation, Report, ReportTemplate
+from ghostwriter.reporting.jobs import prepare_report_documents, queue_report_job
+from ghostwriter.reporting.models import Archive, Finding, Observation, Report, ReportGenerationJob, ReportTemplate
 from ghostwriter.rolodex.models import Project
 
 logger = logging.getLogger(__name__)
@@ -140,10 +143,10 @@ class ArchiveDownloadView(RoleBasedAccessControlMixin, SingleObjectMixin, View):
         archive_instance = self.get_object()
         file_path = os.path.join(settings.MEDIA_ROOT, archive_instance.report_archive.path)
         if os.path.exists(file_path):
-            with open(file_path, "rb") as archive_file:
-                response = HttpResponse(archive_file.read(), content_type="application/x-zip-compressed")
-                add_content_disposition_header(response, os.path.basename(file_path))
-                return response
+            # Stream the archive from disk; the response closes the file when finished
+            response = FileResponse(open(file_path, "rb"), content_type="application/x-zip-compressed")
+            add_content_disposition_header(response, os.path.basename(file_path))
+            return response
         raise Http404
 
 
@@ -677,8 +680,7 @@ class GenerateReportBase(RoleBasedAccessControlMixin, SingleObjectMixin, View):
         "reportobservationlink_set",
         "evidence_set",
         "project__oplog_set",
-        "project__oplog_set__entries",
-        "project__oplog_set__entries__tags",
+        "project__oplog_set__stats",
     ).select_related()
 
     object: Report
@@ -696,6 +698,12 @@ class GenerateReportBase(RoleBasedAccessControlMixin, SingleObjectMixin, View):
         self.include_bloodhound = self.object.include_bloodhound_data
         return super().dispatch(request, *args, **kwargs)
 
+    def add_timings_header(self, response, exporter):
+        """Add the exporter's stage timings as the `X-Report-Timings` header, if enabled in the settings."""
+        if settings.REPORT_TIMINGS_HEADER:
+            response["X-Report-Timings"] = exporter.timings.header_value()
+        return response
+
 class GenerateReportJSON(GenerateReportBase):
     """Generate a JSON report for an individual :model:`reporting.Report`."""
 
@@ -709,8 +717,9 @@ class GenerateReportJSON(GenerateReportBase):
             self.request.user,
         )
 
-        json_report = ExportReportJson(obj, include_bloodhound=self.include_bloodhound).run()
-        return HttpResponse(json_report.getvalue(), "application/json")
+        exporter = ExportReportJson(obj, include_bloodhound=self.include_bloodhound)
+        json_report = exporter.run()
+        return self.add_timings_header(HttpResponse(json_report.getvalue(), "application/json"), exporter)
 
 
 class GenerateReportDOCX(GenerateReportBase):
@@ -769,7 +778,12 @@ class GenerateReportDOCX(GenerateReportBase):
         # Template available and passes linting checks, so proceed with generation
 
         try:
-            exporter = ExportReportDocx(obj, report_template=report_template, include_bloodhound=self.include_bloodhound)
+            exporter = ExportReportDocx(
+                obj,
+                report_template=report_template,
+                include_bloodhound=self.include_bloodhound,
+                include_logs=report_template.contains_log_data,
+            )
             report_name = exporter.render_filename(report_template.filename_override or report_config.report_filename)
             docx = exporter.run()
         except ReportExportTemplateError as error:
@@ -791,6 +805,7 @@ class GenerateReportDOCX(GenerateReportBase):
             docx.getvalue(), content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         )
         add_content_disposition_header(response, report_name)
+        self.add_timings_header(response, exporter)
 
         # Send WebSocket message to update user's webpage
         try:
@@ -823,7 +838,7 @@ class GenerateReportXLSX(GenerateReportBase):
 
         try:
             report_config = ReportConfiguration.get_solo()
-            exporter = ExportReportXlsx(obj, include_bloodhound=self.include_bloodhound)
+            exporter = ExportReportXlsx(obj, include_bloodhound=self.include_bloodhound, include_logs=False)
             report_name = exporter.render_filename(report_config.report_filename, ext="xlsx")
             output = exporter.run()
             response = HttpResponse(
@@ -831,6 +846,7 @@ class GenerateReportXLSX(GenerateReportBase):
                 content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             )
             add_content_disposition_header(response, report_name)
+            self.add_timings_header(response, exporter)
             output.close()
 
             return response
@@ -884,7 +900,12 @@ class GenerateReportPPTX(GenerateReportBase):
                 return HttpResponseRedirect(reverse("reporting:report_detail", kwargs={"pk": obj.pk}) + "#generate")
 
             # Template available and passes linting checks, so proceed with generation
-            exporter = ExportReportPptx(obj, report_template=report_template, include_bloodhound=self.include_bloodhound)
+            exporter = ExportReportPptx(
+                obj,
+                report_template=report_template,
+                include_bloodhound=self.include_bloodhound,
+                include_logs=report_template.contains_log_data,
+            )
             report_name = exporter.render_filename(report_template.filename_override or report_config.report_filename)
             pptx = exporter.run()
             response = HttpResponse(
@@ -892,6 +913,7 @@ class GenerateReportPPTX(GenerateReportBase):
                 content_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
             )
             add_content_disposition_header(response, report_name)
+            self.add_timings_header(response, exporter)
 
             return response
         except ReportExportTemplateError as error:
@@ -937,53 +959,19 @@ class GenerateReportAll(GenerateReportBase):
         )
 
         try:
-            report_config = ReportConfiguration.get_solo()
-
-            # Get the templates for Word and PowerPoint
-            if obj.docx_template:
-                docx_template = obj.docx_template
-            else:
-                docx_template = report_config.default_docx_template
-                if not docx_template:
-                    raise MissingTemplate
+            zip_filename, documents = prepare_report_documents(obj)
 
-            if obj.pptx_template:
-                pptx_template = obj.pptx_template
-            else:
-                pptx_template = report_config.default_pptx_template
-                if not pptx_template:
-                    raise MissingTemplate
+            # Render the first document before starting the response, so errors with it (usually in the templates)
+            # are still reported to the user instead of cutting off the download
+            first_document = next(documents, None)
+            if first_document is not None:
+                documents = chain([first_document], documents)
 
-            exporters_and_filename_templates = [
-                (
-                    ExportReportDocx(obj, report_template=docx_template, include_bloodhound=self.include_bloodhound),
-                    docx_template.filename_override or report_config.report_filename,
-                ),
-                (
-                    ExportReportPptx(obj, report_template=pptx_template, include_bloodhound=self.include_bloodhound),
-                    pptx_template.filename_override or report_config.report_filename,
-                ),
-                (ExportReportXlsx(obj, include_bloodhound=self.include_bloodhound), report_config.report_filename),
-                (ExportReportJson(obj, include_bloodhound=self.include_bloodhound), report_config.report_filename),
-            ]
-
-            zip_filename = exporters_and_filename_templates[0][0].render_filename(
-                report_config.report_filename, ext="zip"
+            # Stream the Zip file, adding each document as it's rendered
+            response = StreamingHttpResponse(
+                iterate_async(stream_zip(documents)), content_type="application/x-zip-compressed"
             )
-
-            # Create a zip file in memory and add the reports to it
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "a") as zf:
-                for (exporter, filename_template) in exporters_and_filename_templates:
-                    filename = exporter.render_filename(filename_template)
-                    doc = exporter.run()
-                    zf.writestr(filename, doc.getvalue())
-            zip_buffer.seek(0)
-
-            # Return the buffer in the HTTP response
-            response = HttpResponse(content_type="application/x-zip-compressed")
             add_content_disposition_header(response, os.path.basename(zip_filename))
-            response.write(zip_buffer.read())
 
             return response
         except ReportExportTemplateError as error:
@@ -1014,13 +1002,97 @@ class GenerateReportAll(GenerateReportBase):
         return HttpResponseRedirect(reverse("reporting:report_detail", kwargs={"pk": obj.pk}) + "#generate")
 
 
-def zip_directory(path, zip_handler):
-    """Compress the target directory as a Zip file for archiving."""
-    # Walk the target directory
-    abs_src = os.path.abspath(path)
-    for root, _, files in os.walk(path):
-        # Add each file to the zip file handler
-        for file in files:
-            absname = os.path.abspath(os.path.join(root, file))
-            arcname = absname[len(abs_src) + 1 :]
-            zip_handler.write(os.path.join(root, file), "evidence/" + arcname)
+class GenerateReportJob(RoleBasedAccessControlMixin, SingleObjectMixin, View):
+    """
+    Queue generation of an individual :model:`reporting.Report` as a :model:`reporting.ReportGenerationJob`
+    instead of rendering it inside the request.
+
+    Progress is sent to the report's WebSocket group and the finished document is available
+    from the :view:`reporting.ReportJobDownload` view.
+    """
+
+    model = Report
+
+    def test_func(self):
+        return self.get_object().user_can_view(self.request.user)
+
+    def handle_no_permission(self):
+        return ForbiddenJsonResponse()
+
+    def post(self, *args, **kwargs):
+        report = self.get_object()
+        output_format = self.kwargs["output_format"]
+        if output_format not in dict(ReportGenerationJob.FORMAT_CHOICES):
+            return JsonResponse(
+                {"result": "error", "message": f"Unknown report format: {output_format}"},
+                status=400,
+            )
+        try:
+            job = queue_report_job(report, output_format, self.request.user)
+        except Exception:
+            logger.exception("Failed to queue report generation for %s %s", report.__class__.__name__, report.id)
+            return JsonResponse({"result": "error", "message": "Report generation could not be queued!"}, status=503)
+
+        logger.info(
+            "Queued %s report generation job %s for %s %s by request of %s",
+            output_format.upper(),
+            job.id,
+            report.__class__.__name__,
+            report.id,
+            self.request.user,
+        )
+        data = {
+            "result": "success",
+            "message": "Report generation has been queued.",
+            "job": job.id,
+            "status_url": reverse("reporting:report_job_status", args=[job.id]),
+        }
+        return JsonResponse(data)
+
+
+class ReportJobStatus(RoleBasedAccessControlMixin, SingleObjectMixin, View):
+    """Return the status of an individual :model:`reporting.ReportGenerationJob` as JSON."""
+
+    model = ReportGenerationJob
+
+    def test_func(self):
+        return self.get_object().report.user_can_view(self.request.user)
+
+    def handle_no_permission(self):
+        return ForbiddenJsonResponse()
+
+    def get(self, *args, **kwargs):
+        job = self.get_object()
+        data = {
+            "job": job.id,
+            "report": job.report_id,
+            "format": job.output_format,
+            "status": job.status,
+            "stage": job.stage,
+            "error": job.error,
+            "download_url": reverse("reporting:report_job_download", args=[job.id]) if job.artifact else None,
+        }
+        return JsonResponse(data)
+
+
+class ReportJobDownload(RoleBasedAccessControlMixin, SingleObjectMixin, View):
+    """Return the document generated by an individual :model:`reporting.ReportGenerationJob`."""
+
+    model = ReportGenerationJob
+
+    def test_func(self):
+        return self.get_object().report.user_can_view(self.request.user)
+
+    def handle_no_permission(self):
+        messages.error(self.request, "You do not have permission to access that.")
+        return redirect("home:dashboard")
+
+    def get(self, *args, **kwargs):
+        job = self.get_object()
+        if job.status != "success" or not job.artifact or not os.path.exists(job.artifact.path):
+            raise Http404
+        return FileResponse(
+            open(job.artifact.path, "rb"),
+            as_attachment=True,
+            filename=job.filename or os.path.basename(job.artifact.name),
+        )
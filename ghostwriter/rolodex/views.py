@@ -1644,6 +1644,8 @@ class ProjectDetailView(RoleBasedAccessControlMixin, DetailView):
             None,
         ))
 
+        ctx["oplogs"] = object.oplog_set.select_related("stats")
+
         bhc = BloodHoundConfiguration.get_solo()
         ctx["global_bloodhound_config"] = bhc
 
@@ -17,11 +17,13 @@ from ghostwriter.shepherd.models import (
     History,
     ServerHistory,
     ServerNote,
+    ServerPortScan,
     ServerProvider,
     ServerRole,
     ServerStatus,
     StaticServer,
     TransientServer,
+    VirusTotalReport,
     WhoisStatus,
 )
 from ghostwriter.shepherd.resources import DomainResource, StaticServerResource
@@ -223,6 +225,13 @@ class ServerNoteAdmin(admin.ModelAdmin):
     list_display_links = ("operator", "timestamp", "server")
 
 
+@admin.register(ServerPortScan)
+class ServerPortScanAdmin(admin.ModelAdmin):
+    list_display = ("server", "timestamp", "open_ports")
+    list_filter = ("server",)
+    list_display_links = ("server", "timestamp")
+
+
 @admin.register(ServerProvider)
 class ServerProviderRoleAdmin(admin.ModelAdmin):
     pass
@@ -297,6 +306,14 @@ class TransientServerRoleAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(VirusTotalReport)
+class VirusTotalReportAdmin(admin.ModelAdmin):
+    list_display = ("domain", "fetched_at", "last_analysis_date")
+    list_display_links = ("domain",)
+    search_fields = ("domain__name",)
+    readonly_fields = ("fetched_at", "last_analysis_date", "etag")
+
+
 @admin.register(WhoisStatus)
 class WhoisStatusAdmin(admin.ModelAdmin):
     pass
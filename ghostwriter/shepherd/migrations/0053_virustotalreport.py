@@ -0,0 +1,30 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shepherd', '0052_rename_note_to_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VirusTotalReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attributes', models.JSONField(default=dict, help_text='Attributes of the domain object returned by VirusTotal', verbose_name='Attributes')),
+                ('etag', models.CharField(blank=True, default='', help_text='ETag header VirusTotal returned with the report', max_length=255, verbose_name='ETag')),
+                ('last_analysis_date', models.DateTimeField(blank=True, help_text="Date and time of VirusTotal's latest analysis of the domain", null=True, verbose_name='Last Analysis Date')),
+                ('fetched_at', models.DateTimeField(help_text='Date and time the report was fetched', verbose_name='Fetched At')),
+                ('domain', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='virustotal_report', to='shepherd.domain')),
+            ],
+            options={
+                'verbose_name': 'VirusTotal report',
+                'verbose_name_plural': 'VirusTotal reports',
+                'ordering': ['domain', '-fetched_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shepherd', '0053_virustotalreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServerPortScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, help_text='Date and time of the scan', verbose_name='Timestamp')),
+                ('open_ports', models.JSONField(blank=True, default=list, help_text="Open ports found by the scan, as `port/protocol` strings - e.g., `['22/tcp', '443/tcp']`", verbose_name='Open Ports')),
+                ('server', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='port_scans', to='shepherd.staticserver')),
+            ],
+            options={
+                'verbose_name': 'Server port scan',
+                'verbose_name_plural': 'Server port scans',
+                'ordering': ['server', '-timestamp'],
+                'indexes': [models.Index(fields=['server', '-timestamp'], name='shepherd_port_scan_latest')],
+            },
+        ),
+    ]
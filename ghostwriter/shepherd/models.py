@@ -11,6 +11,7 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import Q
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 # 3rd Party Libraries
@@ -742,6 +743,83 @@ class DomainNote(models.Model):
         return f"{self.domain} {self.timestamp}: {self.note}"
 
 
+class VirusTotalReport(models.Model):
+    """
+    Stores the latest VirusTotal domain report of an individual :model:`shepherd.Domain`, so health checks can
+    reuse reports fetched within the freshness window of :model:`commandcenter.VirusTotalConfiguration`.
+    """
+
+    attributes = models.JSONField(
+        "Attributes",
+        default=dict,
+        help_text="Attributes of the domain object returned by VirusTotal",
+    )
+    etag = models.CharField(
+        "ETag",
+        max_length=255,
+        default="",
+        blank=True,
+        help_text="ETag header VirusTotal returned with the report",
+    )
+    last_analysis_date = models.DateTimeField(
+        "Last Analysis Date",
+        null=True,
+        blank=True,
+        help_text="Date and time of VirusTotal's latest analysis of the domain",
+    )
+    fetched_at = models.DateTimeField("Fetched At", help_text="Date and time the report was fetched")
+    # Foreign Keys
+    domain = models.OneToOneField(Domain, on_delete=models.CASCADE, related_name="virustotal_report")
+
+    class Meta:
+        ordering = ["domain", "-fetched_at"]
+        verbose_name = "VirusTotal report"
+        verbose_name_plural = "VirusTotal reports"
+
+    def __str__(self):
+        return f"{self.domain.name} ({self.fetched_at})"
+
+    def is_fresh(self, max_age: datetime.timedelta) -> bool:
+        """Check if the report was fetched less than ``max_age`` ago."""
+        return self.fetched_at > timezone.now() - max_age
+
+
+class ServerPortScan(models.Model):
+    """
+    Stores the open ports found by an individual port scan of a :model:`shepherd.StaticServer`.
+    """
+
+    timestamp = models.DateTimeField("Timestamp", auto_now_add=True, help_text="Date and time of the scan")
+    open_ports = models.JSONField(
+        "Open Ports",
+        default=list,
+        blank=True,
+        help_text="Open ports found by the scan, as `port/protocol` strings - e.g., `['22/tcp', '443/tcp']`",
+    )
+    # Foreign Keys
+    server = models.ForeignKey(StaticServer, on_delete=models.CASCADE, related_name="port_scans")
+
+    class Meta:
+        ordering = ["server", "-timestamp"]
+        verbose_name = "Server port scan"
+        verbose_name_plural = "Server port scans"
+        indexes = [models.Index(fields=["server", "-timestamp"], name="shepherd_port_scan_latest")]
+
+    def __str__(self):
+        return f"{self.server.ip_address} {self.timestamp}: {', '.join(self.open_ports) or 'No open ports'}"
+
+    def compare(self, previous=None) -> tuple:
+        """
+        Compare the open ports with those of the ``previous`` scan of the server, returning
+        the lists of ports opened and closed since then. Without a previous scan, every open
+        port counts as opened.
+        """
+        previous_ports = set(previous.open_ports) if previous else set()
+        opened = [port for port in self.open_ports if port not in previous_ports]
+        closed = [port for port in previous.open_ports if port not in self.open_ports] if previous else []
+        return opened, closed
+
+
 class ServerNote(models.Model):
     """
     Stores an individual server note, related to :model:`shepherd.StaticServer` and :model:`users.User`.
@@ -6,11 +6,15 @@ import logging.config
 import traceback
 from asgiref.sync import async_to_sync
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from math import ceil
 
 # Django Imports
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
 
 # 3rd Party Libraries
 import nmap
@@ -32,7 +36,7 @@ from ghostwriter.modules.cloud_monitors import (
     fetch_digital_ocean,
     test_aws,
 )
-from ghostwriter.modules.dns_toolkit import DNSCollector
+from ghostwriter.modules.dns_toolkit import DNSCollector, normalize_records
 from ghostwriter.modules.notifications_slack import SlackNotification
 from ghostwriter.modules.review import DomainReview
 from ghostwriter.shepherd.models import (
@@ -42,6 +46,7 @@ from ghostwriter.shepherd.models import (
     HealthStatus,
     History,
     ServerHistory,
+    ServerPortScan,
     ServerStatus,
     StaticServer,
     TransientServer,
@@ -341,6 +346,9 @@ def check_domains(domain_id=None):
     """
     Initiate a check of all :model:`shepherd.Domain` and update the ``domain_status`` values.
 
+    VirusTotal reports fetched within the configured freshness window are reused, except when
+    checking an individual domain.
+
     **Parameters**
 
     ``domain_id``
@@ -353,13 +361,10 @@ def check_domains(domain_id=None):
 
     # Get target domain(s) from the database or the target ``domain``
     domain_list = []
-    sleep_time_override = None
     if domain_id:
         try:
             domain_queryset = Domain.objects.get(pk=domain_id)
             domain_list.append(domain_queryset)
-            logger.info("Checking only one domain, so disabling sleep time for VirusTotal")
-            sleep_time_override = 0
         except Domain.DoesNotExist:
             domain_updates[domain_id] = {}
             domain_updates[domain_id]["change"] = "error"
@@ -377,10 +382,27 @@ def check_domains(domain_id=None):
             domain_list.append(result)
 
     # Execute ``DomainReview`` to check categories
-    domain_review = DomainReview(domain_queryset=domain_list, sleep_time_override=sleep_time_override)
+    # A domain checked on its own gets a new report, rather than one stored by an earlier check
+    domain_review = DomainReview(domain_queryset=domain_list, use_cache=not domain_id)
     lab_results = domain_review.check_domain_status()
 
+    # Load what applying the results needs once, rather than for each domain
+    health_statuses = {status.health_status: status for status in HealthStatus.objects.all()}
+    burned_ids = [k for k, v in lab_results.items() if v["burned"]]
+    latest_checkouts = {}
+    if burned_ids and slack.enabled:
+        # ``DISTINCT ON`` keeps the first row of each domain, which is the latest checkout
+        latest_checkouts = {
+            checkout.domain_id: checkout
+            for checkout in History.objects.filter(domain_id__in=burned_ids)
+            .select_related("project")
+            .order_by("domain_id", "-end_date")
+            .distinct("domain_id")
+        }
+
     # Update the domains as needed
+    updated_domains = []
+    notifications = []
     for k, v in lab_results.items():
         domain_qs = v["domain_qs"]
         change = "no action"
@@ -391,7 +413,7 @@ def check_domains(domain_id=None):
         try:
             # Flip status if a domain has been flagged as burned
             if lab_results[k]["burned"]:
-                domain_qs.health_status = HealthStatus.objects.get(health_status="Burned")
+                domain_qs.health_status = health_statuses["Burned"]
                 change = "burned"
                 pretty_categories = []
                 for vendor, category in lab_results[k]["categories"].items():
@@ -408,37 +430,22 @@ def check_domains(domain_id=None):
                         scanners,
                         lab_results[k]["burned_explanation"],
                     )
-                    if slack.enabled:
-                        err = slack.send_msg(
-                            message=f"Domain burned: {v['domain']}",
-                            blocks=blocks,
-                        )
-                        if err:
-                            logger.warning(
-                                "Attempt to send a Slack notification returned an error: %s",
-                                err,
-                            )
+                    notifications.append({"message": f"Domain burned: {v['domain']}", "blocks": blocks})
 
                     # Check if the domain is checked-out and send a message to that project channel
-                    try:
-                        latest_checkout = History.objects.filter(domain=domain_qs).latest("end_date")
-                        if (
-                            latest_checkout.end_date >= date.today()
-                            and latest_checkout.project.slack_channel
-                            and slack.enabled
-                        ):
-                            err = slack.send_msg(
-                                message=f"Domain burned: {v['domain']}",
-                                channel=latest_checkout.project.slack_channel,
-                                blocks=blocks,
-                            )
-                            if err:
-                                logger.warning(
-                                    "Attempt to send a Slack notification returned an error: %s",
-                                    err,
-                                )
-                    except History.DoesNotExist:
-                        pass
+                    latest_checkout = latest_checkouts.get(k)
+                    if (
+                        latest_checkout
+                        and latest_checkout.end_date >= date.today()
+                        and latest_checkout.project.slack_channel
+                    ):
+                        notifications.append(
+                            {
+                                "message": f"Domain burned: {v['domain']}",
+                                "channel": latest_checkout.project.slack_channel,
+                                "blocks": blocks,
+                            }
+                        )
             # If the domain isn't marked as burned, check for any informational warnings
             else:
                 if lab_results[k]["warnings"]["total"] > 0:
@@ -449,15 +456,7 @@ def check_domains(domain_id=None):
                         lab_results[k]["warnings"]["messages"],
                     )
                     if slack.enabled:
-                        err = slack.send_msg(
-                            message=f"Domain event warning for {v['domain']}",
-                            blocks=blocks,
-                        )
-                        if err:
-                            logger.warning(
-                                "Attempt to send a Slack notification returned an error: %s",
-                                err,
-                            )
+                        notifications.append({"message": f"Domain event warning for {v['domain']}", "blocks": blocks})
             # Update other fields for the domain object
             if lab_results[k]["burned"] and "burned_explanation" in lab_results[k]:
                 if lab_results[k]["burned_explanation"]:
@@ -470,7 +469,7 @@ def check_domains(domain_id=None):
             else:
                 domain_qs.categorization = {"VirusTotal": "Uncategorized"}
             domain_qs.last_health_check = datetime.now()
-            domain_qs.save()
+            updated_domains.append(domain_qs)
             domain_updates[k]["change"] = change
         except Exception:
             trace = traceback.format_exc()
@@ -479,6 +478,22 @@ def check_domains(domain_id=None):
             domain_updates["errors"][v["domain"]] = trace
             logger.exception('Error updating "%s"', v["domain"])
 
+    # Save every domain together, and only notify once the changes are stored
+    with transaction.atomic():
+        Domain.objects.bulk_update(
+            updated_domains,
+            ["health_status", "categorization", "burned_explanation", "last_health_check"],
+            batch_size=500,
+        )
+
+    for notification in notifications:
+        err = slack.send_msg(**notification)
+        if err:
+            logger.warning(
+                "Attempt to send a Slack notification returned an error: %s",
+                err,
+            )
+
     return domain_updates
 
 
@@ -514,66 +529,22 @@ def update_dns(domain=None):
     record_types = ["A", "NS", "MX", "TXT", "CNAME", "SOA", "DMARC"]
     dns_records = dns_toolkit.run_async_dns(domains=domain_list, record_types=record_types)
 
+    changed_domains = []
     for d in domain_list:
         domain_updates[d.id] = {}
         domain_updates[d.id]["domain"] = d.name
 
         if d.name in dns_records:
             try:
-                a_record = dns_records[d.name]["a_record"]
-                mx_record = dns_records[d.name]["mx_record"]
-                ns_record = dns_records[d.name]["ns_record"]
-                txt_record = dns_records[d.name]["txt_record"]
-                soa_record = dns_records[d.name]["soa_record"]
-                cname_record = dns_records[d.name]["cname_record"]
-                dmarc_record = dns_records[d.name]["dmarc_record"]
-
-                # Format any lists as strings for storage
-                if isinstance(a_record, list):
-                    a_record = ", ".join(a_record).replace('"', "")
-                else:
-                    a_record = a_record.replace('"', "")
-                if isinstance(mx_record, list):
-                    mx_record = ", ".join(mx_record).replace('"', "")
-                else:
-                    mx_record = mx_record.replace('"', "")
-                if isinstance(ns_record, list):
-                    ns_record = ", ".join(ns_record).replace('"', "")
-                else:
-                    ns_record = ns_record.replace('"', "")
-                if isinstance(txt_record, list):
-                    txt_record = ", ".join(txt_record).replace('"', "")
-                else:
-                    txt_record = txt_record.replace('"', "")
-                if isinstance(soa_record, list):
-                    soa_record = ", ".join(soa_record).replace('"', "")
-                else:
-                    soa_record = soa_record.replace('"', "")
-                if isinstance(cname_record, list):
-                    cname_record = ", ".join(cname_record).replace('"', "")
-                else:
-                    cname_record = cname_record.replace('"', "")
-                if isinstance(dmarc_record, list):
-                    dmarc_record = ", ".join(dmarc_record).replace('"', "")
-                else:
-                    dmarc_record = dmarc_record.replace('"', "")
-
                 # Assemble the dict to be stored in the database
-                dns_records_dict = {
-                    "ns": ns_record,
-                    "a": a_record,
-                    "mx": mx_record,
-                    "cname": cname_record,
-                    "dmarc": dmarc_record,
-                    "txt": txt_record,
-                    "soa": soa_record,
-                }
-
-                # Look-up the individual domain and save the new record string
-                domain_instance = Domain.objects.get(name=d.name)
-                domain_instance.dns = dns_records_dict
-                domain_instance.save()
-                domain_updates[d.id]["result"] = "updated"
+                dns_records_dict = normalize_records(dns_records[d.name])
+                # Only write the domains whose records changed
+                if d.dns != dns_records_dict:
+                    d.dns = dns_records_dict
+                    changed_domains.append(d)
+                    domain_updates[d.id]["result"] = "updated"
+                else:
+                    domain_updates[d.id]["result"] = "unchanged"
             except Exception:
                 trace = traceback.format_exc()
                 logger.exception("Failed updating DNS records for %s", d.name)
@@ -582,58 +553,137 @@ def update_dns(domain=None):
             logger.warning("The domain %s was not found in the returned DNS records", d.name)
             domain_updates[d.id]["result"] = "no results"
 
+    Domain.objects.bulk_update(changed_domains, ["dns"], batch_size=500)
+    logger.info("Updated the DNS records of %s of %s domains", len(changed_domains), len(domain_list))
+
     # Log task completed
     logger.info("DNS update completed at %s", datetime.now())
     return domain_updates
 
 
+def scan_open_ports(ip_address):
+    """
+    Scan every TCP port of an IP address with ``python-nmap`` and return the open ports,
+    as sorted ``port/protocol`` strings.
+
+    **Parameters**
+
+    ``ip_address``
+        IP address to scan
+    """
+    # Each scan gets its own scanner, so scans can run in separate threads
+    scanner = nmap.PortScanner()
+    scanner.scan(
+        ip_address,
+        arguments="-sS -Pn -p- -R "
+        "--initial-rtt-timeout 100ms "
+        "--min-rtt-timeout 100ms "
+        "--max-rtt-timeout 200ms "
+        "--max-retries 1 "
+        "--max-scan-delay 0 --open",
+    )
+    open_ports = []
+    for host in scanner.all_hosts():
+        for proto in scanner[host].all_protocols():
+            for port in scanner[host][proto].keys():
+                open_ports.append((proto, port))
+    return [f"{port}/{proto}" for proto, port in sorted(open_ports)]
+
+
 def scan_servers(only_active=False):
     """
     Uses ``python-nmap`` to scan individual :model:`shepherd.StaticServer`
-    and :model:`shepherd.TransientServer` to identify open ports.
+    to identify open ports, recording the results as :model:`shepherd.ServerPortScan`.
+    Up to ``settings.SERVER_SCAN_WORKERS`` servers are scanned at the same time, and
+    the latest ``settings.SERVER_SCAN_HISTORY`` scans of each server are kept.
+
+    Servers marked as unavailable trigger a notification when ports open since
+    their previous scan.
 
     **Parameters**
 
     ``only_active``
         Only scan servers marked as in-use (Default: False)
     """
+    scan_results = {"errors": {}}
     slack = SlackNotification()
 
-    # Create the scanner
-    scanner = nmap.PortScanner()
     # Get the servers stored as static/owned servers
     if only_active:
         server_queryset = StaticServer.objects.filter(server_status__server_status="Active")
     else:
         server_queryset = StaticServer.objects.all()
-    # Run a scan against each server in the queryset
-    for server in server_queryset:
-        scanner.scan(
-            server.ip_address,
-            arguments="-sS -Pn -p- -R "
-            "--initial-rtt-timeout 100ms "
-            "--min-rtt-timeout 100ms "
-            "--max-rtt-timeout 200ms "
-            "--max-retries 1 "
-            "--max-scan-delay 0 --open",
+    servers = list(server_queryset.select_related("server_status"))
+    if not servers:
+        return scan_results
+
+    # Load the previous scans and the latest checkouts once, rather than for each server
+    # (``DISTINCT ON`` keeps the first row of each server, which is the latest one)
+    previous_scans = {
+        scan.server_id: scan
+        for scan in ServerPortScan.objects.filter(server__in=servers)
+        .order_by("server_id", "-timestamp")
+        .distinct("server_id")
+    }
+    latest_checkouts = {
+        checkout.server_id: checkout
+        for checkout in ServerHistory.objects.filter(server__in=servers)
+        .select_related("project")
+        .order_by("server_id", "-end_date")
+        .distinct("server_id")
+    }
+
+    # Run the scans in parallel; each runs an nmap process, so threads are enough
+    with ThreadPoolExecutor(max_workers=max(1, min(settings.SERVER_SCAN_WORKERS, len(servers)))) as executor:
+        futures = {server: executor.submit(scan_open_ports, server.ip_address) for server in servers}
+
+    new_scans = []
+    for server, future in futures.items():
+        try:
+            open_ports = future.result()
+        except Exception:
+            trace = traceback.format_exc()
+            logger.exception("Failed scanning %s", server.ip_address)
+            scan_results["errors"][server.ip_address] = f"Failed scanning the server: {trace}"
+            continue
+
+        scan = ServerPortScan(server=server, open_ports=open_ports)
+        opened, closed = scan.compare(previous_scans.get(server.id))
+        new_scans.append(scan)
+        scan_results[server.id] = {
+            "server": server.ip_address,
+            "open_ports": open_ports,
+            "opened": opened,
+            "closed": closed,
+        }
+
+        if opened and server.server_status and server.server_status.server_status == "Unavailable":
+            message = "Your server, {}, has new open ports - {}".format(server.ip_address, ", ".join(opened))
+            latest = latest_checkouts.get(server.id)
+            if slack.enabled:
+                if latest and latest.project and latest.project.slack_channel:
+                    err = slack.send_msg(message, latest.project.slack_channel)
+                else:
+                    err = slack.send_msg(message)
+                if err:
+                    logger.warning(
+                        "Attempt to send a Slack notification returned an error: %s",
+                        err,
+                    )
+
+    ServerPortScan.objects.bulk_create(new_scans)
+
+    # Delete the scans beyond each server's history in one query
+    older_scans = (
+        ServerPortScan.objects.filter(server__in=servers)
+        .annotate(
+            position=Window(RowNumber(), partition_by=F("server_id"), order_by=[F("timestamp").desc(), F("id").desc()])
         )
-        for host in scanner.all_hosts():
-            for proto in scanner[host].all_protocols():
-                lport = scanner[host][proto].keys()
-                for port in lport:
-                    if server.server_status.server_status == "Unavailable":
-                        message = "Your server, {}, has an open port - {}".format(host, port)
-                        latest = ServerHistory.objects.filter(server=server)[0]
-                        if slack.enabled:
-                            if latest.project.slack_channel:
-                                err = slack.send_msg(message, latest.project.slack_channel)
-                            else:
-                                err = slack.send_msg(message)
-                            if err:
-                                logger.warning(
-                                    "Attempt to send a Slack notification returned an error: %s",
-                                    err,
-                                )
+        .filter(position__gt=max(1, settings.SERVER_SCAN_HISTORY))
+        .values("id")
+    )
+    ServerPortScan.objects.filter(id__in=older_scans).delete()
+    return scan_results
 
 
 def fetch_namecheap_domains():
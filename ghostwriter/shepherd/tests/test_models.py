@@ -5,6 +5,7 @@ from datetime import date, timedelta
 # Django Imports
 from django.db import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
 
 # Ghostwriter Libraries
 from ghostwriter.factories import (
@@ -18,11 +19,13 @@ from ghostwriter.factories import (
     HistoryFactory,
     ServerHistoryFactory,
     ServerNoteFactory,
+    ServerPortScanFactory,
     ServerProviderFactory,
     ServerRoleFactory,
     ServerStatusFactory,
     StaticServerFactory,
     TransientServerFactory,
+    VirusTotalReportFactory,
     WhoisStatusFactory,
 )
 
@@ -672,6 +675,75 @@ class DomainNoteModelTests(TestCase):
         assert not self.DomainNote.objects.all().exists()
 
 
+class VirusTotalReportModelTests(TestCase):
+    """Collection of tests for :model:`shepherd.VirusTotalReport`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.VirusTotalReport = VirusTotalReportFactory._meta.model
+
+    def test_crud_report(self):
+        # Create
+        report = VirusTotalReportFactory(etag="abc")
+
+        # Read
+        self.assertEqual(report.etag, "abc")
+        self.assertEqual(report.domain.virustotal_report, report)
+        self.assertEqual(self.VirusTotalReport.objects.first(), report)
+
+        # Update
+        report.etag = "def"
+        report.save()
+        report.refresh_from_db()
+        self.assertEqual(report.etag, "def")
+
+        # Delete
+        report.delete()
+        assert not self.VirusTotalReport.objects.all().exists()
+
+    def test_is_fresh_method(self):
+        report = VirusTotalReportFactory(fetched_at=timezone.now() - timedelta(hours=2))
+        self.assertTrue(report.is_fresh(timedelta(hours=3)))
+        self.assertFalse(report.is_fresh(timedelta(hours=1)))
+
+    def test_deleted_with_domain(self):
+        report = VirusTotalReportFactory()
+        report.domain.delete()
+        assert not self.VirusTotalReport.objects.all().exists()
+
+
+class ServerPortScanModelTests(TestCase):
+    """Collection of tests for :model:`shepherd.ServerPortScan`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ServerPortScan = ServerPortScanFactory._meta.model
+
+    def test_crud_scan(self):
+        # Create
+        scan = ServerPortScanFactory(open_ports=["22/tcp"])
+
+        # Read
+        self.assertEqual(scan.open_ports, ["22/tcp"])
+        self.assertEqual(list(scan.server.port_scans.all()), [scan])
+
+        # Update
+        scan.open_ports = []
+        scan.save()
+        scan.refresh_from_db()
+        self.assertEqual(scan.open_ports, [])
+
+        # Delete
+        scan.delete()
+        assert not self.ServerPortScan.objects.all().exists()
+
+    def test_compare_method(self):
+        previous = ServerPortScanFactory(open_ports=["22/tcp", "80/tcp"])
+        scan = ServerPortScanFactory.build(server=previous.server, open_ports=["22/tcp", "443/tcp"])
+        self.assertEqual(scan.compare(previous), (["443/tcp"], ["80/tcp"]))
+        self.assertEqual(scan.compare(), (["22/tcp", "443/tcp"], []))
+
+
 class ServerNoteModelTests(TestCase):
     """Collection of tests for :model:`shepherd.ServerNote`."""
 
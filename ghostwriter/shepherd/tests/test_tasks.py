@@ -0,0 +1,402 @@
+# Standard Libraries
+import logging
+import socketserver
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+# Django Imports
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+# 3rd Party Libraries
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+
+# Ghostwriter Libraries
+from ghostwriter.factories import (
+    DomainFactory,
+    DomainStatusFactory,
+    HealthStatusFactory,
+    HistoryFactory,
+    ServerHistoryFactory,
+    ServerPortScanFactory,
+    ServerStatusFactory,
+    StaticServerFactory,
+    VirusTotalConfigurationFactory,
+    VirusTotalReportFactory,
+)
+from ghostwriter.modules.dns_toolkit import DNSCollector, normalize_records, parse_nameserver
+from ghostwriter.modules.review import DomainReview, TokenBucket
+from ghostwriter.shepherd.models import Domain, ServerPortScan, VirusTotalReport
+from ghostwriter.shepherd.tasks import check_domains, scan_servers, update_dns
+
+logging.disable(logging.CRITICAL)
+
+
+def vt_response(status_code=200, attributes=None, headers=None):
+    response = mock.Mock(status_code=status_code, ok=status_code < 400, headers=headers or {})
+    response.json.return_value = {"data": {"attributes": attributes or {}}}
+    return response
+
+
+class StubNameserver(socketserver.ThreadingUDPServer):
+    """
+    Local DNS server answering from ``records``, a dictionary of ``(name, type)`` keys and lists of records.
+    Names without records get NXDOMAIN, and the first ``drop`` queries get no answer at all.
+    """
+
+    def __init__(self, records, drop=0):
+        super().__init__(("127.0.0.1", 0), StubNameserverHandler)
+        self.records = records
+        self.drop = drop
+        self.received = 0
+        self.lock = threading.Lock()
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class StubNameserverHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, sock = self.request
+        with self.server.lock:
+            self.server.received += 1
+            if self.server.received <= self.server.drop:
+                return
+        query = dns.message.from_wire(data)
+        question = query.question[0]
+        name = question.name.to_text(omit_final_dot=True)
+        response = dns.message.make_response(query)
+        records = self.server.records.get((name, dns.rdatatype.to_text(question.rdtype)))
+        if records:
+            response.answer.append(dns.rrset.from_text_list(question.name, 300, "IN", question.rdtype, records))
+        elif not any(key[0] == name for key in self.server.records):
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        sock.sendto(response.to_wire(), self.client_address)
+
+
+class TokenBucketTests(TestCase):
+    """Collection of tests for the ``TokenBucket`` rate limiter in ``ghostwriter.modules.review``."""
+
+    def test_spaces_out_requests(self):
+        clock = [0.0]
+        with mock.patch("ghostwriter.modules.review.monotonic", side_effect=lambda: clock[0]), mock.patch(
+            "ghostwriter.modules.review.sleep", side_effect=lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        ) as sleep:
+            bucket = TokenBucket(rate=4)
+            for _ in range(3):
+                bucket.acquire()
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [15, 15])
+        self.assertEqual(clock[0], 30)
+
+    def test_unlimited_rate(self):
+        with mock.patch("ghostwriter.modules.review.sleep") as sleep:
+            bucket = TokenBucket(rate=0)
+            for _ in range(10):
+                bucket.acquire()
+        sleep.assert_not_called()
+
+
+class DomainReviewTests(TestCase):
+    """Collection of tests for the ``DomainReview`` class in ``ghostwriter.modules.review``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        VirusTotalConfigurationFactory(enable=True, requests_per_minute=0, concurrent_requests=3)
+        cls.domains = [
+            DomainFactory(name=f"review{index}.com", auto_renew=True, expiration=date.today() + timedelta(days=30))
+            for index in range(5)
+        ]
+        cls.expired = DomainFactory(
+            name="expired.com", auto_renew=False, expiration=date.today() - timedelta(days=1)
+        )
+
+    def test_checks_domains_concurrently(self):
+        def get(url, headers):
+            if url.endswith("/review1.com"):
+                return vt_response(attributes={"categories": {"Vendor": "Phishing"}})
+            return vt_response(attributes={"categories": {"Vendor": "Business"}})
+
+        review = DomainReview(self.domains + [self.expired])
+        with mock.patch.object(review.session, "get", side_effect=get) as session_get:
+            results = review.check_domain_status()
+
+        self.assertEqual(session_get.call_count, 5)
+        self.assertEqual(list(results), [domain.id for domain in self.domains])
+        self.assertTrue(results[self.domains[1].id]["burned"])
+        self.assertFalse(results[self.domains[0].id]["burned"])
+        self.assertEqual(results[self.domains[0].id]["categories"], {"Vendor": "Business"})
+
+    def test_retries_when_quota_is_exceeded(self):
+        responses = [
+            vt_response(429, headers={"Retry-After": "2"}),
+            vt_response(429),
+            vt_response(attributes={"categories": {}}),
+        ]
+        review = DomainReview(self.domains[:1])
+        with mock.patch.object(review.session, "get", side_effect=responses), mock.patch(
+            "ghostwriter.modules.review.sleep"
+        ) as sleep:
+            result = review.get_domain_report(self.domains[0].name)
+
+        self.assertEqual(result["result"], "success")
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [2, review.retry_backoff * 2])
+
+    def test_gives_up_when_quota_stays_exceeded(self):
+        review = DomainReview(self.domains[:1])
+        with mock.patch.object(review.session, "get", return_value=vt_response(429)) as session_get, mock.patch(
+            "ghostwriter.modules.review.sleep"
+        ):
+            result = review.get_domain_report(self.domains[0].name)
+
+        self.assertEqual(session_get.call_count, review.max_attempts)
+        self.assertEqual(result["result"], "error")
+
+    def test_reuses_fresh_reports(self):
+        VirusTotalReportFactory(domain=self.domains[0], attributes={"categories": {"Vendor": "Phishing"}})
+        VirusTotalReportFactory(domain=self.domains[1], fetched_at=timezone.now() - timedelta(days=2))
+
+        review = DomainReview(self.domains)
+        with mock.patch.object(
+            review.session, "get", return_value=vt_response(attributes={"last_analysis_date": 1700000000})
+        ) as session_get:
+            results = review.check_domain_status()
+
+        self.assertEqual(session_get.call_count, 4)
+        self.assertTrue(results[self.domains[0].id]["burned"])
+        self.assertEqual(VirusTotalReport.objects.count(), 5)
+        report = VirusTotalReport.objects.get(domain=self.domains[1])
+        self.assertTrue(report.is_fresh(timedelta(minutes=1)))
+        self.assertEqual(report.last_analysis_date.timestamp(), 1700000000)
+
+    def test_refreshes_unchanged_reports(self):
+        stale = VirusTotalReportFactory(
+            domain=self.domains[0],
+            etag="abc",
+            attributes={"categories": {"Vendor": "Phishing"}},
+            fetched_at=timezone.now() - timedelta(days=2),
+        )
+
+        review = DomainReview(self.domains[:1])
+        with mock.patch.object(review.session, "get", return_value=vt_response(304)) as session_get:
+            results = review.check_domain_status()
+
+        self.assertEqual(session_get.call_args.kwargs["headers"]["If-None-Match"], "abc")
+        self.assertTrue(results[self.domains[0].id]["burned"])
+        stale.refresh_from_db()
+        self.assertTrue(stale.is_fresh(timedelta(minutes=1)))
+        self.assertEqual(stale.etag, "abc")
+
+    def test_cache_can_be_skipped(self):
+        VirusTotalReportFactory(domain=self.domains[0])
+        review = DomainReview(self.domains[:1], use_cache=False)
+        with mock.patch.object(review.session, "get", return_value=vt_response()) as session_get:
+            review.check_domain_status()
+        self.assertEqual(session_get.call_count, 1)
+
+
+class CheckDomainsTests(TestCase):
+    """Collection of tests for :task:`shepherd.tasks.check_domains`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        VirusTotalConfigurationFactory(enable=True, requests_per_minute=0)
+        DomainStatusFactory(domain_status="Expired")
+        cls.healthy = HealthStatusFactory(health_status="Healthy")
+        cls.burned = HealthStatusFactory(health_status="Burned")
+
+    def create_domains(self, start, count):
+        domains = []
+        for index in range(start, start + count):
+            domain = DomainFactory(
+                name=f"check{index}.com",
+                health_status=self.healthy,
+                auto_renew=True,
+                expiration=date.today() + timedelta(days=30),
+            )
+            HistoryFactory(domain=domain, end_date=date.today() + timedelta(days=1))
+            domains.append(domain)
+        return domains
+
+    def run_check(self):
+        def get_domain_report(domain, *args, **kwargs):
+            category = "Phishing" if domain.startswith("check1") else "Business"
+            return {"result": "success", "data": {"categories": {"Vendor": category}}}
+
+        with mock.patch("ghostwriter.shepherd.tasks.SlackNotification") as slack_class, mock.patch.object(
+            DomainReview, "get_domain_report", side_effect=get_domain_report
+        ), CaptureQueriesContext(connection) as queries:
+            slack = slack_class.return_value
+            slack.enabled = True
+            slack.send_msg.return_value = {}
+            results = check_domains()
+        return results, slack, len(queries)
+
+    def test_applies_results_in_bulk(self):
+        domains = self.create_domains(0, 2)
+        results, slack, few_queries = self.run_check()
+
+        self.assertEqual(results[domains[1].id]["change"], "categories updated")
+        domains[1].refresh_from_db()
+        self.assertEqual(domains[1].health_status, self.burned)
+        self.assertIn("undesirable category", domains[1].burned_explanation)
+        self.assertEqual(domains[1].last_health_check, date.today())
+        domains[0].refresh_from_db()
+        self.assertEqual(domains[0].health_status, self.healthy)
+        self.assertEqual(domains[0].categorization, {"Vendor": "Business"})
+
+        # The burned domain is announced globally and in the channel of its project
+        self.assertEqual(slack.send_msg.call_count, 2)
+        self.assertEqual(slack.send_msg.call_args_list[1].kwargs["channel"], "#ghostwriter")
+
+        Domain.objects.update(health_status=self.healthy)
+        self.create_domains(10, 4)
+        _, slack, many_queries = self.run_check()
+        self.assertEqual(many_queries, few_queries)
+        self.assertEqual(slack.send_msg.call_count, 10)
+
+
+class DNSCollectorTests(TestCase):
+    """Collection of tests for the ``DNSCollector`` class in ``ghostwriter.modules.dns_toolkit``."""
+
+    records = {
+        ("stub.com", "A"): ["192.0.2.2", "192.0.2.1"],
+        ("stub.com", "NS"): ["ns1.stub.com."],
+        ("stub.com", "TXT"): ['"v=spf1 -all"'],
+    }
+
+    def test_parse_nameserver(self):
+        self.assertEqual(parse_nameserver("8.8.8.8"), ("8.8.8.8", 53))
+        self.assertEqual(parse_nameserver("127.0.0.1:5353"), ("127.0.0.1", 5353))
+        self.assertEqual(parse_nameserver("2001:db8::1"), ("2001:db8::1", 53))
+        self.assertEqual(parse_nameserver("[::1]:5353"), ("::1", 5353))
+
+    def test_collects_records_from_stub_nameserver(self):
+        domains = [SimpleNamespace(name="stub.com"), SimpleNamespace(name="missing.com")]
+        with StubNameserver(self.records) as stub:
+            records = DNSCollector(nameservers=[stub.address], timeout=1, retries=0).run_async_dns(
+                domains, ["A", "NS", "MX", "TXT", "CNAME", "SOA", "DMARC"]
+            )
+
+        self.assertEqual(
+            normalize_records(records["stub.com"]),
+            {
+                "ns": "ns1.stub.com.",
+                "a": "192.0.2.1, 192.0.2.2",
+                "mx": "NoAnswer",
+                "cname": "NoAnswer",
+                "dmarc": "NXDOMAIN",
+                "txt": "v=spf1 -all",
+                "soa": "NoAnswer",
+            },
+        )
+        self.assertEqual(records["missing.com"]["a_record"], "NXDOMAIN")
+
+    def test_retries_with_next_nameserver(self):
+        domain = SimpleNamespace(name="stub.com")
+        with StubNameserver(self.records, drop=1) as silent, StubNameserver(self.records) as stub:
+            collector = DNSCollector(nameservers=[silent.address, stub.address], timeout=0.2, retries=1)
+            records = collector.run_async_dns([domain], ["A"])
+        self.assertEqual(sorted(records["stub.com"]["a_record"]), ["192.0.2.1", "192.0.2.2"])
+
+
+class UpdateDNSTests(TestCase):
+    """Collection of tests for :task:`shepherd.tasks.update_dns`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        DomainStatusFactory(domain_status="Expired")
+        cls.changed = DomainFactory(name="changed.com", dns={})
+        cls.unchanged = DomainFactory(name="unchanged.com")
+
+    def test_writes_only_changed_records(self):
+        records = {
+            field: "NoAnswer" for field in ("ns_record", "mx_record", "cname_record", "txt_record", "soa_record")
+        }
+        collected = {
+            "changed.com": {**records, "a_record": ["192.0.2.1"], "dmarc_record": "NXDOMAIN"},
+            "unchanged.com": {**records, "a_record": ["192.0.2.2", "192.0.2.1"], "dmarc_record": "NXDOMAIN"},
+        }
+        Domain.objects.filter(pk=self.unchanged.pk).update(dns=normalize_records(collected["unchanged.com"]))
+
+        with mock.patch.object(DNSCollector, "run_async_dns", return_value=collected), CaptureQueriesContext(
+            connection
+        ) as queries:
+            results = update_dns()
+
+        self.assertEqual(results[self.changed.id]["result"], "updated")
+        self.assertEqual(results[self.unchanged.id]["result"], "unchanged")
+        self.changed.refresh_from_db()
+        self.assertEqual(self.changed.dns["a"], "192.0.2.1")
+        self.assertEqual(len([query for query in queries if query["sql"].startswith("UPDATE")]), 1)
+
+
+class ScanServersTests(TestCase):
+    """Collection of tests for :task:`shepherd.tasks.scan_servers`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        unavailable = ServerStatusFactory(server_status="Unavailable")
+        cls.released = StaticServerFactory(ip_address="192.0.2.1", server_status=unavailable)
+        active = ServerStatusFactory(server_status="Active")
+        cls.active = StaticServerFactory(ip_address="192.0.2.2", server_status=active)
+        cls.broken = StaticServerFactory(ip_address="192.0.2.3", server_status=unavailable)
+        cls.checkout = ServerHistoryFactory(server=cls.released)
+        ServerPortScanFactory(server=cls.released, open_ports=["22/tcp"])
+
+    def test_records_scans_and_alerts_on_changes(self):
+        open_ports = {"192.0.2.1": ["22/tcp", "443/tcp"], "192.0.2.2": ["80/tcp"]}
+
+        def scan_open_ports(ip_address):
+            if ip_address not in open_ports:
+                raise RuntimeError("nmap failed")
+            return open_ports[ip_address]
+
+        with mock.patch("ghostwriter.shepherd.tasks.scan_open_ports", side_effect=scan_open_ports), mock.patch(
+            "ghostwriter.shepherd.tasks.SlackNotification"
+        ) as slack_class, self.settings(SERVER_SCAN_WORKERS=2):
+            slack = slack_class.return_value
+            slack.enabled = True
+            slack.send_msg.return_value = {}
+            results = scan_servers()
+
+        self.assertEqual(results[self.released.id]["opened"], ["443/tcp"])
+        self.assertEqual(results[self.active.id]["opened"], ["80/tcp"])
+        self.assertIn("192.0.2.3", results["errors"])
+        self.assertEqual(ServerPortScan.objects.filter(server=self.released).first().open_ports, ["22/tcp", "443/tcp"])
+        self.assertFalse(ServerPortScan.objects.filter(server=self.broken).exists())
+
+        # Only the unavailable server with a new open port is reported, in its project's channel
+        slack.send_msg.assert_called_once_with(
+            "Your server, 192.0.2.1, has new open ports - 443/tcp", self.checkout.project.slack_channel
+        )
+
+    def test_prunes_old_scans(self):
+        ServerPortScanFactory.create_batch(3, server=self.active, open_ports=["80/tcp"])
+        with mock.patch("ghostwriter.shepherd.tasks.scan_open_ports", return_value=["80/tcp", "443/tcp"]), mock.patch(
+            "ghostwriter.shepherd.tasks.SlackNotification"
+        ), self.settings(SERVER_SCAN_HISTORY=2):
+            with CaptureQueriesContext(connection) as queries:
+                scan_servers(only_active=True)
+
+        self.assertEqual(len([query for query in queries if query["sql"].startswith("DELETE")]), 1)
+        scans = list(ServerPortScan.objects.filter(server=self.active))
+        self.assertEqual(len(scans), 2)
+        self.assertEqual(scans[0].open_ports, ["80/tcp", "443/tcp"])
+        # Scans of servers that weren't part of the run are left alone
+        self.assertEqual(ServerPortScan.objects.filter(server=self.released).count(), 1)
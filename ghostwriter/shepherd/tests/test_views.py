@@ -101,7 +101,7 @@ class UpdateViewTests(TestCase):
         self.assertIn("total_domains", response.context)
         self.assertIn("update_time", response.context)
         self.assertIn("enable_vt", response.context)
-        self.assertIn("sleep_time", response.context)
+        self.assertIn("requests_per_minute", response.context)
         self.assertIn("cat_last_update_requested", response.context)
         self.assertIn("cat_last_update_completed", response.context)
         self.assertIn("cat_last_update_time", response.context)
@@ -121,8 +121,8 @@ class UpdateViewTests(TestCase):
         self.assertIn("cloud_last_update_time", response.context)
         self.assertIn("cloud_last_result", response.context)
 
-    def test_view_with_zero_sleep_time(self):
-        self.vt_config.sleep_time = 0
+    def test_view_with_unlimited_request_rate(self):
+        self.vt_config.requests_per_minute = 0
         self.vt_config.save()
         response = self.client_auth.get(self.uri)
         self.assertEqual(response.status_code, 200)
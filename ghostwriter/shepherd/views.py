@@ -668,7 +668,7 @@ def update(request):
         Total of entries in :model:`shepherd.Domain`
     ``update_time``
         Calculated time estimate for updating health of all :model:`shepherd.Domain`
-    ``sleep_time``
+    ``requests_per_minute``
         The associated value from :model:`commandcenter.VirusTotalConfiguration`
     ``cat_last_update_requested``
         Start time of latest :model:`django_q.Task` for group "Domain Updates"
@@ -716,7 +716,7 @@ def update(request):
         # Get relevant configuration settings
         vt_config = VirusTotalConfiguration.get_solo()
         enable_vt = vt_config.enable
-        sleep_time = vt_config.sleep_time
+        requests_per_minute = vt_config.requests_per_minute
         cloud_config = CloudServicesConfiguration.get_solo()
         enable_cloud_monitor = cloud_config.enable
         namecheap_config = NamecheapConfiguration.get_solo()
@@ -732,9 +732,9 @@ def update(request):
             expired_status = None
         total_domains = Domain.objects.all().exclude(domain_status=expired_status).count()
         try:
-            update_time = round(total_domains * sleep_time / 60, 2)
+            update_time = round(total_domains / requests_per_minute, 2)
         except ZeroDivisionError:
-            update_time = total_domains
+            update_time = 0
         try:
             # Get the latest completed task from `Domain Updates`
             queryset = Task.objects.filter(group="Domain Updates").order_by("-stopped")[0]
@@ -811,7 +811,7 @@ def update(request):
             "total_domains": total_domains,
             "update_time": update_time,
             "enable_vt": enable_vt,
-            "sleep_time": sleep_time,
+            "requests_per_minute": requests_per_minute,
             "cat_last_update_requested": cat_last_update_requested,
             "cat_last_update_completed": cat_last_update_completed,
             "cat_last_update_time": cat_last_update_time,
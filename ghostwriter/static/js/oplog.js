@@ -117,14 +117,54 @@ $(document).ready(function() {
     const $oplogTableNoEntries = $('#oplogTableNoEntries');
     const $oplogTableLoading = $('#oplogTableLoading');
     const $clearSearchBtn = $('#clearSearchBtn');
+    const $facetBar = $('#facetBar');
+    const facetLabels = {operator: 'Operator', tool: 'Tool', tag: 'Tag'};
 
     let socket = null;
     let allEntriesFetched = false;
     let errorDisplayed = false;
 
-    // null | {filter: string, offset: number}
+    // Cursor returned by the server for the page after the last fetched one
+    let nextCursor = null;
+
+    // Facet values selected to narrow the entries, sent as structured filters
+    let activeFilters = {operator: [], tool: [], tag: []};
+
+    // null | {filter: string, filters: string, cursor: string | null}
     let pendingOperation = null;
 
+    function hasActiveFilters() {
+        return Object.values(activeFilters).some(values => values.length !== 0);
+    }
+
+    // Show the entry counts per operator, tool, and tag of the filtered entries
+    function renderFacets(facets) {
+        $facetBar.empty();
+        Object.keys(facetLabels).forEach(name => {
+            facets[name].forEach(facet => {
+                const active = activeFilters[name].includes(facet.value);
+                $facetBar.append(
+                    $('<button type="button" class="btn btn-sm m-1 js-facet"></button>')
+                        .addClass(active ? 'btn-primary' : 'btn-outline-secondary')
+                        .attr('data-facet', name)
+                        .attr('data-value', facet.value)
+                        .text(`${facetLabels[name]}: ${facet.value} (${facet.count})`)
+                );
+            });
+        });
+    }
+
+    $facetBar.on('click', '.js-facet', function () {
+        const name = $(this).attr('data-facet');
+        const value = $(this).attr('data-value');
+        if (activeFilters[name].includes(value)) {
+            activeFilters[name] = activeFilters[name].filter(item => item !== value);
+        } else {
+            activeFilters[name].push(value);
+        }
+        fetch(true);
+    });
+
     function updatePlaceholder() {
         if (pendingOperation) {
             $oplogTableLoading.show();
@@ -138,6 +178,7 @@ $(document).ready(function() {
 
     $clearSearchBtn.click(function () {
         $searchInput.val("");
+        activeFilters = {operator: [], tool: [], tag: []};
         fetch(true);
     });
 
@@ -394,13 +435,15 @@ $(document).ready(function() {
 
     function fetch(clear_existing) {
         const new_filter = $searchInput.val();
-        const new_offset = clear_existing ? 0 : $tableBody.find('> tr').length;
-        if (pendingOperation !== null && pendingOperation.filter === new_filter && pendingOperation.new_offset === new_offset)
+        const new_filters = JSON.stringify(activeFilters);
+        const new_cursor = clear_existing ? null : nextCursor;
+        if (pendingOperation !== null && pendingOperation.filter === new_filter && pendingOperation.filters === new_filters && pendingOperation.cursor === new_cursor)
             return;
 
         pendingOperation = {
             filter: new_filter,
-            offset: new_offset,
+            filters: new_filters,
+            cursor: new_cursor,
         };
         allEntriesFetched = false;
 
@@ -412,11 +455,38 @@ $(document).ready(function() {
         socket.send(JSON.stringify({
             'action': 'sync',
             'oplog_id': oplog_id,
-            'offset': new_offset,
+            'cursor': new_cursor,
             'filter': new_filter,
+            'filters': activeFilters,
         }));
     }
 
+    // Update the row of a created or updated entry, or add it to the top of the table
+    function upsertRow(entry) {
+        let $row = $tableBody.find(`> tr[id="${entry['id']}"]`);
+        if ($row.length !== 0) {
+            updateRow($row, generateRow(entry));
+            return;
+        }
+
+        $tableBody.prepend(generateRow(entry));
+        let $newRow = $(`#${entry['id']}`);
+        $newRow.hide();
+
+        emptyTable = false;
+        hideColumns();
+        $newRow.fadeIn(500);
+    }
+
+    // Remove the row of a deleted entry
+    function removeRow(id) {
+        $tableBody.find(`> tr[id="${id}"]`).fadeOut('slow', function () {
+            $('.tooltip').tooltip('hide');
+            $(this).remove();
+            updatePlaceholder();
+        });
+    }
+
     function connect() {
         let endpoint = protocol + window.location.host + '/ws' + window.location.pathname
         socket = new WebSocket(endpoint)
@@ -434,20 +504,23 @@ $(document).ready(function() {
 
             // Handle the `sync` action that is received whenever the socket (re)connects
             if (message['action'] === 'sync') {
-                if (pendingOperation === null || pendingOperation.filter !== message['filter'] || pendingOperation.offset !== message['offset']) {
+                if (pendingOperation === null || pendingOperation.filter !== message['filter'] || pendingOperation.filters !== JSON.stringify(message['filters']) || pendingOperation.cursor !== message['cursor']) {
                     //console.log("Received sync message that did not match pending operation", pendingOperation, message);
                     return;
                 }
                 pendingOperation = null;
 
                 let entries = message['data']
+                nextCursor = message['next_cursor'];
+                if (message['facets']) {
+                    renderFacets(message['facets']);
+                }
 
-                if (entries.length !== 0) {
-                    entries.forEach(element => {
-                        let newRow = generateRow(element);
-                        $tableBody.append(newRow);
-                    })
-                } else {
+                entries.forEach(element => {
+                    let newRow = generateRow(element);
+                    $tableBody.append(newRow);
+                })
+                if (nextCursor === null) {
                     allEntriesFetched = true;
                 }
                 updatePlaceholder();
@@ -456,54 +529,40 @@ $(document).ready(function() {
                 $('[data-toggle="tooltip"]').tooltip();
                 $table.trigger('updateAll');
                 $table.trigger('updateCache');
-            } else if (message['action'] === 'create') {
-                // Handle the `create` action that is received whenever a new entry is created
+            } else if (message['action'] === 'batch') {
+                // Handle the `batch` action that is received with the entries created, updated, or deleted recently
 
-                if ($searchInput.val() !== "") {
+                if (($searchInput.val() !== "" || hasActiveFilters()) && message['upsert'].length !== 0) {
                     // If there's a filter, refech all, since only the server will know if it matches the filter
                     fetch(true);
                     return;
                 }
 
-                let rowFound = false;
-                let entry = message['data'];
-                let entryId = entry['id'];
-
-                // Check if the row already exists
-                $('#oplogTable tbody tr').each(function () {
-                    if ($(this).attr('id') === entryId.toString()) {
-                        updateRow($(this), generateRow(entry));
-                        rowFound = true;
-                    }
-                });
-
-                // If the row doesn't exist, add it to the table
-                if (!rowFound) {
-                    $tableBody.prepend(generateRow(entry));
-                    let $newRow = $(`#${entry['id']}`);
-                    $newRow.hide();
-
-                    emptyTable = false;
-                    hideColumns();
-                    $newRow.fadeIn(500);
-                }
+                message['upsert'].forEach(upsertRow);
+                message['delete'].forEach(removeRow);
                 updatePlaceholder();
                 $('[data-toggle="tooltip"]').tooltip();
                 $table.trigger('updateAll');
                 $table.trigger('updateCache');
-            } else if (message['action'] === 'delete') {
-                // Handle the `delete` action that is received whenever an entry is deleted
-                let id = message['data'];
-                $('#oplogTable tbody tr').each(function () {
-                    if ($(this).attr('id') === id.toString()) {
-                        $(this).fadeOut('slow', function () {
-                            $('.tooltip').tooltip('hide');
-                            $(this).remove();
-                            updatePlaceholder();
-                        });
-                    }
-                });
-                $table.trigger('updateAll');
+            } else if (message['action'] === 'refresh') {
+                // Handle the `refresh` action that is received after a bulk change, like a CSV import
+                fetch(true);
+            } else if (message['action'] === 'import') {
+                // Handle the `import` action that is received as a CSV import job makes progress
+                if (message['status'] === 'success') {
+                    displayToastTop({
+                        type: 'success',
+                        string: `Imported ${message['created']} new and ${message['updated']} updated log entries.`,
+                        title: 'Log Import'
+                    });
+                } else if (message['status'] === 'failed') {
+                    displayToastTop({
+                        type: 'error',
+                        string: `The log import failed: ${message['error']}`,
+                        title: 'Log Import',
+                        delay: 10
+                    });
+                }
             }
         }
 
@@ -627,11 +686,22 @@ $(document).ready(function() {
         tinymceRemove();
     })
 
-    // Download the log as a CSV file when the user clicks the "Export Entries" menu item
-    $('#exportEntries').click(function () {
-        let filename = generateDownloadName(oplog_name + '-log-export-' + oplog_id.toString() + '.csv');
+    // Download the log through a link, so the browser saves the export as the server streams it
+    function exportEntries(format) {
+        let filename = generateDownloadName(oplog_name + '-log-export-' + oplog_id.toString() + '.' + format);
         let export_url = $tableBody.attr("data-oplog-export-url");
-        download(export_url, filename);
+        let a = document.createElement('a');
+        a.href = export_url + '?format=' + format;
+        a.setAttribute('download', filename);
+        a.click();
+    }
+
+    // Download the log as a CSV or JSON Lines file when the user clicks the "Export Entries" menu items
+    $('#exportEntries').click(function () {
+        exportEntries('csv');
+    })
+    $('#exportEntriesJsonl').click(function () {
+        exportEntries('jsonl');
     })
 
     // Create event to filter results in real-time as search textbox is updated
@@ -696,9 +766,7 @@ $(document).ready(function() {
 
         if (event.ctrlKey && event.keyCode === 83) {
             event.preventDefault();
-            let filename = generateDownloadName(oplog_name + '-log-export-' + oplog_id.toString() + '.csv');
-            let export_url = $tableBody.attr("data-oplog-export-url");
-            download(export_url + oplog_id.toString(), filename);
+            exportEntries('csv');
         }
     });
 